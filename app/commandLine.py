@@ -0,0 +1,123 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""
+Module containing the helpers shared by the command line commands of
+main.py working on the rules (--plan and --verify).
+"""
+
+import sys
+import json
+import argparse
+from typing import Callable
+from model.Rule import Rule
+from model.RuleRepository import RuleRepository
+
+
+def addRuleArguments(parser: argparse.ArgumentParser, verb: str) -> None:
+    """
+    Adds the --rule and --output arguments to the parser.
+    Args:
+        parser (argparse.ArgumentParser): is the parser of the command.
+        verb (str): is what the command does to a rule, e.g. "plans".
+    """
+    parser.add_argument("--rule", action="append", dest="ruleIDs",
+                        help=f"{verb} the rule with the ID (all by default)")
+    parser.add_argument("--output", help="writes the reports to the file")
+
+
+def parseRules(parser: argparse.ArgumentParser, arguments: list[str]
+               ) -> tuple[argparse.Namespace, list[Rule] | None]:
+    """
+    Parses the command line arguments and selects the rules of --rule.
+    Args:
+        parser (argparse.ArgumentParser): is the parser of the command with
+        the arguments of addRuleArguments.
+        arguments (list[str]): are the command line arguments.
+    Returns:
+        tuple[argparse.Namespace, list[Rule] | None]: the parsed arguments
+        and the rules of selectRules.
+    """
+    parsedArguments = parser.parse_args(arguments)
+    return parsedArguments, selectRules(parsedArguments.ruleIDs)
+
+
+def selectRules(ruleIDs: list[str] | None) -> list[Rule] | None:
+    """
+    Returns the rules with the IDs, in the order of RULES_FILE.
+    Args:
+        ruleIDs (list[str], None): are the IDs of the rules or None for all
+        rules.
+    Returns:
+        list[Rule], None: the rules or None if any rule is not found; the
+        missing IDs are printed on the standard error.
+    """
+    rules = RuleRepository().loadRules()
+    if not ruleIDs:
+        return rules
+
+    missingRuleIDs = set(ruleIDs) - {rule.ruleID for rule in rules}
+    if missingRuleIDs:
+        print(f"Rules not found: {', '.join(sorted(missingRuleIDs))}",
+              file=sys.stderr)
+        return None
+    return [rule for rule in rules if rule.ruleID in ruleIDs]
+
+
+def reportRules(rules: list[Rule], createReport: Callable[[Rule], dict],
+                summarizeReport: Callable[[dict], str],
+                errors: tuple[type[Exception], ...]
+                ) -> tuple[list[dict], bool]:
+    """
+    Creates the reports of the rules and prints their summaries on the
+    standard error.
+    Args:
+        rules (list[Rule]): are the reported rules.
+        createReport (Callable[[Rule], dict]): creates the report of a rule.
+        summarizeReport (Callable[[dict], str]): returns the line
+        summarizing a report.
+        errors (tuple[type[Exception], ...]): are the errors of createReport
+        failing a rule, which are printed on the standard error.
+    Returns:
+        tuple[list[dict], bool]: the reports of the rules which have not
+        failed and whether any rule has failed.
+    """
+    reports = []
+    isFailed = False
+    for rule in rules:
+        try:
+            report = createReport(rule)
+        except errors as exception:
+            print(f"{rule.ruleID} {rule.pathFrom}: {exception}",
+                  file=sys.stderr)
+            isFailed = True
+            continue
+        reports.append(report)
+        print(summarizeReport(report), file=sys.stderr)
+    return reports, isFailed
+
+
+def writeReports(reports: list[dict], output: str | None) -> None:
+    """
+    Writes the reports of the rules as JSON.
+    Args:
+        reports (list[dict]): are the reports of the rules.
+        output (str, None): is the path to the written file or None for the
+        standard output.
+    """
+    if output:
+        with open(output, 'w') as file:
+            json.dump({"rules": reports}, file, indent=2)
+    else:
+        json.dump({"rules": reports}, sys.stdout, indent=2)
+        print()
@@ -13,13 +13,27 @@
 """Module containing the initializer of the environment."""
 
 import os
-from const.const import RULE_DIRECTORY, RULES_FILE_PATH
+from const.const import (
+    RULE_DIRECTORY,
+    RULES_FILE_PATH,
+    CACHE_DIRECTORY,
+    DATA_DIRECTORY,
+)
 
 
 def initializeEnvironment():
-    """Creates the RULE_DIRECTORY and RULES_FILE."""
+    """
+    Creates the RULE_DIRECTORY, RULES_FILE, CACHE_DIRECTORY and
+    DATA_DIRECTORY.
+    """
     if not os.path.exists(RULE_DIRECTORY):
         os.makedirs(RULE_DIRECTORY)
 
+    if not os.path.exists(CACHE_DIRECTORY):
+        os.makedirs(CACHE_DIRECTORY)
+
+    if not os.path.exists(DATA_DIRECTORY):
+        os.makedirs(DATA_DIRECTORY)
+
     if not os.path.exists(RULES_FILE_PATH):
         open(RULES_FILE_PATH, 'w').close()
@@ -0,0 +1,90 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Module containing the command line planner.
+
+Run with: python main.py --plan [--rule RULE_ID ...] [--output PLAN.json]
+
+Plans the runs of the rules (all rules by default) without uploading
+anything: the files to create, to update, to skip and to delete, the bytes
+and the duration estimated by the recent throughput. The plans are written
+as JSON and summarized on the standard error.
+"""
+
+import argparse
+import functools
+from app.commandLine import (
+    addRuleArguments,
+    parseRules,
+    reportRules,
+    writeReports,
+)
+from model.CredentialsRepository import CredentialsRepository
+from model.ManifestRepository import ManifestRepository
+from model.RunHistoryRepository import RunHistoryRepository
+from model.HashCacheRepository import HashCacheRepository
+from service.GoogleAuthService import GoogleAuthService
+from worker.PlanWorker import PlanWorker
+
+
+def summarizePlan(plan: dict) -> str:
+    """Returns the line summarizing the plan of PlanWorker.createPlan."""
+    estimatedSeconds = plan["estimatedSeconds"]
+    estimate = f"~{estimatedSeconds:.0f} s" if estimatedSeconds is not None \
+        else "unknown time"
+    return f"{plan['ruleID']} {plan['pathFrom']}: " + \
+        f"{len(plan['create'])} to create, {len(plan['update'])} to " + \
+        f"update, {plan['skip']} skipped, {len(plan['delete'])} to " + \
+        f"delete, {len(plan['deferred'])} deferred; " + \
+        f"{plan['plannedBytes'] / 1024 / 1024:.1f} MB, {estimate}"
+
+
+def runPlanCommand(arguments: list[str]) -> int:
+    """
+    Plans the rules of the command line arguments.
+    Args:
+        arguments (list[str]): are the command line arguments.
+    Returns:
+        int: the exit code, 1 if a rule is not found or cannot be planned.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py --plan",
+        description="Plans the runs of the rules without uploading."
+    )
+    parser.add_argument("--plan", action="store_true")
+    addRuleArguments(parser, "plans")
+    parsedArguments, rules = parseRules(parser, arguments)
+    if rules is None:
+        return 1
+
+    driveService = GoogleAuthService.getAuthorizedService(
+        CredentialsRepository()
+    )
+    manifest = ManifestRepository()
+    runHistory = RunHistoryRepository()
+    hashCache = HashCacheRepository()
+    planWorker = PlanWorker(driveService, manifest, runHistory, hashCache)
+    engine = planWorker.createEngine()
+    try:
+        plans, isFailed = reportRules(
+            rules, functools.partial(planWorker.createPlan, engine),
+            summarizePlan, PlanWorker.PLAN_ERRORS
+        )
+    finally:
+        engine.hashService.close()
+        manifest.close()
+        runHistory.close()
+        hashCache.close()
+
+    writeReports(plans, parsedArguments.output)
+    return 1 if isFailed else 0
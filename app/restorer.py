@@ -0,0 +1,92 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""
+Module containing the command line restore.
+
+Run with: python main.py --restore FOLDER_ID --to DIRECTORY [--workers N]
+    [--output REPORT.json]
+
+Downloads the Google Drive folder with its subfolders into the directory
+(see RestoreEngine): the files are downloaded in parallel, verified
+against their md5Checksum and skipped if the local file already matches
+(the bundles are skipped if their members match the manifest), and an
+interrupted restore continues where it stopped when it is run again. The
+report is written as JSON and summarized on the standard error.
+"""
+
+import sys
+import json
+import argparse
+from model.CredentialsRepository import CredentialsRepository
+from model.HashCacheRepository import HashCacheRepository
+from model.ManifestRepository import ManifestRepository
+from service.GoogleAuthService import GoogleAuthService
+from service.HashService import HashService
+from service.RestoreEngine import RestoreEngine
+from const.const import RESTORE_WORKERS
+
+
+def runRestoreCommand(arguments: list[str]) -> int:
+    """
+    Restores the folder of the command line arguments.
+    Args:
+        arguments (list[str]): are the command line arguments.
+    Returns:
+        int: the exit code, 1 if any file has not been restored.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py --restore",
+        description="Downloads a Google Drive folder into a directory."
+    )
+    parser.add_argument("--restore", required=True, dest="folderID",
+                        help="the ID of the restored Google Drive folder")
+    parser.add_argument("--to", required=True, dest="pathTo",
+                        help="the directory the files are restored to")
+    parser.add_argument("--workers", type=int, default=RESTORE_WORKERS,
+                        help="the number of the parallel downloads")
+    parser.add_argument("--output", help="writes the report to the file")
+    parsedArguments = parser.parse_args(arguments)
+
+    driveService = GoogleAuthService.getAuthorizedService(
+        CredentialsRepository()
+    )
+    hashCache = HashCacheRepository()
+    hashService = HashService(hashCache)
+    manifest = ManifestRepository()
+    engine = RestoreEngine(driveService, hashService,
+                           maxWorkers=parsedArguments.workers,
+                           manifestModel=manifest)
+    try:
+        report = engine.restore(parsedArguments.folderID,
+                                parsedArguments.pathTo)
+    except RestoreEngine.RESTORE_ERRORS as exception:
+        print(f"{parsedArguments.folderID}: {exception}", file=sys.stderr)
+        return 1
+    finally:
+        hashService.close()
+        hashCache.close()
+        manifest.close()
+
+    print(f"{report.folderID} -> {report.pathTo}: " +
+          f"{report.filesRestored} restored, {report.filesSkipped} " +
+          f"skipped, {report.filesIgnored} ignored, {len(report.errors)} " +
+          f"failed; {report.bytesDownloaded / 1024 / 1024:.1f} MB in " +
+          f"{report.duration:.0f} s", file=sys.stderr)
+    if parsedArguments.output:
+        with open(parsedArguments.output, 'w') as file:
+            json.dump(report.toDict(), file, indent=2)
+    else:
+        json.dump(report.toDict(), sys.stdout, indent=2)
+        print()
+    return 0 if report.outcome == report.SUCCESS else 1
@@ -0,0 +1,107 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""
+Module containing the command line verification.
+
+Run with: python main.py --verify [--rule RULE_ID ...] [--rehash]
+    [--requeue] [--output REPORT.json]
+
+Verifies the backups of the rules (all rules by default) against the
+sizes and the md5Checksums of the listed Google Drive files without
+downloading anything (see BackupVerifier): the files missing in Google
+Drive, the mismatched files and the extra files are reported. With
+--rehash the local files are hashed and compared instead of the manifest,
+and with --requeue the missing and mismatched files are uploaded again by
+the next run of their rule. The reports are written as JSON and
+summarized on the standard error.
+"""
+
+import argparse
+import functools
+from app.commandLine import (
+    addRuleArguments,
+    parseRules,
+    reportRules,
+    writeReports,
+)
+from model.Rule import Rule
+from model.CredentialsRepository import CredentialsRepository
+from model.ManifestRepository import ManifestRepository
+from model.HashCacheRepository import HashCacheRepository
+from service.GoogleAuthService import GoogleAuthService
+from service.HashService import HashService
+from service.BackupVerifier import BackupVerifier
+
+
+def summarizeReport(report: dict) -> str:
+    """Returns the line summarizing the report of VerifyReport.toDict."""
+    return f"{report['ruleID']}: {report['outcome']}, " + \
+        f"{report['filesChecked']} checked, {len(report['missing'])} " + \
+        f"missing, {len(report['mismatched'])} mismatched, " + \
+        f"{len(report['extra'])} extra, {report['requeued']} requeued; " + \
+        f"{report['listCalls']} list calls in {report['duration']:.0f} s"
+
+
+def verifyRule(verifier: BackupVerifier, isRehashed: bool, isRequeued: bool,
+               rule: Rule) -> dict:
+    """Returns the dictionary of the report of BackupVerifier.verifyRule."""
+    return verifier.verifyRule(rule, isRehashed, isRequeued).toDict()
+
+
+def runVerifyCommand(arguments: list[str]) -> int:
+    """
+    Verifies the rules of the command line arguments.
+    Args:
+        arguments (list[str]): are the command line arguments.
+    Returns:
+        int: the exit code, 1 if a rule is not found or cannot be verified
+        or any file is missing or mismatched.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py --verify",
+        description="Verifies the backups of the rules without downloading."
+    )
+    parser.add_argument("--verify", action="store_true")
+    addRuleArguments(parser, "verifies")
+    parser.add_argument("--rehash", action="store_true",
+                        help="compares the hashes of the local files")
+    parser.add_argument("--requeue", action="store_true",
+                        help="uploads the bad files by the next run")
+    parsedArguments, rules = parseRules(parser, arguments)
+    if rules is None:
+        return 1
+
+    manifest = ManifestRepository()
+    hashCache = HashCacheRepository()
+    hashService = HashService(hashCache)
+    verifier = BackupVerifier(
+        GoogleAuthService.getAuthorizedService(CredentialsRepository()),
+        manifest, hashService
+    )
+    try:
+        reports, isFailed = reportRules(
+            rules, functools.partial(verifyRule, verifier,
+                                     parsedArguments.rehash,
+                                     parsedArguments.requeue),
+            summarizeReport, BackupVerifier.VERIFY_ERRORS
+        )
+    finally:
+        hashService.close()
+        manifest.close()
+        hashCache.close()
+
+    writeReports(reports, parsedArguments.output)
+    isFailed = isFailed or any(report["outcome"] != "success"
+                               for report in reports)
+    return 1 if isFailed else 0
@@ -0,0 +1,343 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Module containing the benchmark of the backup engine against the fake
+Google Drive service.
+
+Run with: python -m benchmark.DriveBenchmark [--scenario NAME ...]
+    [--scale FACTOR] [--latency MS] [--bandwidth MBPS] [--faults PROFILE]
+    [--retryDelay MS] [--mode MODE] [--output BASELINE.json]
+    [--compare BASELINE.json] [--threshold RATIO]
+
+Every scenario runs in its own process, so the peak RSS is the peak of the
+scenario. A scenario backs up a generated tree twice: the first run uploads
+everything and the rerun only scans the unchanged tree.
+
+With a fault profile (see FaultProfile.fromName) the requests fail, and the
+time to completion, the retries, the wasted uploaded bytes and the files
+which failed despite the retries show how the engine recovers. The retry
+delays are scaled down by --retryDelay to keep the benchmark short.
+
+The rule runs with the mode of --mode, e.g. "bundle" to bundle the small
+files.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import concurrent.futures
+import multiprocessing
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.ManifestRepository import ManifestRepository
+from service.BackupEngine import BackupEngine
+from service.RetryPolicy import RetryPolicy
+from benchmark.FakeDriveService import FakeDriveService
+from benchmark.FaultProfile import FaultProfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+MEGABYTE = 1024 * 1024
+
+# The size of the scenario, not compared.
+SIZE_METRICS = {"files", "megabytes"}
+
+# Lower is better for these metrics, higher for all others.
+LOWER_IS_BETTER = {
+    "seconds",
+    "apiCallsPerFile",
+    "peakRSSMegabytes",
+    "rerunSeconds",
+    "rerunApiCalls",
+    "retries",
+    "wastedMegabytes",
+    "failedFiles",
+}
+
+
+def writeFile(path: str, size: int, block: bytes) -> None:
+    """Writes a file of the size repeating the block."""
+    with open(path, 'wb') as file:
+        for _ in range(size // len(block)):
+            file.write(block)
+        file.write(block[:size % len(block)])
+
+
+def createSmallFiles(directory: str, scale: float) -> None:
+    """10 000 files of 1 KiB in 100 folders."""
+    NUMBER_OF_FOLDERS = 100
+    FILES_PER_FOLDER = 100
+    FILE_SIZE = 1024
+    block = os.urandom(FILE_SIZE)
+    for folder in range(max(1, round(NUMBER_OF_FOLDERS * scale))):
+        folderPath = os.path.join(directory, f"folder{folder:03d}")
+        os.makedirs(folderPath)
+        for number in range(FILES_PER_FOLDER):
+            writeFile(os.path.join(folderPath, f"file{number:03d}.bin"),
+                      FILE_SIZE, block)
+
+
+def createHugeFiles(directory: str, scale: float) -> None:
+    """3 files of 256 MiB."""
+    NUMBER_OF_FILES = 3
+    FILE_SIZE = 256 * MEGABYTE
+    block = os.urandom(MEGABYTE)
+    for number in range(NUMBER_OF_FILES):
+        writeFile(os.path.join(directory, f"huge{number}.bin"),
+                  max(1, round(FILE_SIZE * scale)), block)
+
+
+def createDeepTree(directory: str, scale: float) -> None:
+    """A chain of 100 nested folders with 10 files of 4 KiB in each."""
+    DEPTH = 100
+    FILES_PER_FOLDER = 10
+    FILE_SIZE = 4 * 1024
+    block = os.urandom(FILE_SIZE)
+    folderPath = directory
+    for depth in range(max(1, round(DEPTH * scale))):
+        folderPath = os.path.join(folderPath, f"level{depth:03d}")
+        os.makedirs(folderPath)
+        for number in range(FILES_PER_FOLDER):
+            writeFile(os.path.join(folderPath, f"file{number}.bin"),
+                      FILE_SIZE, block)
+
+
+SCENARIOS = {
+    "smallFiles": createSmallFiles,
+    "hugeFiles": createHugeFiles,
+    "deepTree": createDeepTree,
+}
+
+
+def getPeakRSSMegabytes() -> float | None:
+    """Returns the peak resident set size of the process or None."""
+    if resource is None:
+        return None
+    peakRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    if sys.platform == "darwin":
+        return peakRSS / MEGABYTE
+    return peakRSS / 1024
+
+
+def timeRun(engine: BackupEngine, rule: Rule,
+            isFaulty: bool) -> tuple[RuleRun, float]:
+    """
+    Runs the rule and returns the run and its duration in seconds.
+    Raises:
+        RuntimeError: raises if the run failed without injected faults.
+    """
+    start = time.perf_counter()
+    run = engine.runRule(rule)
+    seconds = time.perf_counter() - start
+    if run.errorClass is not None and not isFaulty:
+        raise RuntimeError(f"The run failed with {run.errorClass}.") \
+            from run.error
+    return run, seconds
+
+
+def backUpTwice(treePath: str, manifest: ManifestRepository,
+                driveService: FakeDriveService, isFaulty: bool,
+                retryDelay: float,
+                mode: str | None) -> dict[str, float | None]:
+    """
+    Backs up the tree twice into a new folder and returns the metrics of
+    the scenario, see runScenario.
+    """
+    retryPolicy = RetryPolicy(
+        initialDelay=retryDelay,
+        maxDelay=retryDelay * 32,
+        randomGenerator=random.Random(0)  # nosec B311
+    )
+    engine = BackupEngine(driveService, manifest, retryPolicy)
+    rule = Rule(treePath, driveService.addFolder("Backup"), "benchmark",
+                "00:00", mode=mode)
+
+    run, seconds = timeRun(engine, rule, isFaulty)
+    apiCalls = driveService.numberOfCalls
+    wastedBytes = driveService.wastedBytes
+    rerunSeconds = timeRun(engine, rule, isFaulty)[1]
+
+    files = max(run.filesUploaded, 1)
+    return {
+        "files": run.filesUploaded,
+        "megabytes": run.bytesUploaded / MEGABYTE,
+        "seconds": seconds,
+        "filesPerSecond": run.filesUploaded / seconds,
+        "megabytesPerSecond": run.bytesUploaded / MEGABYTE / seconds,
+        "apiCallsPerFile": apiCalls / files,
+        "rerunSeconds": rerunSeconds,
+        "rerunApiCalls": driveService.numberOfCalls - apiCalls,
+        "retries": run.retries,
+        "wastedMegabytes": wastedBytes / MEGABYTE,
+        "failedFiles": run.filesChanged - run.filesUploaded,
+        "peakRSSMegabytes": getPeakRSSMegabytes(),
+    }
+
+
+def runScenario(name: str, scale: float = 1.0, latency: float = 0.0,
+                bandwidth: float = 0.0, faults: str = "none",
+                retryDelay: float = 0.01,
+                mode: str | None = None) -> dict[str, float | None]:
+    """
+    Generates the tree of the scenario and backs it up twice.
+    Args:
+        name (str): is the name of the scenario in SCENARIOS.
+        scale (float): scales the number of files, folders or the size.
+        latency (float): is the latency of every request in seconds.
+        bandwidth (float): is the bandwidth in bytes per second (0 for
+        unlimited).
+        faults (str): is the name of the fault profile.
+        retryDelay (float): is the initial retry delay in seconds.
+        mode (str, None): is the mode of the rule.
+    Returns:
+        dict[str, float | None]: the metrics of the scenario.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        treePath = os.path.join(directory, name)
+        os.makedirs(treePath)
+        SCENARIOS[name](treePath, scale)
+
+        faultProfile = FaultProfile.fromName(faults)
+        driveService = FakeDriveService(latency, bandwidth, faultProfile)
+        manifest = ManifestRepository(
+            os.path.join(directory, "manifest.sqlite3")
+        )
+        try:
+            return backUpTwice(treePath, manifest, driveService,
+                               faultProfile is not None, retryDelay, mode)
+        finally:
+            manifest.close()
+
+
+def runScenarios(names: list[str], scale: float, latency: float,
+                 bandwidth: float, faults: str, retryDelay: float,
+                 mode: str | None = None) -> dict[str, dict]:
+    """Runs every scenario in a new process."""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=context
+        ) as executor:
+            results[name] = executor.submit(
+                runScenario, name, scale, latency, bandwidth, faults,
+                retryDelay, mode
+            ).result()
+    return results
+
+
+def compareResults(baseline: dict, results: dict,
+                   threshold: float) -> list[str]:
+    """
+    Compares the metrics of the scenarios with the baseline.
+    Args:
+        baseline (dict): is the baseline in the output format.
+        results (dict): are the compared results in the output format.
+        threshold (float): is the relative change counted as a regression.
+    Returns:
+        list[str]: the lines of the comparison; the regressions start with
+        "REGRESSION".
+    """
+    lines = []
+    for name, metrics in results["scenarios"].items():
+        baselineMetrics = baseline.get("scenarios", {}).get(name)
+        if baselineMetrics is None:
+            lines.append(f"{name}: not in the baseline")
+            continue
+        for metric, value in metrics.items():
+            baselineValue = baselineMetrics.get(metric)
+            if metric in SIZE_METRICS or value is None or \
+               not baselineValue:
+                continue
+            change = (value - baselineValue) / baselineValue
+            worse = change > threshold if metric in LOWER_IS_BETTER \
+                else change < -threshold
+            prefix = "REGRESSION " if worse else ""
+            lines.append(
+                f"{prefix}{name}.{metric}: {baselineValue:.3f} -> " +
+                f"{value:.3f} ({change:+.1%})"
+            )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the backup engine against a fake Drive."
+    )
+    parser.add_argument("--scenario", action="append",
+                        choices=list(SCENARIOS), dest="scenarios")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="latency of a request in milliseconds")
+    parser.add_argument("--bandwidth", type=float, default=0.0,
+                        help="upload bandwidth in MB/s (0 for unlimited)")
+    parser.add_argument("--faults", choices=FaultProfile.PROFILES,
+                        default="none")
+    parser.add_argument("--retryDelay", type=float, default=10.0,
+                        help="initial retry delay in milliseconds")
+    parser.add_argument("--mode", help="the mode of the rule, e.g. bundle")
+    parser.add_argument("--output", help="writes the results as JSON")
+    parser.add_argument("--compare", help="compares with a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    arguments = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": arguments.scale,
+        "latencyMs": arguments.latency,
+        "bandwidthMBps": arguments.bandwidth,
+        "faults": arguments.faults,
+        "retryDelayMs": arguments.retryDelay,
+        "mode": arguments.mode,
+        "scenarios": runScenarios(
+            arguments.scenarios or list(SCENARIOS),
+            arguments.scale,
+            arguments.latency / 1000,
+            arguments.bandwidth * MEGABYTE,
+            arguments.faults,
+            arguments.retryDelay / 1000,
+            arguments.mode
+        ),
+    }
+
+    for name, metrics in results["scenarios"].items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f"  {metric}: " +
+                  (f"{value:.3f}" if value is not None else "-"))
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            lines = compareResults(json.load(file), results,
+                                   arguments.threshold)
+        print("\n".join(lines))
+        if any(line.startswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
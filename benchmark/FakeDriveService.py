@@ -0,0 +1,757 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the in-process fake of the Google Drive v3 service."""
+
+import re
+import json
+import time
+import hashlib
+import datetime
+import threading
+import functools
+import collections
+from typing import Callable
+import httplib2
+from googleapiclient.errors import HttpError, BatchError
+from googleapiclient.http import MediaUploadProgress
+from benchmark.FaultProfile import FaultProfile
+
+
+class FakeRequest:
+    """
+    The request of FakeDriveService - like HttpRequest it does nothing until
+    execute (or next_chunk for a resumable upload) is called.
+    """
+    def __init__(self, service: "FakeDriveService", method: str, handler,
+                 media=None):
+        """
+        Initializes the request.
+        Args:
+            service (FakeDriveService): is the service of the request.
+            method (str): is the name of the API method, e.g. "files.get".
+            handler (Callable[[bytes | None], dict]): applies the request to
+            the state of the service and returns the response.
+            media (MediaUpload, None): is the uploaded media.
+        """
+        self.service = service
+        self.method = method
+        self.handler = handler
+        self.resumable = media if media is not None and media.resumable() \
+            else None
+        self.media = media
+        self.__uploadedBytes: list[bytes] = []
+        self.__progress = 0
+        self.__isSessionStarted = False
+
+    def execute(self, _http=None, _num_retries: int = 0) -> dict:
+        """Executes the request and returns the response."""
+        if self.resumable is not None:
+            response = None
+            while response is None:
+                _, response = self.next_chunk()
+            return response
+
+        content = None
+        if self.media is not None:
+            content = self.media.getbytes(0, self.media.size())
+        fault = self.service.send(self.method, len(content or b""))
+        response = self.handler(content)
+        self.service.loseResponse(self.method, fault)
+        return response
+
+    def next_chunk(self, _http=None, _num_retries: int = 0):
+        """
+        Uploads the next chunk of a resumable upload.
+        Returns:
+            tuple[MediaUploadProgress | None, dict | None]: the progress and
+            None until the last chunk, then None and the response.
+        """
+        if self.resumable is None:
+            raise ValueError("The request has no resumable media.")
+        if not self.__isSessionStarted:
+            fault = self.service.send(self.method, 0)
+            self.__isSessionStarted = True
+            self.service.loseResponse(self.method, fault)
+
+        size = self.resumable.size()
+        chunkSize = self.resumable.chunksize()
+        if chunkSize < 0:
+            chunkSize = size
+        chunk = self.resumable.getbytes(self.__progress, chunkSize)
+        fault = self.service.send(FakeDriveService.UPLOAD_CHUNK_METHOD,
+                                  len(chunk))
+        self.__uploadedBytes.append(chunk)
+        self.__progress += len(chunk)
+        if self.__progress < size:
+            self.service.loseResponse(FakeDriveService.UPLOAD_CHUNK_METHOD,
+                                      fault)
+            return MediaUploadProgress(self.__progress, size), None
+
+        content = b"".join(self.__uploadedBytes)
+        self.__uploadedBytes = []
+        response = self.handler(content)
+        self.service.loseResponse(FakeDriveService.UPLOAD_CHUNK_METHOD, fault)
+        return None, response
+
+
+class FakeMediaRequest:
+    """
+    The media request of files.get_media of FakeDriveService - like
+    HttpRequest it has the uri, the headers and the http sending the Range
+    requests (e.g. of MediaIoBaseDownload).
+    """
+    def __init__(self, service: "FakeDriveService", fileID: str):
+        self.service = service
+        self.fileID = fileID
+        self.uri = f"fake://drive/v3/files/{fileID}?alt=media"
+        self.headers: dict[str, str] = {}
+        self.http = self
+
+    def request(self, _uri: str, _method: str = "GET",
+                headers: dict | None = None, **_kwargs):
+        """
+        Returns the response and the bytes of the Range of the headers.
+        Raises:
+            HttpError: raises 404 if the file does not exist.
+        """
+        fault = self.service.send(FakeDriveService.GET_MEDIA_METHOD, 0)
+        self.service.loseResponse(FakeDriveService.GET_MEDIA_METHOD, fault)
+        content = self.service.getContent(self.fileID)
+        byteRange = (headers or {}).get("range", "")
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", byteRange)
+        start = int(match[1]) if match else 0
+        end = int(match[2]) + 1 if match and match[2] else len(content)
+        chunk = content[start:end]
+        self.service.download(len(chunk), self.fileID, byteRange)
+        return httplib2.Response({
+            "status": 206,
+            "content-range":
+                f"bytes {start}-{start + len(chunk) - 1}/{len(content)}",
+        }), chunk
+
+
+class FakeBatchRequest:
+    """
+    The batch of FakeDriveService - the added requests are sent in one call,
+    and their responses are passed to the callbacks.
+    """
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, service: "FakeDriveService", callback=None):
+        self.service = service
+        self.callback = callback
+        self.__requests: list[
+            tuple[str, FakeRequest, Callable | None]
+        ] = []
+
+    def add(self, request: FakeRequest, callback=None,
+            request_id: str | None = None) -> None:
+        """
+        Adds the request to the batch.
+        Raises:
+            BatchError: raises if the batch is full.
+        """
+        if len(self.__requests) >= self.MAX_BATCH_SIZE:
+            raise BatchError(
+                f"Exceeds the maximum of {self.MAX_BATCH_SIZE} calls in a " +
+                "single batch request."
+            )
+        if request_id is None:
+            request_id = str(len(self.__requests) + 1)
+        self.__requests.append((request_id, request, callback))
+
+    def execute(self, _http=None) -> None:
+        """Executes the requests of the batch in one call."""
+        fault = self.service.send(FakeDriveService.BATCH_METHOD, 0)
+        self.service.loseResponse(FakeDriveService.BATCH_METHOD, fault)
+        for requestID, request, callback in self.__requests:
+            response, exception = None, None
+            self.service.count(request.method)
+            try:
+                content = None
+                if request.media is not None:
+                    content = request.media.getbytes(0, request.media.size())
+                    self.service.transfer(len(content))
+                response = request.handler(content)
+            except HttpError as error:
+                exception = error
+            for function in (callback, self.callback):
+                if function is not None:
+                    function(requestID, response, exception)
+
+
+class FakeFilesResource:
+    """The files resource of FakeDriveService."""
+    def __init__(self, service: "FakeDriveService"):
+        self.service = service
+
+    def get(self, fileId: str, fields: str | None = None,
+            **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.get",
+            lambda _: self.service.getFile(fileId, fields)
+        )
+
+    def list(self, q: str | None = None, fields: str | None = None,
+             pageSize: int = 100, pageToken: str | None = None,
+             orderBy: str | None = None, **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.list",
+            lambda _: self.service.listFiles(q, fields, pageSize, pageToken,
+                                             orderBy)
+        )
+
+    def create(self, body: dict | None = None, media_body=None,
+               fields: str | None = None, **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.create",
+            lambda content: self.service.createFile(body or {}, content,
+                                                    fields),
+            media_body
+        )
+
+    def update(self, fileId: str, body: dict | None = None, media_body=None,
+               fields: str | None = None, addParents: str | None = None,
+               removeParents: str | None = None, **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.update",
+            lambda content: self.service.updateFile(
+                fileId, body or {}, content, fields, addParents,
+                removeParents
+            ),
+            media_body
+        )
+
+    def generateIds(self, count: int = 10, space: str = "drive",
+                    **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.generateIds",
+            lambda _: {"space": space,
+                       "ids": self.service.generateFileIDs(count)}
+        )
+
+    def get_media(self, fileId: str, **_kwargs) -> FakeMediaRequest:
+        return FakeMediaRequest(self.service, fileId)
+
+    def copy(self, fileId: str, body: dict | None = None,
+             fields: str | None = None, **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.copy",
+            lambda _: self.service.copyFile(fileId, body or {}, fields)
+        )
+
+    def delete(self, fileId: str, **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "files.delete",
+            lambda _: self.service.deleteFile(fileId)
+        )
+
+
+class FakeAboutResource:
+    """The about resource of FakeDriveService."""
+    def __init__(self, service: "FakeDriveService"):
+        self.service = service
+
+    def get(self, **_kwargs) -> FakeRequest:
+        return FakeRequest(
+            self.service, "about.get", lambda _: self.service.getAbout()
+        )
+
+
+class FakeDriveService:
+    """
+    The class of FakeDriveService - a stateful in-process stand-in for the
+    Google Drive v3 service built by googleapiclient, for the benchmarks and
+    the tests of the code talking to Google Drive.
+
+    The files are kept in memory without their content (only the size and
+    the MD5 checksum) unless isContentKept is set, which the downloads
+    need. Every request sleeps latency seconds and every
+    uploaded byte takes 1 / bandwidth seconds, so the API costs can be
+    modelled; calls counts the executed requests by the API method.
+
+    The fault profile injects errors into the requests: the failed requests
+    are not applied, and their uploaded bytes are counted in wastedBytes.
+    With a storage limit the content which would exceed it is refused with
+    403 storageQuotaExceeded.
+    """
+    # The status, the reason and the message of the injected HTTP errors.
+    HTTP_FAULTS = {
+        FaultProfile.RATE_LIMIT: (429, "rateLimitExceeded",
+                                  "Rate Limit Exceeded"),
+        FaultProfile.USER_RATE_LIMIT: (403, "userRateLimitExceeded",
+                                       "User Rate Limit Exceeded"),
+        FaultProfile.SERVER_ERROR: (503, "backendError",
+                                    "Service Unavailable"),
+        FaultProfile.TOKEN_EXPIRED: (401, "authError",
+                                     "Invalid Credentials"),
+    }
+    FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+    ROOT_FOLDER_ID = "root"
+    UPLOAD_CHUNK_METHOD = "upload.chunk"
+    BATCH_METHOD = "batch"
+    GET_MEDIA_METHOD = "files.get_media"
+    MAX_PAGE_SIZE = 1000
+    DEFAULT_FIELDS = ("id", "name", "mimeType")
+
+    # One clause of a files.list query: "'ID' in parents",
+    # "name = 'NAME'", "mimeType != 'TYPE'" or "trashed = false".
+    QUERY_CLAUSE = re.compile(
+        r"\s*(?:'(?P<parent>(?:[^'\\]|\\.)*)'\s+in\s+parents"
+        r"|(?P<field>name|mimeType)\s*(?P<operator>!=|=)\s*"
+        r"'(?P<value>(?:[^'\\]|\\.)*)'"
+        r"|trashed\s*=\s*(?P<trashed>true|false))"
+        r"\s*(?:and\s+|$)"
+    )
+
+    def __init__(self, latency: float = 0.0, bandwidth: float = 0.0,
+                 faultProfile: FaultProfile | None = None,
+                 storageLimit: int | None = None,
+                 isContentKept: bool = False):
+        """
+        Initializes the empty Google Drive with the root folder.
+        Args:
+            latency (float): is the latency of every request in seconds.
+            bandwidth (float): is the upload bandwidth in bytes per second
+            (0 for unlimited).
+            faultProfile (FaultProfile, None): injects the faults into the
+            requests or None for no faults.
+            storageLimit (int, None): is the storage quota in bytes or None
+            for unlimited storage.
+            isContentKept (bool): whether the content of the files is kept
+            to be downloaded.
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.faultProfile = faultProfile
+        self.storageLimit = storageLimit
+        self.isContentKept = isContentKept
+        self.storageUsage = 0
+        self.calls: collections.Counter[str] = collections.Counter()
+        self.faults: collections.Counter[str] = collections.Counter()
+        self.uploadedBytes = 0
+        self.wastedBytes = 0
+        self.downloadedBytes = 0
+        self.downloadedRanges: list[tuple[str, str]] = []
+        self.__lock = threading.Lock()
+        self.__files: dict[str, dict] = {}
+        self.__contents: dict[str, bytes] = {}
+        self.__children: dict[str, dict[str, None]] = \
+            collections.defaultdict(dict)
+        self.__nextID = 0
+        self.__files[self.ROOT_FOLDER_ID] = {
+            "id": self.ROOT_FOLDER_ID,
+            "name": "My Drive",
+            "mimeType": self.FOLDER_MIME_TYPE,
+            "parents": [],
+            "trashed": False,
+        }
+
+    def files(self) -> FakeFilesResource:
+        return FakeFilesResource(self)
+
+    def about(self) -> FakeAboutResource:
+        return FakeAboutResource(self)
+
+    def new_batch_http_request(self, callback=None) -> FakeBatchRequest:
+        return FakeBatchRequest(self, callback)
+
+    @property
+    def numberOfCalls(self) -> int:
+        """Returns the number of the executed requests."""
+        return sum(self.calls.values())
+
+    def send(self, method: str, numberOfBytes: int) -> str | None:
+        """
+        Counts the request, waits for its latency and the upload of its
+        bytes and injects the fault of the fault profile.
+        Raises:
+            HttpError: raises if an HTTP error is injected.
+            ConnectionResetError: raises if the connection drops; half of
+            the bytes are uploaded.
+        Returns:
+            str | None: the fault injected after the request is applied
+            (RESPONSE_LOST, see loseResponse) or None.
+        """
+        self.count(method)
+        fault = None
+        delay = self.latency
+        if self.faultProfile is not None:
+            fault = self.faultProfile.nextFault(method)
+            if fault == FaultProfile.SLOW_RESPONSE:
+                delay += self.faultProfile.slowDelay
+        if fault is not None:
+            with self.__lock:
+                self.faults[fault] += 1
+        if delay > 0:
+            time.sleep(delay)
+
+        if fault == FaultProfile.CONNECTION_DROP:
+            sentBytes = numberOfBytes // 2
+            self.transfer(sentBytes, isWasted=True)
+            raise ConnectionResetError(f"{method}: the connection dropped.")
+        self.transfer(numberOfBytes, isWasted=fault in self.HTTP_FAULTS)
+        if fault in self.HTTP_FAULTS:
+            raise self.__error(*self.HTTP_FAULTS[fault])
+        return fault if fault == FaultProfile.RESPONSE_LOST else None
+
+    @staticmethod
+    def loseResponse(method: str, fault: str | None) -> None:
+        """
+        Drops the connection of the applied request if its response is
+        lost.
+        Raises:
+            ConnectionResetError: raises if the fault is RESPONSE_LOST.
+        """
+        if fault == FaultProfile.RESPONSE_LOST:
+            raise ConnectionResetError(f"{method}: the response was lost.")
+
+    def count(self, method: str) -> None:
+        with self.__lock:
+            self.calls[method] += 1
+
+    def transfer(self, numberOfBytes: int, isWasted: bool = False) -> None:
+        """Waits for the upload of the bytes."""
+        with self.__lock:
+            self.uploadedBytes += numberOfBytes
+            if isWasted:
+                self.wastedBytes += numberOfBytes
+        if self.bandwidth > 0:
+            time.sleep(numberOfBytes / self.bandwidth)
+
+    def download(self, numberOfBytes: int, fileID: str,
+                 byteRange: str) -> None:
+        """Counts the downloaded bytes and records the Range header."""
+        with self.__lock:
+            self.downloadedBytes += numberOfBytes
+            self.downloadedRanges.append((fileID, byteRange))
+
+    def getContent(self, fileID: str) -> bytes:
+        """
+        Returns the content of the file.
+        Raises:
+            HttpError: raises 404 if the file does not exist.
+            ValueError: raises if the content is not kept.
+        """
+        with self.__lock:
+            file = self.__getFile(fileID)
+            if fileID in self.__contents:
+                return self.__contents[fileID]
+        if "size" not in file:
+            return b""
+        raise ValueError(f"The content of {fileID} is not kept.")
+
+    def addFolder(self, name: str, parentID: str = ROOT_FOLDER_ID) -> str:
+        """Adds a folder without a request and returns its ID."""
+        return self.createFile(
+            {"name": name, "mimeType": self.FOLDER_MIME_TYPE,
+             "parents": [parentID]},
+            None, "id"
+        )["id"]
+
+    def getAbout(self) -> dict:
+        """Returns the storage quota; the limit is missing if unlimited."""
+        with self.__lock:
+            quota = {"usage": str(self.storageUsage)}
+            if self.storageLimit is not None:
+                quota["limit"] = str(self.storageLimit)
+        return {"storageQuota": quota}
+
+    def getFile(self, fileID: str, fields: str | None) -> dict:
+        with self.__lock:
+            return self.__selectFields(self.__getFile(fileID), fields)
+
+    def listFiles(self, query: str | None, fields: str | None,
+                  pageSize: int, pageToken: str | None,
+                  orderBy: str | None) -> dict:
+        """
+        Returns a page of the files matching the query.
+        Raises:
+            HttpError: raises 400 if the query or the page token is invalid.
+        """
+        predicates, parentID = self.__parseQuery(query or "")
+        with self.__lock:
+            if parentID is not None:
+                candidates = [
+                    self.__files[fileID]
+                    for fileID in self.__children.get(parentID, {})
+                ]
+            else:
+                candidates = [
+                    file for fileID, file in self.__files.items()
+                    if fileID != self.ROOT_FOLDER_ID
+                ]
+            files = [
+                file for file in candidates
+                if all(predicate(file) for predicate in predicates)
+            ]
+            if orderBy:
+                files.sort(key=lambda file: file["name"].lower(),
+                           reverse="desc" in orderBy)
+
+            try:
+                offset = int(pageToken) if pageToken else 0
+            except ValueError:
+                raise self.__error(400, "invalid",
+                                   "Invalid page token.") from None
+            pageSize = max(1, min(pageSize or 100, self.MAX_PAGE_SIZE))
+            page = files[offset:offset + pageSize]
+            fileFields = self.__listedFields(fields)
+            response: dict = {
+                "files": [self.__selectFields(file, fileFields)
+                          for file in page]
+            }
+            if offset + pageSize < len(files):
+                response["nextPageToken"] = str(offset + pageSize)
+            return response
+
+    def createFile(self, body: dict, content: bytes | None,
+                   fields: str | None) -> dict:
+        """
+        Creates the file in its parents, with the ID of the body if it has
+        one.
+        Raises:
+            HttpError: raises 404 if a parent does not exist, 409 if the ID
+            is in use or 403 if the storage quota is exceeded.
+        """
+        with self.__lock:
+            parents = body.get("parents") or [self.ROOT_FOLDER_ID]
+            for parentID in parents:
+                self.__getFile(parentID)
+            fileID = self.__newFileID(body)
+            self.__useStorage(len(content or b""))
+            file = {
+                "id": fileID,
+                "name": body.get("name", "Untitled"),
+                "mimeType": body.get("mimeType",
+                                     "application/octet-stream"),
+                "parents": list(parents),
+                "trashed": False,
+            }
+            self.__setContent(file, content)
+            self.__keepContent(fileID, content)
+            self.__files[fileID] = file
+            for parentID in parents:
+                self.__children[parentID][fileID] = None
+            return self.__selectFields(file, fields)
+
+    def updateFile(self, fileID: str, body: dict, content: bytes | None,
+                   fields: str | None, addParents: str | None = None,
+                   removeParents: str | None = None) -> dict:
+        """
+        Updates the metadata, the parents (comma-separated IDs) and the
+        content of the file.
+        Raises:
+            HttpError: raises 404 if the file or an added parent does not
+            exist or 403 if the storage quota is exceeded.
+        """
+        with self.__lock:
+            file = self.__getFile(fileID)
+            addedParents = list(filter(None, (addParents or "").split(",")))
+            for parentID in addedParents:
+                self.__getFile(parentID)
+            for parentID in (removeParents or "").split(","):
+                if parentID in file["parents"]:
+                    file["parents"].remove(parentID)
+                    self.__children[parentID].pop(fileID, None)
+            for parentID in addedParents:
+                if parentID not in file["parents"]:
+                    file["parents"].append(parentID)
+                    self.__children[parentID][fileID] = None
+            if content is not None:
+                self.__useStorage(len(content) - int(file.get("size", 0)))
+            for key in ("name", "mimeType", "trashed"):
+                if key in body:
+                    file[key] = body[key]
+            self.__setContent(file, content)
+            self.__keepContent(fileID, content)
+            return self.__selectFields(file, fields)
+
+    def copyFile(self, fileID: str, body: dict, fields: str | None) -> dict:
+        """
+        Copies the file with its content into the parents of the body, or
+        the parents of the file, with the ID of the body if it has one.
+        Raises:
+            HttpError: raises 404 if the file or a parent does not exist,
+            409 if the ID is in use or 403 if the storage quota is exceeded.
+        """
+        with self.__lock:
+            file = self.__getFile(fileID)
+            parents = body.get("parents") or list(file["parents"])
+            for parentID in parents:
+                self.__getFile(parentID)
+            copiedID = self.__newFileID(body)
+            self.__useStorage(int(file.get("size", 0)))
+            copiedFile = dict(file, id=copiedID,
+                              name=body.get("name", file["name"]),
+                              parents=list(parents), trashed=False)
+            self.__files[copiedFile["id"]] = copiedFile
+            if fileID in self.__contents:
+                self.__contents[copiedFile["id"]] = self.__contents[fileID]
+            for parentID in parents:
+                self.__children[parentID][copiedFile["id"]] = None
+            return self.__selectFields(copiedFile, fields)
+
+    def generateFileIDs(self, count: int) -> list[str]:
+        """Returns the IDs reserved for the created and copied files."""
+        with self.__lock:
+            fileIDs = [f"fake{self.__nextID + number:08d}"
+                       for number in range(1, count + 1)]
+            self.__nextID += count
+            return fileIDs
+
+    def deleteFile(self, fileID: str) -> dict:
+        """
+        Deletes the file permanently, skipping the trash.
+        Raises:
+            HttpError: raises 404 if the file does not exist.
+        """
+        with self.__lock:
+            file = self.__getFile(fileID)
+            self.storageUsage -= int(file.get("size", 0))
+            del self.__files[fileID]
+            self.__contents.pop(fileID, None)
+            for parentID in file["parents"]:
+                self.__children[parentID].pop(fileID, None)
+            return {}
+
+    def __useStorage(self, numberOfBytes: int) -> None:
+        """
+        Adds the bytes to the storage usage.
+        Raises:
+            HttpError: raises 403 if the storage quota would be exceeded.
+        """
+        if self.storageLimit is not None and numberOfBytes > 0 and \
+           self.storageUsage + numberOfBytes > self.storageLimit:
+            raise self.__error(
+                403, "storageQuotaExceeded",
+                "The user's Drive storage quota has been exceeded."
+            )
+        self.storageUsage += numberOfBytes
+
+    def __newFileID(self, body: dict) -> str:
+        """
+        Returns the ID of the body or the next ID.
+        Raises:
+            HttpError: raises 409 if the ID of the body is in use.
+        """
+        fileID = body.get("id")
+        if fileID is None:
+            self.__nextID += 1
+            return f"fake{self.__nextID:08d}"
+        if fileID in self.__files:
+            raise self.__error(409, "fileIdInUse",
+                               "A file already exists with the provided ID.")
+        return fileID
+
+    def __getFile(self, fileID: str) -> dict:
+        file = self.__files.get(fileID)
+        if file is None:
+            raise self.__error(404, "notFound", f"File not found: {fileID}.")
+        return file
+
+    def __keepContent(self, fileID: str, content: bytes | None) -> None:
+        if self.isContentKept and content is not None:
+            self.__contents[fileID] = content
+
+    @staticmethod
+    def __setContent(file: dict, content: bytes | None) -> None:
+        file["modifiedTime"] = datetime.datetime.now(
+            datetime.timezone.utc
+        ).isoformat()
+        if content is None:
+            return
+        file["size"] = str(len(content))
+        file["md5Checksum"] = hashlib.md5(
+            content, usedforsecurity=False
+        ).hexdigest()
+
+    def __parseQuery(self, query: str):
+        """
+        Parses the query into predicates over the files and the parent of
+        the listed files (None if the query is not limited to a folder).
+        """
+        predicates: list[Callable[[dict], bool]] = []
+        parentID = None
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = self.QUERY_CLAUSE.match(query, position)
+            if match is None or match.end() == position:
+                raise self.__error(400, "invalid", f"Invalid query: {query}.")
+            position = match.end()
+
+            if match["parent"] is not None:
+                parent = self.__unescape(match["parent"])
+                if parentID is None:
+                    parentID = parent
+                predicates.append(
+                    functools.partial(self.__isInFolder, parent)
+                )
+            elif match["field"] is not None:
+                field = match["field"]
+                value = self.__unescape(match["value"])
+                isEqual = match["operator"] == "="
+                predicates.append(functools.partial(
+                    self.__isFieldEqual, field, value, isEqual
+                ))
+            else:
+                trashed = match["trashed"] == "true"
+                predicates.append(
+                    functools.partial(self.__isTrashed, trashed)
+                )
+        return predicates, parentID
+
+    @staticmethod
+    def __isInFolder(parentID: str, file: dict) -> bool:
+        return parentID in file["parents"]
+
+    @staticmethod
+    def __isFieldEqual(field: str, value: str, isEqual: bool,
+                       file: dict) -> bool:
+        return (file[field] == value) == isEqual
+
+    @staticmethod
+    def __isTrashed(trashed: bool, file: dict) -> bool:
+        return file["trashed"] == trashed
+
+    @staticmethod
+    def __unescape(value: str) -> str:
+        return re.sub(r"\\(.)", r"\1", value)
+
+    @classmethod
+    def __listedFields(cls, fields: str | None) -> str | None:
+        """Returns the fields of the files in "files(...)" of the fields."""
+        if fields is None:
+            return None
+        match = re.search(r"files\(([^)]*)\)", fields)
+        return match[1] if match else None
+
+    @classmethod
+    def __selectFields(cls, file: dict, fields: str | None) -> dict:
+        if fields == "*":
+            return dict(file)
+        names = cls.DEFAULT_FIELDS if not fields else [
+            name.strip() for name in fields.split(",") if name.strip()
+        ]
+        return {name: file[name] for name in names if name in file}
+
+    @staticmethod
+    def __error(status: int, reason: str, message: str) -> HttpError:
+        content = {"error": {
+            "code": status,
+            "message": message,
+            "errors": [{"reason": reason, "message": message}],
+        }}
+        return HttpError(httplib2.Response({"status": status}),
+                         json.dumps(content).encode())
@@ -0,0 +1,142 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FaultProfile class."""
+
+import random
+import threading
+from typing import Callable
+
+
+class FaultProfile:
+    """
+    The class of FaultProfile - decides which requests of FakeDriveService
+    fail and how. The faults are scripted by the number of the request (the
+    n-th request matching methods, from 1) or drawn with the given
+    probabilities from a seeded generator, so every run of a profile injects
+    the same faults.
+    """
+    RATE_LIMIT = "rateLimit"  # 429 Too Many Requests
+    USER_RATE_LIMIT = "userRateLimit"  # 403 userRateLimitExceeded
+    SERVER_ERROR = "serverError"  # 503 Service Unavailable
+    CONNECTION_DROP = "connectionDrop"  # the connection drops mid-request
+    SLOW_RESPONSE = "slowResponse"  # the response takes slowDelay longer
+    TOKEN_EXPIRED = "tokenExpired"  # 401 Invalid Credentials  # nosec B105
+    # The request is applied, then the connection drops before the response.
+    RESPONSE_LOST = "responseLost"
+
+    FAULTS = (
+        RATE_LIMIT,
+        USER_RATE_LIMIT,
+        SERVER_ERROR,
+        CONNECTION_DROP,
+        SLOW_RESPONSE,
+        TOKEN_EXPIRED,
+        RESPONSE_LOST,
+    )
+
+    PROFILES = (
+        "none",
+        "rateLimited",
+        "serverErrors",
+        "flakyNetwork",
+        "slow",
+        "tokenExpiry",
+        "lostResponses",
+    )
+
+    def __init__(self, probabilities: dict[str, float] | None = None,
+                 script: dict[int, str] | None = None,
+                 methods: set[str] | None = None, slowDelay: float = 1.0,
+                 seed: int = 0):
+        """
+        Initializes the fault profile.
+        Args:
+            probabilities (dict[str, float], None): are the probabilities
+            of the faults in a request.
+            script (dict[int, str], None): are the faults by the number of
+            the request; the script takes precedence over the
+            probabilities.
+            methods (set[str], None): are the faulty API methods, e.g.
+            "files.create" or "upload.chunk", or None for all methods.
+            slowDelay (float): is the delay of SLOW_RESPONSE in seconds.
+            seed (int): is the seed of the probabilistic faults.
+        Raises:
+            ValueError: raises if a fault is unknown.
+        """
+        self.probabilities = dict(probabilities or {})
+        self.script = dict(script or {})
+        unknownFaults = (set(self.probabilities) | set(self.script.values())) \
+            - set(self.FAULTS)
+        if unknownFaults:
+            raise ValueError(f"Unknown faults: {sorted(unknownFaults)}.")
+        self.methods = methods
+        self.slowDelay = slowDelay
+        # Reproducible faults, not a security use of the generator.
+        self.__random = random.Random(seed)  # nosec B311
+        self.__numberOfRequests = 0
+        self.__lock = threading.Lock()
+
+    def nextFault(self, method: str) -> str | None:
+        """
+        Returns the fault of the next request of the method or None.
+        Args:
+            method (str): is the API method of the request.
+        """
+        if self.methods is not None and method not in self.methods:
+            return None
+        with self.__lock:
+            self.__numberOfRequests += 1
+            fault = self.script.get(self.__numberOfRequests)
+            if fault is not None:
+                return fault
+            draw = self.__random.random()
+            for fault, probability in self.probabilities.items():
+                if draw < probability:
+                    return fault
+                draw -= probability
+        return None
+
+    @classmethod
+    def fromName(cls, name: str) -> "FaultProfile | None":
+        """
+        Returns the preset profile:
+            none: no faults.
+            rateLimited: 5% of 429 and 5% of 403 rate limit errors.
+            serverErrors: 5% of 503 errors.
+            flakyNetwork: 5% of the uploads drop the connection.
+            slow: 10% of the responses are 0.05 s slower.
+            tokenExpiry: the token expires on the 100th request.
+            lostResponses: 5% of the responses of the created and copied
+            files are lost after the files are created.
+        Raises:
+            ValueError: raises if the name is unknown.
+        """
+        UPLOAD_METHODS = {"files.create", "files.update", "upload.chunk"}
+        presets: dict[str, Callable[[], FaultProfile | None]] = {
+            "none": lambda: None,
+            "rateLimited": lambda: cls(
+                {cls.RATE_LIMIT: 0.05, cls.USER_RATE_LIMIT: 0.05}
+            ),
+            "serverErrors": lambda: cls({cls.SERVER_ERROR: 0.05}),
+            "flakyNetwork": lambda: cls({cls.CONNECTION_DROP: 0.05},
+                                        methods=UPLOAD_METHODS),
+            "slow": lambda: cls({cls.SLOW_RESPONSE: 0.1}, slowDelay=0.05),
+            "tokenExpiry": lambda: cls(script={100: cls.TOKEN_EXPIRED}),
+            "lostResponses": lambda: cls(
+                {cls.RESPONSE_LOST: 0.05},
+                methods={"files.create", "files.copy"}
+            ),
+        }
+        if name in presets:
+            return presets[name]()
+        raise ValueError(f"Unknown fault profile: {name}.")
@@ -0,0 +1,122 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Module containing the benchmark of the bulk rule import.
+
+Run with: python -m benchmark.RuleSetBenchmark [numberOfRules]
+"""
+
+import os
+import csv
+import sys
+import time
+import tempfile
+from typing import Callable, TypeVar
+from model.Rule import Rule
+from model.RuleSet import RuleSet
+
+Result = TypeVar("Result")
+
+
+def generateRows(numberOfRules: int) -> list[list[str]]:
+    """
+    Generates rows in the RULES_FILE format, about 10% of them duplicates.
+    Args:
+        numberOfRules (int): is the number of generated rows.
+    """
+    WEEKDAYS = ["", "Monday", "Friday"]
+    NUMBER_OF_ACCOUNTS = 5
+    NUMBER_OF_FOLDERS = 50
+    DUPLICATE_EVERY = 10
+    rows: list[list[str]] = []
+    for number in range(numberOfRules):
+        if number % DUPLICATE_EVERY == DUPLICATE_EVERY - 1:
+            rows.append(rows[number // 2])
+            continue
+        rows.append([
+            f"/home/user/data/{number}",
+            f"folder{number % NUMBER_OF_FOLDERS}",
+            f"account{number % NUMBER_OF_ACCOUNTS}",
+            f"{number % 24:02d}:{number % 60:02d}",
+            WEEKDAYS[number % len(WEEKDAYS)],
+            "",
+        ])
+    return rows
+
+
+def measure(function: Callable[[], Result]) -> tuple[float, Result]:
+    """Returns the wall time in milliseconds and the result of function."""
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def loadRowByRow(rows: list[list[str]]) -> list[Rule]:
+    """Loads and deduplicates the rows one Rule at a time."""
+    listOfRules = []
+    for row in rows:
+        listOfRules.append(Rule(
+            row[0], row[1], row[2], row[3],
+            row[4] if row[4].strip() else None,
+            int(row[5]) if row[5].strip() else None
+        ))
+    return list(set(listOfRules))
+
+
+def readCSVRowByRow(filePath: str) -> list[Rule]:
+    """Reads the CSV file and loads it one Rule at a time."""
+    with open(filePath, mode='r', newline='') as file:
+        return loadRowByRow(list(csv.reader(file)))
+
+
+def runBenchmark(numberOfRules: int) -> dict[str, float]:
+    """
+    Runs the benchmark.
+    Returns:
+        dict[str, float]: the wall time of every step in milliseconds.
+    """
+    rows = generateRows(numberOfRules)
+    results = {}
+    results["rowByRowMs"], _ = measure(lambda: loadRowByRow(rows))
+    results["fromRowsMs"], ruleSet = measure(lambda: RuleSet.fromRows(rows))
+
+    with tempfile.TemporaryDirectory() as directory:
+        csvPath = os.path.join(directory, "rules.csv")
+        jsonPath = os.path.join(directory, "rules.json")
+        results["writeCSVMs"], _ = measure(lambda: ruleSet.writeCSV(csvPath))
+        results["readCSVRowByRowMs"], _ = measure(
+            lambda: readCSVRowByRow(csvPath)
+        )
+        results["readCSVMs"], _ = measure(
+            lambda: RuleSet.readCSV(csvPath)
+        )
+        results["writeJSONMs"], _ = measure(
+            lambda: ruleSet.writeJSON(jsonPath)
+        )
+        results["readJSONMs"], _ = measure(lambda: RuleSet.readJSON(jsonPath))
+
+    results["uniqueRules"] = len(ruleSet)
+    return results
+
+
+def main() -> None:
+    DEFAULT_NUMBER_OF_RULES = 100_000
+    numberOfRules = int(sys.argv[1]) if len(sys.argv) > 1 else \
+        DEFAULT_NUMBER_OF_RULES
+    print(f"rules: {numberOfRules}")
+    for name, value in runBenchmark(numberOfRules).items():
+        print(f"{name}: {value:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Module containing the soak test of the tray-resident process.
+
+Run with: python -m benchmark.SoakTest [--days DAYS] [--rules N]
+    [--files N] [--gui] [--output REPORT.json]
+
+The worker checks the rules every simulated minute against the fake Google
+Drive service for days of accelerated time; the backed up files change
+every simulated hour. With --gui the main window is refreshed after every
+check like in the application. The RSS, the number of Python objects, the
+open file descriptors and the threads are sampled; the test fails if any of
+them keeps growing after the warm-up.
+"""
+
+import os
+import gc
+import sys
+import json
+import argparse
+import datetime
+import collections
+import tempfile
+import threading
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtWidgets import QApplication
+from model.Rule import Rule
+from model.ManifestRepository import ManifestRepository
+from model.RunHistoryRepository import RunHistoryRepository
+from worker.FileCopyWorker import FileCopyWorker
+from view.MainWindow import MainWindow
+from benchmark.FakeDriveService import FakeDriveService
+
+# The allowed growth of a sample after the warm-up: the relative growth and
+# the absolute growth, whichever is larger.
+TOLERANCES = {
+    "rssMegabytes": (0.10, 5.0),
+    "objects": (0.05, 2000),
+    "fileDescriptors": (0.0, 2),
+    "threads": (0.0, 1),
+}
+WARM_UP = 0.2  # the part of the samples which is not checked
+MINUTES_PER_DAY = 24 * 60
+
+
+def sampleResources() -> dict[str, float | None]:
+    """
+    Returns the current RSS in megabytes, the number of the Python objects
+    after a collection, the open file descriptors and the threads. The RSS
+    and the file descriptors are None where /proc is not available.
+    """
+    gc.collect()
+    rssMegabytes = None
+    if os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as statm:
+            residentPages = int(statm.read().split()[1])
+        rssMegabytes = residentPages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    fileDescriptors = None
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(directory):
+            fileDescriptors = len(os.listdir(directory))
+            break
+    return {
+        "rssMegabytes": rssMegabytes,
+        "objects": len(gc.get_objects()),
+        "fileDescriptors": fileDescriptors,
+        "threads": threading.active_count(),
+    }
+
+
+def detectGrowth(samples: list[dict]) -> dict[str, float]:
+    """
+    Compares the median of the last half of the samples after the warm-up
+    with the median of the first half.
+    Args:
+        samples (list[dict]): are the samples in the order of the time.
+    Returns:
+        dict[str, float]: the growth of the metrics growing beyond their
+        TOLERANCES.
+    """
+    def median(values: list[float]) -> float:
+        values = sorted(values)
+        return values[len(values) // 2]
+
+    checkedSamples = samples[int(len(samples) * WARM_UP):]
+    growing = {}
+    for metric, (relative, absolute) in TOLERANCES.items():
+        values = [sample[metric] for sample in checkedSamples
+                  if sample.get(metric) is not None]
+        if len(values) < 4:
+            continue
+        half = len(values) // 2
+        base = median(values[:half])
+        growth = median(values[half:]) - base
+        if growth > max(relative * base, absolute):
+            growing[metric] = growth
+    return growing
+
+
+def createTree(path: str, numberOfFiles: int) -> None:
+    """Creates the backed up directory with the files."""
+    os.makedirs(os.path.join(path, "sub"))
+    for number in range(numberOfFiles):
+        directory = path if number % 2 else os.path.join(path, "sub")
+        with open(os.path.join(directory, f"file{number}.txt"), 'w') as file:
+            file.write(f"file {number}\n")
+
+
+def changeTree(path: str, number: int) -> None:
+    """Appends a line to one file of the backed up directory."""
+    filePaths = sorted(
+        os.path.join(directory, fileName)
+        for directory, _, fileNames in os.walk(path)
+        for fileName in fileNames
+    )
+    with open(filePaths[number % len(filePaths)], 'a') as file:
+        file.write(f"change {number}\n")
+
+
+def createRules(directory: str, driveService: FakeDriveService,
+                numberOfRules: int,
+                numberOfFiles: int) -> list[tuple[str, str, str, str]]:
+    """
+    Creates the trees of the rules and returns the rows of the rules, whose
+    times are spread over a day.
+    """
+    folderID = driveService.addFolder("Backup")
+    rows = []
+    for number in range(numberOfRules):
+        treePath = os.path.join(directory, f"rule{number}")
+        createTree(treePath, numberOfFiles)
+        minuteOfDay = number * MINUTES_PER_DAY // numberOfRules
+        rows.append((treePath, folderID, "soak",
+                     f"{minuteOfDay // 60:02d}:{minuteOfDay % 60:02d}"))
+    return rows
+
+
+def simulate(worker: FileCopyWorker, rows: list[tuple[str, str, str, str]],
+             days: float, sampleEvery: int, outcomes: collections.Counter,
+             application: QCoreApplication | None) -> list[dict]:
+    """
+    Checks the rules every simulated minute, changes the trees every
+    simulated hour and returns the samples of the resources.
+    """
+    start = datetime.datetime(2024, 1, 1)
+    samples = []
+    for minute in range(int(days * MINUTES_PER_DAY)):
+        if minute % 60 == 0:
+            for number, row in enumerate(rows):
+                changeTree(row[0], minute // 60 + number)
+        worker.runCycle(start + datetime.timedelta(minutes=minute))
+        if application is not None:
+            application.processEvents()
+        if minute % sampleEvery == 0:
+            samples.append(dict(sampleResources(), minute=minute,
+                                runs=sum(outcomes.values())))
+    return samples
+
+
+def runSoak(days: float = 7, numberOfRules: int = 24,
+            numberOfFiles: int = 20, isGUI: bool = False,
+            sampleEvery: int = 60) -> dict:
+    """
+    Runs the scheduled rules for days of simulated time.
+    Args:
+        days (float): is the simulated time in days.
+        numberOfRules (int): is the number of the rules, spread over a day.
+        numberOfFiles (int): is the number of the files of every rule.
+        isGUI (bool): whether the main window is refreshed after every
+        check.
+        sampleEvery (int): is the sampling period in simulated minutes.
+    Returns:
+        dict: the samples, the number of the runs and the growing metrics.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        driveService = FakeDriveService()
+        rows = createRules(directory, driveService, numberOfRules,
+                           numberOfFiles)
+        manifest = ManifestRepository(
+            os.path.join(directory, "manifest.sqlite3")
+        )
+        runHistory = RunHistoryRepository(
+            os.path.join(directory, "runHistory.sqlite3")
+        )
+        worker = FileCopyWorker(driveService, [Rule(*row) for row in rows],
+                                manifest, runHistory)
+        outcomes: collections.Counter[str] = collections.Counter()
+        worker.ruleRunFinished.connect(
+            lambda rule, run: outcomes.update((run.outcome,))
+        )
+
+        application = mainWindow = None
+        if isGUI:
+            application = QApplication.instance() or QApplication(
+                sys.argv[:1] + ["-platform", "offscreen"]
+            )
+            mainWindow = MainWindow()
+            # Like the controller, reload the rules after every check.
+            worker.updateSignal.connect(lambda: mainWindow.setRulesToTable(
+                [Rule(*row) for row in rows]
+            ))
+            worker.ruleRunFinished.connect(mainWindow.setRuleRun)
+
+        try:
+            samples = simulate(worker, rows, days, sampleEvery, outcomes,
+                               application)
+        finally:
+            if mainWindow is not None:
+                mainWindow.deleteLater()
+            manifest.close()
+            runHistory.close()
+
+    return {
+        "days": days,
+        "rules": numberOfRules,
+        "samples": samples,
+        "runs": sum(outcomes.values()),
+        "failedRuns": outcomes["failure"],
+        "growing": detectGrowth(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Runs the scheduled rules for days of simulated time."
+    )
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--rules", type=int, default=24)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--gui", action="store_true")
+    parser.add_argument("--output", help="writes the report as JSON")
+    arguments = parser.parse_args()
+
+    report = runSoak(arguments.days, arguments.rules, arguments.files,
+                     arguments.gui)
+    first, last = report["samples"][0], report["samples"][-1]
+    for metric in TOLERANCES:
+        print(f"{metric}: {first[metric]} -> {last[metric]}")
+    print(f"runs: {report['runs']}, failed: {report['failedRuns']}")
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if report["growing"]:
+        print(f"GROWING: {report['growing']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,11 +17,20 @@ import os
 # Folders
 RULE_DIRECTORY = "rule"
 CONFIG_DIRECTORY = "config"
+CACHE_DIRECTORY = "cache"
+DATA_DIRECTORY = "data"
 
 # Files
 ICON_FILE = "GooD_Autobackuper.svg"
 RULES_FILE = "rules.csv"
 LOGGER_CONFIG_FILE = "configLogger.json"
+METRICS_CONFIG_FILE = "configMetrics.json"
+PROFILING_CONFIG_FILE = "configProfiling.json"
+FOLDER_CACHE_FILE = "folderCache.json"
+FOLDER_INDEX_FILE = "folderIndex.json"
+RUN_HISTORY_FILE = "runHistory.sqlite3"
+MANIFEST_FILE = "manifest.sqlite3"
+HASH_CACHE_FILE = "hashCache.sqlite3"
 
 # Confidential files
 TOKEN_FILE = "token.json"  # nosec B105
@@ -33,6 +42,59 @@ SCOPES = ["https://www.googleapis.com/auth/drive"]
 # Paths
 RULES_FILE_PATH = os.path.join(RULE_DIRECTORY, RULES_FILE)
 LOGGER_CONFIG_FILE_PATH = os.path.join(CONFIG_DIRECTORY, LOGGER_CONFIG_FILE)
+METRICS_CONFIG_FILE_PATH = os.path.join(CONFIG_DIRECTORY, METRICS_CONFIG_FILE)
+PROFILING_CONFIG_FILE_PATH = os.path.join(
+    CONFIG_DIRECTORY, PROFILING_CONFIG_FILE
+)
+FOLDER_CACHE_FILE_PATH = os.path.join(CACHE_DIRECTORY, FOLDER_CACHE_FILE)
+FOLDER_INDEX_FILE_PATH = os.path.join(CACHE_DIRECTORY, FOLDER_INDEX_FILE)
+RUN_HISTORY_FILE_PATH = os.path.join(DATA_DIRECTORY, RUN_HISTORY_FILE)
+MANIFEST_FILE_PATH = os.path.join(DATA_DIRECTORY, MANIFEST_FILE)
+HASH_CACHE_FILE_PATH = os.path.join(CACHE_DIRECTORY, HASH_CACHE_FILE)
 
 # Numbers
 NUMBER_OF_RULE_ATTRIBUTES = 6
+MANIFEST_FOLDER_SIZE = -1
+FOLDERS_PAGE_SIZE = 1000
+FOLDER_CACHE_TTL = 300  # seconds
+FOLDER_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+FOLDER_INDEX_REFRESH_TIME = 60  # seconds
+MAX_FOLDER_SEARCH_RESULTS = 50
+RUN_HISTORY_MAX_RUNS_PER_RULE = 1000
+RUN_HISTORY_MAX_AGE = 90 * 24 * 60 * 60  # seconds
+MAX_API_RETRIES = 5
+API_RETRY_INITIAL_DELAY = 1.0  # seconds
+API_RETRY_MAX_DELAY = 32.0  # seconds
+RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024  # bytes
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # bytes, a multiple of 256 KiB
+GENERATED_FILE_IDS = 100
+ERROR_GROUP_WINDOW = 60 * 60  # seconds
+ERROR_NOTIFICATION_INTERVAL = 5 * 60  # seconds
+MAX_ERROR_GROUPS = 1000
+HASH_BUFFER_SIZE = 1024 * 1024  # bytes
+HASH_MMAP_THRESHOLD = 16 * 1024 * 1024  # bytes
+QUICK_HASH_BLOCK_SIZE = 64 * 1024  # bytes
+QUICK_HASH_BLOCKS = 16
+HASH_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds
+HASH_CACHE_TOUCH_INTERVAL = 24 * 60 * 60  # seconds
+ON_CHANGE_QUIET_PERIOD = 10  # seconds
+ON_CHANGE_MAX_DELAY = 10 * 60  # seconds
+ON_CHANGE_FALLBACK_SCAN_INTERVAL = 15 * 60  # seconds
+ON_CHANGE_WATCH_RETRY_DELAY = 60  # seconds
+ON_CHANGE_WATCH_RETRY_MAX_DELAY = 60 * 60  # seconds
+WATCH_POLL_TIME = 1.0  # seconds
+STORAGE_QUOTA_TTL = 5 * 60  # seconds
+PROGRESS_REPORT_INTERVAL = 0.5  # seconds
+SCHEDULER_AGING_INTERVAL = 10 * 60  # seconds
+MAX_MISSED_MINUTES = 60
+THROUGHPUT_HISTORY_WINDOW = 30 * 24 * 60 * 60  # seconds
+MIRROR_MAX_DELETED_PERCENT = 20
+TRASH_BATCH_SIZE = 100  # requests, the maximum of a Google Drive batch
+BUNDLE_THRESHOLD = 64 * 1024  # bytes
+BUNDLE_MAX_SIZE = 8 * 1024 * 1024  # bytes of the members of a bundle
+DEDUPLICATION_THRESHOLD = 1024 * 1024  # bytes, the smallest copied file
+RESTORE_WORKERS = 4  # parallel downloads
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # bytes of a Range request
+RESTORE_PART_SUFFIX = ".goodab-part"
+RESTORE_BUNDLE_DIRECTORY = ".goodab-restore"  # downloaded bundles
+VERIFY_WORKERS = 8  # parallel folder listings
@@ -12,13 +12,27 @@
 
 """Module containing the main ApplicationController class."""
 
+import time
+import sqlite3
+from PyQt5.QtCore import QTimer
+from google.auth.exceptions import GoogleAuthError
+from oauthlib.oauth2.rfc6749.errors import OAuth2Error
 from view.MainWindow import MainWindow
 from view.CreationRuleWindow import CreationRuleWindow
 from model.Rule import Rule
 from model.RuleRepository import RuleRepository
 from model.CredentialsRepository import CredentialsRepository
+from model.FolderCacheRepository import FolderCacheRepository
+from model.RunHistoryRepository import RunHistoryRepository
+from model.ErrorAggregator import ErrorAggregator
 from worker.FileCopyWorker import FileCopyWorker
+from worker.FolderListingWorker import FolderListingWorker
+from worker.FolderIndexWorker import FolderIndexWorker
+from worker.PlanWorker import PlanWorker
+from service.GoogleAuthService import GoogleAuthService
+from util.displayCriticalMessage import displayCriticalMessage
 from util.reportException import reportException
+from logger.logger import logger
 from controller.CreationRuleController import (
     CreationRuleController
 )
@@ -28,6 +42,7 @@ from exception.exceptions import (
     ListOfRulesIsEmptyException,
     PathToRulesFileDoesNotExistException,
     MalformedRuleAttributesException,
+    RulesAreInvalidException,
 )
 
 
@@ -38,7 +53,12 @@ class ApplicationController:
     """
     def __init__(self, view: MainWindow, ruleModel: RuleRepository,
                  credentialsModel: CredentialsRepository,
-                 worker: FileCopyWorker, driveService):
+                 folderCacheModel: FolderCacheRepository,
+                 runHistoryModel: RunHistoryRepository,
+                 worker: FileCopyWorker,
+                 folderListingWorker: FolderListingWorker,
+                 folderIndexWorker: FolderIndexWorker,
+                 planWorker: PlanWorker, driveService):
         """
         Initializes a Rule instance with the given parameters.
         Args:
@@ -46,14 +66,34 @@ class ApplicationController:
             ruleModel (RuleRepository): is the rule management model.
             credentialsModel (CredentialsRepository): is the credentials
             management model.
+            folderCacheModel (FolderCacheRepository): is the cache of the
+            Google Drive folders.
+            runHistoryModel (RunHistoryRepository): is the store of the runs
+            of the rules.
             worker (FileCopyWorker): is the Google Drive backup worker.
+            folderListingWorker (FolderListingWorker): is the worker listing
+            the Google Drive folders.
+            folderIndexWorker (FolderIndexWorker): is the worker keeping the
+            index of all Google Drive folders.
+            planWorker (PlanWorker): is the worker planning the previewed
+            rules.
             driveService: is the authorized service.
         """
         self.view = view
         self.ruleModel = ruleModel
         self.credentialsModel = credentialsModel
+        self.folderCacheModel = folderCacheModel
+        self.runHistoryModel = runHistoryModel
         self.worker = worker
+        self.folderListingWorker = folderListingWorker
+        self.folderIndexWorker = folderIndexWorker
+        self.planWorker = planWorker
         self.driveService = driveService
+        self.errorAggregator = ErrorAggregator()
+
+        self.notificationTimer = QTimer()
+        self.notificationTimer.setSingleShot(True)
+        self.notificationTimer.timeout.connect(self.notifyErrors)
 
         self.view.createRulesButton.clicked.connect(
             self.displayCreationRuleWindow
@@ -61,21 +101,53 @@ class ApplicationController:
         self.view.deleteSelectedRuleButton.clicked.connect(
             self.deleteSelectedRuleFromTable
         )
+        self.view.previewRuleButton.clicked.connect(self.previewSelectedRule)
         self.view.deleteTokenFileAction.triggered.connect(self.deleteTokenFile)
         self.view.updateTableAction.triggered.connect(self.updateTable)
+        self.view.errorPanel.clearButton.clicked.connect(self.clearErrors)
+
+        self.ruleModel.subscribe(self.handleRulesChanged)
+        self.loadRulesToTable()
+        self.loadRuleRunsToTable()
 
-        self.worker.updateSignal.connect(self.loadRulesToTable)
+        # The signals of the worker are queued to the GUI thread, so the
+        # worker never waits for the handlers.
+        self.worker.updateSignal.connect(self.refreshRules)
         self.worker.errorOccured.connect(self.handleWorkerError)
+        self.worker.ruleRunFinished.connect(self.view.setRuleRun)
+        self.worker.ruleProgress.connect(self.view.setRuleProgress)
         self.worker.start()
 
+        self.folderListingWorker.listingFinished.connect(
+            self.folderCacheModel.putFolders
+        )
+        self.folderListingWorker.start()
+
+        self.folderIndexWorker.errorOccured.connect(self.handleIndexError)
+        self.planWorker.planFinished.connect(self.view.showPlan)
+        self.planWorker.errorOccured.connect(self.handlePlanError)
+        self.folderIndexWorker.start()
+
     def displayCreationRuleWindow(self) -> None:
         """Displays the CreateRuleWindow."""
-        creationRuleWindow = CreationRuleWindow(self.driveService)
+        creationRuleWindow = CreationRuleWindow(
+            self.folderListingWorker,
+            self.folderIndexWorker,
+            self.folderCacheModel
+        )
         CreationRuleController(
             self.ruleModel,
             creationRuleWindow
         )
         creationRuleWindow.exec_()
+        self.saveFolderCache()
+
+    def saveFolderCache(self) -> None:
+        """Saves the cache of the Google Drive folders."""
+        try:
+            self.folderCacheModel.save()
+        except OSError as exception:
+            reportException(exception)
 
     def loadRulesToTable(self) -> None:
         """
@@ -85,24 +157,59 @@ class ApplicationController:
             does not exist.
             MalformedRuleAttributesException: raises if the number of rule
             attributes is incorrect.
+            RulesAreInvalidException: raises if any rule is invalid.
             ListOfRulesIsEmptyException: raises if the list of rules is empty.
         """
-        self.view.resetTable()
-
         listOfRules = []
         try:
             listOfRules = self.ruleModel.loadRules()
         except (
             PathToRulesFileDoesNotExistException,
             MalformedRuleAttributesException,
+            RulesAreInvalidException,
         ) as exception:
             reportException(exception)
 
+        self.view.setRulesToTable(listOfRules)
+        if not listOfRules:
+            reportException(ListOfRulesIsEmptyException())
+
+    def loadRuleRunsToTable(self) -> None:
+        """Shows the last runs of the rules from the run history."""
+        try:
+            self.view.setRuleRuns(self.runHistoryModel.getLastRuns())
+        except sqlite3.Error as exception:
+            logger.error(exception)
+
+    def refreshRules(self) -> None:
+        """
+        Re-reads RULES_FILE if it has changed since the last check; the table
+        and the worker are updated by handleRulesChanged.
+        Raises:
+            PathToRulesFileDoesNotExistException: raises if path to rules file
+            does not exist.
+            MalformedRuleAttributesException: raises if the number of rule
+            attributes is incorrect.
+            RulesAreInvalidException: raises if any rule is invalid.
+        """
         try:
-            self.view.addRulesToTable(listOfRules)
-        except ListOfRulesIsEmptyException as exception:
+            self.ruleModel.refreshRules()
+        except (
+            PathToRulesFileDoesNotExistException,
+            MalformedRuleAttributesException,
+            RulesAreInvalidException,
+        ) as exception:
             reportException(exception)
 
+    def handleRulesChanged(self, listOfRules: list[Rule]) -> None:
+        """
+        Updates the table and the worker when the list of rules has changed.
+        Args:
+            listOfRules (list[Rule]): is the new list of rules.
+        """
+        self.worker.setRules(listOfRules)
+        self.view.setRulesToTable(listOfRules)
+
     def deleteSelectedRuleFromTable(self) -> None:
         """
         Deletes the selected rule from the table and file RULES_FILE_PATH.
@@ -113,41 +220,48 @@ class ApplicationController:
             does not exist.
             MalformedRuleAttributesException: raises if the number of rule
             attributes is incorrect.
+            RulesAreInvalidException: raises if any rule is invalid.
         """
-        selectedRow = 0
         try:
-            selectedRow = self.view.getSelectedRow()
+            rule = self.view.getSelectedRule()
         except NoRuleSelectedInTableException as exception:
             reportException(exception)
             return
 
-        rulesData = self.view.getSelectedRuleFromTable(selectedRow)
-
-        weekday = rulesData["weekday"] if rulesData["weekday"].strip() \
-            else None
-        dayOfMonth = int(rulesData["dayOfMonth"]) if \
-            rulesData["dayOfMonth"].strip() else None
-
-        rule = Rule(
-            rulesData["pathFrom"],
-            rulesData["folderID"],
-            rulesData["account"],
-            rulesData["time"],
-            weekday,
-            dayOfMonth
-        )
-
         try:
             self.ruleModel.deleteRule(rule)
         except (
             PathToRulesFileDoesNotExistException,
             MalformedRuleAttributesException,
+            RulesAreInvalidException,
         ) as exception:
             reportException(exception)
 
+    def previewSelectedRule(self) -> None:
+        """
+        Plans the run of the selected rule in the background; the plan is
+        shown when it is ready.
+        Raises:
+            NoRuleSelectedInTableException: raise if no row was selected to
+            preview.
+        """
+        try:
+            rule = self.view.getSelectedRule()
+        except NoRuleSelectedInTableException as exception:
+            reportException(exception)
+            return
+        self.planWorker.requestPlan(rule)
+
+    def handlePlanError(self, ruleID: str, message: str) -> None:
+        """Displays the error of the preview of the rule."""
+        displayCriticalMessage(f"The rule {ruleID} cannot be planned: " +
+                               message)
+
     def deleteTokenFile(self) -> None:
         """
-        Deletes token.json.
+        Deletes token.json, the cached folders and the folder index of the
+        account, authorizes again and builds the folder index of the
+        authorized account.
         Raises:
             TokenFileDoesNotExistException: raise if the token.json is not
             exist.
@@ -157,10 +271,65 @@ class ApplicationController:
         except TokenFileDoesNotExistException as exception:
             reportException(exception)
 
+        try:
+            self.folderCacheModel.clear()
+        except OSError as exception:
+            reportException(exception)
+
+        try:
+            self.driveService = GoogleAuthService.getAuthorizedService(
+                self.credentialsModel
+            )
+        except (OSError, ValueError, GoogleAuthError, OAuth2Error) \
+                as exception:
+            reportException(exception)
+        self.folderIndexWorker.resetIndex(self.driveService)
+
     def updateTable(self) -> None:
         """Updates the table."""
+        self.refreshRules()
         self.loadRulesToTable()
 
-    def handleWorkerError(self, exception) -> None:
-        """Handles worker exceptions."""
-        reportException(exception)
+    def handleWorkerError(self, errorClass: str, ruleID: str, message: str,
+                          count: int) -> None:
+        """
+        Adds the errors of a failed run to the error panel and notifies them
+        in the tray, at most once per notification interval.
+        Args:
+            errorClass (str): is the class of the error.
+            ruleID (str): is the ID of the failed rule.
+            message (str): is the message of the error.
+            count (int): is the number of the errors.
+        """
+        logger.bind(ruleID=ruleID).error(f"{message} ({count}x)")
+        group = self.errorAggregator.add(errorClass, ruleID, message, count,
+                                         time.time())
+        self.view.setErrorGroup(group)
+        self.notifyErrors()
+
+    def notifyErrors(self) -> None:
+        """
+        Notifies the pending errors if the notification interval has
+        passed, otherwise schedules the notification.
+        """
+        now = time.time()
+        summary = self.errorAggregator.takeNotification(now)
+        if summary is not None:
+            self.view.showNotification(summary)
+            return
+        delay = self.errorAggregator.nextNotificationDelay(now)
+        if delay is not None and not self.notificationTimer.isActive():
+            self.notificationTimer.start(int(delay * 1000) + 1)
+
+    def clearErrors(self) -> None:
+        """Removes the errors from the error panel."""
+        self.errorAggregator.clear()
+        self.notificationTimer.stop()
+        self.view.setErrorGroups(self.errorAggregator.groups)
+
+    def handleIndexError(self, message: str) -> None:
+        """
+        Logs the errors of the folder index; the search works on the last
+        index and the update is retried on the next check.
+        """
+        logger.error(message)
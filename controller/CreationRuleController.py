@@ -81,6 +81,17 @@ class CreationRuleController:
             else None
         dayOfMonth = inputs["dayOfMonth"] if inputs["dayOfMonth"] != 0 \
             else None
+        trigger = Rule.ON_CHANGE if inputs.get("isOnChange") else None
+        priority = inputs.get("priority")
+        if priority == Rule.NORMAL_PRIORITY:
+            priority = None
+        modes = [
+            name for name, key in ((Rule.MIRROR, "isMirror"),
+                                   (Rule.BUNDLE, "isBundle"))
+            if inputs.get(key)
+        ]
+        mode = Rule.MODE_SEPARATOR.join(modes) or None
+        filters = inputs.get("filters") or None
         listOfRules = []
 
         for time in inputs["timeList"]:
@@ -90,7 +101,11 @@ class CreationRuleController:
                 inputs["account"],
                 time,
                 weekday,
-                dayOfMonth
+                dayOfMonth,
+                trigger,
+                priority,
+                mode,
+                filters
             )
             listOfRules.append(rule)
 
@@ -75,6 +75,38 @@ class WeekdayIsInvalidException(Exception):
         )
 
 
+class TriggerIsInvalidException(Exception):
+    def __init__(self, message: str):
+        """Raises if trigger is invalid."""
+        super().__init__(
+            "TriggerIsInvalidException: " + message + " is invalid."
+        )
+
+
+class PriorityIsInvalidException(Exception):
+    def __init__(self, message: str):
+        """Raises if priority is invalid."""
+        super().__init__(
+            "PriorityIsInvalidException: " + message + " is invalid."
+        )
+
+
+class ModeIsInvalidException(Exception):
+    def __init__(self, message: str):
+        """Raises if mode is invalid."""
+        super().__init__(
+            "ModeIsInvalidException: " + message + " is invalid."
+        )
+
+
+class FiltersAreInvalidException(Exception):
+    def __init__(self, message: str):
+        """Raises if a filter of a rule is invalid."""
+        super().__init__(
+            "FiltersAreInvalidException: " + message + " is invalid."
+        )
+
+
 class DayOfMonthOutOfRangeException(Exception):
     """Raises if day of month is out of range."""
     def __init__(self):
@@ -222,3 +254,67 @@ class DayOfMonthIsInvalidException(Exception):
         super().__init__(
             "DayOfMonthIsInvalidException: the day of month is invalid."
         )
+
+
+class RulesAreInvalidException(Exception):
+    def __init__(self, errors: list[str]):
+        """Raises if one or more imported rules are invalid."""
+        MAX_DISPLAYED_ERRORS = 10
+        self.errors = errors
+        message = "RulesAreInvalidException: " + str(len(errors)) + \
+            " invalid rule attributes:\n" + \
+            "\n".join(errors[:MAX_DISPLAYED_ERRORS])
+        if len(errors) > MAX_DISPLAYED_ERRORS:
+            message += "\n... and " + \
+                str(len(errors) - MAX_DISPLAYED_ERRORS) + " more."
+        super().__init__(message)
+
+
+class StorageQuotaExceededException(Exception):
+    def __init__(self, deferredFiles: int, deferredBytes: int):
+        """
+        Raises if files have not been uploaded because the Google Drive
+        storage quota is exceeded.
+        """
+        self.deferredFiles = deferredFiles
+        self.deferredBytes = deferredBytes
+        super().__init__(
+            "StorageQuotaExceededException: " + str(deferredFiles) +
+            " files (" + f"{deferredBytes / 1024 / 1024:.1f}" +
+            " MB) have not been uploaded: the Google Drive storage quota " +
+            "is exceeded."
+        )
+
+
+class MirrorDeletionRefusedException(Exception):
+    def __init__(self, missingFiles: int, uploadedFiles: int,
+                 maxDeletedPercent: int):
+        """
+        Raises if the files gone from pathFrom of a mirror rule have not
+        been trashed because there are too many of them.
+        """
+        self.missingFiles = missingFiles
+        self.uploadedFiles = uploadedFiles
+        self.maxDeletedPercent = maxDeletedPercent
+        super().__init__(
+            "MirrorDeletionRefusedException: " + str(missingFiles) +
+            " of " + str(uploadedFiles) + " uploaded files are gone, " +
+            "more than " + str(maxDeletedPercent) + "%: nothing has been " +
+            "trashed."
+        )
+
+
+class ChecksumMismatchException(Exception):
+    def __init__(self, filePath: str, md5: str, downloadedMD5: str):
+        """
+        Raises if a downloaded file does not match the md5Checksum of its
+        Google Drive file.
+        """
+        self.filePath = filePath
+        self.md5 = md5
+        self.downloadedMD5 = downloadedMD5
+        super().__init__(
+            "ChecksumMismatchException: " + filePath + " has been " +
+            "downloaded with the MD5 " + downloadedMD5 + " instead of " +
+            md5 + "."
+        )
@@ -10,24 +10,66 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
-"""Module containing the logger settings."""
+"""
+Module containing the logger settings.
+
+The records are written by a background thread (enqueue), so logging does
+not block the worker on the file writes. The context bound to a record
+(logger.bind) with the keys of CONTEXT_KEYS is appended to the message as
+key=value pairs, or with serialize the records are written as JSON lines
+with the context in record.extra.
+"""
 
 import os
 import json
 from loguru import logger
 from const.const import LOGGER_CONFIG_FILE_PATH
 
+CONTEXT_KEYS = ("ruleID", "account", "file", "bytes", "duration")
+
 with open(LOGGER_CONFIG_FILE_PATH, 'r') as loggerConfigFile:
     loggerConfig = json.load(loggerConfigFile)
 
-os.makedirs(os.path.dirname(loggerConfig["logPath"]), exist_ok=True)
+
+def createFormatter(recordFormat: str):
+    """
+    Returns the format function appending the bound context to the format.
+    Args:
+        recordFormat (str): is the format of the record without the context.
+    """
+    def formatRecord(record) -> str:
+        context = " ".join(
+            f"{key}={{extra[{key}]}}" for key in CONTEXT_KEYS
+            if key in record["extra"]
+        )
+        if context:
+            return f"{recordFormat} | {context}\n{{exception}}"
+        return f"{recordFormat}\n{{exception}}"
+    return formatRecord
+
+
+def addFileSink(config: dict) -> int:
+    """
+    Adds the log file of the config.
+    Args:
+        config (dict): is the logger config in the LOGGER_CONFIG_FILE
+        format.
+    Returns:
+        int: the ID of the sink for logger.remove.
+    """
+    os.makedirs(os.path.dirname(config["logPath"]), exist_ok=True)
+    return logger.add(
+        config["logPath"],
+        rotation=config["rotation"],
+        retention=config.get("retention"),
+        mode=config["mode"],
+        level=config["level"],
+        format=createFormatter(config["format"]),
+        enqueue=config.get("enqueue", True),
+        serialize=config.get("serialize", False)
+    )
+
 
 logger.remove()
 
-logger.add(
-    loggerConfig["logPath"],
-    rotation=loggerConfig["rotation"],
-    mode=loggerConfig["mode"],
-    level=loggerConfig["level"],
-    format=loggerConfig["format"]
-)
+addFileSink(loggerConfig)
@@ -19,23 +19,58 @@
 """Module containing the entry point."""
 
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from app.initializer import initializeEnvironment
+from app.planner import runPlanCommand
+from app.restorer import runRestoreCommand
+from app.verifier import runVerifyCommand
 from view.MainWindow import MainWindow
 from model.RuleRepository import RuleRepository
 from model.CredentialsRepository import CredentialsRepository
+from model.FolderCacheRepository import FolderCacheRepository
+from model.FolderIndex import FolderIndex
+from model.ManifestRepository import ManifestRepository
+from model.RunHistoryRepository import RunHistoryRepository
+from model.HashCacheRepository import HashCacheRepository
 from controller.ApplicationController import ApplicationController
 from worker.FileCopyWorker import FileCopyWorker
+from worker.FolderListingWorker import FolderListingWorker
+from worker.FolderIndexWorker import FolderIndexWorker
+from worker.PlanWorker import PlanWorker
 from service.GoogleAuthService import GoogleAuthService
 from logger.logger import logger
+from metrics.metrics import startMetricsServer
+from profiling.profiling import installProfilingSignal
+from const.const import FOLDER_INDEX_FILE_PATH
 
 if __name__ == "__main__":
     logger.info("Start an application.")
 
     initializeEnvironment()
 
+    if "--plan" in sys.argv[1:]:
+        sys.exit(runPlanCommand(sys.argv[1:]))
+    if "--restore" in sys.argv[1:]:
+        sys.exit(runRestoreCommand(sys.argv[1:]))
+    if "--verify" in sys.argv[1:]:
+        sys.exit(runVerifyCommand(sys.argv[1:]))
+
+    try:
+        startMetricsServer()
+    except OSError as exception:
+        logger.error(f"The metrics endpoint is not started: {exception}")
+
     application = QApplication(sys.argv)
 
+    # Python runs the signal handlers only between bytecodes, so the timer
+    # wakes the interpreter up while Qt waits for events.
+    signalTimer = QTimer()
+    if installProfilingSignal():
+        SIGNAL_CHECK_TIME = 500  # milliseconds
+        signalTimer.timeout.connect(lambda: None)
+        signalTimer.start(SIGNAL_CHECK_TIME)
+
     credentialsRepository = CredentialsRepository()
 
     driveService = GoogleAuthService.getAuthorizedService(
@@ -46,13 +81,38 @@ if __name__ == "__main__":
 
     listOfRules = ruleRepository.loadRules()
 
+    folderCacheRepository = FolderCacheRepository()
+    folderIndex = FolderIndex.readJSON(FOLDER_INDEX_FILE_PATH)
+    manifestRepository = ManifestRepository()
+    runHistoryRepository = RunHistoryRepository()
+    hashCacheRepository = HashCacheRepository()
+
     mainWindow = MainWindow()
-    worker = FileCopyWorker(driveService, listOfRules)
+    worker = FileCopyWorker(
+        driveService,
+        listOfRules,
+        manifestRepository,
+        runHistoryRepository,
+        hashCacheRepository
+    )
+    folderListingWorker = FolderListingWorker(driveService)
+    folderIndexWorker = FolderIndexWorker(driveService, folderIndex)
+    planWorker = PlanWorker(
+        driveService,
+        manifestRepository,
+        runHistoryRepository,
+        hashCacheRepository
+    )
     applicationController = ApplicationController(
         mainWindow,
         ruleRepository,
         credentialsRepository,
+        folderCacheRepository,
+        runHistoryRepository,
         worker,
+        folderListingWorker,
+        folderIndexWorker,
+        planWorker,
         driveService
     )
 
@@ -0,0 +1,311 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the metric classes and the MetricsRegistry class."""
+
+import os
+import json
+import math
+import threading
+from typing import Any
+from bisect import bisect_left
+
+
+class Metric:
+    """
+    The base class of a metric - a family of samples with the same name,
+    one sample per combination of the label values.
+    """
+    TYPE = ""
+
+    def __init__(self, name: str, helpText: str,
+                 labelNames: tuple[str, ...] = ()):
+        """
+        Initializes the metric.
+        Args:
+            name (str): is the name of the metric.
+            helpText (str): is the description of the metric.
+            labelNames (tuple[str, ...]): are the names of the labels.
+        """
+        self.name = name
+        self.help = helpText
+        self.labelNames = tuple(labelNames)
+        self._lock = threading.Lock()
+        self._samples: dict[tuple[str, ...], Any] = {}
+
+    def _labelValues(self, labels: dict[str, object]) -> tuple[str, ...]:
+        """
+        Returns the label values in the order of the label names.
+        Raises:
+            ValueError: raises if the labels do not match the label names.
+        """
+        if set(labels) != set(self.labelNames):
+            raise ValueError(
+                f"{self.name}: expected labels {self.labelNames}, " +
+                f"got {tuple(labels)}."
+            )
+        return tuple(str(labels[name]) for name in self.labelNames)
+
+    def samples(self) -> list[tuple[dict[str, str], Any]]:
+        """Returns the (labels, value) of every sample."""
+        with self._lock:
+            return [
+                (dict(zip(self.labelNames, labelValues)), self._copy(value))
+                for labelValues, value in self._samples.items()
+            ]
+
+    def _copy(self, value):
+        return value
+
+    def render(self) -> list[str]:
+        """Returns the lines of the metric in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {escapeHelp(self.help)}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for labels, value in self.samples():
+            lines.append(
+                f"{self.name}{formatLabels(labels)} {formatValue(value)}"
+            )
+        return lines
+
+    def snapshot(self) -> dict:
+        """Returns the metric as a JSON serializable dict."""
+        return {
+            "type": self.TYPE,
+            "help": self.help,
+            "samples": [
+                {"labels": labels, "value": value}
+                for labels, value in self.samples()
+            ],
+        }
+
+
+class Counter(Metric):
+    """The class of Counter - a metric which only increases."""
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1, /, **labels) -> None:
+        """
+        Increases the sample of the labels.
+        Raises:
+            ValueError: raises if the amount is negative.
+        """
+        if amount < 0:
+            raise ValueError(f"{self.name}: a counter cannot decrease.")
+        labelValues = self._labelValues(labels)
+        with self._lock:
+            self._samples[labelValues] = \
+                self._samples.get(labelValues, 0) + amount
+
+
+class Gauge(Metric):
+    """The class of Gauge - a metric which can go up and down."""
+    TYPE = "gauge"
+
+    def set(self, value: float, /, **labels) -> None:
+        """Sets the sample of the labels."""
+        labelValues = self._labelValues(labels)
+        with self._lock:
+            self._samples[labelValues] = value
+
+    def inc(self, amount: float = 1, /, **labels) -> None:
+        """Increases the sample of the labels."""
+        labelValues = self._labelValues(labels)
+        with self._lock:
+            self._samples[labelValues] = \
+                self._samples.get(labelValues, 0) + amount
+
+    def dec(self, amount: float = 1, /, **labels) -> None:
+        """Decreases the sample of the labels."""
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    The class of Histogram - counts the observed values in cumulative
+    buckets and keeps their sum and count.
+    """
+    TYPE = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                       5.0, 10.0, 30.0, 60.0, 300.0)
+
+    def __init__(self, name: str, helpText: str,
+                 labelNames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initializes the histogram.
+        Args:
+            buckets (tuple[float, ...]): are the upper bounds of the
+            buckets; the +Inf bucket is added automatically.
+        """
+        super().__init__(name, helpText, labelNames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, /, **labels) -> None:
+        """Records the value in the sample of the labels."""
+        labelValues = self._labelValues(labels)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(labelValues)
+            if sample is None:
+                sample = {
+                    "bucketCounts": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+                self._samples[labelValues] = sample
+            sample["bucketCounts"][bucket] += 1
+            sample["sum"] += value
+            sample["count"] += 1
+
+    def _copy(self, value):
+        return {
+            "bucketCounts": list(value["bucketCounts"]),
+            "sum": value["sum"],
+            "count": value["count"],
+        }
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {escapeHelp(self.help)}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for labels, value in self.samples():
+            cumulativeCount = 0
+            bounds = [*map(formatValue, self.buckets), "+Inf"]
+            for bound, count in zip(bounds, value["bucketCounts"]):
+                cumulativeCount += count
+                bucketLabels = formatLabels({**labels, "le": bound})
+                lines.append(
+                    f"{self.name}_bucket{bucketLabels} {cumulativeCount}"
+                )
+            lines.append(f"{self.name}_sum{formatLabels(labels)} " +
+                         formatValue(value["sum"]))
+            lines.append(
+                f"{self.name}_count{formatLabels(labels)} {value['count']}"
+            )
+        return lines
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.TYPE,
+            "help": self.help,
+            "buckets": list(self.buckets),
+            "samples": [
+                {"labels": labels, **value}
+                for labels, value in self.samples()
+            ],
+        }
+
+
+class MetricsRegistry:
+    """
+    The class of MetricsRegistry - keeps the metrics of the application and
+    exports them in the Prometheus text format or as a JSON snapshot.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, helpText: str,
+                labelNames: tuple[str, ...] = ()) -> Counter:
+        """Registers the counter or returns the registered one."""
+        return self.__register(Counter(name, helpText, labelNames))
+
+    def gauge(self, name: str, helpText: str,
+              labelNames: tuple[str, ...] = ()) -> Gauge:
+        """Registers the gauge or returns the registered one."""
+        return self.__register(Gauge(name, helpText, labelNames))
+
+    def histogram(self, name: str, helpText: str,
+                  labelNames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = Histogram.DEFAULT_BUCKETS
+                  ) -> Histogram:
+        """Registers the histogram or returns the registered one."""
+        return self.__register(
+            Histogram(name, helpText, labelNames, buckets)
+        )
+
+    def getMetric(self, name: str) -> Metric | None:
+        return self.__metrics.get(name)
+
+    def renderPrometheus(self) -> str:
+        """Returns all metrics in the Prometheus text format."""
+        with self.__lock:
+            metrics = list(self.__metrics.values())
+        return "".join(
+            line + "\n" for metric in metrics for line in metric.render()
+        )
+
+    def snapshot(self) -> dict[str, dict]:
+        """Returns all metrics as a JSON serializable dict."""
+        with self.__lock:
+            metrics = list(self.__metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def writeSnapshot(self, filePath: str) -> None:
+        """Writes the JSON snapshot of all metrics to the file."""
+        directory = os.path.dirname(filePath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporaryFilePath = filePath + ".tmp"
+        with open(temporaryFilePath, 'w') as snapshotFile:
+            json.dump(self.snapshot(), snapshotFile, indent=2)
+        os.replace(temporaryFilePath, filePath)
+
+    def __register(self, metric):
+        """
+        Registers the metric; a metric with the same name and type is
+        shared.
+        Raises:
+            ValueError: raises if the name is registered with another type
+            or labels.
+        """
+        with self.__lock:
+            registered = self.__metrics.get(metric.name)
+            if registered is None:
+                self.__metrics[metric.name] = metric
+                return metric
+        if type(registered) is not type(metric) or \
+           registered.labelNames != metric.labelNames:
+            raise ValueError(
+                f"{metric.name} is already registered as another metric."
+            )
+        return registered
+
+
+def escapeHelp(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def formatLabels(labels: dict[str, str]) -> str:
+    """Returns the labels in the Prometheus text format."""
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{name}="' + str(value).replace("\\", "\\\\")
+        .replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    ) + "}"
+
+
+def formatValue(value) -> str:
+    """Returns the number in the Prometheus text format."""
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+        return repr(value)
+    return str(value)
@@ -0,0 +1,81 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the MetricsServer class."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from metrics.MetricsRegistry import MetricsRegistry
+
+
+class MetricsServer:
+    """
+    The class of MetricsServer - serves the metrics of the registry in the
+    Prometheus text format on http://host:port/metrics from a daemon
+    thread.
+    """
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int):
+        """
+        Initializes the metrics server.
+        Args:
+            registry (MetricsRegistry): is the exported registry.
+            host (str): is the address to listen on.
+            port (int): is the port to listen on (0 for any free port).
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.__server: ThreadingHTTPServer | None = None
+
+    def start(self) -> None:
+        """
+        Starts serving the metrics.
+        Raises:
+            OSError: raises if the port cannot be bound.
+        """
+        registry = self.registry
+        contentType = self.CONTENT_TYPE
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.renderPrometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", contentType)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                ...
+
+        self.__server = ThreadingHTTPServer(
+            (self.host, self.port), MetricsRequestHandler
+        )
+        self.__server.daemon_threads = True
+        self.port = self.__server.server_address[1]
+        threading.Thread(
+            target=self.__server.serve_forever,
+            name="MetricsServer",
+            daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        """Stops serving the metrics."""
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
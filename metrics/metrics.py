@@ -0,0 +1,121 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the metrics of the application and their export."""
+
+import json
+from const.const import METRICS_CONFIG_FILE_PATH
+from metrics.MetricsRegistry import MetricsRegistry
+from metrics.MetricsServer import MetricsServer
+
+with open(METRICS_CONFIG_FILE_PATH, 'r') as metricsConfigFile:
+    metricsConfig = json.load(metricsConfigFile)
+
+registry = MetricsRegistry()
+
+UPLOADED_BYTES = registry.counter(
+    "goodab_uploaded_bytes_total",
+    "Bytes uploaded to Google Drive.",
+    ("rule", "account")
+)
+UPLOADED_FILES = registry.counter(
+    "goodab_uploaded_files_total",
+    "Files uploaded to Google Drive.",
+    ("rule", "account")
+)
+SKIPPED_FILES = registry.counter(
+    "goodab_skipped_files_total",
+    "Files checked but not uploaded.",
+    ("rule", "account")
+)
+TRASHED_FILES = registry.counter(
+    "goodab_trashed_files_total",
+    "Files and folders gone from pathFrom moved to the Google Drive trash.",
+    ("rule", "account")
+)
+COPIED_FILES = registry.counter(
+    "goodab_copied_files_total",
+    "Files copied in Google Drive from the uploaded files of the same "
+    "content instead of being uploaded.",
+    ("rule", "account")
+)
+COPIED_BYTES = registry.counter(
+    "goodab_copied_bytes_total",
+    "Bytes of the files copied in Google Drive instead of being uploaded.",
+    ("rule", "account")
+)
+MOVED_FILES = registry.counter(
+    "goodab_moved_files_total",
+    "Files moved or renamed in Google Drive after they were moved or "
+    "renamed in pathFrom, instead of being uploaded.",
+    ("rule", "account")
+)
+API_CALLS = registry.counter(
+    "goodab_api_calls_total",
+    "Google Drive API calls by method and HTTP status.",
+    ("method", "status")
+)
+API_REQUEST_DURATION = registry.histogram(
+    "goodab_api_request_duration_seconds",
+    "Latency of the Google Drive API calls.",
+    ("method",)
+)
+API_RETRIES = registry.counter(
+    "goodab_api_retries_total",
+    "Retried Google Drive API calls.",
+    ("method",)
+)
+QUEUE_DEPTH = registry.gauge(
+    "goodab_queue_depth",
+    "Rules due in the current check that have not run yet."
+)
+RULE_RUN_DURATION = registry.histogram(
+    "goodab_rule_run_duration_seconds",
+    "Duration of the rule runs.",
+    ("rule", "account")
+)
+RULE_ERRORS = registry.counter(
+    "goodab_rule_errors_total",
+    "Failed rule runs by the class of the error.",
+    ("rule", "account", "error")
+)
+
+
+def startMetricsServer() -> MetricsServer | None:
+    """
+    Starts the HTTP endpoint of the metrics if it is enabled in
+    METRICS_CONFIG_FILE.
+    Raises:
+        OSError: raises if the port cannot be bound.
+    Returns:
+        MetricsServer | None: the started server or None if it is disabled.
+    """
+    if not metricsConfig["httpEnabled"]:
+        return None
+    metricsServer = MetricsServer(
+        registry,
+        metricsConfig["host"],
+        metricsConfig["port"]
+    )
+    metricsServer.start()
+    return metricsServer
+
+
+def writeMetricsSnapshot() -> None:
+    """
+    Writes the JSON snapshot of the metrics if its path is set in
+    METRICS_CONFIG_FILE.
+    Raises:
+        OSError: raises if the snapshot cannot be written.
+    """
+    if metricsConfig["snapshotPath"]:
+        registry.writeSnapshot(metricsConfig["snapshotPath"])
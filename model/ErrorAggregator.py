@@ -0,0 +1,129 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ErrorAggregator class."""
+
+from model.ErrorGroup import ErrorGroup
+from const.const import (
+    ERROR_GROUP_WINDOW,
+    ERROR_NOTIFICATION_INTERVAL,
+    MAX_ERROR_GROUPS,
+)
+
+
+class ErrorAggregator:
+    """
+    The class of ErrorAggregator - coalesces the errors of the rule runs by
+    their class and rule. An error joins the group of its class and rule
+    while the group has seen an error within the window; later it opens a
+    new group. Only the newest maxGroups groups are kept.
+
+    The notifications are rate limited: takeNotification summarizes the
+    groups changed since the last notification at most once per
+    notificationInterval.
+    """
+    def __init__(self, window: float = ERROR_GROUP_WINDOW,
+                 notificationInterval: float = ERROR_NOTIFICATION_INTERVAL,
+                 maxGroups: int = MAX_ERROR_GROUPS):
+        """
+        Initializes the empty error aggregator.
+        Args:
+            window (float): is the time in seconds after the last error of
+            a group in which the errors join the group.
+            notificationInterval (float): is the minimal time in seconds
+            between two notifications.
+            maxGroups (int): is the number of the kept groups.
+        """
+        self.window = window
+        self.notificationInterval = notificationInterval
+        self.maxGroups = maxGroups
+        self.__groups: list[ErrorGroup] = []
+        self.__openGroups: dict[tuple[str, str], ErrorGroup] = {}
+        self.__pendingGroups: dict[tuple[str, str], ErrorGroup] = {}
+        self.__pendingCount = 0
+        self.__lastNotificationTime: float | None = None
+
+    @property
+    def groups(self) -> list[ErrorGroup]:
+        """Returns the groups, the oldest first."""
+        return list(self.__groups)
+
+    def add(self, errorClass: str, ruleID: str, message: str, count: int,
+            time: float) -> ErrorGroup:
+        """
+        Adds the errors of a rule run.
+        Args:
+            errorClass (str): is the class of the errors.
+            ruleID (str): is the ID of the failed rule.
+            message (str): is the message of the errors.
+            count (int): is the number of the errors.
+            time (float): is the time of the errors (epoch seconds).
+        Returns:
+            ErrorGroup: the group of the errors.
+        """
+        key = (errorClass, ruleID)
+        group = self.__openGroups.get(key)
+        if group is not None and time - group.lastTime <= self.window:
+            group.add(message, count, time)
+        else:
+            group = ErrorGroup(errorClass, ruleID, message, count, time)
+            self.__openGroups[key] = group
+            self.__groups.append(group)
+            if len(self.__groups) > self.maxGroups:
+                droppedGroup = self.__groups.pop(0)
+                if self.__openGroups.get(droppedGroup.key) is droppedGroup:
+                    del self.__openGroups[droppedGroup.key]
+        self.__pendingGroups[key] = group
+        self.__pendingCount += count
+        return group
+
+    def nextNotificationDelay(self, time: float) -> float | None:
+        """
+        Returns the seconds until the pending errors may be notified or
+        None if no errors are pending.
+        """
+        if not self.__pendingGroups:
+            return None
+        if self.__lastNotificationTime is None:
+            return 0.0
+        return max(self.__lastNotificationTime + self.notificationInterval -
+                   time, 0.0)
+
+    def takeNotification(self, time: float) -> str | None:
+        """
+        Returns the summary of the errors since the last notification if
+        the notification interval has passed, otherwise None.
+        Args:
+            time (float): is the current time (epoch seconds).
+        """
+        if self.nextNotificationDelay(time) != 0.0:
+            return None
+        groups = sorted(self.__pendingGroups.values(),
+                        key=lambda group: group.lastTime, reverse=True)
+        MAX_NOTIFIED_GROUPS = 3
+        lines = [str(group) for group in groups[:MAX_NOTIFIED_GROUPS]]
+        if len(groups) > MAX_NOTIFIED_GROUPS:
+            lines.append(f"and {len(groups) - MAX_NOTIFIED_GROUPS} more.")
+        summary = f"{self.__pendingCount} errors in " + \
+            f"{len({group.ruleID for group in groups})} rules:\n" + \
+            "\n".join(lines)
+        self.__pendingGroups = {}
+        self.__pendingCount = 0
+        self.__lastNotificationTime = time
+        return summary
+
+    def clear(self) -> None:
+        """Removes all groups and the pending notification."""
+        self.__groups = []
+        self.__openGroups = {}
+        self.__pendingGroups = {}
+        self.__pendingCount = 0
@@ -0,0 +1,53 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ErrorGroup class."""
+
+
+class ErrorGroup:
+    """
+    Class representing the errors of one class in one rule within a time
+    window - how many there were, when and the last message.
+    """
+    def __init__(self, errorClass: str, ruleID: str, message: str,
+                 count: int, firstTime: float):
+        """
+        Initializes an ErrorGroup instance with the given parameters.
+        Args:
+            errorClass (str): is the class of the errors.
+            ruleID (str): is the ID of the failed rule.
+            message (str): is the message of the last error.
+            count (int): is the number of the errors.
+            firstTime (float): is the time of the first error (epoch
+            seconds).
+        """
+        self.errorClass = errorClass
+        self.ruleID = ruleID
+        self.message = message
+        self.count = count
+        self.firstTime = firstTime
+        self.lastTime = firstTime
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """Returns the class of the errors and the rule ID."""
+        return self.errorClass, self.ruleID
+
+    def add(self, message: str, count: int, time: float) -> None:
+        """Adds the errors to the group."""
+        self.message = message
+        self.count += count
+        self.lastTime = time
+
+    def __str__(self) -> str:
+        return f"{self.errorClass} in the rule {self.ruleID} " + \
+            f"({self.count}x): {self.message}"
@@ -0,0 +1,325 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FileFilter class."""
+
+import os
+import re
+import functools
+from typing import NamedTuple
+from logger.logger import logger
+from exception.exceptions import FiltersAreInvalidException
+
+
+class IgnorePattern(NamedTuple):
+    """
+    A compiled .gitignore-style pattern: the regular expression of the
+    paths it matches, whether it re-includes them ("!PATTERN") and whether
+    it matches directories only ("PATTERN/").
+    """
+    regex: re.Pattern
+    isNegated: bool
+    isDirectoryOnly: bool
+
+
+class FileFilter:
+    """
+    The class of FileFilter - the compiled filters of a rule, separated by
+    ";" in the filters of the rule:
+    * "PATTERN" excludes the files and directories matching the
+    .gitignore-style pattern, "!PATTERN" includes them again;
+    * "include:PATTERN" backs up only the files matching any of these
+    patterns;
+    * "ignoreFile:NAME" reads more patterns from the files NAME (e.g.
+    .gitignore) of every directory, applied under the directory;
+    * "maxSize:SIZE" skips the files larger than SIZE bytes, or SIZE
+    followed by K, M, G or T;
+    * "maxAge:DAYS" skips the files modified more than DAYS days ago.
+
+    The paths are relative to pathFrom with "/" separators. The patterns
+    are compiled once per filters: without "!PATTERN" all of them are
+    matched by one regular expression, otherwise the last matching
+    pattern wins like in .gitignore. A directory excluded by a pattern is
+    not scanned at all, so nothing under it can be included again.
+    """
+    SEPARATOR = ";"
+    INCLUDE = "include"
+    IGNORE_FILE = "ignoreFile"
+    MAX_SIZE = "maxSize"
+    MAX_AGE = "maxAge"
+    SIZE_UNITS = {
+        "": 1,
+        "K": 1024,
+        "M": 1024 ** 2,
+        "G": 1024 ** 3,
+        "T": 1024 ** 4,
+    }
+    SECONDS_PER_DAY = 24 * 60 * 60
+
+    def __init__(self, patterns: tuple[IgnorePattern, ...] = (),
+                 includePatterns: tuple[re.Pattern, ...] = (),
+                 ignoreFileNames: tuple[str, ...] = (),
+                 maxSize: int | None = None, maxAge: int | None = None):
+        """
+        Initializes the filter.
+        Args:
+            patterns (tuple[IgnorePattern, ...]): are the exclude patterns
+            in the order of their precedence, the last one wins.
+            includePatterns (tuple[re.Pattern, ...]): are the patterns of
+            the only included files or () to include all files.
+            ignoreFileNames (tuple[str, ...]): are the names of the ignore
+            files read in every directory.
+            maxSize (int, None): is the size of the largest included file in
+            bytes or None.
+            maxAge (int, None): is the age of the oldest included file in
+            days or None.
+        """
+        self.patterns = patterns
+        self.includePatterns = includePatterns
+        self.ignoreFileNames = ignoreFileNames
+        self.maxSize = maxSize
+        self.maxAge = maxAge
+        self.__directoryRegex: re.Pattern | None = None
+        self.__fileRegex: re.Pattern | None = None
+        if not any(pattern.isNegated for pattern in patterns):
+            self.__directoryRegex = self.__combine(patterns)
+            self.__fileRegex = self.__combine(tuple(
+                pattern for pattern in patterns
+                if not pattern.isDirectoryOnly
+            ))
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def fromString(cls, filters: str | None) -> "FileFilter":
+        """
+        Compiles the filters of a rule; the filters are compiled once.
+        Args:
+            filters (str, None): are the filters separated by ";" or None.
+        Raises:
+            FiltersAreInvalidException: raises if a filter is invalid.
+        """
+        patterns = []
+        includePatterns = []
+        ignoreFileNames = []
+        maxSize = maxAge = None
+        for token in (filters or "").split(cls.SEPARATOR):
+            token = token.strip()
+            if not token:
+                continue
+            key, separator, value = token.partition(":")
+            if not separator or key not in (cls.INCLUDE, cls.IGNORE_FILE,
+                                            cls.MAX_SIZE, cls.MAX_AGE):
+                patterns.append(cls.compilePattern(token))
+            elif not value.strip():
+                raise FiltersAreInvalidException(token)
+            elif key == cls.INCLUDE:
+                includePatterns.append(re.compile(cls.translate(value)))
+            elif key == cls.IGNORE_FILE:
+                if "/" in value or "\\" in value:
+                    raise FiltersAreInvalidException(token)
+                ignoreFileNames.append(value)
+            elif key == cls.MAX_SIZE:
+                try:
+                    maxSize = cls.parseSize(value)
+                except ValueError as exception:
+                    raise FiltersAreInvalidException(token) from exception
+            else:
+                if not value.isdigit():
+                    raise FiltersAreInvalidException(token)
+                maxAge = int(value)
+        return cls(tuple(patterns), tuple(includePatterns),
+                   tuple(ignoreFileNames), maxSize, maxAge)
+
+    @property
+    def isEmpty(self) -> bool:
+        """Returns whether the filter includes every file."""
+        return not (self.patterns or self.includePatterns or
+                    self.ignoreFileNames) and \
+            self.maxSize is None and self.maxAge is None
+
+    @classmethod
+    def compilePattern(cls, pattern: str,
+                       baseDirectory: str = "") -> IgnorePattern:
+        """
+        Compiles a .gitignore-style pattern.
+        Args:
+            pattern (str): is the pattern, "!" re-includes and a trailing
+            "/" matches directories only.
+            baseDirectory (str): is the directory of the ignore file of the
+            pattern relative to pathFrom ("" for the rule).
+        Raises:
+            FiltersAreInvalidException: raises if the pattern is empty.
+        """
+        isNegated = pattern.startswith("!")
+        body = pattern[1:] if isNegated else pattern
+        isDirectoryOnly = body.endswith("/")
+        body = body.rstrip("/")
+        if not body:
+            raise FiltersAreInvalidException(pattern)
+        return IgnorePattern(
+            re.compile(cls.translate(body, baseDirectory)),
+            isNegated,
+            isDirectoryOnly
+        )
+
+    @staticmethod
+    def translate(pattern: str, baseDirectory: str = "") -> str:
+        """
+        Translates a glob pattern into a regular expression of the paths:
+        "*" and "?" do not match "/", "**" matches any directories, and a
+        pattern without "/" matches the name at any depth.
+        """
+        isAnchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        parts = [re.escape(f"{baseDirectory}/")] if baseDirectory else []
+        if not isAnchored:
+            parts.append("(?:.*/)?")
+        index = 0
+        while index < len(pattern):
+            character = pattern[index]
+            if pattern.startswith("**/", index):
+                parts.append("(?:.*/)?")
+                index += 3
+                continue
+            if pattern.startswith("**", index):
+                parts.append(".*")
+                index += 2
+                continue
+            if character == "*":
+                parts.append("[^/]*")
+            elif character == "?":
+                parts.append("[^/]")
+            elif character == "[" and "]" in pattern[index + 2:]:
+                end = pattern.index("]", index + 2)
+                characters = pattern[index + 1:end]
+                if characters.startswith("!"):
+                    characters = "^" + characters[1:]
+                parts.append("[" + characters.replace("\\", "\\\\") + "]")
+                index = end
+            elif character == "\\" and index + 1 < len(pattern):
+                index += 1
+                parts.append(re.escape(pattern[index]))
+            else:
+                parts.append(re.escape(character))
+            index += 1
+        return "".join(parts)
+
+    def withIgnoreFiles(self, directory: str,
+                        relativeDirectory: str) -> "FileFilter":
+        """
+        Returns the filter of the directory with the patterns of its ignore
+        files, or this filter if the directory has none.
+        Args:
+            directory (str): is the path to the directory.
+            relativeDirectory (str): is the directory relative to pathFrom
+            ("" for pathFrom).
+        """
+        patterns = []
+        for fileName in self.ignoreFileNames:
+            try:
+                with open(os.path.join(directory, fileName),
+                          encoding="utf-8", errors="replace") as file:
+                    lines = file.read().splitlines()
+            except FileNotFoundError:
+                continue
+            except OSError as exception:
+                logger.error(exception)
+                continue
+            for line in lines:
+                line = line.rstrip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    patterns.append(
+                        self.compilePattern(line, relativeDirectory)
+                    )
+                except FiltersAreInvalidException:
+                    continue
+        if not patterns:
+            return self
+        return FileFilter(self.patterns + tuple(patterns),
+                          self.includePatterns, self.ignoreFileNames,
+                          self.maxSize, self.maxAge)
+
+    def isDirectoryExcluded(self, relativePath: str) -> bool:
+        """Returns whether the directory is excluded by the patterns."""
+        if self.__directoryRegex is not None:
+            return self.__directoryRegex.fullmatch(relativePath) is not None
+        return self.__isMatched(relativePath, isDirectory=True)
+
+    def isFileExcluded(self, relativePath: str, fileStat: os.stat_result,
+                       now: float) -> bool:
+        """
+        Returns whether the file in an included directory is excluded.
+        Args:
+            relativePath (str): is the path relative to pathFrom.
+            fileStat (os.stat_result): is the stat of the file.
+            now (float): is the current time in epoch seconds.
+        """
+        if self.maxSize is not None and fileStat.st_size > self.maxSize:
+            return True
+        if self.maxAge is not None and \
+           fileStat.st_mtime < now - self.maxAge * self.SECONDS_PER_DAY:
+            return True
+        if self.includePatterns and not any(
+            pattern.fullmatch(relativePath) for pattern in self.includePatterns
+        ):
+            return True
+        if self.__fileRegex is not None:
+            return self.__fileRegex.fullmatch(relativePath) is not None
+        return self.__isMatched(relativePath, isDirectory=False)
+
+    def isExcluded(self, relativePath: str, fileStat: os.stat_result,
+                   now: float) -> bool:
+        """
+        Returns whether the file or any of its directories is excluded; the
+        ignore files are not read.
+        """
+        directory = relativePath.rpartition("/")[0]
+        while directory:
+            if self.isDirectoryExcluded(directory):
+                return True
+            directory = directory.rpartition("/")[0]
+        return self.isFileExcluded(relativePath, fileStat, now)
+
+    def __isMatched(self, relativePath: str, isDirectory: bool) -> bool:
+        """Returns whether the last matching pattern excludes the path."""
+        for pattern in reversed(self.patterns):
+            if pattern.isDirectoryOnly and not isDirectory:
+                continue
+            if pattern.regex.fullmatch(relativePath) is not None:
+                return not pattern.isNegated
+        return False
+
+    @staticmethod
+    def __combine(patterns: tuple[IgnorePattern, ...]) -> re.Pattern | None:
+        """Returns one regular expression matching any of the patterns."""
+        if not patterns:
+            return None
+        return re.compile("|".join(
+            f"(?:{pattern.regex.pattern})" for pattern in patterns
+        ))
+
+    @classmethod
+    def parseSize(cls, value: str) -> int:
+        """
+        Returns the size in bytes of e.g. "10M".
+        Raises:
+            ValueError: raises if the size is not digits followed by an
+            optional K, M, G or T.
+        """
+        number, unit = value[:-1], value[-1:].upper()
+        if unit.isdigit():
+            number, unit = value, ""
+        if not number.isdigit() or unit not in cls.SIZE_UNITS:
+            raise ValueError(f"{value} is not a size.")
+        return int(number) * cls.SIZE_UNITS[unit]
@@ -0,0 +1,134 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FolderCacheRepository class."""
+
+import os
+import json
+import time
+from const.const import (
+    FOLDER_CACHE_FILE_PATH,
+    FOLDER_CACHE_TTL,
+    FOLDER_CACHE_MAX_AGE,
+)
+
+
+class FolderCacheRepository:
+    """
+    The model of the FolderCacheRepository - the model keeps the subfolders
+    of Google Drive folders listed by the folder picker in FOLDER_CACHE_FILE,
+    so the picker can show them instantly when it is opened again.
+
+    An entry younger than the TTL is fresh; an older entry is still shown
+    but should be revalidated in the background. Entries older than the
+    maximum age are dropped when the cache is saved.
+    """
+    def __init__(self, cacheFilePath: str = FOLDER_CACHE_FILE_PATH,
+                 ttl: float = FOLDER_CACHE_TTL,
+                 maxAge: float = FOLDER_CACHE_MAX_AGE):
+        """
+        Initializes the folder cache repository and loads the cache file.
+        Args:
+            cacheFilePath (str): is the path to the cache file.
+            ttl (float): is the number of seconds an entry is fresh.
+            maxAge (float): is the number of seconds an entry is kept.
+        """
+        self.cacheFilePath = cacheFilePath
+        self.ttl = ttl
+        self.maxAge = maxAge
+        self.__entries: dict[str, dict] = self.__loadEntries()
+        self.__isChanged = False
+
+    def getFolders(self, parentID: str) -> list[dict] | None:
+        """
+        Returns the cached subfolders of the parent folder.
+        Args:
+            parentID (str): is the parent ID.
+        Returns:
+            list[dict] | None: the subfolders with "id" and "name" or None if
+            the parent folder is not cached.
+        """
+        entry = self.__entries.get(parentID)
+        if entry is None:
+            return None
+        return list(entry["folders"])
+
+    def isFresh(self, parentID: str, now: float | None = None) -> bool:
+        """Returns True if the parent folder is cached within the TTL."""
+        entry = self.__entries.get(parentID)
+        if entry is None:
+            return False
+        now = time.time() if now is None else now
+        return now - entry["listedAt"] < self.ttl
+
+    def putFolders(self, parentID: str, folders: list[dict],
+                   now: float | None = None) -> None:
+        """
+        Caches the subfolders of the parent folder.
+        Args:
+            parentID (str): is the parent ID.
+            folders (list[dict]): are the subfolders with "id" and "name".
+        """
+        self.__entries[parentID] = {
+            "listedAt": time.time() if now is None else now,
+            "folders": [
+                {"id": folder["id"], "name": folder["name"]}
+                for folder in folders
+            ],
+        }
+        self.__isChanged = True
+
+    def clear(self) -> None:
+        """Drops all cached folders, e.g. when the account changes."""
+        self.__entries = {}
+        self.__isChanged = True
+        self.save()
+
+    def save(self, now: float | None = None) -> None:
+        """
+        Writes the cache to FOLDER_CACHE_FILE if it has changed, dropping
+        the entries older than the maximum age.
+        """
+        if not self.__isChanged:
+            return
+
+        now = time.time() if now is None else now
+        self.__entries = {
+            parentID: entry for parentID, entry in self.__entries.items()
+            if now - entry["listedAt"] < self.maxAge
+        }
+
+        directory = os.path.dirname(self.cacheFilePath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporaryFilePath = self.cacheFilePath + ".tmp"
+        with open(temporaryFilePath, 'w') as cacheFile:
+            json.dump(self.__entries, cacheFile)
+        os.replace(temporaryFilePath, self.cacheFilePath)
+        self.__isChanged = False
+
+    def __loadEntries(self) -> dict[str, dict]:
+        """Reads the cache file; a missing or broken file is an empty cache."""
+        try:
+            with open(self.cacheFilePath, 'r') as cacheFile:
+                entries = json.load(cacheFile)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(entries, dict):
+            return {}
+        return {
+            parentID: entry for parentID, entry in entries.items()
+            if isinstance(entry, dict) and
+            isinstance(entry.get("listedAt"), (int, float)) and
+            isinstance(entry.get("folders"), list)
+        }
@@ -0,0 +1,307 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FolderIndex class."""
+
+import os
+import re
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from const.const import MAX_FOLDER_SEARCH_RESULTS
+
+
+class FolderIndex:
+    """
+    The class of FolderIndex - the local index of all folders of the drive
+    for the type-ahead search of the folder picker.
+
+    The index keeps the name and the parent of every folder and the children
+    of every parent. Whenever the folders change it builds a sorted list of
+    the lowercase names for prefix matching by bisection, and one newline
+    separated text of all names for fuzzy (subsequence) matching with a
+    single regular expression pass. The index is updated incrementally from
+    the changes of the drive; changesPageToken is the position in the
+    changes. The methods are thread-safe.
+    """
+    ROOT_NAME = "My Drive"
+    MAX_PATH_DEPTH = 100
+
+    def __init__(self):
+        """Initializes the empty folder index."""
+        self.__lock = threading.RLock()
+        self.__folders: dict[str, tuple[str, str | None]] = {}
+        self.__childrenByParent: dict[str | None, set[str]] = {}
+        self.__rootFolderID: str | None = None
+        self.__changesPageToken: str | None = None
+        self.__sortedNames: list[tuple[str, str]] | None = None
+        self.__searchText = ""
+        self.__lineOffsets: list[int] = []
+        self.__lineFolderIDs: list[str] = []
+
+    @property
+    def isReady(self) -> bool:
+        """Returns True if the index has been built."""
+        return self.__changesPageToken is not None
+
+    @property
+    def changesPageToken(self) -> str | None:
+        return self.__changesPageToken
+
+    @property
+    def rootFolderID(self) -> str | None:
+        return self.__rootFolderID
+
+    def __len__(self) -> int:
+        return len(self.__folders)
+
+    def rebuild(self, rootFolderID: str, folders: list[dict],
+                changesPageToken: str) -> None:
+        """
+        Replaces the index with all folders of the drive.
+        Args:
+            rootFolderID (str): is the real ID of My Drive.
+            folders (list[dict]): are the folders with "id", "name" and
+            "parents".
+            changesPageToken (str): is the position in the changes the
+            folders were listed at.
+        """
+        with self.__lock:
+            self.__folders = {}
+            self.__childrenByParent = {}
+            self.__rootFolderID = rootFolderID
+            for folder in folders:
+                self.__putFolder(folder)
+            self.__changesPageToken = changesPageToken
+            self.__sortedNames = None
+            self.__buildSearchIndex()
+
+    def applyChanges(self, changes: list[dict],
+                     changesPageToken: str | None) -> bool:
+        """
+        Applies the changes of the drive to the index.
+        Args:
+            changes (list[dict]): are the changes with "fileId", "removed"
+            and "file".
+            changesPageToken (str | None): is the new position in the
+            changes or None to keep the current one.
+        Returns:
+            bool: True if any folder has changed.
+        """
+        isChanged = False
+        with self.__lock:
+            for change in changes:
+                file = change.get("file") or {}
+                folderID = change.get("fileId") or file.get("id")
+                isFolder = file.get("mimeType") == \
+                    "application/vnd.google-apps.folder"
+                if change.get("removed") or file.get("trashed") or \
+                   not isFolder:
+                    isChanged |= self.__removeFolder(folderID)
+                else:
+                    isChanged |= self.__putFolder(file)
+            if changesPageToken is not None:
+                self.__changesPageToken = changesPageToken
+            if isChanged:
+                self.__sortedNames = None
+                self.__buildSearchIndex()
+        return isChanged
+
+    def clear(self) -> None:
+        """Drops all folders; the index has to be built again."""
+        with self.__lock:
+            self.__folders = {}
+            self.__childrenByParent = {}
+            self.__rootFolderID = None
+            self.__changesPageToken = None
+            self.__sortedNames = None
+
+    def getChildren(self, parentID: str) -> list[str]:
+        """Returns the IDs of the subfolders of the parent folder."""
+        with self.__lock:
+            if parentID == "root":
+                parentID = self.__rootFolderID or parentID
+            return sorted(
+                self.__childrenByParent.get(parentID, ()),
+                key=lambda folderID: self.__folders[folderID][0].lower()
+            )
+
+    def getPath(self, folderID: str) -> str:
+        """
+        Returns the full path of the folder, e.g. "My Drive/Photos/2024". A
+        folder outside My Drive (e.g. shared) starts with its topmost known
+        parent.
+        """
+        with self.__lock:
+            names: list[str] = []
+            currentID: str | None = folderID
+            while currentID is not None and \
+                    len(names) < self.MAX_PATH_DEPTH:
+                if currentID == self.__rootFolderID:
+                    names.append(self.ROOT_NAME)
+                    break
+                folder = self.__folders.get(currentID)
+                if folder is None:
+                    break
+                names.append(folder[0])
+                currentID = folder[1]
+            return "/".join(reversed(names))
+
+    def search(self, query: str, limit: int = MAX_FOLDER_SEARCH_RESULTS
+               ) -> list[tuple[str, str]]:
+        """
+        Searches the folders by name: the names starting with the query come
+        first, then the names containing the characters of the query in
+        order, the more compact matches first. The search is case
+        insensitive.
+        Args:
+            query (str): is the searched text.
+            limit (int): is the maximum number of results.
+        Returns:
+            list[tuple[str, str]]: the (folder ID, full path) of the found
+            folders.
+        """
+        query = " ".join(query.lower().split())
+        if not query or limit <= 0:
+            return []
+
+        with self.__lock:
+            self.__buildSearchIndex()
+            folderIDs = self.__searchPrefix(query, limit)
+            if len(folderIDs) < limit:
+                folderIDs += self.__searchFuzzy(
+                    query, limit - len(folderIDs), set(folderIDs)
+                )
+            return [(folderID, self.getPath(folderID))
+                    for folderID in folderIDs]
+
+    @classmethod
+    def readJSON(cls, filePath: str) -> "FolderIndex":
+        """
+        Reads the index from a JSON file; a missing or broken file is an
+        empty index.
+        """
+        folderIndex = cls()
+        try:
+            with open(filePath, 'r') as file:
+                data = json.load(file)
+            folderIndex.rebuild(
+                data["rootFolderID"],
+                [
+                    {"id": folderID, "name": name, "parents": [parentID]}
+                    for folderID, name, parentID in data["folders"]
+                ],
+                data["changesPageToken"]
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+        return folderIndex
+
+    def writeJSON(self, filePath: str) -> None:
+        """Writes the index to a JSON file."""
+        with self.__lock:
+            data = {
+                "rootFolderID": self.__rootFolderID,
+                "changesPageToken": self.__changesPageToken,
+                "folders": [
+                    (folderID, name, parentID)
+                    for folderID, (name, parentID) in self.__folders.items()
+                ],
+            }
+
+        directory = os.path.dirname(filePath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporaryFilePath = filePath + ".tmp"
+        with open(temporaryFilePath, 'w') as file:
+            json.dump(data, file)
+        os.replace(temporaryFilePath, filePath)
+
+    def __putFolder(self, folder: dict) -> bool:
+        """Adds or updates the folder; returns True if it has changed."""
+        parents = folder.get("parents") or [None]
+        entry = (folder["name"], parents[0])
+        oldEntry = self.__folders.get(folder["id"])
+        if oldEntry == entry:
+            return False
+        if oldEntry is not None:
+            self.__childrenByParent[oldEntry[1]].discard(folder["id"])
+        self.__folders[folder["id"]] = entry
+        self.__childrenByParent.setdefault(entry[1], set()).add(folder["id"])
+        return True
+
+    def __removeFolder(self, folderID: str | None) -> bool:
+        """Removes the folder; returns True if it was in the index."""
+        entry = self.__folders.pop(folderID, None)  # type: ignore
+        if entry is None:
+            return False
+        self.__childrenByParent[entry[1]].discard(folderID)  # type: ignore
+        return True
+
+    def __buildSearchIndex(self) -> None:
+        """Builds the sorted names and the search text if they are stale."""
+        if self.__sortedNames is not None:
+            return
+
+        self.__sortedNames = sorted(
+            (name.lower().replace("\n", " "), folderID)
+            for folderID, (name, _) in self.__folders.items()
+        )
+        self.__lineFolderIDs = [
+            folderID for _, folderID in self.__sortedNames
+        ]
+        self.__lineOffsets = []
+        offset = 0
+        for name, _ in self.__sortedNames:
+            self.__lineOffsets.append(offset)
+            offset += len(name) + 1
+        self.__searchText = "\n".join(
+            name for name, _ in self.__sortedNames
+        )
+
+    def __searchPrefix(self, query: str, limit: int) -> list[str]:
+        """Returns the folders whose names start with the query."""
+        sortedNames = self.__sortedNames or []
+        start = bisect_left(sortedNames, (query,))
+        stop = bisect_right(sortedNames, (query + "\uffff",), lo=start)
+        return [folderID for _, folderID in
+                sortedNames[start:min(stop, start + limit)]]
+
+    def __searchFuzzy(self, query: str, limit: int,
+                      excludedIDs: set[str]) -> list[str]:
+        """
+        Returns the folders whose names contain the characters of the query
+        in order, ordered by the length of the match.
+        """
+        pattern = re.compile(
+            "[^\n]*?".join(map(re.escape, query))
+        )
+        matches: dict[int, tuple[int, int]] = {}
+        for match in pattern.finditer(self.__searchText):
+            line = bisect_right(self.__lineOffsets, match.start()) - 1
+            if line in matches:
+                continue
+            matches[line] = (
+                match.end() - match.start(),
+                match.start() - self.__lineOffsets[line]
+            )
+
+        rankedLines = sorted(matches, key=matches.__getitem__)
+        folderIDs = []
+        for line in rankedLines:
+            folderID = self.__lineFolderIDs[line]
+            if folderID in excludedIDs:
+                continue
+            folderIDs.append(folderID)
+            if len(folderIDs) == limit:
+                break
+        return folderIDs
@@ -0,0 +1,134 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the HashCacheRepository class."""
+
+import os
+import time
+import threading
+from util.connectDatabase import connectDatabase
+from const.const import (
+    HASH_CACHE_FILE_PATH,
+    HASH_CACHE_MAX_AGE,
+    HASH_CACHE_TOUCH_INTERVAL,
+)
+
+
+class HashCacheRepository:
+    """
+    The model of the HashCacheRepository - the model keeps the hashes of
+    the local files in the SQLite database HASH_CACHE_FILE, keyed by the
+    device, the inode and the algorithm. A hash is valid while the size and
+    the modification time of the file match, so a file is hashed again only
+    after it has changed.
+
+    Every hash records when it was last used (at most once per
+    HASH_CACHE_TOUCH_INTERVAL, so the hits rarely write). The hashes of
+    deleted and long changed files are not used any more and are pruned
+    after maxAge, when the cache is opened.
+    """
+    def __init__(self, databaseFilePath: str = HASH_CACHE_FILE_PATH,
+                 maxAge: float = HASH_CACHE_MAX_AGE):
+        """
+        Initializes the hash cache repository, creates the database and
+        prunes the unused hashes.
+        Args:
+            databaseFilePath (str): is the path to the database file.
+            maxAge (float): is the number of seconds an unused hash is kept.
+        """
+        self.databaseFilePath = databaseFilePath
+        self.maxAge = maxAge
+        self.__lock = threading.Lock()
+
+        self.__connection = connectDatabase(databaseFilePath)
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "device INTEGER NOT NULL, "
+                "inode INTEGER NOT NULL, "
+                "algorithm TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "mtimeNs INTEGER NOT NULL, "
+                "digest TEXT NOT NULL, "
+                "lastUsed REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (device, inode, algorithm))"
+            )
+            columns = {
+                row[1] for row in
+                self.__connection.execute("PRAGMA table_info(hashes)")
+            }
+            if "lastUsed" not in columns:
+                # The hashes cached before count as used now.
+                self.__connection.execute(
+                    "ALTER TABLE hashes ADD COLUMN "
+                    "lastUsed REAL NOT NULL DEFAULT 0"
+                )
+                self.__connection.execute("UPDATE hashes SET lastUsed = ?",
+                                          (time.time(),))
+        self.prune()
+
+    def getHash(self, fileStat: os.stat_result, algorithm: str) -> str | None:
+        """
+        Returns the cached hash of the file or None if the file is not
+        cached or has changed since.
+        Args:
+            fileStat (os.stat_result): is the stat of the file.
+            algorithm (str): is the name of the hash, e.g. "md5".
+        """
+        now = time.time()
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT digest, lastUsed FROM hashes WHERE device = ? AND "
+                "inode = ? AND algorithm = ? AND size = ? AND mtimeNs = ?",
+                (fileStat.st_dev, fileStat.st_ino, algorithm,
+                 fileStat.st_size, fileStat.st_mtime_ns)
+            ).fetchone()
+            if row is not None and \
+               row[1] < now - HASH_CACHE_TOUCH_INTERVAL:
+                with self.__connection:
+                    self.__connection.execute(
+                        "UPDATE hashes SET lastUsed = ? WHERE device = ? "
+                        "AND inode = ? AND algorithm = ?",
+                        (now, fileStat.st_dev, fileStat.st_ino, algorithm)
+                    )
+        return row[0] if row is not None else None
+
+    def putHash(self, fileStat: os.stat_result, algorithm: str,
+                digest: str) -> None:
+        """Adds or replaces the hash of the file."""
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO hashes "
+                "(device, inode, algorithm, size, mtimeNs, digest, lastUsed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fileStat.st_dev, fileStat.st_ino, algorithm,
+                 fileStat.st_size, fileStat.st_mtime_ns, digest, time.time())
+            )
+
+    def prune(self, now: float | None = None) -> int:
+        """
+        Deletes the hashes not used for maxAge.
+        Args:
+            now (float, None): is the current time or None for time.time().
+        Returns:
+            int: the number of the deleted hashes.
+        """
+        if now is None:
+            now = time.time()
+        with self.__lock, self.__connection:
+            return self.__connection.execute(
+                "DELETE FROM hashes WHERE lastUsed < ?", (now - self.maxAge,)
+            ).rowcount
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
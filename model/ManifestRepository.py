@@ -0,0 +1,239 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ManifestRepository class."""
+
+import threading
+from util.connectDatabase import connectDatabase
+from typing import NamedTuple
+from const.const import MANIFEST_FILE_PATH, MANIFEST_FOLDER_SIZE
+
+
+class ManifestEntry(NamedTuple):
+    """
+    The uploaded state of a file or a folder of a rule: the size and the
+    modification time of the local file, the ID of the Google Drive file,
+    its md5Checksum, the quick hash of the local file (see HashService) and
+    its inode, which finds the file again after it was moved. Folders have
+    the size MANIFEST_FOLDER_SIZE; isOwned marks the folders created by the
+    rule, as opposed to the existing folders of the same name it adopted,
+    which may hold files of others.
+    """
+    size: int
+    mtimeNs: int
+    fileID: str
+    md5: str | None = None
+    quickHash: str | None = None
+    inode: int | None = None
+    isOwned: bool = False
+
+    @property
+    def isFolder(self) -> bool:
+        return self.size == MANIFEST_FOLDER_SIZE
+
+
+class ManifestRepository:
+    """
+    The model of the ManifestRepository - the model keeps the manifest of
+    the uploaded files of every rule in the SQLite database MANIFEST_FILE,
+    keyed by the path relative to the parent of pathFrom with "/"
+    separators. A file whose size and modification time match its entry is
+    not uploaded again, nor is a file whose content still matches the
+    hashes of its entry.
+
+    The entries of a rule are read at once at the start of a run and written
+    in one transaction at its end.
+
+    The repository also keeps the content index of every account: the ID of
+    an uploaded Google Drive file by its md5Checksum and size, so the same
+    content backed up by another rule is copied in Google Drive instead of
+    being uploaded again.
+    """
+    SELECT_RULE_ENTRIES = (
+        "SELECT path, size, mtimeNs, fileID, md5, quickHash, inode, isOwned "
+        "FROM manifest WHERE ruleID = ?"
+    )
+    SELECT_FILE_ENTRIES = (
+        "SELECT path, size, mtimeNs, fileID, md5, quickHash, inode, isOwned "
+        "FROM manifest WHERE fileID = ?"
+    )
+
+    def __init__(self, databaseFilePath: str = MANIFEST_FILE_PATH):
+        """
+        Initializes the manifest repository and creates the database.
+        Args:
+            databaseFilePath (str): is the path to the database file.
+        """
+        self.databaseFilePath = databaseFilePath
+        self.__lock = threading.Lock()
+
+        self.__connection = connectDatabase(databaseFilePath)
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS manifest ("
+                "ruleID TEXT NOT NULL, "
+                "path TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "mtimeNs INTEGER NOT NULL, "
+                "fileID TEXT NOT NULL, "
+                "md5 TEXT, "
+                "quickHash TEXT, "
+                "inode INTEGER, "
+                "isOwned INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (ruleID, path))"
+            )
+            columns = {
+                row[1] for row in
+                self.__connection.execute("PRAGMA table_info(manifest)")
+            }
+            # The folders of the older manifests are not known to be owned.
+            for column, columnType in (("md5", "TEXT"), ("quickHash", "TEXT"),
+                                       ("inode", "INTEGER"),
+                                       ("isOwned", "INTEGER NOT NULL "
+                                                   "DEFAULT 0")):
+                if column not in columns:
+                    self.__connection.execute(
+                        f"ALTER TABLE manifest ADD COLUMN {column} " +
+                        columnType
+                    )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS contents ("
+                "account TEXT NOT NULL, "
+                "md5 TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "fileID TEXT NOT NULL, "
+                "PRIMARY KEY (account, md5, size))"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS manifestByFileID "
+                "ON manifest (fileID)"
+            )
+
+    def getEntries(self, ruleID: str) -> dict[str, ManifestEntry]:
+        """Returns the entries of the rule by the relative path."""
+        return self.__selectEntries(self.SELECT_RULE_ENTRIES, ruleID)
+
+    def getFileEntries(self, fileID: str) -> dict[str, ManifestEntry]:
+        """
+        Returns the entries of the Google Drive file by the relative path,
+        e.g. a bundle and its members.
+        """
+        return self.__selectEntries(self.SELECT_FILE_ENTRIES, fileID)
+
+    def __selectEntries(self, query: str,
+                        value: str) -> dict[str, ManifestEntry]:
+        """Returns the entries selected by the query of the value."""
+        with self.__lock:
+            rows = self.__connection.execute(query, (value,)).fetchall()
+        return {
+            path: ManifestEntry(size, mtimeNs, fileID, md5, quickHash, inode,
+                                bool(isOwned))
+            for path, size, mtimeNs, fileID, md5, quickHash, inode, isOwned
+            in rows
+        }
+
+    def putEntries(self, ruleID: str,
+                   entries: dict[str, ManifestEntry]) -> None:
+        """Adds or replaces the entries of the rule."""
+        if not entries:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO manifest "
+                "(ruleID, path, size, mtimeNs, fileID, md5, quickHash, "
+                "inode, isOwned) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(ruleID, path, *entry) for path, entry in entries.items()]
+            )
+
+    def deleteEntries(self, ruleID: str, paths: list[str]) -> None:
+        """Deletes the entries of the paths of the rule."""
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "DELETE FROM manifest WHERE ruleID = ? AND path = ?",
+                [(ruleID, path) for path in paths]
+            )
+
+    def deleteFolderEntries(self, ruleID: str) -> None:
+        """
+        Deletes the folder entries of the rule, so the folders are looked
+        up again, e.g. after a folder was deleted in Google Drive.
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "DELETE FROM manifest WHERE ruleID = ? AND size = ?",
+                (ruleID, MANIFEST_FOLDER_SIZE)
+            )
+
+    def getContentSizes(self, account: str) -> set[int]:
+        """
+        Returns the sizes of the indexed contents of the account, so only
+        the local files of these sizes are hashed to be looked up.
+        """
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT DISTINCT size FROM contents WHERE account = ?",
+                (account,)
+            ).fetchall()
+        return {size for size, in rows}
+
+    def findContent(self, account: str, md5: str, size: int) -> str | None:
+        """
+        Returns the ID of the Google Drive file of the account with the
+        content or None if the content is not indexed.
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT fileID FROM contents "
+                "WHERE account = ? AND md5 = ? AND size = ?",
+                (account, md5, size)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def putContents(self, account: str,
+                    contents: dict[tuple[str, int], str]) -> None:
+        """
+        Adds or replaces the file IDs of the contents of the account.
+        Args:
+            account (str): is the account of the files.
+            contents (dict[tuple[str, int], str]): are the IDs of the
+            Google Drive files by the md5Checksum and the size.
+        """
+        if not contents:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO contents (account, md5, size, fileID) "
+                "VALUES (?, ?, ?, ?)",
+                [(account, md5, size, fileID)
+                 for (md5, size), fileID in contents.items()]
+            )
+
+    def deleteContents(self, account: str,
+                       contents: dict[tuple[str, int], str]) -> None:
+        """
+        Deletes the contents of the account which are still indexed with
+        the file IDs, e.g. after the files have been updated.
+        """
+        if not contents:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "DELETE FROM contents "
+                "WHERE account = ? AND md5 = ? AND size = ? AND fileID = ?",
+                [(account, md5, size, fileID)
+                 for (md5, size), fileID in contents.items()]
+            )
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
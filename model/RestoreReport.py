@@ -0,0 +1,95 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing the RestoreReport class."""
+
+import threading
+
+
+class RestoreReport:
+    """
+    Class representing one restore of a Google Drive folder - what was
+    listed, downloaded and skipped, and the errors of the files which have
+    not been restored. The counters are updated by the download threads.
+    """
+    SUCCESS = "success"
+    FAILURE = "failure"
+
+    def __init__(self, folderID: str, pathTo: str, startTime: float):
+        """
+        Initializes the empty report.
+        Args:
+            folderID (str): is the ID of the restored Google Drive folder.
+            pathTo (str): is the directory the files are restored to.
+            startTime (float): is the start of the restore (epoch seconds).
+        """
+        self.folderID = folderID
+        self.pathTo = pathTo
+        self.startTime = startTime
+        self.endTime: float | None = None
+        self.filesListed = 0
+        self.filesRestored = 0
+        self.filesSkipped = 0
+        self.filesIgnored = 0
+        self.bytesDownloaded = 0
+        self.errors: dict[str, str] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def outcome(self) -> str:
+        return self.SUCCESS if not self.errors else self.FAILURE
+
+    @property
+    def duration(self) -> float:
+        """Returns the duration of the restore in seconds."""
+        if self.endTime is None:
+            return 0.0
+        return max(self.endTime - self.startTime, 0.0)
+
+    def addRestored(self, downloadedBytes: int) -> None:
+        with self.__lock:
+            self.filesRestored += 1
+            self.bytesDownloaded += downloadedBytes
+
+    def addSkipped(self) -> None:
+        with self.__lock:
+            self.filesSkipped += 1
+
+    def addDownloaded(self, downloadedBytes: int) -> None:
+        """Adds the bytes downloaded for more than one file, e.g. a bundle."""
+        with self.__lock:
+            self.bytesDownloaded += downloadedBytes
+
+    def addError(self, relativePath: str, exception: Exception) -> None:
+        with self.__lock:
+            self.errors[relativePath] = str(exception)
+
+    def toDict(self) -> dict:
+        """Returns the report for JSON."""
+        return {
+            "folderID": self.folderID,
+            "pathTo": self.pathTo,
+            "outcome": self.outcome,
+            "duration": round(self.duration, 3),
+            "filesListed": self.filesListed,
+            "filesRestored": self.filesRestored,
+            "filesSkipped": self.filesSkipped,
+            "filesIgnored": self.filesIgnored,
+            "bytesDownloaded": self.bytesDownloaded,
+            "errors": dict(sorted(self.errors.items())),
+        }
+
+    def __str__(self) -> str:
+        return f"RestoreReport(folderID={self.folderID}," + \
+            f"outcome={self.outcome},filesRestored={self.filesRestored}," + \
+            f"filesSkipped={self.filesSkipped},errors={len(self.errors)})"
@@ -12,6 +12,7 @@
 
 """Module containing the Rule class."""
 
+import hashlib
 from exception.exceptions import (
     PathFromIsNoneException,
     PathFromIsBlankException,
@@ -23,14 +24,94 @@ from exception.exceptions import (
     TimeIsBlankException,
     WeekdayIsBlankException,
     WeekdayIsInvalidException,
-    DayOfMonthOutOfRangeException
+    DayOfMonthOutOfRangeException,
+    TriggerIsInvalidException,
+    PriorityIsInvalidException,
+    ModeIsInvalidException,
+)
+from model.FileFilter import FileFilter
+from const.const import (
+    NUMBER_OF_RULE_ATTRIBUTES,
+    ON_CHANGE_QUIET_PERIOD,
+    MIRROR_MAX_DELETED_PERCENT,
+    BUNDLE_THRESHOLD,
 )
 
 
 class Rule:
-    """Class representing a rule."""
+    """
+    Class representing a rule.
+
+    Rules are immutable: the attributes are validated once on construction
+    and stored in __slots__, and the hash and the compiled filters are
+    computed once and cached.
+
+    A rule runs at its time. A rule with the trigger "onChange" also runs
+    when its files change: after the files have been quiet for
+    ON_CHANGE_QUIET_PERIOD seconds, or for the seconds given as
+    "onChange:SECONDS", only the changed files are backed up.
+
+    The priority "high", "normal" (the default) or "low" orders the runs of
+    the rules which are due together.
+
+    A rule with the mode "mirror" also moves the files and folders it has
+    uploaded to the trash of Google Drive when they are gone from pathFrom,
+    unless more than MIRROR_MAX_DELETED_PERCENT percent of its files, or
+    the percent given as "mirror:PERCENT", would be trashed in one run.
+    With the mode "bundle" the files smaller than BUNDLE_THRESHOLD bytes,
+    or the size given as "bundle:SIZE", are uploaded packed in bundles (see
+    FileBundler). The modes are separated by ";", e.g. "mirror;bundle".
+
+    The filters exclude files and directories of pathFrom from the backup
+    (see FileFilter).
+    """
+    ATTRIBUTES = (
+        "pathFrom",
+        "folderID",
+        "account",
+        "time",
+        "weekday",
+        "dayOfMonth",
+        "trigger",
+        "priority",
+        "mode",
+        "filters",
+    )
+    __slots__ = (*ATTRIBUTES, "fileFilter", "_hash")
+
+    WEEKDAYS = frozenset((
+        "Monday", "Tuesday", "Wednesday",
+        "Thursday", "Friday", "Saturday", "Sunday"
+    ))
+    MIN_DAY_OF_MONTH = 1
+    MAX_DAY_OF_MONTH = 31
+    ON_CHANGE = "onChange"
+    HIGH_PRIORITY = "high"
+    NORMAL_PRIORITY = "normal"
+    LOW_PRIORITY = "low"
+    PRIORITIES = (HIGH_PRIORITY, NORMAL_PRIORITY, LOW_PRIORITY)
+    MIRROR = "mirror"
+    BUNDLE = "bundle"
+    MODE_SEPARATOR = ";"
+    MAX_PERCENT = 100
+
+    pathFrom: str
+    folderID: str
+    account: str
+    time: str
+    weekday: str | None
+    dayOfMonth: int | None
+    trigger: str | None
+    priority: str | None
+    mode: str | None
+    filters: str | None
+    fileFilter: FileFilter
+    _hash: int
+
     def __init__(self, pathFrom: str, folderID: str, account: str, time: str,
-                 weekday: str | None = None, dayOfMonth: int | None = None):
+                 weekday: str | None = None, dayOfMonth: int | None = None,
+                 trigger: str | None = None, priority: str | None = None,
+                 mode: str | None = None, filters: str | None = None):
         """
         Initializes a Rule instance with the given parameters.
         Args:
@@ -42,6 +123,14 @@ class Rule:
             (optional).
             dayOfMonth(int, None): day of month when the rule should be
             triggered (optional).
+            trigger (str, None): "onChange" or "onChange:SECONDS" to also
+            run the rule when its files change (optional).
+            priority (str, None): "high", "normal" or "low" (optional).
+            mode (str, None): "mirror" or "mirror:PERCENT" to trash the
+            files gone from pathFrom and "bundle" or "bundle:SIZE" to
+            bundle the small files, separated by ";" (optional).
+            filters (str, None): are the filters of the backed up files
+            separated by ";" (optional).
         Raises:
             PathFromIsNoneException: if pathFrom is None.
             PathFromIsBlankException: if pathFrom is an empty string.
@@ -55,99 +144,228 @@ class Rule:
             WeekdayIsInvalidException: if weekday is not in "Monday" ...
             "Sunday".
             DayOfMonthOutOfRangeException: if dayOfMonth is not in 1–31.
+            TriggerIsInvalidException: if trigger is not "onChange" or
+            "onChange:SECONDS".
+            PriorityIsInvalidException: if priority is not "high", "normal"
+            or "low".
+            ModeIsInvalidException: if mode is not "mirror",
+            "mirror:PERCENT", "bundle" or "bundle:SIZE" separated by ";".
+            FiltersAreInvalidException: if a filter is invalid.
         """
-        self.pathFrom = pathFrom
-        self.folderID = folderID
-        self.account = account
-        self.time = time
-        self.weekday = weekday
-        self.dayOfMonth = dayOfMonth
+        self.__initialize(
+            self.validatePathFrom(pathFrom),
+            self.validateFolderID(folderID),
+            self.validateAccount(account),
+            self.validateTime(time),
+            self.validateWeekday(weekday),
+            self.validateDayOfMonth(dayOfMonth),
+            self.validateTrigger(trigger),
+            self.validatePriority(priority),
+            self.validateMode(mode),
+            self.validateFilters(filters)
+        )
 
-    @property
-    def pathFrom(self) -> str:
-        return self.__pathFrom
+    @classmethod
+    def fromValidated(cls, pathFrom: str, folderID: str, account: str,
+                      time: str, weekday: str | None = None,
+                      dayOfMonth: int | None = None,
+                      trigger: str | None = None,
+                      priority: str | None = None,
+                      mode: str | None = None,
+                      filters: str | None = None) -> "Rule":
+        """
+        Creates a rule from attributes that have already been validated (for
+        example, column by column by RuleSet) without validating them again.
+        """
+        rule = cls.__new__(cls)
+        rule.__initialize(
+            pathFrom, folderID, account, time, weekday, dayOfMonth, trigger,
+            priority, mode, filters
+        )
+        return rule
+
+    def __initialize(self, pathFrom: str, folderID: str, account: str,
+                     time: str, weekday: str | None,
+                     dayOfMonth: int | None, trigger: str | None,
+                     priority: str | None, mode: str | None,
+                     filters: str | None) -> None:
+        """Sets the slots, compiles the filters and caches the hash."""
+        setAttribute = object.__setattr__
+        setAttribute(self, "pathFrom", pathFrom)
+        setAttribute(self, "folderID", folderID)
+        setAttribute(self, "account", account)
+        setAttribute(self, "time", time)
+        setAttribute(self, "weekday", weekday)
+        setAttribute(self, "dayOfMonth", dayOfMonth)
+        setAttribute(self, "trigger", trigger)
+        setAttribute(self, "priority", priority)
+        setAttribute(self, "mode", mode)
+        setAttribute(self, "filters", filters)
+        setAttribute(self, "fileFilter", FileFilter.fromString(filters))
+        setAttribute(self, "_hash", hash((
+            pathFrom, folderID, account, time, weekday, dayOfMonth, trigger,
+            priority, mode, filters
+        )))
 
-    @pathFrom.setter
-    def pathFrom(self, pathFrom: str) -> None:
+    @staticmethod
+    def validatePathFrom(pathFrom: str) -> str:
         if pathFrom is None:
             raise PathFromIsNoneException()
         if not pathFrom.strip():
             raise PathFromIsBlankException()
-        self.__pathFrom = pathFrom
+        return pathFrom
 
-    @property
-    def folderID(self) -> str:
-        return self.__folderID
-
-    @folderID.setter
-    def folderID(self, folderID: str) -> None:
+    @staticmethod
+    def validateFolderID(folderID: str) -> str:
         if folderID is None:
             raise FolderIDIsNoneException()
         if not folderID.strip():
             raise FolderIDIsBlankException()
-        self.__folderID = folderID
-
-    @property
-    def account(self) -> str:
-        return self.__account
+        return folderID
 
-    @account.setter
-    def account(self, account: str) -> None:
+    @staticmethod
+    def validateAccount(account: str) -> str:
         if account is None:
             raise AccountIsNoneException()
         if not account.strip():
             raise AccountIsBlankException()
-        self.__account = account
+        return account
 
-    @property
-    def time(self) -> str:
-        return self.__time
-
-    @time.setter
-    def time(self, time: str) -> None:
+    @staticmethod
+    def validateTime(time: str) -> str:
         if time is None:
             raise TimeIsNoneException()
         if not time.strip():
             raise TimeIsBlankException()
-        self.__time = time
-
-    @property
-    def weekday(self) -> str | None:
-        return self.__weekday
+        return time
 
-    @weekday.setter
-    def weekday(self, weekday: str | None) -> None:
+    @classmethod
+    def validateWeekday(cls, weekday: str | None) -> str | None:
         if weekday is None:
-            self.__weekday = None
-        else:
-            if not weekday.strip():
-                raise WeekdayIsBlankException()
+            return None
+        if not weekday.strip():
+            raise WeekdayIsBlankException()
+        if weekday not in cls.WEEKDAYS:
+            raise WeekdayIsInvalidException(weekday)
+        return weekday
+
+    @classmethod
+    def validateDayOfMonth(cls, dayOfMonth: int | None) -> int | None:
+        if dayOfMonth is None:
+            return None
+        if not cls.MIN_DAY_OF_MONTH <= dayOfMonth <= cls.MAX_DAY_OF_MONTH:
+            raise DayOfMonthOutOfRangeException()
+        return dayOfMonth
+
+    @classmethod
+    def validateTrigger(cls, trigger: str | None) -> str | None:
+        if trigger is None:
+            return None
+        name, separator, quietPeriod = trigger.partition(":")
+        if name != cls.ON_CHANGE or (
+            separator and not (quietPeriod.isdigit() and int(quietPeriod) > 0)
+        ):
+            raise TriggerIsInvalidException(trigger)
+        return trigger
+
+    @classmethod
+    def validatePriority(cls, priority: str | None) -> str | None:
+        if priority is None:
+            return None
+        if priority not in cls.PRIORITIES:
+            raise PriorityIsInvalidException(priority)
+        return priority
+
+    @classmethod
+    def validateMode(cls, mode: str | None) -> str | None:
+        if mode is None:
+            return None
+        names = set()
+        for token in mode.split(cls.MODE_SEPARATOR):
+            name, separator, value = token.strip().partition(":")
+            if name in names:
+                raise ModeIsInvalidException(mode)
+            names.add(name)
+            if name == cls.MIRROR:
+                isValid = not separator or (
+                    value.isdigit() and 0 < int(value) <= cls.MAX_PERCENT
+                )
+            elif name == cls.BUNDLE:
+                try:
+                    isValid = not separator or \
+                        FileFilter.parseSize(value) > 0
+                except ValueError:
+                    isValid = False
+            else:
+                isValid = False
+            if not isValid:
+                raise ModeIsInvalidException(mode)
+        return mode
+
+    def __getModeValue(self, name: str) -> str | None:
+        """
+        Returns the value of the mode ("" if it has none) or None if the
+        rule does not have the mode.
+        """
+        if self.mode is None:
+            return None
+        for token in self.mode.split(self.MODE_SEPARATOR):
+            tokenName, _, value = token.strip().partition(":")
+            if tokenName == name:
+                return value
+        return None
 
-            weekdayList = [
-                "Monday", "Tuesday", "Wednesday",
-                "Thursday", "Friday", "Saturday", "Sunday"
-            ]
+    @staticmethod
+    def validateFilters(filters: str | None) -> str | None:
+        if filters is None:
+            return None
+        FileFilter.fromString(filters)
+        return filters
 
-            if weekday not in weekdayList:
-                raise WeekdayIsInvalidException(weekday)
+    @property
+    def priorityRank(self) -> int:
+        """Returns the rank of the priority, 0 for the highest."""
+        return self.PRIORITIES.index(self.priority or self.NORMAL_PRIORITY)
 
-            self.__weekday = weekday
+    @property
+    def isOnChange(self) -> bool:
+        """Returns whether the rule runs when its files change."""
+        return self.trigger is not None
 
     @property
-    def dayOfMonth(self) -> int | None:
-        return self.__dayOfMonth
+    def quietPeriod(self) -> int:
+        """
+        Returns the seconds without changes after which the changed files
+        are backed up.
+        """
+        if self.trigger is None or ":" not in self.trigger:
+            return ON_CHANGE_QUIET_PERIOD
+        return int(self.trigger.partition(":")[2])
 
-    @dayOfMonth.setter
-    def dayOfMonth(self, dayOfMonth: int | None) -> None:
-        if dayOfMonth is None:
-            self.__dayOfMonth = None
-        else:
-            MIN_DAY_OF_MONTH = 1
-            MAX_DAY_OF_MONTH = 31
-            if not MIN_DAY_OF_MONTH <= dayOfMonth <= MAX_DAY_OF_MONTH:
-                raise DayOfMonthOutOfRangeException()
+    @property
+    def isMirror(self) -> bool:
+        """Returns whether the files gone from pathFrom are trashed."""
+        return self.__getModeValue(self.MIRROR) is not None
 
-            self.__dayOfMonth = dayOfMonth
+    @property
+    def maxDeletedPercent(self) -> int:
+        """
+        Returns the percent of the uploaded files which may be trashed in
+        one run.
+        """
+        percent = self.__getModeValue(self.MIRROR)
+        return int(percent) if percent else MIRROR_MAX_DELETED_PERCENT
+
+    @property
+    def bundleThreshold(self) -> int | None:
+        """
+        Returns the size of the files which are bundled, the smaller files
+        are, or None if the rule does not bundle files.
+        """
+        size = self.__getModeValue(self.BUNDLE)
+        if size is None:
+            return None
+        return FileFilter.parseSize(size) if size else BUNDLE_THRESHOLD
 
     def toRow(self) -> list:
         return [
@@ -156,43 +374,65 @@ class Rule:
             self.account,
             self.time,
             self.weekday,
-            self.dayOfMonth
+            self.dayOfMonth,
+            self.trigger,
+            self.priority,
+            self.mode,
+            self.filters
         ]
 
-    def copy(self) -> "Rule":
-        return Rule(
-            pathFrom=self.pathFrom,
-            folderID=self.folderID,
-            account=self.account,
-            time=self.time,
-            weekday=self.weekday,
-            dayOfMonth=self.dayOfMonth
+    @property
+    def ruleID(self) -> str:
+        """
+        Returns the short stable ID of the rule - a digest of its attributes
+        - to label the metrics and the history of the rule. The optional
+        attributes after NUMBER_OF_RULE_ATTRIBUTES are digested only if
+        they are set, so the IDs of the rules without them do not change.
+        """
+        values = self.toRow()
+        while len(values) > NUMBER_OF_RULE_ATTRIBUTES and values[-1] is None:
+            values.pop()
+        row = "\x1f".join(
+            "" if value is None else str(value) for value in values
         )
+        return hashlib.blake2b(row.encode(), digest_size=6).hexdigest()
+
+    def copy(self) -> "Rule":
+        return Rule.fromValidated(*self.toRow())
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Rule is immutable.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Rule is immutable.")
+
+    def __reduce__(self):
+        return (Rule.fromValidated, tuple(self.toRow()))
 
     def __str__(self) -> str:
         return f"Rule(pathFrom={self.pathFrom},folderID={self.folderID}," + \
             f"account={self.account},time={self.time}," + \
-            f"weekday={self.weekday},dayOfMonth={self.dayOfMonth})"
+            f"weekday={self.weekday},dayOfMonth={self.dayOfMonth}," + \
+            f"trigger={self.trigger},priority={self.priority}," + \
+            f"mode={self.mode},filters={self.filters})"
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Rule):
             return NotImplemented
 
         return (
+            self._hash == other._hash and
             self.pathFrom == other.pathFrom and
             self.folderID == other.folderID and
             self.account == other.account and
             self.time == other.time and
             self.weekday == other.weekday and
-            self.dayOfMonth == other.dayOfMonth
+            self.dayOfMonth == other.dayOfMonth and
+            self.trigger == other.trigger and
+            self.priority == other.priority and
+            self.mode == other.mode and
+            self.filters == other.filters
         )
 
     def __hash__(self) -> int:
-        return hash((
-            self.pathFrom,
-            self.folderID,
-            self.account,
-            self.time,
-            self.weekday,
-            self.dayOfMonth
-        ))
+        return self._hash
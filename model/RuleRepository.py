@@ -14,8 +14,10 @@
 
 import os
 import csv
+from typing import Callable
 from const.const import RULES_FILE_PATH, NUMBER_OF_RULE_ATTRIBUTES
 from model.Rule import Rule
+from model.RuleSet import RuleSet
 from exception.exceptions import (
     PathToRulesFileDoesNotExistException,
     MalformedRuleAttributesException,
@@ -26,51 +28,91 @@ class RuleRepository:
     """
     The model of the RuleRepository - the model manages the rules and the
     rules file.
+
+    The repository keeps a validated in-memory snapshot of the rules file
+    keyed by its change stamp (mtime_ns, size, generation), so the file is
+    re-parsed only when it has actually changed on disk, and subscribers are
+    notified only when the list of rules is really different.
     """
+    MISSING_FILE_STAMP = (-1, -1)
+
+    def __init__(self, rulesFilePath: str = RULES_FILE_PATH):
+        """
+        Initializes the rule repository.
+        Args:
+            rulesFilePath (str): is the path to the rules file.
+        """
+        self.rulesFilePath = rulesFilePath
+        self.__snapshot: list[Rule] | None = None
+        self.__fileStamp: tuple[int, int] | None = None
+        self.__failedFileStamp: tuple[int, int] | None = None
+        self.__generation = 0
+        self.__subscribers: list[Callable[[list[Rule]], None]] = []
+
+    @property
+    def changeStamp(self) -> tuple[int, int, int] | None:
+        """
+        Returns the change stamp (mtime_ns, size, generation) of the current
+        snapshot or None if the rules have not been loaded yet.
+        """
+        if self.__fileStamp is None:
+            return None
+        return (*self.__fileStamp, self.__generation)
+
+    def subscribe(self, callback: Callable[[list[Rule]], None]) -> None:
+        """
+        Subscribes the callback to changes of the list of rules.
+        Args:
+            callback (Callable[[list[Rule]], None]): is called with the new
+            list of rules every time the list of rules changes.
+        """
+        self.__subscribers.append(callback)
+
     def loadRules(self) -> list[Rule]:
         """
-        Loads the rules to the list from RULES_FILE.
+        Loads the rules to the list from RULES_FILE. The file is re-parsed
+        only if its change stamp differs from the stamp of the snapshot.
         Raises:
             PathToRulesFileDoesNotExistException: raises if path to rules file
             does not exist.
             MalformedRuleAttributesException: raises if the number of rule
             attributes is incorrect.
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
         Returns:
             list[Rule]: the list of rules from RULES_FILE.
         """
-        if not os.path.exists(RULES_FILE_PATH):
-            raise PathToRulesFileDoesNotExistException()
+        fileStamp = self.__readFileStamp()
+        if self.__snapshot is None or fileStamp != self.__fileStamp:
+            self.__updateSnapshot(fileStamp)
+        return list(self.__snapshot or [])
+
+    def refreshRules(self) -> bool:
+        """
+        Re-parses RULES_FILE if its change stamp has changed and notifies the
+        subscribers if the list of rules is different. A file that failed to
+        load is reported only once until it changes again.
+        Raises:
+            PathToRulesFileDoesNotExistException: raises if path to rules file
+            does not exist.
+            MalformedRuleAttributesException: raises if the number of rule
+            attributes is incorrect.
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        Returns:
+            bool: True if the list of rules has changed.
+        """
+        try:
+            fileStamp = self.__readFileStamp()
+        except PathToRulesFileDoesNotExistException:
+            if self.__failedFileStamp == self.MISSING_FILE_STAMP:
+                return False
+            self.__failedFileStamp = self.MISSING_FILE_STAMP
+            raise
 
-        PATH_FROM_ELEMENT = 0
-        FOLDER_ID_ELEMNT = 1
-        ACCOUNT_NAME_ELEMENT = 2
-        TIME_ELEMENT = 3
-        WEEKDAY_ELEMENT = 4
-        DAY_OF_MONTH_ELEMENT = 5
-
-        listOfRules = []
-        with open(RULES_FILE_PATH, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if len(row) < NUMBER_OF_RULE_ATTRIBUTES:
-                    raise MalformedRuleAttributesException()
-
-                weekday = row[WEEKDAY_ELEMENT] if \
-                    row[WEEKDAY_ELEMENT].strip() else None
-                dayOfMonth = None if not row[DAY_OF_MONTH_ELEMENT].strip() \
-                    else int(row[DAY_OF_MONTH_ELEMENT])
-
-                rule = Rule(
-                    row[PATH_FROM_ELEMENT],
-                    row[FOLDER_ID_ELEMNT],
-                    row[ACCOUNT_NAME_ELEMENT],
-                    row[TIME_ELEMENT],
-                    weekday,
-                    dayOfMonth
-                )
-                listOfRules.append(rule)
-
-        return listOfRules
+        if fileStamp in (self.__fileStamp, self.__failedFileStamp):
+            return False
+        return self.__updateSnapshot(fileStamp)
 
     def saveRules(self, listOfRules: list[Rule]) -> None:
         """
@@ -82,12 +124,15 @@ class RuleRepository:
             does not exist.
         """
 
-        if not os.path.exists(RULES_FILE_PATH):
+        if not os.path.exists(self.rulesFilePath):
             raise PathToRulesFileDoesNotExistException()
 
-        with open(RULES_FILE_PATH, mode='w', newline='') as file:
-            for rule in listOfRules:
-                csv.writer(file).writerow(rule.toRow())
+        with open(self.rulesFilePath, mode='w', newline='') as file:
+            csv.writer(file).writerows(rule.toRow() for rule in listOfRules)
+
+        self.__fileStamp = self.__readFileStamp()
+        self.__failedFileStamp = None
+        self.__setSnapshot(list(listOfRules))
 
     def deleteRule(self, rule: Rule) -> None:
         """
@@ -111,14 +156,114 @@ class RuleRepository:
             PathToRulesFileDoesNotExistException: raises if path to rules file
             does not exist.
         """
-        if not os.path.exists(RULES_FILE_PATH):
+        if not os.path.exists(self.rulesFilePath):
             raise PathToRulesFileDoesNotExistException()
 
         existingRules = self.loadRules()
 
-        combinedRules = set(existingRules) | set(newRules)
+        combinedRules = list(dict.fromkeys(existingRules + newRules))
+
+        self.saveRules(combinedRules)
+
+    def importRules(self, filePath: str) -> None:
+        """
+        Imports the unique rules from a CSV or JSON file (chosen by the file
+        extension) to RULES_FILE.
+        Args:
+            filePath (str): is the path to the imported file.
+        Raises:
+            RulesAreInvalidException: raises with all errors if any imported
+            rule is invalid.
+            MalformedRuleAttributesException: raises if the number of rule
+            attributes is incorrect.
+            PathToRulesFileDoesNotExistException: raises if path to rules file
+            does not exist.
+        """
+        if filePath.lower().endswith(".json"):
+            importedRules = RuleSet.readJSON(filePath)
+        else:
+            importedRules = RuleSet.readCSV(filePath)
+        self.saveUniqueRules(list(importedRules))
+
+    def exportRules(self, filePath: str) -> None:
+        """
+        Exports the rules to a CSV or JSON file (chosen by the file
+        extension).
+        Args:
+            filePath (str): is the path to the exported file.
+        Raises:
+            MalformedRuleAttributesException: raises if the number of rule
+            attributes is incorrect.
+            PathToRulesFileDoesNotExistException: raises if path to rules file
+            does not exist.
+        """
+        ruleSet = RuleSet(self.loadRules())
+        if filePath.lower().endswith(".json"):
+            ruleSet.writeJSON(filePath)
+        else:
+            ruleSet.writeCSV(filePath)
+
+    def __readFileStamp(self) -> tuple[int, int]:
+        """
+        Returns the (mtime_ns, size) stamp of RULES_FILE.
+        Raises:
+            PathToRulesFileDoesNotExistException: raises if path to rules file
+            does not exist.
+        """
+        try:
+            fileStat = os.stat(self.rulesFilePath)
+        except FileNotFoundError as exception:
+            raise PathToRulesFileDoesNotExistException() from exception
+        return (fileStat.st_mtime_ns, fileStat.st_size)
+
+    def __updateSnapshot(self, fileStamp: tuple[int, int]) -> bool:
+        """
+        Re-parses RULES_FILE and replaces the snapshot.
+        Args:
+            fileStamp (tuple[int, int]): is the stamp of the parsed file.
+        Raises:
+            MalformedRuleAttributesException: raises if the number of rule
+            attributes is incorrect.
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        Returns:
+            bool: True if the list of rules has changed.
+        """
+        try:
+            listOfRules = self.__parseRules()
+        except Exception:
+            self.__failedFileStamp = fileStamp
+            raise
+
+        self.__fileStamp = fileStamp
+        self.__failedFileStamp = None
+        if listOfRules == self.__snapshot:
+            return False
+        self.__setSnapshot(listOfRules)
+        return True
+
+    def __setSnapshot(self, listOfRules: list[Rule]) -> None:
+        """Replaces the snapshot, bumps the generation and notifies."""
+        self.__snapshot = listOfRules
+        self.__generation += 1
+        for callback in self.__subscribers:
+            callback(list(listOfRules))
+
+    def __parseRules(self) -> list[Rule]:
+        """
+        Parses RULES_FILE.
+        Raises:
+            MalformedRuleAttributesException: raises if the number of rule
+            attributes is incorrect.
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        Returns:
+            list[Rule]: the list of rules from RULES_FILE.
+        """
+        with open(self.rulesFilePath, mode='r', newline='') as file:
+            rows = list(csv.reader(file))
+
+        if any(len(row) < NUMBER_OF_RULE_ATTRIBUTES for row in rows):
+            raise MalformedRuleAttributesException()
 
-        with open(RULES_FILE_PATH, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            for rule in combinedRules:
-                writer.writerow(rule.toRow())
+        return list(RuleSet.fromRows(rows))
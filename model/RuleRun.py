@@ -0,0 +1,99 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RuleRun class."""
+
+
+class RuleRun:
+    """
+    Class representing one run of a rule - when it ran, what it transferred
+    and how it ended.
+    """
+    SUCCESS = "success"
+    FAILURE = "failure"
+
+    FIELDS = (
+        "ruleID",
+        "startTime",
+        "endTime",
+        "filesScanned",
+        "filesChanged",
+        "filesUploaded",
+        "bytesUploaded",
+        "apiCalls",
+        "retries",
+        "errorClass",
+    )
+
+    def __init__(self, ruleID: str, startTime: float,
+                 endTime: float | None = None, filesScanned: int = 0,
+                 filesChanged: int = 0, filesUploaded: int = 0,
+                 bytesUploaded: int = 0, apiCalls: int = 0, retries: int = 0,
+                 errorClass: str | None = None):
+        """
+        Initializes a RuleRun instance with the given parameters.
+        Args:
+            ruleID (str): is the ID of the rule.
+            startTime (float): is the start of the run (epoch seconds).
+            endTime (float, None): is the end of the run (epoch seconds) or
+            None while the rule is running.
+            filesScanned (int): is the number of checked files.
+            filesChanged (int): is the number of new or changed files.
+            filesUploaded (int): is the number of uploaded files.
+            bytesUploaded (int): is the number of uploaded bytes.
+            apiCalls (int): is the number of Google Drive API calls.
+            retries (int): is the number of retried API calls.
+            errorClass (str, None): is the class of the error which failed
+            the run or None if the run succeeded.
+        """
+        self.ruleID = ruleID
+        self.startTime = startTime
+        self.endTime = endTime
+        self.filesScanned = filesScanned
+        self.filesChanged = filesChanged
+        self.filesUploaded = filesUploaded
+        self.bytesUploaded = bytesUploaded
+        self.apiCalls = apiCalls
+        self.retries = retries
+        self.errorClass = errorClass
+        self.error: Exception | None = None
+
+    @property
+    def outcome(self) -> str:
+        return self.SUCCESS if self.errorClass is None else self.FAILURE
+
+    @property
+    def duration(self) -> float:
+        """Returns the duration of the run in seconds."""
+        if self.endTime is None:
+            return 0.0
+        return max(self.endTime - self.startTime, 0.0)
+
+    @property
+    def throughput(self) -> float:
+        """Returns the uploaded bytes per second."""
+        if self.duration == 0:
+            return 0.0
+        return self.bytesUploaded / self.duration
+
+    def toRow(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RuleRun):
+            return NotImplemented
+        return self.toRow() == other.toRow()
+
+    def __str__(self) -> str:
+        return f"RuleRun(ruleID={self.ruleID},outcome={self.outcome}," + \
+            f"duration={self.duration:.3f},filesUploaded=" + \
+            f"{self.filesUploaded},bytesUploaded={self.bytesUploaded})"
@@ -0,0 +1,454 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RuleSet class."""
+
+import io
+import csv
+import json
+import itertools
+from operator import itemgetter, methodcaller
+from typing import Callable, Iterable, Iterator, Sequence
+from const.const import NUMBER_OF_RULE_ATTRIBUTES
+from model.Rule import Rule
+from exception.exceptions import (
+    PathFromIsNoneException,
+    PathFromIsBlankException,
+    FolderIDIsNoneException,
+    FolderIDIsBlankException,
+    AccountIsNoneException,
+    AccountIsBlankException,
+    TimeIsNoneException,
+    TimeIsBlankException,
+    WeekdayIsBlankException,
+    WeekdayIsInvalidException,
+    DayOfMonthOutOfRangeException,
+    TriggerIsInvalidException,
+    PriorityIsInvalidException,
+    ModeIsInvalidException,
+    FiltersAreInvalidException,
+    DayOfMonthIsInvalidException,
+    RulesAreInvalidException,
+)
+
+
+class RuleSet:
+    """
+    The class of RuleSet - an ordered collection of unique rules with bulk
+    import and export. The rules are stored as unique row tuples and Rule
+    objects are created only when the rules are accessed. Rules are
+    validated column by column: every distinct value of a column is
+    validated once, and all errors are reported together in one
+    RulesAreInvalidException.
+    """
+    COLUMNS = Rule.ATTRIBUTES
+    REQUIRED_TEXT_COLUMNS = frozenset((
+        "pathFrom",
+        "folderID",
+        "account",
+        "time",
+    ))
+    VALIDATORS: dict[str, Callable] = {
+        "pathFrom": Rule.validatePathFrom,
+        "folderID": Rule.validateFolderID,
+        "account": Rule.validateAccount,
+        "time": Rule.validateTime,
+        "weekday": Rule.validateWeekday,
+        "dayOfMonth": Rule.validateDayOfMonth,
+        "trigger": Rule.validateTrigger,
+        "priority": Rule.validatePriority,
+        "mode": Rule.validateMode,
+        "filters": Rule.validateFilters,
+    }
+
+    # The errors of the validators; the wrongly typed values of fromColumns
+    # raise the built-in errors.
+    VALIDATION_ERRORS = (
+        PathFromIsNoneException,
+        PathFromIsBlankException,
+        FolderIDIsNoneException,
+        FolderIDIsBlankException,
+        AccountIsNoneException,
+        AccountIsBlankException,
+        TimeIsNoneException,
+        TimeIsBlankException,
+        WeekdayIsBlankException,
+        WeekdayIsInvalidException,
+        DayOfMonthOutOfRangeException,
+        TriggerIsInvalidException,
+        PriorityIsInvalidException,
+        ModeIsInvalidException,
+        FiltersAreInvalidException,
+        AttributeError,
+        TypeError,
+        ValueError,
+    )
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        """
+        Initializes the rule set, dropping duplicate rules but keeping the
+        order of the first occurrences.
+        Args:
+            rules (Iterable[Rule]): are the rules.
+        """
+        self.__rows: tuple[tuple, ...] = tuple(dict.fromkeys(
+            tuple(rule.toRow()) for rule in rules
+        ))
+        self.__rules: tuple[Rule, ...] | None = None
+
+    @property
+    def rules(self) -> tuple[Rule, ...]:
+        if self.__rules is None:
+            self.__rules = tuple(
+                Rule.fromValidated(*row) for row in self.__rows
+            )
+        return self.__rules
+
+    @property
+    def rows(self) -> tuple[tuple, ...]:
+        return self.__rows
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def __getitem__(self, index: int) -> Rule:
+        return self.rules[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RuleSet):
+            return NotImplemented
+        return self.__rows == other.rows
+
+    def __hash__(self) -> int:
+        return hash(self.__rows)
+
+    def union(self, rules: Iterable[Rule]) -> "RuleSet":
+        """Returns a new rule set with the unique rules of both."""
+        return RuleSet.__fromValidatedRows((
+            *self.__rows,
+            *(tuple(rule.toRow()) for rule in rules)
+        ))
+
+    def toColumns(self) -> dict[str, list]:
+        """Returns the rules as a dict of columns."""
+        return {
+            column: list(map(itemgetter(index), self.__rows))
+            for index, column in enumerate(self.COLUMNS)
+        }
+
+    @classmethod
+    def fromColumns(cls, columns: dict[str, Sequence]) -> "RuleSet":
+        """
+        Creates the rule set from a dict of typed columns.
+        Args:
+            columns (dict[str, Sequence]): are the columns of the rules;
+            missing "weekday", "dayOfMonth", "trigger", "priority", "mode"
+            and "filters" columns are treated as None.
+        Raises:
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        """
+        numberOfRules = len(columns.get("pathFrom", ()))
+        columns = {
+            "weekday": [None] * numberOfRules,
+            "dayOfMonth": [None] * numberOfRules,
+            "trigger": [None] * numberOfRules,
+            "priority": [None] * numberOfRules,
+            "mode": [None] * numberOfRules,
+            "filters": [None] * numberOfRules,
+            **columns
+        }
+        errors = [
+            f"column {column}: expected {numberOfRules} values."
+            for column in cls.COLUMNS
+            if len(columns.get(column, ())) != numberOfRules
+        ]
+        if errors:
+            raise RulesAreInvalidException(errors)
+
+        return cls.__build([columns[column] for column in cls.COLUMNS],
+                           isParsed=True)
+
+    @classmethod
+    def fromRows(cls, rows: Iterable[Sequence[str]]) -> "RuleSet":
+        """
+        Creates the rule set from rows of strings in the RULES_FILE format:
+        a blank or missing optional attribute (after the first
+        NUMBER_OF_RULE_ATTRIBUTES) and a blank weekday or day of month mean
+        None.
+        Args:
+            rows (Iterable[Sequence[str]]): are the rows of the rules.
+        Raises:
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls()
+        if min(map(len, rows)) < NUMBER_OF_RULE_ATTRIBUTES:
+            raise RulesAreInvalidException([
+                f"row {rowNumber}: expected {NUMBER_OF_RULE_ATTRIBUTES} " +
+                f"attributes, got {len(row)}."
+                for rowNumber, row in enumerate(rows, start=1)
+                if len(row) < NUMBER_OF_RULE_ATTRIBUTES
+            ])
+
+        # Transposed in C, the missing optional attributes are blank.
+        rowLengths = set(map(len, rows))
+        columns: list[Sequence[str]]
+        if len(rowLengths) == 1:
+            columns = [
+                list(map(itemgetter(index), rows))
+                for index in range(min(rowLengths.pop(), len(cls.COLUMNS)))
+            ]
+        else:
+            columns = list(itertools.zip_longest(*rows, fillvalue=""))
+        return cls.__build(cls.__padColumns(columns, len(rows)),
+                           isParsed=False)
+
+    @classmethod
+    def readCSV(cls, filePath: str) -> "RuleSet":
+        """
+        Reads the rule set from a CSV file in the RULES_FILE format.
+        Raises:
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        """
+        with open(filePath, mode='r', newline='') as file:
+            text = file.read()
+        columns = cls.__splitColumns(text)
+        if columns is None:
+            return cls.fromRows(csv.reader(io.StringIO(text, newline='')))
+        return cls.__build(cls.__padColumns(columns, len(columns[0])),
+                           isParsed=False)
+
+    @classmethod
+    def readJSON(cls, filePath: str) -> "RuleSet":
+        """
+        Reads the rule set from a JSON file containing a list of objects
+        with the keys of COLUMNS.
+        Raises:
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        """
+        with open(filePath, mode='r') as file:
+            records = json.load(file)
+
+        if not isinstance(records, list) or \
+           not all(isinstance(record, dict) for record in records):
+            raise RulesAreInvalidException(
+                ["the JSON file must contain a list of objects."]
+            )
+
+        return cls.fromColumns({
+            column: [record.get(column) for record in records]
+            for column in cls.COLUMNS
+        })
+
+    def writeCSV(self, filePath: str) -> None:
+        """Writes the rule set to a CSV file in the RULES_FILE format."""
+        with open(filePath, mode='w', newline='') as file:
+            csv.writer(file).writerows(self.__rows)
+
+    def writeJSON(self, filePath: str) -> None:
+        """Writes the rule set to a JSON file as a list of objects."""
+        with open(filePath, mode='w') as file:
+            json.dump(
+                [dict(zip(self.COLUMNS, row)) for row in self.__rows],
+                file,
+                indent=2
+            )
+
+    @classmethod
+    def __splitColumns(cls, text: str) -> list[Sequence[str]] | None:
+        """
+        Splits the text of a CSV file into columns without the csv module
+        and without building the rows.
+        Returns:
+            list[Sequence[str]], None: the columns or None if a field is
+            quoted, the lines have different numbers of fields or fewer than
+            NUMBER_OF_RULE_ATTRIBUTES, so the text has to be read by the csv
+            module.
+        """
+        if '"' in text:
+            return None
+        text = text.replace("\r\n", "\n")
+        if "\r" in text:
+            return None
+        lines = text.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        numbersOfSeparators = set(map(methodcaller("count", ","), lines))
+        if len(numbersOfSeparators) != 1:
+            return None
+        width = numbersOfSeparators.pop() + 1
+        if width < NUMBER_OF_RULE_ATTRIBUTES:
+            return None
+
+        fields = ",".join(lines).split(",")
+        return [
+            fields[index::width]
+            for index in range(min(width, len(cls.COLUMNS)))
+        ]
+
+    @classmethod
+    def __padColumns(cls, columns: list[Sequence[str]],
+                     numberOfRules: int) -> list[Sequence[str]]:
+        """Adds the missing optional columns as blank columns."""
+        blankColumn = ("",) * numberOfRules
+        return [
+            columns[index] if index < len(columns) else blankColumn
+            for index in range(len(cls.COLUMNS))
+        ]
+
+    @classmethod
+    def __fromValidatedRows(cls, rows: Iterable[tuple]) -> "RuleSet":
+        """Creates the rule set from validated rows of typed attributes."""
+        ruleSet = cls()
+        cls.__setRows(ruleSet, rows)
+        return ruleSet
+
+    def __setRows(self, rows: Iterable[tuple]) -> None:
+        """Sets the unique rows of the rule set in their order."""
+        self.__rows = tuple(dict.fromkeys(rows))
+        self.__rules = None
+
+    @classmethod
+    def __build(cls, columns: Sequence[Sequence],
+                isParsed: bool) -> "RuleSet":
+        """
+        Validates the columns and creates the rule set.
+        Args:
+            columns (Sequence[Sequence]): are the columns of the attributes
+            in the order of COLUMNS.
+            isParsed (bool): whether the weekday and the day of month are
+            already typed rather than strings in the RULES_FILE format.
+        Raises:
+            RulesAreInvalidException: raises with all errors if any rule is
+            invalid.
+        """
+        columns, errors = cls.__validateColumns(columns, isParsed)
+        if errors:
+            raise RulesAreInvalidException(errors)
+        return cls.__fromValidatedRows(zip(*columns))
+
+    @classmethod
+    def __validateColumns(cls, columns: Sequence[Sequence], isParsed: bool
+                          ) -> tuple[list[Sequence], list[str]]:
+        """
+        Types the columns and validates them.
+        Returns:
+            tuple[list[Sequence], list[str]]: the columns and the errors.
+        """
+        WEEKDAY_COLUMN = 4
+        DAY_OF_MONTH_COLUMN = 5
+        TRIGGER_COLUMN = 6
+        PRIORITY_COLUMN = 7
+        MODE_COLUMN = 8
+        FILTERS_COLUMN = 9
+
+        columns = list(columns)
+        errors: list[str] = []
+        if not isParsed:
+            for columnIndex in (WEEKDAY_COLUMN, TRIGGER_COLUMN,
+                                PRIORITY_COLUMN, MODE_COLUMN, FILTERS_COLUMN):
+                columns[columnIndex] = cls.__mapColumn(
+                    columns[columnIndex],
+                    lambda value: value if value.strip() else None
+                )
+            columns[DAY_OF_MONTH_COLUMN] = cls.__mapColumn(
+                columns[DAY_OF_MONTH_COLUMN],
+                cls.__parseDayOfMonth,
+                errors
+            )
+
+        for column, values in zip(cls.COLUMNS, columns):
+            errors.extend(cls.__validateColumn(column, values))
+        return columns, errors
+
+    @classmethod
+    def __validateColumn(cls, column: str, values: Sequence) -> list[str]:
+        """
+        Validates every distinct value of the column once.
+        Returns:
+            list[str]: the errors of the column in the order of the rows.
+        """
+        validator = cls.VALIDATORS[column]
+        # A required text column of non-blank strings is valid; checked in
+        # C without collecting the mostly distinct values.
+        if column in cls.REQUIRED_TEXT_COLUMNS and \
+           set(map(type, values)) == {str} and all(values) and \
+           not any(map(str.isspace, values)):
+            return []
+        try:
+            uniqueValues = set(values)
+        except TypeError:
+            return cls.__validateEachValue(column, values)
+
+        invalidValues = {}
+        for value in uniqueValues:
+            try:
+                validator(value)
+            except cls.VALIDATION_ERRORS as exception:
+                invalidValues[value] = str(exception)
+
+        if not invalidValues:
+            return []
+        return [
+            f"row {rowNumber}, {column}: {invalidValues[value]}"
+            for rowNumber, value in enumerate(values, start=1)
+            if value in invalidValues
+        ]
+
+    @classmethod
+    def __validateEachValue(cls, column: str,
+                            values: Sequence) -> list[str]:
+        """Validates a column containing unhashable values row by row."""
+        validator = cls.VALIDATORS[column]
+        errors = []
+        for rowNumber, value in enumerate(values, start=1):
+            try:
+                validator(value)
+            except cls.VALIDATION_ERRORS as exception:
+                errors.append(f"row {rowNumber}, {column}: {exception}")
+        return errors
+
+    @staticmethod
+    def __mapColumn(values: Sequence, function: Callable,
+                    errors: list[str] | None = None) -> list:
+        """Maps every distinct value of the column once."""
+        mapping = {}
+        for value in set(values):
+            try:
+                mapping[value] = function(value)
+            except DayOfMonthIsInvalidException as exception:
+                if errors is None:
+                    raise
+                mapping[value] = None
+                errors.extend(
+                    f"row {rowNumber}: {exception}"
+                    for rowNumber, rowValue in enumerate(values, start=1)
+                    if rowValue == value
+                )
+        return list(map(mapping.__getitem__, values))
+
+    @staticmethod
+    def __parseDayOfMonth(dayOfMonth: str) -> int | None:
+        if not dayOfMonth.strip():
+            return None
+        try:
+            return int(dayOfMonth)
+        except ValueError as exception:
+            raise DayOfMonthIsInvalidException() from exception
@@ -0,0 +1,199 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RunHistoryRepository class."""
+
+import time
+import threading
+from util.connectDatabase import connectDatabase
+from model.RuleRun import RuleRun
+from const.const import (
+    RUN_HISTORY_FILE_PATH,
+    RUN_HISTORY_MAX_RUNS_PER_RULE,
+    RUN_HISTORY_MAX_AGE,
+    THROUGHPUT_HISTORY_WINDOW,
+)
+
+
+class RunHistoryRepository:
+    """
+    The model of the RunHistoryRepository - the model keeps the runs of the
+    rules in the SQLite database RUN_HISTORY_FILE.
+
+    Every rule keeps at most maxRunsPerRule runs, and runs older than
+    maxAge seconds are dropped. The repository is used by the worker to add
+    runs and by the window to query them, so the connection is shared
+    between threads under a lock.
+    """
+    # The queries are built once from the constant field names, every
+    # filter is a bound parameter which is ignored when it is NULL.
+    SELECT_RUNS = (
+        f"SELECT {', '.join(RuleRun.FIELDS)} FROM runs "  # nosec B608
+        "WHERE (? IS NULL OR ruleID = ?) "
+        "AND (? IS NULL OR startTime >= ?) "
+        "AND (? IS NULL OR startTime <= ?) "
+        "AND (? IS NULL OR (errorClass IS NULL) = ?) "
+        "ORDER BY startTime DESC LIMIT ?"
+    )
+    SELECT_LAST_RUNS = (
+        f"SELECT {', '.join(RuleRun.FIELDS)} FROM runs "  # nosec B608
+        "WHERE id IN (SELECT id FROM runs AS lastRun "
+        "WHERE lastRun.ruleID = runs.ruleID "
+        "ORDER BY startTime DESC LIMIT 1)"
+    )
+
+    def __init__(self, databaseFilePath: str = RUN_HISTORY_FILE_PATH,
+                 maxRunsPerRule: int = RUN_HISTORY_MAX_RUNS_PER_RULE,
+                 maxAge: float = RUN_HISTORY_MAX_AGE):
+        """
+        Initializes the run history repository and creates the database.
+        Args:
+            databaseFilePath (str): is the path to the database file.
+            maxRunsPerRule (int): is the number of kept runs of a rule.
+            maxAge (float): is the number of seconds a run is kept.
+        """
+        self.databaseFilePath = databaseFilePath
+        self.maxRunsPerRule = maxRunsPerRule
+        self.maxAge = maxAge
+        self.__lock = threading.Lock()
+
+        self.__connection = connectDatabase(databaseFilePath)
+        with self.__lock, self.__connection:
+            self.__connection.executescript(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "ruleID TEXT NOT NULL, "
+                "startTime REAL NOT NULL, "
+                "endTime REAL, "
+                "filesScanned INTEGER NOT NULL, "
+                "filesChanged INTEGER NOT NULL, "
+                "filesUploaded INTEGER NOT NULL, "
+                "bytesUploaded INTEGER NOT NULL, "
+                "apiCalls INTEGER NOT NULL, "
+                "retries INTEGER NOT NULL, "
+                "errorClass TEXT); "
+                "CREATE INDEX IF NOT EXISTS runsByRule "
+                "ON runs (ruleID, startTime);"
+            )
+
+    def addRun(self, run: RuleRun) -> None:
+        """
+        Adds the run and applies the retention to the runs of its rule.
+        Args:
+            run (RuleRun): is the finished run.
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                f"INSERT INTO runs ({', '.join(RuleRun.FIELDS)}) " +
+                f"VALUES ({', '.join('?' * len(RuleRun.FIELDS))})",
+                run.toRow()
+            )
+            self.__connection.execute(
+                "DELETE FROM runs WHERE ruleID = ? AND id NOT IN ("
+                "SELECT id FROM runs WHERE ruleID = ? "
+                "ORDER BY startTime DESC LIMIT ?)",
+                (run.ruleID, run.ruleID, self.maxRunsPerRule)
+            )
+            self.__connection.execute(
+                "DELETE FROM runs WHERE startTime < ?",
+                (time.time() - self.maxAge,)
+            )
+
+    def getRuns(self, ruleID: str | None = None, since: float | None = None,
+                until: float | None = None, outcome: str | None = None,
+                limit: int = 100) -> list[RuleRun]:
+        """
+        Returns the runs, the newest first.
+        Args:
+            ruleID (str, None): is the ID of the rule or None for all rules.
+            since (float, None): is the earliest start time.
+            until (float, None): is the latest start time.
+            outcome (str, None): is RuleRun.SUCCESS, RuleRun.FAILURE or
+            None for both.
+            limit (int): is the maximum number of runs.
+        """
+        if outcome not in (RuleRun.SUCCESS, RuleRun.FAILURE):
+            outcome = None
+        with self.__lock:
+            rows = self.__connection.execute(
+                self.SELECT_RUNS,
+                (ruleID, ruleID, since, since, until, until,
+                 outcome, outcome == RuleRun.SUCCESS, limit)
+            ).fetchall()
+        return [RuleRun(*row) for row in rows]
+
+    def getLastRuns(self) -> dict[str, RuleRun]:
+        """Returns the last run of every rule by the rule ID."""
+        with self.__lock:
+            rows = self.__connection.execute(
+                self.SELECT_LAST_RUNS
+            ).fetchall()
+        return {row[0]: RuleRun(*row) for row in rows}
+
+    def getRuleStatistics(self, ruleID: str,
+                          since: float | None = None) -> dict[str, float]:
+        """
+        Returns the statistics of the runs of the rule: "runs", "failures",
+        "averageDuration", "maxDuration" and "bytesUploaded".
+        Args:
+            ruleID (str): is the ID of the rule.
+            since (float, None): is the earliest start time.
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT COUNT(*), "
+                "COUNT(errorClass), "
+                "COALESCE(AVG(endTime - startTime), 0), "
+                "COALESCE(MAX(endTime - startTime), 0), "
+                "COALESCE(SUM(bytesUploaded), 0) "
+                "FROM runs WHERE ruleID = ? AND startTime >= ?",
+                (ruleID, since if since is not None else float("-inf"))
+            ).fetchone()
+        return dict(zip(
+            ("runs", "failures", "averageDuration", "maxDuration",
+             "bytesUploaded"),
+            row
+        ))
+
+    def getThroughput(self, ruleID: str | None = None,
+                      since: float | None = None) -> float:
+        """
+        Returns the uploaded bytes per second of the runs which uploaded
+        anything or 0 if there are no such runs.
+        Args:
+            ruleID (str, None): is the ID of the rule or None for all rules.
+            since (float, None): is the earliest start time.
+        """
+        with self.__lock:
+            bytesUploaded, duration = self.__connection.execute(
+                "SELECT COALESCE(SUM(bytesUploaded), 0), "
+                "COALESCE(SUM(endTime - startTime), 0) FROM runs "
+                "WHERE bytesUploaded > 0 AND endTime > startTime "
+                "AND (? IS NULL OR ruleID = ?) "
+                "AND (? IS NULL OR startTime >= ?)",
+                (ruleID, ruleID, since, since)
+            ).fetchone()
+        return bytesUploaded / duration if duration > 0 else 0.0
+
+    def estimateThroughput(self, ruleID: str) -> float:
+        """
+        Returns the throughput of the runs of the rule in the last
+        THROUGHPUT_HISTORY_WINDOW seconds, or of the runs of all rules if
+        the rule has not uploaded anything, or 0 if it is not known.
+        """
+        since = time.time() - THROUGHPUT_HISTORY_WINDOW
+        return self.getThroughput(ruleID, since) or \
+            self.getThroughput(since=since)
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
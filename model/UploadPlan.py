@@ -0,0 +1,173 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the UploadPlan class."""
+
+import os
+from typing import NamedTuple
+from model.ManifestRepository import ManifestEntry
+
+
+class PlannedFile(NamedTuple):
+    """
+    A new or changed file of a rule run: the path relative to the parent of
+    pathFrom, the path and the stat of the file and its manifest entry
+    (None for a new file).
+    """
+    relativePath: str
+    filePath: str
+    fileStat: os.stat_result
+    entry: ManifestEntry | None
+
+    @property
+    def size(self) -> int:
+        return self.fileStat.st_size
+
+    @property
+    def quotaBytes(self) -> int:
+        """
+        Returns the growth of the used storage by the upload: the size less
+        the size of the uploaded file it replaces (negative if it shrank).
+        """
+        return self.size - (self.entry.size if self.entry is not None else 0)
+
+
+class UploadPlan:
+    """
+    Class representing the plan of a rule run - the files to upload in the
+    order of the scan, the files deferred to a later run (e.g. because the
+    storage quota is short), the manifest entries of the touched files
+    whose content has not changed and the files and folders of the manifest
+    which are gone (only known after a full scan).
+
+    A new file with the inode (or the modification time), the size and the
+    MD5 of a gone file has been moved or renamed: it is in movedFiles with
+    the gone path and the entry of the gone file, and the Google Drive file
+    is moved instead of uploading the file again.
+
+    A new file is created in Google Drive unless a file of its name has
+    been found in its Google Drive folder (remoteFileIDs); then, like a
+    changed file, it is updated.
+    """
+    def __init__(self, ruleID: str):
+        """
+        Initializes the empty plan.
+        Args:
+            ruleID (str): is the ID of the planned rule.
+        """
+        self.ruleID = ruleID
+        self.files: list[PlannedFile] = []
+        self.deferredFiles: list[PlannedFile] = []
+        self.unchangedEntries: dict[str, ManifestEntry] = {}
+        self.missingEntries: dict[str, ManifestEntry] = {}
+        self.remoteFileIDs: dict[str, str] = {}
+        self.movedFiles: list[tuple[str, PlannedFile]] = []
+        self.filesScanned = 0
+
+    @property
+    def plannedBytes(self) -> int:
+        """Returns the bytes of the files to upload."""
+        return sum(file.size for file in self.files)
+
+    @property
+    def plannedQuotaBytes(self) -> int:
+        """Returns the growth of the used storage by the files to upload."""
+        return sum(file.quotaBytes for file in self.files)
+
+    @property
+    def deferredBytes(self) -> int:
+        """Returns the bytes of the deferred files."""
+        return sum(file.size for file in self.deferredFiles)
+
+    def trim(self, availableBytes: int) -> None:
+        """
+        Defers the files whose growth of the used storage (see quotaBytes)
+        does not fit the available bytes. The most recently modified files
+        are kept first, and the kept files are uploaded in the order of the
+        scan. The priorities of the rules are applied across the runs: the
+        available bytes exclude the bytes reserved for the queued runs of a
+        higher priority.
+        Args:
+            availableBytes (int): is the number of the bytes by which the
+            used storage may grow.
+        """
+        keptFiles = set()
+        newestFirst = sorted(enumerate(self.files),
+                             key=lambda item: -item[1].fileStat.st_mtime_ns)
+        for index, file in newestFirst:
+            if file.quotaBytes <= availableBytes:
+                keptFiles.add(index)
+                availableBytes -= file.quotaBytes
+        self.deferredFiles.extend(
+            file for index, file in enumerate(self.files)
+            if index not in keptFiles
+        )
+        self.files = [
+            file for index, file in enumerate(self.files)
+            if index in keptFiles
+        ]
+
+    def estimateSeconds(self, bytesPerSecond: float,
+                        uploadedBytes: int = 0) -> float | None:
+        """
+        Returns the estimated seconds until the planned files are uploaded
+        or None if the throughput is not known.
+        Args:
+            bytesPerSecond (float): is the expected throughput.
+            uploadedBytes (int): is the number of the already uploaded
+            bytes of the plan.
+        """
+        if bytesPerSecond <= 0:
+            return None
+        return max(self.plannedBytes - uploadedBytes, 0) / bytesPerSecond
+
+    def isUpdate(self, file: PlannedFile) -> bool:
+        """Returns whether the planned file replaces a Google Drive file."""
+        return file.entry is not None or \
+            file.relativePath in self.remoteFileIDs
+
+    def toDict(self, estimatedSeconds: float | None = None) -> dict:
+        """
+        Returns the plan for JSON: the files to create and to update, the
+        number of the skipped files, the moved files, the files to delete,
+        the deferred files, the bytes and the estimated seconds.
+        Args:
+            estimatedSeconds (float, None): is the estimated duration of the
+            uploads or None if it is not known.
+        """
+        def toItems(files: list[PlannedFile]) -> list[dict]:
+            return [{"path": file.relativePath, "size": file.size}
+                    for file in files]
+
+        return {
+            "ruleID": self.ruleID,
+            "filesScanned": self.filesScanned,
+            "create": toItems([file for file in self.files
+                               if not self.isUpdate(file)]),
+            "update": toItems([file for file in self.files
+                               if self.isUpdate(file)]),
+            "skip": self.filesScanned - len(self.files) -
+            len(self.deferredFiles) - len(self.movedFiles),
+            "move": [{"from": movedPath, "path": file.relativePath,
+                      "size": file.size}
+                     for movedPath, file in self.movedFiles],
+            "delete": sorted(self.missingEntries),
+            "deferred": toItems(self.deferredFiles),
+            "plannedBytes": self.plannedBytes,
+            "deferredBytes": self.deferredBytes,
+            "estimatedSeconds": estimatedSeconds,
+        }
+
+    def __str__(self) -> str:
+        return f"UploadPlan(ruleID={self.ruleID},files={len(self.files)}," + \
+            f"plannedBytes={self.plannedBytes},deferredFiles=" + \
+            f"{len(self.deferredFiles)})"
@@ -0,0 +1,77 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing the VerifyReport class."""
+
+
+class VerifyReport:
+    """
+    Class representing one verification of the backup of a rule - the
+    checked files, the files missing in Google Drive, the files whose size
+    or md5Checksum differs, the Google Drive files which are not in the
+    backup and the requeued files.
+    """
+    SUCCESS = "success"
+    FAILURE = "failure"
+
+    def __init__(self, ruleID: str, startTime: float):
+        """
+        Initializes the empty report.
+        Args:
+            ruleID (str): is the ID of the verified rule.
+            startTime (float): is the start of the verification (epoch
+            seconds).
+        """
+        self.ruleID = ruleID
+        self.startTime = startTime
+        self.endTime: float | None = None
+        self.filesChecked = 0
+        self.listCalls = 0
+        self.missing: list[str] = []
+        # The expected and the found size and md5Checksum by the path.
+        self.mismatched: dict[str, dict] = {}
+        self.extra: list[str] = []
+        self.requeued = 0
+
+    @property
+    def outcome(self) -> str:
+        """Returns failure if any file is missing or mismatched."""
+        return self.FAILURE if self.missing or self.mismatched \
+            else self.SUCCESS
+
+    @property
+    def duration(self) -> float:
+        """Returns the duration of the verification in seconds."""
+        if self.endTime is None:
+            return 0.0
+        return max(self.endTime - self.startTime, 0.0)
+
+    def toDict(self) -> dict:
+        """Returns the report for JSON."""
+        return {
+            "ruleID": self.ruleID,
+            "outcome": self.outcome,
+            "duration": round(self.duration, 3),
+            "filesChecked": self.filesChecked,
+            "listCalls": self.listCalls,
+            "missing": sorted(self.missing),
+            "mismatched": dict(sorted(self.mismatched.items())),
+            "extra": sorted(self.extra),
+            "requeued": self.requeued,
+        }
+
+    def __str__(self) -> str:
+        return f"VerifyReport(ruleID={self.ruleID}," + \
+            f"outcome={self.outcome},filesChecked={self.filesChecked}," + \
+            f"missing={len(self.missing)},mismatched=" + \
+            f"{len(self.mismatched)},extra={len(self.extra)})"
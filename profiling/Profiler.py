@@ -0,0 +1,232 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the Profiler class."""
+
+import os
+import json
+import time
+import cProfile
+import datetime
+import functools
+import contextlib
+import tracemalloc
+from typing import Iterable, Iterator
+from logger.logger import logger
+
+
+class Span:
+    """The context manager adding its wall time to the span of a run."""
+    __slots__ = ("spans", "name", "startTime")
+
+    def __init__(self, spans: dict[str, list[float]], name: str):
+        self.spans = spans
+        self.name = name
+        self.startTime = 0.0
+
+    def __enter__(self) -> "Span":
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, *exceptionInfo) -> None:
+        span = self.spans.setdefault(self.name, [0.0, 0])
+        span[0] += time.perf_counter() - self.startTime
+        span[1] += 1
+
+
+NULL_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    The class of Profiler - the opt-in profiling of the rule runs.
+
+    While enabled, every run wrapped in profileRun sums the wall time of its
+    spans (e.g. "scan", "lookup", "read" and "upload"; the spans may nest,
+    "read" is a part of "upload"). Optionally the run is profiled by
+    cProfile and tracemalloc, and the profiles of the slowest runs are kept
+    in outputDirectory: RULE-TIME.prof for pstats or snakeviz and
+    RULE-TIME.tracemalloc for tracemalloc.Snapshot.load, listed in
+    profiles.json.
+
+    While disabled, span returns a shared no-op context manager and
+    spanIterator and wrap return their argument, so the instrumented code
+    pays one attribute check.
+    """
+    SUMMARY_FILE = "profiles.json"
+
+    def __init__(self, enabled: bool = False, isCProfileEnabled: bool = True,
+                 isTracemallocEnabled: bool = False, slowestRuns: int = 5,
+                 outputDirectory: str = "log/profiles"):
+        """
+        Initializes the profiler.
+        Args:
+            enabled (bool): whether the runs are profiled.
+            isCProfileEnabled (bool): whether the runs are profiled by
+            cProfile.
+            isTracemallocEnabled (bool): whether the allocations of the runs
+            are traced by tracemalloc.
+            slowestRuns (int): is the number of the slowest runs whose
+            profiles are kept.
+            outputDirectory (str): is the directory of the profiles.
+        """
+        self.enabled = enabled
+        self.isCProfileEnabled = isCProfileEnabled
+        self.isTracemallocEnabled = isTracemallocEnabled
+        self.slowestRuns = slowestRuns
+        self.outputDirectory = outputDirectory
+        self.__activeSpans: dict[str, list[float]] | None = None
+        self.__profiles: list[dict] = []
+
+    def toggle(self) -> None:
+        """Enables the disabled profiler and disables the enabled one."""
+        self.enabled = not self.enabled
+        logger.info(
+            f"Profiling is {'enabled' if self.enabled else 'disabled'}."
+        )
+
+    @property
+    def profiles(self) -> list[dict]:
+        """Returns the summaries of the kept profiles, the slowest first."""
+        return list(self.__profiles)
+
+    @property
+    def isActive(self) -> bool:
+        """Returns whether a run is profiled now."""
+        return self.__activeSpans is not None
+
+    def span(self, name: str):
+        """
+        Returns the context manager timing the span of the active run.
+        Args:
+            name (str): is the name of the span.
+        """
+        spans = self.__activeSpans
+        if spans is None:
+            return NULL_SPAN
+        return Span(spans, name)
+
+    def spanIterator(self, name: str, iterable: Iterable) -> Iterable:
+        """Returns the iterable whose every step is timed in the span."""
+        if self.__activeSpans is None:
+            return iterable
+        return self.__timeIterator(name, iter(iterable))
+
+    def wrap(self, name: str, function):
+        """Returns the function whose every call is timed in the span."""
+        if self.__activeSpans is None:
+            return function
+
+        @functools.wraps(function)
+        def timedFunction(*args, **kwargs):
+            with self.span(name):
+                return function(*args, **kwargs)
+        return timedFunction
+
+    @contextlib.contextmanager
+    def profileRun(self, ruleID: str) -> Iterator[dict[str, list[float]]]:
+        """
+        Profiles the run of the rule if the profiler is enabled.
+        Args:
+            ruleID (str): is the ID of the run rule.
+        Returns:
+            Iterator[dict[str, list[float]]]: the spans of the run, filled
+            when the run ends, which stay empty if the profiler is disabled.
+        """
+        spans: dict[str, list[float]] = {}
+        if not self.enabled or self.__activeSpans is not None:
+            yield spans
+            return
+
+        profile = cProfile.Profile() if self.isCProfileEnabled else None
+        isTracing = self.isTracemallocEnabled and \
+            not tracemalloc.is_tracing()
+        if isTracing:
+            tracemalloc.start()
+        self.__activeSpans = spans
+        startTime = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield spans
+        finally:
+            if profile is not None:
+                profile.disable()
+            duration = time.perf_counter() - startTime
+            self.__activeSpans = None
+            snapshot = tracemalloc.take_snapshot() if isTracing else None
+            if isTracing:
+                tracemalloc.stop()
+            logger.info(
+                f"Profile of the rule {ruleID}: {duration:.3f} s; " +
+                ", ".join(f"{name} {seconds:.3f} s ({count})"
+                          for name, (seconds, count) in spans.items())
+            )
+            try:
+                self.__keepProfile(ruleID, duration, spans, profile,
+                                   snapshot)
+            except OSError as exception:
+                logger.error(exception)
+
+    def __timeIterator(self, name: str, iterator: Iterator) -> Iterator:
+        while True:
+            with self.span(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def __keepProfile(self, ruleID: str, duration: float,
+                      spans: dict[str, list[float]],
+                      profile: cProfile.Profile | None,
+                      snapshot: tracemalloc.Snapshot | None) -> None:
+        """
+        Writes the profiles of the run if it is one of the slowest runs and
+        removes the profiles of the run it displaces.
+        """
+        if len(self.__profiles) >= self.slowestRuns and \
+           duration <= self.__profiles[-1]["duration"]:
+            return
+
+        os.makedirs(self.outputDirectory, exist_ok=True)
+        name = f"{ruleID}-" + \
+            datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        summary: dict = {
+            "ruleID": ruleID,
+            "time": datetime.datetime.now().isoformat(),
+            "duration": duration,
+            "spans": {spanName: {"seconds": seconds, "count": count}
+                      for spanName, (seconds, count) in spans.items()},
+        }
+        if profile is not None:
+            summary["cProfile"] = os.path.join(self.outputDirectory,
+                                               f"{name}.prof")
+            profile.dump_stats(summary["cProfile"])
+        if snapshot is not None:
+            summary["tracemalloc"] = os.path.join(self.outputDirectory,
+                                                  f"{name}.tracemalloc")
+            snapshot.dump(summary["tracemalloc"])
+
+        self.__profiles.append(summary)
+        self.__profiles.sort(key=lambda kept: kept["duration"],
+                             reverse=True)
+        for displaced in self.__profiles[self.slowestRuns:]:
+            for key in ("cProfile", "tracemalloc"):
+                if key in displaced:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(displaced[key])
+        del self.__profiles[self.slowestRuns:]
+
+        with open(os.path.join(self.outputDirectory, self.SUMMARY_FILE),
+                  'w') as summaryFile:
+            json.dump(self.__profiles, summaryFile, indent=2)
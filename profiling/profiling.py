@@ -0,0 +1,42 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the profiler of the application."""
+
+import json
+import signal
+from const.const import PROFILING_CONFIG_FILE_PATH
+from profiling.Profiler import Profiler
+
+with open(PROFILING_CONFIG_FILE_PATH, 'r') as profilingConfigFile:
+    profilingConfig = json.load(profilingConfigFile)
+
+profiler = Profiler(
+    profilingConfig["enabled"],
+    profilingConfig["cProfile"],
+    profilingConfig["tracemalloc"],
+    profilingConfig["slowestRuns"],
+    profilingConfig["outputDirectory"]
+)
+
+
+def installProfilingSignal() -> bool:
+    """
+    Toggles the profiler on SIGUSR1 (not available on Windows). Must be
+    called from the main thread.
+    Returns:
+        bool: True if the signal handler is installed.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.toggle())
+    return True
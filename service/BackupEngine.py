@@ -0,0 +1,960 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the BackupEngine class."""
+
+import os
+import stat
+import time
+import datetime
+import functools
+import concurrent.futures
+from typing import Callable, Iterable, Iterator
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.ManifestRepository import ManifestRepository, ManifestEntry
+from model.UploadPlan import UploadPlan, PlannedFile
+from model.FileFilter import FileFilter
+from service.GoogleDriveService import GoogleDriveService
+from service.RetryPolicy import RetryPolicy
+from service.HashService import HashService
+from service.FileBundler import FileBundler, Bundle
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.MirrorService import MirrorService
+from service.StorageQuotaService import StorageQuotaService
+from service.BundleService import BundleService
+from service.DeduplicationService import DeduplicationService
+from service.MoveService import MoveService
+from profiling.Profiler import Profiler
+from googleapiclient.http import MediaFileUpload
+from googleapiclient.errors import HttpError
+from logger.logger import logger
+from metrics.metrics import (
+    UPLOADED_BYTES,
+    UPLOADED_FILES,
+    SKIPPED_FILES,
+    COPIED_FILES,
+    COPIED_BYTES,
+    RULE_RUN_DURATION,
+    RULE_ERRORS,
+)
+from exception.exceptions import (
+    FileNotUploadedException,
+    FolderIDDoesNotExistException,
+    DriveServiceInNoneException,
+    StorageQuotaExceededException,
+    MirrorDeletionRefusedException,
+)
+from const.const import (
+    RESUMABLE_UPLOAD_THRESHOLD,
+    UPLOAD_CHUNK_SIZE,
+    MANIFEST_FOLDER_SIZE,
+)
+
+
+class BackupEngine:
+    """
+    The class of BackupEngine - decides when the rules are due and copies
+    them to Google Drive, recording the metrics of every run and API call.
+    The engine does not depend on Qt; FileCopyWorker runs it in a thread.
+
+    pathFrom may be a file or a directory. A directory is copied with its
+    subdirectories into a folder of the same name in the rule folder. With
+    a manifest only the new and changed files (by size and modification
+    time) are uploaded, and files and folders are addressed by their stored
+    IDs instead of being looked up by name. A file which was touched but
+    kept its size is compared with the md5Checksum of the uploaded file
+    (and first with its quick hash), and it is not uploaded again if its
+    content has not changed.
+
+    Every run is planned before the uploads (see planRule), and the planned
+    bytes are checked against the free storage of the account by
+    StorageQuotaService.
+
+    After a full scan of a mirror rule, the files and folders of the
+    manifest which are gone from pathFrom are moved to the trash by
+    MirrorService, so the Google Drive folder stays the size of pathFrom.
+
+    The small files of a rule with the mode "bundle" are uploaded packed in
+    bundles by BundleService after the other files.
+
+    A new file whose content has been uploaded by any rule of the account
+    is copied in Google Drive by DeduplicationService instead of being
+    uploaded.
+
+    After a full scan, the files moved or renamed in pathFrom are found by
+    MoveService, and their Google Drive files are moved before the uploads
+    instead of being uploaded again.
+
+    The API requests are executed by DriveRequestExecutor, which retries the
+    transient errors, and the files larger than RESUMABLE_UPLOAD_THRESHOLD
+    are uploaded in resumable chunks, so a failure resends only the current
+    chunk.
+
+    While the profiler profiles a run, the engine times the spans "scan"
+    (walking and stat), "lookup" (finding and creating the folders and the
+    files), "upload", "read" (reading the uploaded files, a part of
+    "upload") and "hash" (waiting for the hashes of the files).
+    """
+    BACKUP_ERRORS = (
+        FolderIDDoesNotExistException,
+        HttpError,
+        FileNotUploadedException,
+        StorageQuotaExceededException,
+        MirrorDeletionRefusedException,
+        *RetryPolicy.CONNECTION_ERRORS,
+    )
+
+    def __init__(self, driveService,
+                 manifestModel: ManifestRepository | None = None,
+                 retryPolicy: RetryPolicy | None = None,
+                 profiler: Profiler | None = None,
+                 hashService: HashService | None = None):
+        """
+        Initializes the backup engine.
+        Args:
+            driveService (Service): is the auth drive service.
+            manifestModel (ManifestRepository, None): is the manifest of
+            the uploaded files or None to upload every file on every run.
+            retryPolicy (RetryPolicy, None): is the policy of retrying the
+            failed API requests or None for the default policy.
+            profiler (Profiler, None): times the spans of the profiled runs
+            or None to not profile.
+            hashService (HashService, None): hashes the local files or None
+            for a hash service without a cache.
+        Raises:
+            DriveServiceInNoneException: raises if the drive service is None.
+        """
+        if driveService is None:
+            raise DriveServiceInNoneException()
+        self.driveService = driveService
+        self.manifestModel = manifestModel
+        self.retryPolicy = retryPolicy or RetryPolicy()
+        self.profiler = profiler or Profiler()
+        self.hashService = hashService or HashService()
+        self.requestExecutor = DriveRequestExecutor(
+            driveService, self.retryPolicy, self.profiler
+        )
+        self.mirrorService = MirrorService(self.requestExecutor,
+                                           manifestModel)
+        self.storageQuotaService = StorageQuotaService(self.requestExecutor)
+        self.bundleService = BundleService(self.requestExecutor,
+                                           self.storageQuotaService)
+        self.deduplicationService = DeduplicationService(
+            self.requestExecutor, self.hashService, manifestModel
+        )
+        self.moveService = MoveService(self.requestExecutor,
+                                       self.hashService)
+        self.__remoteChildren: dict[str, dict[str, dict]] = {}
+        self.__logger = logger
+
+    @staticmethod
+    def isRuleDue(rule: Rule, now: datetime.datetime) -> bool:
+        """
+        Checks the time, the weekday and the day of month of the rule.
+        Args:
+            rule (Rule): is the checked rule.
+            now (datetime.datetime): is the current time.
+        Returns:
+            bool: True if the rule should run now.
+        """
+        if rule.weekday and rule.weekday.strip():
+            if rule.weekday.lower() != now.strftime("%A").lower():
+                return False
+
+        if rule.dayOfMonth:
+            if rule.dayOfMonth != now.day:
+                return False
+
+        return now.strftime("%H:%M") == rule.time
+
+    def runRule(self, rule: Rule,
+                changedPaths: Iterable[str] | None = None,
+                onProgress: Callable[[RuleRun, UploadPlan], None]
+                | None = None,
+                reservedBytes: int = 0) -> RuleRun:
+        """
+        Copies pathFrom of the rule to its Google Drive folder. The run is
+        planned first, and the files which do not fit the free storage of
+        the account are deferred before any byte is sent. The errors of
+        BACKUP_ERRORS do not raise: they fail the run and are returned in
+        RuleRun.error.
+        Args:
+            rule (Rule): is the run rule.
+            changedPaths (Iterable[str], None): are the paths of the changed
+            files relative to the parent of pathFrom, which are the only
+            checked files, or None to scan all files.
+            onProgress (Callable[[RuleRun, UploadPlan], None], None): is
+            called with the run and its plan when the plan is checked and
+            after every uploaded file.
+            reservedBytes (int): are the bytes of the free storage kept for
+            the queued runs of the rules of a higher priority.
+        Returns:
+            RuleRun: the finished run.
+        """
+        labels = {"rule": rule.ruleID, "account": rule.account}
+        run = RuleRun(rule.ruleID, time.time())
+        self.requestExecutor.run = run
+        self.__remoteChildren = {}
+        self.deduplicationService.reset()
+        self.__bindLogger(rule)
+        try:
+            if not self.__isFolderIDExists(rule.folderID):
+                raise FolderIDDoesNotExistException(rule.folderID)
+            manifest = self.manifestModel.getEntries(rule.ruleID) \
+                if self.manifestModel is not None else {}
+            plan = self.__plan(rule, changedPaths, manifest)
+            run.filesScanned = plan.filesScanned
+            run.filesChanged = len(plan.files)
+            SKIPPED_FILES.inc(plan.filesScanned - len(plan.files), **labels)
+            self.storageQuotaService.checkPlan(rule, plan, reservedBytes)
+            self.__backup(rule, run, labels, plan, manifest, onProgress)
+            if rule.isMirror and plan.missingEntries:
+                self.mirrorService.mirror(rule, labels, plan, manifest)
+        except self.BACKUP_ERRORS as exception:
+            self.__failRun(run, exception, labels)
+        except Exception as exception:
+            self.__failRun(run, exception, labels)
+            raise
+        finally:
+            run.endTime = time.time()
+            RULE_RUN_DURATION.observe(run.duration, **labels)
+            self.__logger.bind(
+                bytes=run.bytesUploaded, duration=round(run.duration, 3)
+            ).info(
+                f"Rule run {run.outcome}: {run.filesUploaded} of " +
+                f"{run.filesChanged} changed files uploaded, " +
+                f"{run.filesScanned} scanned."
+            )
+            self.requestExecutor.run = None
+            self.__remoteChildren = {}
+            self.__bindLogger(None)
+        return run
+
+    @staticmethod
+    def __failRun(run: RuleRun, exception: Exception,
+                  labels: dict[str, str]) -> None:
+        """Records the error of the failed run."""
+        run.errorClass = type(exception).__name__
+        run.error = exception
+        RULE_ERRORS.inc(error=run.errorClass, **labels)
+
+    def planRule(self, rule: Rule,
+                 changedPaths: Iterable[str] | None = None,
+                 isRemoteChecked: bool = False) -> UploadPlan:
+        """
+        Plans the run of the rule without uploading anything (a dry run).
+        Args:
+            rule (Rule): is the planned rule.
+            changedPaths (Iterable[str], None): are the paths of the changed
+            files relative to the parent of pathFrom or None to scan all
+            files.
+            isRemoteChecked (bool): whether the new files are looked up in
+            their Google Drive folders and the plan is checked against the
+            storage quota; the folders are listed only, never created.
+        Raises:
+            HttpError: raises if the Google Drive folders cannot be listed.
+        Returns:
+            UploadPlan: the new and changed files of the rule.
+        """
+        manifest = self.manifestModel.getEntries(rule.ruleID) \
+            if self.manifestModel is not None else {}
+        self.__bindLogger(rule)
+        try:
+            plan = self.__plan(rule, changedPaths, manifest)
+            if isRemoteChecked:
+                with self.profiler.span("lookup"):
+                    self.__findRemoteFiles(rule, plan, manifest)
+                self.storageQuotaService.checkPlan(rule, plan)
+        finally:
+            self.__remoteChildren = {}
+            self.__bindLogger(None)
+        return plan
+
+    def __bindLogger(self, rule: Rule | None) -> None:
+        """
+        Binds the logger of the engine and of its services to the rule or
+        unbinds it if the rule is None.
+        """
+        self.__logger = logger if rule is None else \
+            logger.bind(ruleID=rule.ruleID, account=rule.account)
+        self.requestExecutor.logger = self.__logger
+
+    @staticmethod
+    def scan(pathFrom: str, fileFilter: FileFilter | None = None,
+             excludedPaths: set[str] | None = None
+             ) -> Iterator[tuple[str, str, os.stat_result]]:
+        """
+        Yields the files of pathFrom: the file itself or all files of the
+        directory and its subdirectories (symbolic links to directories are
+        not followed). The directories excluded by the filter are pruned
+        without being listed.
+        Args:
+            pathFrom (str): is the path to the file or the directory.
+            fileFilter (FileFilter, None): filters the files of the
+            directory or None to yield all of them.
+            excludedPaths (set[str], None): collects the relative paths of
+            the excluded files and directories or None.
+        Returns:
+            Iterator[tuple[str, str, os.stat_result]]: the path relative to
+            the parent of pathFrom with "/" separators, the path and the
+            stat of every file.
+        """
+        if os.path.isfile(pathFrom):
+            yield os.path.basename(pathFrom), pathFrom, os.stat(pathFrom)
+            return
+        if not os.path.isdir(pathFrom):
+            return
+
+        if fileFilter is not None and fileFilter.isEmpty:
+            fileFilter = None
+        now = time.time()
+        rootName = os.path.basename(os.path.normpath(pathFrom))
+        rootLength = len(rootName) + 1
+        directories = [(pathFrom, rootName, fileFilter)]
+        while directories:
+            directory, relativeDirectory, directoryFilter = directories.pop()
+            try:
+                entries = sorted(os.scandir(directory),
+                                 key=lambda entry: entry.name)
+            except OSError as exception:
+                logger.error(exception)
+                continue
+            if directoryFilter is not None and \
+               directoryFilter.ignoreFileNames:
+                directoryFilter = directoryFilter.withIgnoreFiles(
+                    directory, relativeDirectory[rootLength:]
+                )
+            subdirectories: list[tuple[str, str, FileFilter | None]] = []
+            yield from BackupEngine.__scanEntries(
+                entries, relativeDirectory, directoryFilter, rootLength, now,
+                subdirectories, excludedPaths
+            )
+            directories.extend(reversed(subdirectories))
+
+    @staticmethod
+    def __scanEntries(entries: list[os.DirEntry], relativeDirectory: str,
+                      directoryFilter: FileFilter | None, rootLength: int,
+                      now: float,
+                      subdirectories: list[tuple[str, str, FileFilter | None]],
+                      excludedPaths: set[str] | None
+                      ) -> Iterator[tuple[str, str, os.stat_result]]:
+        """
+        Yields the files of the entries of a directory like scan and adds
+        the subdirectories which are not excluded to subdirectories.
+        """
+        for entry in entries:
+            relativePath = f"{relativeDirectory}/{entry.name}"
+            isExcluded = False
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    isExcluded = directoryFilter is not None and \
+                        directoryFilter.isDirectoryExcluded(
+                            relativePath[rootLength:]
+                        )
+                    if not isExcluded:
+                        subdirectories.append(
+                            (entry.path, relativePath, directoryFilter)
+                        )
+                elif entry.is_file():
+                    fileStat = entry.stat()
+                    isExcluded = directoryFilter is not None and \
+                        directoryFilter.isFileExcluded(
+                            relativePath[rootLength:], fileStat, now
+                        )
+                    if not isExcluded:
+                        yield relativePath, entry.path, fileStat
+            except OSError as exception:
+                logger.error(exception)
+            if isExcluded and excludedPaths is not None:
+                excludedPaths.add(relativePath)
+
+    @staticmethod
+    def scanPaths(pathFrom: str, relativePaths: Iterable[str],
+                  fileFilter: FileFilter | None = None
+                  ) -> Iterator[tuple[str, str, os.stat_result]]:
+        """
+        Yields the files of the paths relative to the parent of pathFrom
+        like scan; the paths which are not files (anymore) or are excluded
+        by the filter (the ignore files are not read) are skipped.
+        """
+        if fileFilter is not None and fileFilter.isEmpty:
+            fileFilter = None
+        now = time.time()
+        parentPath = os.path.dirname(os.path.normpath(pathFrom))
+        for relativePath in sorted(set(relativePaths)):
+            path = os.path.join(parentPath, *relativePath.split("/"))
+            try:
+                fileStat = os.stat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(fileStat.st_mode):
+                continue
+            if fileFilter is not None and "/" in relativePath and \
+               fileFilter.isExcluded(relativePath.partition("/")[2],
+                                     fileStat, now):
+                continue
+            yield relativePath, path, fileStat
+
+    def __plan(self, rule: Rule, changedPaths: Iterable[str] | None,
+               manifest: dict[str, ManifestEntry]) -> UploadPlan:
+        """
+        Scans the files of the rule and compares the content of the files
+        which were touched but kept their size with the manifest in the
+        thread pool of the hash service while the scan goes on.
+        """
+        excludedPaths: set[str] = set()
+        files = self.scan(rule.pathFrom, rule.fileFilter, excludedPaths) \
+            if changedPaths is None \
+            else self.scanPaths(rule.pathFrom, changedPaths, rule.fileFilter)
+        plan = UploadPlan(rule.ruleID)
+        scannedEntries = set()
+        scannedDirectories = set()
+        comparedFiles: list[tuple[PlannedFile, concurrent.futures.Future]] \
+            = []
+        try:
+            for relativePath, filePath, fileStat in \
+                    self.profiler.spanIterator("scan", files):
+                plan.filesScanned += 1
+                scannedDirectories.add(relativePath.rpartition("/")[0])
+                file = PlannedFile(relativePath, filePath, fileStat,
+                                   manifest.get(relativePath))
+                if file.entry is not None:
+                    scannedEntries.add(relativePath)
+                if file.entry is not None and \
+                   file.entry.size == fileStat.st_size:
+                    if file.entry.mtimeNs == fileStat.st_mtime_ns:
+                        continue
+                    if file.entry.md5 is not None:
+                        comparedFiles.append((
+                            file,
+                            self.hashService.submitIsUnchanged(
+                                filePath, fileStat, file.entry.md5,
+                                file.entry.quickHash
+                            )
+                        ))
+                plan.files.append(file)
+            for file, isUnchanged in comparedFiles:
+                if file.entry is not None and \
+                   self.__getResult(isUnchanged, file.filePath):
+                    plan.unchangedEntries[file.relativePath] = \
+                        file.entry._replace(
+                            mtimeNs=file.fileStat.st_mtime_ns,
+                            inode=file.fileStat.st_ino
+                        )
+        finally:
+            for _, isUnchanged in comparedFiles:
+                isUnchanged.cancel()
+        if plan.unchangedEntries:
+            plan.files = [
+                file for file in plan.files
+                if file.relativePath not in plan.unchangedEntries
+            ]
+        if changedPaths is None and os.path.isdir(rule.pathFrom):
+            self.__findMissingEntries(rule, plan, manifest, scannedEntries,
+                                      scannedDirectories, excludedPaths)
+            if plan.missingEntries and plan.files:
+                self.moveService.findMovedFiles(plan, manifest)
+        return plan
+
+    @staticmethod
+    def __findMissingEntries(rule: Rule, plan: UploadPlan,
+                             manifest: dict[str, ManifestEntry],
+                             scannedEntries: set[str],
+                             scannedDirectories: set[str],
+                             excludedPaths: set[str]) -> None:
+        """
+        Adds the entries of the manifest which are gone from the full scan
+        of the directory of the rule to missingEntries; the excluded paths
+        are kept.
+        """
+        liveDirectories = {os.path.basename(os.path.normpath(rule.pathFrom))}
+        for directory in (
+            *scannedDirectories,
+            *(relativePath.rpartition("/")[0]
+              for relativePath in excludedPaths)
+        ):
+            while directory and directory not in liveDirectories:
+                liveDirectories.add(directory)
+                directory = directory.rpartition("/")[0]
+        for relativePath, entry in manifest.items():
+            if entry.isFolder:
+                isLive = relativePath in liveDirectories
+            elif FileBundler.isBundlePath(relativePath):
+                isLive = relativePath.rpartition("/")[0] in liveDirectories
+            else:
+                isLive = relativePath in scannedEntries
+            if not isLive and relativePath not in excludedPaths and \
+               not MirrorService.isInFolders(relativePath, excludedPaths):
+                plan.missingEntries[relativePath] = entry
+
+    def __findRemoteFiles(self, rule: Rule, plan: UploadPlan,
+                          manifest: dict[str, ManifestEntry]) -> None:
+        """
+        Looks the new files of the plan up in their existing Google Drive
+        folders, listed once each, and adds the found files to
+        remoteFileIDs.
+        """
+        isSingleFile = os.path.isfile(rule.pathFrom)
+        folderIDs: dict[str, str | None] = {"": rule.folderID}
+
+        def findFolderID(relativeDirectory: str) -> str | None:
+            if relativeDirectory in folderIDs:
+                return folderIDs[relativeDirectory]
+            entry = manifest.get(relativeDirectory)
+            folderID = None
+            if entry is not None and entry.isFolder:
+                folderID = entry.fileID
+            else:
+                parentDirectory, folderName = \
+                    relativeDirectory.rpartition("/")[::2]
+                parentID = findFolderID(parentDirectory)
+                folder = self.__listRemoteChildren(parentID).get(
+                    folderName
+                ) if parentID is not None else None
+                if folder is not None and folder["mimeType"] == \
+                   GoogleDriveService.FOLDER_MIME_TYPE:
+                    folderID = folder["id"]
+            folderIDs[relativeDirectory] = folderID
+            return folderID
+
+        for file in plan.files:
+            if file.entry is not None:
+                continue
+            relativeDirectory, fileName = \
+                file.relativePath.rpartition("/")[::2]
+            folderID = findFolderID(relativeDirectory)
+            if folderID is None:
+                continue
+            fileID = self.__findRemoteFile(folderID, fileName, isSingleFile)
+            if fileID is not None:
+                plan.remoteFileIDs[file.relativePath] = fileID
+
+    def __backup(self, rule: Rule, run: RuleRun, labels: dict[str, str],
+                 plan: UploadPlan, manifest: dict[str, ManifestEntry],
+                 onProgress: Callable[[RuleRun, UploadPlan], None] | None
+                 ) -> None:
+        """
+        Moves the moved files of the rule in Google Drive, then uploads the
+        planned files in the order of the scan and then the bundles of the
+        small files. When Google Drive refuses a
+        file because the storage quota is exceeded, the remaining files are
+        deferred.
+        Raises:
+            HttpError: raises if a folder cannot be looked up or created.
+            StorageQuotaExceededException: raises if any file has been
+            deferred.
+            FileNotUploadedException: raises if any other file has not been
+            uploaded to Google Drive.
+        """
+        uploadedEntries: dict[str, ManifestEntry] = dict(
+            plan.unchangedEntries
+        )
+        movedPaths: list[str] = []
+        failures: list[Exception] = []
+        if onProgress is not None:
+            onProgress(run, plan)
+        try:
+            for movedPath, file in plan.movedFiles:
+                exception = self.__moveFile(
+                    rule, run, labels, manifest, uploadedEntries, movedPath,
+                    file
+                )
+                if exception is None:
+                    movedPaths.append(movedPath)
+                else:
+                    failures.append(exception)
+            self.__uploadFiles(rule, run, labels, plan, manifest,
+                               uploadedEntries, onProgress, failures)
+        finally:
+            self.__saveManifest(rule, uploadedEntries, movedPaths, any(
+                isinstance(exception, HttpError) and
+                exception.resp.status == 404 for exception in failures
+            ))
+
+        lastException = failures[-1] if failures else None
+        if plan.deferredFiles:
+            raise StorageQuotaExceededException(
+                len(plan.deferredFiles), plan.deferredBytes
+            ) from lastException
+        if lastException is not None:
+            raise FileNotUploadedException() from lastException
+
+    def __uploadFiles(self, rule: Rule, run: RuleRun, labels: dict[str, str],
+                      plan: UploadPlan, manifest: dict[str, ManifestEntry],
+                      uploadedEntries: dict[str, ManifestEntry],
+                      onProgress: Callable[[RuleRun, UploadPlan], None]
+                      | None, failures: list[Exception]) -> None:
+        """
+        Uploads the planned files in the order of the scan and then the
+        bundles of the small files, adding the errors of the failed uploads
+        to failures. When Google Drive refuses a file because the storage
+        quota is exceeded, the remaining files are deferred.
+        Raises:
+            HttpError: raises if a folder cannot be looked up or created.
+        """
+        isSingleFile = os.path.isfile(rule.pathFrom)
+        uploads = self.bundleService.planUploads(rule, plan, manifest)
+        getFolderID = functools.partial(
+            self.__getRemoteFolderID, rule.folderID, manifest=manifest,
+            uploadedEntries=uploadedEntries
+        )
+        for index, upload in enumerate(uploads):
+            if isinstance(upload, Bundle):
+                exception = self.bundleService.backupBundle(
+                    rule, run, labels, uploadedEntries, upload, getFolderID
+                )
+            else:
+                exception = self.__backupFile(
+                    rule, run, labels, manifest, uploadedEntries,
+                    isSingleFile, upload
+                )
+            if onProgress is not None:
+                onProgress(run, plan)
+            if exception is None:
+                continue
+            failures.append(exception)
+            if StorageQuotaService.isQuotaExceeded(exception):
+                self.storageQuotaService.forgetFreeBytes(rule.account)
+                self.__deferUploads(plan, uploads[index:])
+                return
+
+    def __saveManifest(self, rule: Rule,
+                       uploadedEntries: dict[str, ManifestEntry],
+                       movedPaths: list[str], isFolderMissing: bool) -> None:
+        """
+        Saves the entries uploaded by the run and the content index of the
+        account; the folder entries are dropped if a folder is missing, so
+        the next run looks the folders up again.
+        """
+        if self.manifestModel is None:
+            return
+        self.manifestModel.putEntries(rule.ruleID, uploadedEntries)
+        self.manifestModel.deleteEntries(rule.ruleID, movedPaths)
+        self.deduplicationService.saveContents(rule.account)
+        if isFolderMissing:
+            self.manifestModel.deleteFolderEntries(rule.ruleID)
+
+    @staticmethod
+    def __deferUploads(plan: UploadPlan,
+                       uploads: list[PlannedFile | Bundle]) -> None:
+        """
+        Moves the files of the uploads (the members of the bundles) from
+        the planned files to the head of the deferred files.
+        """
+        deferredFiles = [
+            file for upload in uploads
+            for file in (upload.files if isinstance(upload, Bundle)
+                         else (upload,))
+        ]
+        deferredPaths = {file.relativePath for file in deferredFiles}
+        plan.deferredFiles[:0] = deferredFiles
+        plan.files = [file for file in plan.files
+                      if file.relativePath not in deferredPaths]
+
+    def __backupFile(self, rule: Rule, run: RuleRun, labels: dict[str, str],
+                     manifest: dict[str, ManifestEntry],
+                     uploadedEntries: dict[str, ManifestEntry],
+                     isSingleFile: bool, file: PlannedFile
+                     ) -> Exception | None:
+        """
+        Uploads the planned file, or copies the uploaded file of the same
+        content in Google Drive.
+        Raises:
+            HttpError: raises if a folder cannot be looked up or created.
+        Returns:
+            Exception | None: the error which failed the upload or None.
+        """
+        quickHash = None
+        if self.manifestModel is not None and \
+           HashService.isQuickHashUseful(file.size):
+            quickHash = self.hashService.submitQuickHash(file.filePath,
+                                                         file.fileStat)
+        uploadStartTime = time.perf_counter()
+        try:
+            uploadedFile, isCopied = self.__transferFile(
+                rule, manifest, uploadedEntries, isSingleFile, file
+            )
+        except GoogleDriveService.API_ERRORS as exception:
+            self.__logger.bind(file=file.relativePath).error(str(exception))
+            if quickHash is not None:
+                quickHash.cancel()
+            return exception
+
+        run.filesUploaded += 1
+        self.storageQuotaService.useFreeBytes(rule.account, file.quotaBytes)
+        self.__logger.bind(
+            file=file.relativePath,
+            bytes=file.size,
+            duration=round(time.perf_counter() - uploadStartTime, 3)
+        ).debug("Copied." if isCopied else "Uploaded.")
+        if isCopied:
+            COPIED_FILES.inc(**labels)
+            COPIED_BYTES.inc(file.size, **labels)
+        else:
+            run.bytesUploaded += file.size
+            UPLOADED_FILES.inc(**labels)
+            UPLOADED_BYTES.inc(file.size, **labels)
+        self.deduplicationService.indexContent(file.entry, file.fileStat,
+                                               uploadedFile)
+        uploadedEntries[file.relativePath] = ManifestEntry(
+            file.size,
+            file.fileStat.st_mtime_ns,
+            uploadedFile["id"],
+            uploadedFile.get("md5Checksum"),
+            self.__getResult(quickHash, file.filePath)
+            if quickHash is not None else None,
+            file.fileStat.st_ino
+        )
+        return None
+
+    def __transferFile(self, rule: Rule,
+                       manifest: dict[str, ManifestEntry],
+                       uploadedEntries: dict[str, ManifestEntry],
+                       isSingleFile: bool,
+                       file: PlannedFile) -> tuple[dict, bool]:
+        """
+        Copies the uploaded file of the same content or uploads the planned
+        file.
+        Returns:
+            tuple[dict, bool]: the uploaded file and whether it was copied.
+        """
+        relativeDirectory, fileName = \
+            file.relativePath.rpartition("/")[::2]
+        with self.profiler.span("lookup"):
+            parentID = self.__getRemoteFolderID(
+                rule.folderID, relativeDirectory, manifest, uploadedEntries
+            )
+        fileID = file.entry.fileID if file.entry is not None else None
+        if fileID is None:
+            with self.profiler.span("lookup"):
+                fileID = self.__findRemoteFile(parentID, fileName,
+                                               isSingleFile)
+        if fileID is None:
+            copiedFile = self.deduplicationService.copyContent(
+                rule.account, file.filePath, file.fileStat, parentID, fileName
+            )
+            if copiedFile is not None:
+                return copiedFile, True
+        return self.__uploadFile(
+            file.filePath, file.size, parentID, fileName, fileID
+        ), False
+
+    def __moveFile(self, rule: Rule, run: RuleRun, labels: dict[str, str],
+                   manifest: dict[str, ManifestEntry],
+                   uploadedEntries: dict[str, ManifestEntry],
+                   movedPath: str, file: PlannedFile
+                   ) -> Exception | None:
+        """
+        Moves the Google Drive file of the gone path to the path of the
+        moved file; if the Google Drive file is not found, the moved file is
+        uploaded instead.
+        Raises:
+            HttpError: raises if a folder cannot be looked up or created.
+        Returns:
+            Exception | None: the error which failed the move or None.
+        """
+        with self.profiler.span("lookup"):
+            folderID = self.__getRemoteFolderID(
+                rule.folderID, file.relativePath.rpartition("/")[0], manifest,
+                uploadedEntries
+            )
+        try:
+            if self.moveService.moveFile(labels, manifest, uploadedEntries,
+                                         movedPath, file, folderID):
+                return None
+        except GoogleDriveService.API_ERRORS as exception:
+            self.__logger.bind(file=file.relativePath).error(str(exception))
+            return exception
+        self.__logger.bind(file=file.relativePath).warning(
+            f"The file of {movedPath} is not found in Google Drive, the " +
+            "file is uploaded instead."
+        )
+        # The moved files are only found in the scan of a directory.
+        return self.__backupFile(rule, run, labels, manifest, uploadedEntries,
+                                 False, file._replace(entry=None))
+
+    def __getResult(self, future: concurrent.futures.Future, filePath: str):
+        """
+        Waits for the hash of the file; returns None if the file cannot be
+        read.
+        """
+        with self.profiler.span("hash"):
+            try:
+                return future.result()
+            except OSError as exception:
+                self.__logger.warning(f"{filePath}: {exception}")
+                return None
+
+    def __getRemoteFolderID(self, rootFolderID: str, relativeDirectory: str,
+                            manifest: dict[str, ManifestEntry],
+                            uploadedEntries: dict[str, ManifestEntry]) -> str:
+        """
+        Returns the ID of the Google Drive folder of the relative directory,
+        creating the missing folders.
+        Args:
+            rootFolderID (str): is the ID of the rule folder.
+            relativeDirectory (str): is the directory relative to the parent
+            of pathFrom ("" for the rule folder itself).
+            manifest (dict[str, ManifestEntry]): is the manifest of the rule.
+            uploadedEntries (dict[str, ManifestEntry]): are the entries
+            added in this run; the created folders are added to them.
+        """
+        if not relativeDirectory:
+            return rootFolderID
+        entry = uploadedEntries.get(relativeDirectory) or \
+            manifest.get(relativeDirectory)
+        if entry is not None and entry.isFolder:
+            return entry.fileID
+
+        parentDirectory, folderName = relativeDirectory.rpartition("/")[::2]
+        parentID = self.__getRemoteFolderID(
+            rootFolderID, parentDirectory, manifest, uploadedEntries
+        )
+        children = self.__listRemoteChildren(parentID)
+        folder = children.get(folderName)
+        isOwned = False
+        if folder is None or \
+                folder["mimeType"] != GoogleDriveService.FOLDER_MIME_TYPE:
+            isOwned = True
+            createdID = self.requestExecutor.reserveFileID()
+            folder = self.requestExecutor.create(
+                "files.create",
+                self.driveService.files().create(
+                    body={
+                        "id": createdID,
+                        "name": folderName,
+                        "mimeType": GoogleDriveService.FOLDER_MIME_TYPE,
+                        "parents": [parentID],
+                    },
+                    fields="id"
+                ),
+                createdID,
+                "id"
+            )
+            folder["mimeType"] = GoogleDriveService.FOLDER_MIME_TYPE
+            children[folderName] = folder
+
+        uploadedEntries[relativeDirectory] = ManifestEntry(
+            MANIFEST_FOLDER_SIZE, 0, folder["id"], isOwned=isOwned
+        )
+        return folder["id"]
+
+    def __listRemoteChildren(self, folderID: str) -> dict[str, dict]:
+        """
+        Returns the files and folders of the Google Drive folder by name,
+        listed once per run.
+        """
+        children = self.__remoteChildren.get(folderID)
+        if children is not None:
+            return children
+
+        children = {}
+        pageToken = None
+        while True:
+            response = self.requestExecutor.execute(
+                "files.list",
+                self.driveService.files().list(
+                    q=f"'{folderID}' in parents and trashed = false",
+                    spaces="drive",
+                    fields="nextPageToken, files(id, name, mimeType)",
+                    pageSize=1000,
+                    pageToken=pageToken
+                )
+            )
+            for file in response.get("files", []):
+                children.setdefault(file["name"], file)
+            pageToken = response.get("nextPageToken")
+            if not pageToken:
+                break
+        self.__remoteChildren[folderID] = children
+        return children
+
+    def __findRemoteFile(self, folderID: str, fileName: str,
+                         isSingleFile: bool) -> str | None:
+        """
+        Returns the ID of the file with the name in the folder or None. A
+        single file is looked up by name; the files of a directory are
+        looked up in the listing of the folder.
+        """
+        if not isSingleFile:
+            file = self.__listRemoteChildren(folderID).get(fileName)
+            if file is None or \
+               file["mimeType"] == GoogleDriveService.FOLDER_MIME_TYPE:
+                return None
+            return file["id"]
+
+        escapedFileName = fileName.replace("\\", "\\\\").replace("'", "\\'")
+        query = f"'{folderID}' in parents and name = '{escapedFileName}' " + \
+            "and trashed = false"
+        response = self.requestExecutor.execute(
+            "files.list",
+            self.driveService.files().list(q=query, spaces="drive",
+                                           fields="files(id)")
+        )
+        files = response.get("files", [])
+        return files[0]["id"] if files else None
+
+    def __uploadFile(self, filePath: str, fileSize: int, folderID: str,
+                     fileName: str, fileID: str | None) -> dict:
+        """
+        Uploads a single file to the given Google Drive folder by its ID,
+        updating the existing file if there is one.
+        Args:
+            filePath: is a file path.
+            fileSize: is the size of the file in bytes.
+            folderID: is the destination folder ID.
+            fileName: is the name of the file in Google Drive.
+            fileID: is the ID of the uploaded file from the manifest or the
+            folder, or None.
+        Returns:
+            dict: the id and the md5Checksum of the file in Google Drive.
+        """
+        isResumable = fileSize > RESUMABLE_UPLOAD_THRESHOLD
+        media = MediaFileUpload(
+            filePath,
+            mimetype="application/octet-stream",
+            chunksize=UPLOAD_CHUNK_SIZE,
+            resumable=isResumable
+        )
+        if self.profiler.isActive:
+            media.getbytes = self.profiler.wrap(  # type: ignore
+                "read", media.getbytes
+            )
+        # MediaFileUpload keeps the file open until it is collected, which
+        # a reference cycle (e.g. of the wrapped getbytes) can delay.
+        try:
+            return self.requestExecutor.sendFile(media, fileID, folderID,
+                                                 fileName, isResumable)
+        finally:
+            media.stream().close()
+
+    def __isFolderIDExists(self, folderID: str) -> bool:
+        """
+        Checks whether a folder with a given ID exists.
+        Args:
+            folderID: is the Google Drive folder ID.
+        Raises:
+            HttpError: raises if the folder cannot be checked, e.g. the
+            retries of a server error are exhausted.
+        """
+        try:
+            self.requestExecutor.execute(
+                "files.get",
+                self.driveService.files().get(fileId=folderID,
+                                              fields="id, name, mimeType")
+            )
+            return True
+        except HttpError as exception:
+            if exception.resp.status == 404:
+                return False
+            raise
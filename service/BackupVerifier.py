@@ -0,0 +1,281 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing the BackupVerifier class."""
+
+import os
+import time
+import sqlite3
+import concurrent.futures
+from model.Rule import Rule
+from model.VerifyReport import VerifyReport
+from model.ManifestRepository import ManifestRepository, ManifestEntry
+from service.BackupEngine import BackupEngine
+from service.GoogleDriveService import GoogleDriveService
+from service.RetryPolicy import RetryPolicy
+from service.ParallelDriveClient import ParallelDriveClient
+from service.HashService import HashService
+from service.FileBundler import FileBundler
+from logger.logger import logger
+from const.const import VERIFY_WORKERS
+
+
+class BackupVerifier:
+    """
+    The class of BackupVerifier - proves that the backup of a rule in
+    Google Drive matches the manifest, or the local files, without
+    downloading anything.
+
+    The root of the rule in its Google Drive folder (the folder or the file
+    named as pathFrom) is listed page by page with the size and the
+    md5Checksum of every file, maxWorkers folders at a time, so the cost is
+    the list calls (one per 1000 files of a folder) and the files of the
+    other rules sharing the folder are not listed. Every
+    file of the manifest is compared with the file of its path; with
+    isRehashed the local files are hashed (the hash cache keeps the hashes
+    of the unchanged files) and compared instead. The members of a bundle
+    are checked by their bundle.
+
+    The missing and the mismatched files can be requeued: their entries are
+    deleted from the manifest, so the next run of the rule uploads them
+    again.
+    """
+    # The errors failing the verification of a rule.
+    VERIFY_ERRORS = (
+        *GoogleDriveService.API_ERRORS,
+        sqlite3.Error,
+    )
+    LISTED_FIELDS = "nextPageToken, files(id, name, mimeType, size, " + \
+        "md5Checksum)"
+
+    def __init__(self, driveService,
+                 manifestModel: ManifestRepository | None = None,
+                 hashService: HashService | None = None,
+                 retryPolicy: RetryPolicy | None = None,
+                 maxWorkers: int = VERIFY_WORKERS):
+        """
+        Initializes the verifier.
+        Args:
+            driveService (Service): is the auth drive service.
+            manifestModel (ManifestRepository, None): is the manifest of
+            the uploaded files or None to verify the local files.
+            hashService (HashService, None): hashes the local files or None
+            for a hash service without a cache.
+            retryPolicy (RetryPolicy, None): is the policy of retrying the
+            failed API requests or None for the default policy.
+            maxWorkers (int): is the number of the parallel listings.
+        """
+        self.driveService = driveService
+        self.manifestModel = manifestModel
+        self.hashService = hashService or HashService()
+        self.maxWorkers = maxWorkers
+        self.driveClient = ParallelDriveClient(driveService, retryPolicy)
+
+    def verifyRule(self, rule: Rule, isRehashed: bool = False,
+                   isRequeued: bool = False) -> VerifyReport:
+        """
+        Compares the backup of the rule with the Google Drive folder.
+        Args:
+            rule (Rule): is the verified rule.
+            isRehashed (bool): whether the local files are hashed and
+            compared instead of the manifest; without a manifest they
+            always are.
+            isRequeued (bool): whether the entries of the missing and the
+            mismatched files are deleted from the manifest, so the next run
+            uploads them.
+        Raises:
+            HttpError: raises if a Google Drive folder cannot be listed.
+        Returns:
+            VerifyReport: the finished verification.
+        """
+        report = VerifyReport(rule.ruleID, time.time())
+        self.driveClient.listCalls = 0
+        try:
+            manifest = self.manifestModel.getEntries(rule.ruleID) \
+                if self.manifestModel is not None else {}
+            rootName = os.path.basename(os.path.normpath(rule.pathFrom))
+            remoteFiles = self.listRemoteFiles(rule.folderID, rootName)
+            expected = self.__getManifestFiles(manifest)
+            if isRehashed or self.manifestModel is None:
+                expected.update(self.__hashLocalFiles(rule))
+            self.__compareFiles(expected, manifest, remoteFiles, report)
+            report.extra = [
+                relativePath for relativePath in remoteFiles
+                if relativePath not in expected and
+                relativePath not in manifest
+            ]
+            if isRequeued:
+                self.__requeue(rule, manifest, report)
+        finally:
+            report.listCalls = self.driveClient.listCalls
+            report.endTime = time.time()
+            logger.bind(ruleID=rule.ruleID, account=rule.account,
+                        duration=round(report.duration, 3)).info(
+                f"Verification {report.outcome}: {report.filesChecked} " +
+                f"files checked, {len(report.missing)} missing, " +
+                f"{len(report.mismatched)} mismatched, " +
+                f"{len(report.extra)} extra."
+            )
+        return report
+
+    def listRemoteFiles(self, folderID: str, rootName: str | None = None
+                        ) -> dict[str, list[dict]]:
+        """
+        Lists the files of the Google Drive folder and its subfolders, the
+        folders in parallel.
+        Args:
+            folderID (str): is the ID of the listed folder.
+            rootName (str, None): is the name of the only listed child of the
+            folder, e.g. the root of a rule in a folder shared with other
+            rules, or None to list all children.
+        Raises:
+            HttpError: raises if a folder cannot be listed.
+        Returns:
+            dict[str, list[dict]]: the files with "id", "size" and
+            "md5Checksum" by the path relative to the folder with "/"
+            separators; a folder may have many files of a name.
+        """
+        files: dict[str, list[dict]] = {}
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.maxWorkers, thread_name_prefix="BackupVerifier"
+        )
+        try:
+            pending = {executor.submit(self.driveClient.listChildren,
+                                       folderID, self.LISTED_FIELDS,
+                                       rootName): ""}
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    relativeDirectory = pending.pop(future)
+                    for item in future.result():
+                        relativePath = \
+                            f"{relativeDirectory}/{item['name']}" \
+                            if relativeDirectory else item["name"]
+                        if item["mimeType"] == \
+                           GoogleDriveService.FOLDER_MIME_TYPE:
+                            pending[executor.submit(
+                                self.driveClient.listChildren, item["id"],
+                                self.LISTED_FIELDS
+                            )] = relativePath
+                        else:
+                            files.setdefault(relativePath, []).append(item)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return files
+
+    @staticmethod
+    def __getManifestFiles(manifest: dict[str, ManifestEntry]
+                           ) -> dict[str, tuple[int, str | None]]:
+        """Returns the size and the MD5 of the files of the manifest."""
+        return {
+            relativePath: (entry.size, entry.md5)
+            for relativePath, entry in manifest.items()
+            if not entry.isFolder
+        }
+
+    def __hashLocalFiles(self, rule: Rule
+                         ) -> dict[str, tuple[int, str | None]]:
+        """
+        Returns the size and the MD5 of the local files of the rule, hashed
+        in the thread pool of the hash service. The files which cannot be
+        read are not checked.
+        """
+        futures = [
+            (relativePath, filePath, fileStat,
+             self.hashService.submitMD5(filePath, fileStat))
+            for relativePath, filePath, fileStat in
+            BackupEngine.scan(rule.pathFrom, rule.fileFilter)
+        ]
+        files = {}
+        for relativePath, filePath, fileStat, md5 in futures:
+            try:
+                files[relativePath] = (fileStat.st_size, md5.result())
+            except OSError as exception:
+                logger.warning(f"{filePath}: {exception}")
+        return files
+
+    def __compareFiles(self, expected: dict[str, tuple[int, str | None]],
+                       manifest: dict[str, ManifestEntry],
+                       remoteFiles: dict[str, list[dict]],
+                       report: VerifyReport) -> None:
+        """
+        Adds the expected files missing in Google Drive and the mismatched
+        files to the report; the members of a bundle are checked by their
+        bundle.
+        """
+        bundleFileIDs = FileBundler.getBundleFileIDs(manifest)
+        for relativePath, (size, md5) in expected.items():
+            report.filesChecked += 1
+            entry = manifest.get(relativePath)
+            if entry is not None and entry.fileID in bundleFileIDs and \
+               not FileBundler.isBundlePath(relativePath):
+                if md5 is not None and md5 != entry.md5:
+                    report.mismatched[relativePath] = {
+                        "size": size, "md5": md5,
+                        "remoteSize": entry.size, "remoteMD5": entry.md5
+                    }
+                continue
+            remoteFile = self.__findRemoteFile(
+                remoteFiles.get(relativePath),
+                entry.fileID if entry is not None else None
+            )
+            if remoteFile is None:
+                report.missing.append(relativePath)
+                continue
+            remoteSize = int(remoteFile.get("size", -1))
+            remoteMD5 = remoteFile.get("md5Checksum")
+            if remoteSize != size or (md5 is not None and remoteMD5 != md5):
+                report.mismatched[relativePath] = {
+                    "size": size, "md5": md5,
+                    "remoteSize": remoteSize, "remoteMD5": remoteMD5
+                }
+
+    @staticmethod
+    def __findRemoteFile(remoteFiles: list[dict] | None,
+                         fileID: str | None) -> dict | None:
+        """
+        Returns the listed file of the ID or the first listed file of the
+        path.
+        """
+        if not remoteFiles:
+            return None
+        for remoteFile in remoteFiles:
+            if remoteFile["id"] == fileID:
+                return remoteFile
+        return remoteFiles[0]
+
+    def __requeue(self, rule: Rule, manifest: dict[str, ManifestEntry],
+                  report: VerifyReport) -> None:
+        """
+        Deletes the entries of the missing and the mismatched files from
+        the manifest; the members of a missing or mismatched bundle are
+        requeued with it.
+        """
+        if self.manifestModel is None:
+            return
+        badPaths = set(report.missing) | set(report.mismatched)
+        badBundleFileIDs = {
+            manifest[relativePath].fileID for relativePath in badPaths
+            if relativePath in manifest and
+            FileBundler.isBundlePath(relativePath)
+        }
+        badPaths.update(
+            relativePath for relativePath, entry in manifest.items()
+            if entry.fileID in badBundleFileIDs
+        )
+        requeuedPaths = [relativePath for relativePath in badPaths
+                         if relativePath in manifest]
+        self.manifestModel.deleteEntries(rule.ruleID, requeuedPaths)
+        report.requeued = len(requeuedPaths)
@@ -0,0 +1,167 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the BundleService class."""
+
+import io
+import os
+import time
+from typing import Callable
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import UploadPlan, PlannedFile
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.StorageQuotaService import StorageQuotaService
+from service.GoogleDriveService import GoogleDriveService
+from service.FileBundler import FileBundler, Bundle
+from googleapiclient.http import MediaIoBaseUpload
+from metrics.metrics import UPLOADED_BYTES, UPLOADED_FILES
+from const.const import RESUMABLE_UPLOAD_THRESHOLD, UPLOAD_CHUNK_SIZE
+
+
+class BundleService:
+    """
+    The class of BundleService - uploads the small files of a rule with the
+    mode "bundle" packed in bundles by FileBundler. An uploaded bundle is
+    updated in place when it is packed again.
+    """
+
+    def __init__(self, executor: DriveRequestExecutor,
+                 storageQuotaService: StorageQuotaService):
+        """
+        Initializes the bundle service.
+        Args:
+            executor (DriveRequestExecutor): executes the uploads.
+            storageQuotaService (StorageQuotaService): is lowered by the
+            uploaded bundles.
+        """
+        self.executor = executor
+        self.storageQuotaService = storageQuotaService
+        # The bundler of the planned run, None if the rule does not bundle.
+        self.__bundler: FileBundler | None = None
+
+    def planUploads(self, rule: Rule, plan: UploadPlan,
+                    manifest: dict[str, ManifestEntry]
+                    ) -> list[PlannedFile | Bundle]:
+        """
+        Returns the uploads of the run: the files uploaded on their own in
+        the order of the scan and then the bundles of the small files. The
+        bundles of a mirror rule without members left are added to the
+        missing entries of the plan.
+        Args:
+            rule (Rule): is the run rule.
+            plan (UploadPlan): is the plan of the run.
+            manifest (dict[str, ManifestEntry]): is the manifest of the rule.
+        """
+        threshold = rule.bundleThreshold
+        if threshold is None or os.path.isfile(rule.pathFrom):
+            self.__bundler = None
+            return list(plan.files)
+        self.__bundler = FileBundler(threshold, rule.isMirror)
+        nativeFiles, bundles, emptyBundles = self.__bundler.planBundles(
+            plan.files, manifest, plan.missingEntries
+        )
+        if rule.isMirror:
+            plan.missingEntries.update(emptyBundles)
+        return [*nativeFiles, *bundles]
+
+    def backupBundle(self, rule: Rule, run: RuleRun, labels: dict[str, str],
+                     uploadedEntries: dict[str, ManifestEntry],
+                     bundle: Bundle, getFolderID: Callable[[str], str]
+                     ) -> Exception | None:
+        """
+        Packs and uploads the bundle of planUploads, updating the uploaded
+        bundle in place.
+        Args:
+            rule (Rule): is the run rule.
+            run (RuleRun): is the run, which counts the uploaded files.
+            labels (dict[str, str]): are the metric labels of the run.
+            uploadedEntries (dict[str, ManifestEntry]): are the entries
+            added in this run; the bundle and its members are added to them.
+            bundle (Bundle): is the uploaded bundle.
+            getFolderID (Callable[[str], str]): returns the ID of the Google
+            Drive folder of a relative directory, creating it if needed.
+        Raises:
+            HttpError: raises if a folder cannot be looked up or created.
+            ValueError: raises if the bundles of the rule are not planned.
+        Returns:
+            Exception | None: the error which failed the upload or None.
+        """
+        bundler = self.__bundler
+        if bundler is None:
+            raise ValueError(f"The bundles of {rule.ruleID} are not planned.")
+        with self.executor.profiler.span("read"):
+            bundle, content, memberEntries = bundler.pack(
+                bundle, os.path.dirname(os.path.normpath(rule.pathFrom))
+            )
+        if not memberEntries:
+            return None
+        with self.executor.profiler.span("lookup"):
+            parentID = getFolderID(bundle.relativePath.rpartition("/")[0])
+        uploadStartTime = time.perf_counter()
+        try:
+            uploadedFile = self.__upload(bundle, content, parentID)
+        except GoogleDriveService.API_ERRORS as exception:
+            self.executor.logger.bind(file=bundle.relativePath).error(
+                str(exception)
+            )
+            return exception
+
+        uploadedFiles = sum(
+            file.relativePath in memberEntries for file in bundle.files
+        )
+        run.filesUploaded += uploadedFiles
+        run.bytesUploaded += len(content)
+        self.storageQuotaService.useFreeBytes(
+            rule.account,
+            len(content) - (bundle.entry.size if bundle.entry is not None
+                            else 0)
+        )
+        self.executor.logger.bind(
+            file=bundle.relativePath,
+            bytes=len(content),
+            duration=round(time.perf_counter() - uploadStartTime, 3)
+        ).debug(f"Uploaded the bundle of {len(memberEntries)} files.")
+        UPLOADED_FILES.inc(uploadedFiles, **labels)
+        UPLOADED_BYTES.inc(len(content), **labels)
+        uploadedEntries[bundle.relativePath] = ManifestEntry(
+            len(content), 0, uploadedFile["id"],
+            uploadedFile.get("md5Checksum")
+        )
+        uploadedEntries.update(
+            (relativePath, entry._replace(fileID=uploadedFile["id"]))
+            for relativePath, entry in memberEntries.items()
+        )
+        return None
+
+    def __upload(self, bundle: Bundle, content: bytes, folderID: str) -> dict:
+        """
+        Uploads the packed bundle into the folder, updating the uploaded
+        bundle if there is one.
+        Returns:
+            dict: the id and the md5Checksum of the bundle in Google Drive.
+        """
+        isResumable = len(content) > RESUMABLE_UPLOAD_THRESHOLD
+        media = MediaIoBaseUpload(
+            io.BytesIO(content),
+            mimetype="application/zip",
+            chunksize=UPLOAD_CHUNK_SIZE,
+            resumable=isResumable
+        )
+        return self.executor.sendFile(
+            media,
+            bundle.entry.fileID if bundle.entry is not None else None,
+            folderID,
+            bundle.relativePath.rpartition("/")[2],
+            isResumable
+        )
@@ -0,0 +1,404 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ChangeWatcher class."""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from model.Rule import Rule
+from logger.logger import logger
+from const.const import (
+    ON_CHANGE_MAX_DELAY,
+    ON_CHANGE_FALLBACK_SCAN_INTERVAL,
+    ON_CHANGE_WATCH_RETRY_DELAY,
+    ON_CHANGE_WATCH_RETRY_MAX_DELAY,
+)
+
+
+class ChangeWatcher:
+    """
+    The class of ChangeWatcher - watches pathFrom of the "onChange" rules
+    recursively through inotify and collects the paths of the files which
+    were written (IN_CLOSE_WRITE) or moved in (IN_MOVED_TO). The events of
+    a rule are coalesced until its files have been quiet for the quiet
+    period of the rule (or for maxDelay since the first event at most), and
+    then takeChanges returns the changed paths once.
+
+    New and moved in directories are watched and all their files count as
+    changed. If the watch limit (fs.inotify.max_user_watches) is exceeded,
+    inotify is not available (not Linux) or the event queue overflows, the
+    rule is scanned whole instead: every fallbackScanInterval seconds while
+    it cannot be watched, once after an overflow. A rule which cannot be
+    watched is watched again after watchRetryDelay seconds, doubled after
+    every failed attempt up to ON_CHANGE_WATCH_RETRY_MAX_DELAY; once it is
+    watched, it is scanned whole one more time.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, maxDelay: float = ON_CHANGE_MAX_DELAY,
+                 fallbackScanInterval: float =
+                 ON_CHANGE_FALLBACK_SCAN_INTERVAL,
+                 watchRetryDelay: float = ON_CHANGE_WATCH_RETRY_DELAY,
+                 clock=time.monotonic):
+        """
+        Initializes the change watcher and opens the inotify instance.
+        Args:
+            maxDelay (float): is the maximal time in seconds from the first
+            change to its backup, even if the files keep changing.
+            fallbackScanInterval (float): is the interval in seconds of the
+            scans of the rules which cannot be watched.
+            watchRetryDelay (float): is the delay in seconds before the
+            first attempt to watch a rule which cannot be watched again.
+            clock (Callable[[], float]): returns the current time in
+            seconds.
+        """
+        self.maxDelay = maxDelay
+        self.fallbackScanInterval = fallbackScanInterval
+        self.watchRetryDelay = watchRetryDelay
+        self.clock = clock
+        self.__libc: ctypes.CDLL | None = None
+        self.__fd = -1
+        self.__rules: set[Rule] = set()
+        # The watched directories: the rules by the watch descriptor with
+        # the relative directory and the only watched name (of a single
+        # file rule), and the path of the directory.
+        self.__watches: dict[int, dict[Rule, tuple[str, str | None]]] = {}
+        self.__paths: dict[int, str] = {}
+        self.__watchesByRule: dict[Rule, set[int]] = {}
+        # The coalesced changes: the changed paths (None for a whole scan),
+        # the time of the first and the last event.
+        self.__changes: dict[Rule, list] = {}
+        self.__nextFallbackScans: dict[Rule, float] = {}
+        # The rules which cannot be watched: the time of the next attempt to
+        # watch the rule and the delay since the last attempt.
+        self.__watchRetries: dict[Rule, tuple[float, float]] = {}
+        self.__open()
+
+    @property
+    def isAvailable(self) -> bool:
+        """Returns whether inotify is available."""
+        return self.__fd >= 0
+
+    @property
+    def rules(self) -> set[Rule]:
+        return set(self.__rules)
+
+    def setRules(self, listOfRules: list[Rule]) -> None:
+        """
+        Watches the rules and stops watching the other rules.
+        Args:
+            listOfRules (list[Rule]): are the watched rules.
+        """
+        newRules = set(listOfRules)
+        if newRules == self.__rules:
+            return
+        for rule in self.__rules - newRules:
+            self.unwatch(rule)
+        for rule in newRules - self.__rules:
+            self.watch(rule)
+
+    def watch(self, rule: Rule) -> bool:
+        """
+        Watches pathFrom of the rule.
+        Args:
+            rule (Rule): is the watched rule.
+        Returns:
+            bool: False if the rule cannot be watched and is scanned every
+            fallbackScanInterval seconds instead.
+        """
+        self.__rules.add(rule)
+        self.__watchesByRule.setdefault(rule, set())
+        try:
+            if not self.isAvailable:
+                raise OSError(errno.ENOSYS, "inotify is not available")
+            if os.path.isdir(rule.pathFrom):
+                rootName = os.path.basename(os.path.normpath(rule.pathFrom))
+                self.__watchTree(rule, rule.pathFrom, rootName)
+            else:
+                self.__addWatch(rule, os.path.dirname(
+                    os.path.abspath(rule.pathFrom)
+                ), "", os.path.basename(rule.pathFrom))
+        except OSError as exception:
+            self.__degrade(rule, exception)
+            return False
+        self.__nextFallbackScans.pop(rule, None)
+        self.__watchRetries.pop(rule, None)
+        return True
+
+    def unwatch(self, rule: Rule) -> None:
+        """Stops watching the rule and drops its changes."""
+        self.__removeWatches(rule)
+        self.__rules.discard(rule)
+        self.__watchesByRule.pop(rule, None)
+        self.__changes.pop(rule, None)
+        self.__nextFallbackScans.pop(rule, None)
+        self.__watchRetries.pop(rule, None)
+
+    def poll(self, timeout: float) -> None:
+        """
+        Waits for the events at most timeout seconds and collects them.
+        Args:
+            timeout (float): is the maximal wait in seconds.
+        """
+        if not self.isAvailable:
+            time.sleep(timeout)
+            return
+        readable, _, _ = select.select([self.__fd], [], [], timeout)
+        if not readable:
+            return
+        while True:
+            try:
+                data = os.read(self.__fd, self.READ_SIZE)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            self.__handleEvents(data)
+
+    def takeChanges(self) -> list[tuple[Rule, set[str] | None]]:
+        """
+        Returns the rules whose changes are due with the changed paths
+        relative to the parent of pathFrom, or None if the rule must be
+        scanned whole.
+        """
+        self.__retryWatches()
+        now = self.clock()
+        dueChanges = []
+        for rule, (paths, firstTime, lastTime) in list(
+            self.__changes.items()
+        ):
+            if now - lastTime >= rule.quietPeriod or \
+               now - firstTime >= self.maxDelay:
+                dueChanges.append((rule, paths))
+                del self.__changes[rule]
+        for rule, nextScan in self.__nextFallbackScans.items():
+            if now >= nextScan:
+                if rule not in {dueRule for dueRule, _ in dueChanges}:
+                    dueChanges.append((rule, None))
+                self.__nextFallbackScans[rule] = \
+                    now + self.fallbackScanInterval
+        return dueChanges
+
+    def close(self) -> None:
+        """Closes the inotify instance."""
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
+
+    def __retryWatches(self) -> None:
+        """
+        Watches the rules whose attempt to watch them again is due; a
+        watched rule is scanned whole for the changes missed meanwhile.
+        """
+        now = self.clock()
+        dueRules = [rule for rule, (retryTime, _) in
+                    self.__watchRetries.items() if now >= retryTime]
+        if dueRules and not self.isAvailable:
+            self.__open()
+        for rule in dueRules:
+            if self.watch(rule):
+                logger.bind(ruleID=rule.ruleID).info(
+                    f"{rule.pathFrom} is watched again."
+                )
+                self.__addChange(rule, None)
+
+    def __open(self) -> None:
+        """Opens the inotify instance if the platform has it."""
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                               use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32
+            ]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError) as exception:
+            logger.warning(f"inotify is not available: {exception}")
+            return
+        fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if fd < 0:
+            logger.warning("inotify is not available: " +
+                           os.strerror(ctypes.get_errno()))
+            return
+        self.__libc = libc
+        self.__fd = fd
+
+    def __watchTree(self, rule: Rule, path: str,
+                    relativeDirectory: str) -> list[str]:
+        """
+        Watches the directory and its subdirectories except the directories
+        excluded by the filters of the rule.
+        Raises:
+            OSError: raises if the watch limit is exceeded.
+        Returns:
+            list[str]: the relative paths of the files in the directories.
+        """
+        relativePaths = []
+        fileFilter = rule.fileFilter
+        directories = [(path, relativeDirectory)]
+        while directories:
+            directory, relativeDirectory = directories.pop()
+            if "/" in relativeDirectory and not fileFilter.isEmpty and \
+               fileFilter.isDirectoryExcluded(
+                   relativeDirectory.partition("/")[2]
+               ):
+                continue
+            try:
+                self.__addWatch(rule, directory, relativeDirectory)
+                entries = list(os.scandir(directory))
+            except OSError as exception:
+                if exception.errno in (errno.ENOSPC, errno.ENOMEM):
+                    raise
+                logger.error(exception)
+                continue
+            for entry in entries:
+                relativePath = f"{relativeDirectory}/{entry.name}"
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append((entry.path, relativePath))
+                    elif entry.is_file():
+                        relativePaths.append(relativePath)
+                except OSError as exception:
+                    logger.error(exception)
+        return relativePaths
+
+    def __addWatch(self, rule: Rule, directory: str, relativeDirectory: str,
+                   onlyName: str | None = None) -> None:
+        """
+        Watches the directory for the rule.
+        Raises:
+            OSError: raises if the directory cannot be watched.
+        """
+        if self.__libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        wd = self.__libc.inotify_add_watch(
+            self.__fd, os.fsencode(directory), self.WATCH_MASK
+        )
+        if wd < 0:
+            errorNumber = ctypes.get_errno()
+            raise OSError(errorNumber, os.strerror(errorNumber), directory)
+        self.__watches.setdefault(wd, {})[rule] = \
+            (relativeDirectory, onlyName)
+        self.__paths[wd] = directory
+        self.__watchesByRule[rule].add(wd)
+
+    def __removeWatches(self, rule: Rule) -> None:
+        """Removes the watches of the directories watched only by the rule."""
+        for wd in self.__watchesByRule.get(rule, set()):
+            watchedRules = self.__watches.get(wd, {})
+            watchedRules.pop(rule, None)
+            if not watchedRules:
+                self.__watches.pop(wd, None)
+                self.__paths.pop(wd, None)
+                if self.__libc is not None and self.isAvailable:
+                    self.__libc.inotify_rm_watch(self.__fd, wd)
+        self.__watchesByRule[rule] = set()
+
+    def __handleEvents(self, data: bytes) -> None:
+        """Collects the changed paths of the read events."""
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, nameLength = self.EVENT_HEADER.unpack_from(
+                data, offset
+            )
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + nameLength].rstrip(b"\0"))
+            offset += nameLength
+
+            if mask & self.IN_Q_OVERFLOW:
+                logger.warning("The inotify event queue has overflowed.")
+                for rule in self.__rules:
+                    self.__addChange(rule, None)
+                continue
+            if mask & self.IN_IGNORED:
+                for rule in self.__watches.pop(wd, {}):
+                    self.__watchesByRule.get(rule, set()).discard(wd)
+                self.__paths.pop(wd, None)
+                continue
+            if not name or (mask & self.IN_CREATE and
+                            not mask & self.IN_ISDIR):
+                continue
+            for rule, (relativeDirectory, onlyName) in \
+                    list(self.__watches.get(wd, {}).items()):
+                if onlyName is not None and name != onlyName:
+                    continue
+                relativePath = f"{relativeDirectory}/{name}" \
+                    if relativeDirectory else name
+                if not mask & self.IN_ISDIR:
+                    self.__addChange(rule, [relativePath])
+                    continue
+                try:
+                    self.__addChange(rule, self.__watchTree(
+                        rule, os.path.join(self.__paths[wd], name),
+                        relativePath
+                    ))
+                except OSError as exception:
+                    self.__addChange(rule, None)
+                    self.__degrade(rule, exception)
+
+    def __degrade(self, rule: Rule, exception: OSError) -> None:
+        """
+        Scans the rule periodically instead of watching it and schedules
+        the next attempt to watch it.
+        """
+        self.__removeWatches(rule)
+        now = self.clock()
+        self.__nextFallbackScans.setdefault(
+            rule, now + self.fallbackScanInterval
+        )
+        retry = self.__watchRetries.get(rule)
+        delay = self.watchRetryDelay if retry is None else \
+            min(retry[1] * 2, ON_CHANGE_WATCH_RETRY_MAX_DELAY)
+        self.__watchRetries[rule] = (now + delay, delay)
+        if retry is None:
+            logger.bind(ruleID=rule.ruleID).warning(
+                f"{rule.pathFrom} is not watched, it is scanned every " +
+                f"{self.fallbackScanInterval:.0f} s instead: {exception}"
+            )
+
+    def __addChange(self, rule: Rule, relativePaths: list[str] | None
+                    ) -> None:
+        """Adds the changed paths of the rule (None for a whole scan)."""
+        now = self.clock()
+        change = self.__changes.get(rule)
+        if change is None:
+            self.__changes[rule] = [
+                None if relativePaths is None else set(relativePaths),
+                now,
+                now
+            ]
+            return
+        if relativePaths is None:
+            change[0] = None
+        elif change[0] is not None:
+            change[0].update(relativePaths)
+        change[2] = now
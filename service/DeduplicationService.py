@@ -0,0 +1,182 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the DeduplicationService class."""
+
+import os
+from model.ManifestRepository import ManifestRepository, ManifestEntry
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.HashService import HashService
+from googleapiclient.errors import HttpError
+from const.const import DEDUPLICATION_THRESHOLD
+
+
+class DeduplicationService:
+    """
+    The class of DeduplicationService - copies the uploaded content of the
+    account in Google Drive instead of uploading it again.
+
+    The uploaded files of at least DEDUPLICATION_THRESHOLD bytes are indexed
+    by their md5Checksum and size in the content index of the account. A
+    new file of an indexed size is hashed, and if its content has been
+    uploaded by any rule of the account, the uploaded file is copied into
+    the folder by files.copy. A copy whose md5Checksum differs (the source
+    has changed since) is deleted and the file is uploaded.
+    """
+
+    def __init__(self, executor: DriveRequestExecutor,
+                 hashService: HashService,
+                 manifestModel: ManifestRepository | None = None):
+        """
+        Initializes the deduplication service.
+        Args:
+            executor (DriveRequestExecutor): executes the copies.
+            hashService (HashService): hashes the new files.
+            manifestModel (ManifestRepository, None): keeps the content
+            index or None to not copy any file.
+        """
+        self.executor = executor
+        self.hashService = hashService
+        self.manifestModel = manifestModel
+        # The content index of the account of the run: the indexed sizes
+        # (read on the first use), and the added and the stale file IDs by
+        # the md5Checksum and the size.
+        self.__contentSizes: set[int] | None = None
+        self.__contents: dict[tuple[str, int], str] = {}
+        self.__staleContents: dict[tuple[str, int], str] = {}
+
+    def reset(self) -> None:
+        """Forgets the content index of the previous run."""
+        self.__contentSizes = None
+        self.__contents = {}
+        self.__staleContents = {}
+
+    def copyContent(self, account: str, filePath: str,
+                    fileStat: os.stat_result, folderID: str,
+                    fileName: str) -> dict | None:
+        """
+        Copies the uploaded Google Drive file of the account with the
+        content of the new file into the folder.
+        Args:
+            account (str): is the account of the run.
+            filePath (str): is the path to the new file.
+            fileStat (os.stat_result): is the stat of the new file.
+            folderID (str): is the ID of the Google Drive folder of the copy.
+            fileName (str): is the name of the copy.
+        Raises:
+            HttpError: raises if the file cannot be copied, except if the
+            uploaded file is not found.
+        Returns:
+            dict | None: the id and the md5Checksum of the copy or None if
+            the content has not been uploaded (anymore).
+        """
+        size = fileStat.st_size
+        if self.manifestModel is None or size < DEDUPLICATION_THRESHOLD:
+            return None
+        if self.__contentSizes is None:
+            self.__contentSizes = self.manifestModel.getContentSizes(account)
+        if size not in self.__contentSizes:
+            return None
+        with self.executor.profiler.span("hash"):
+            try:
+                md5 = self.hashService.md5(filePath, fileStat)
+            except OSError as exception:
+                self.executor.logger.warning(f"{filePath}: {exception}")
+                return None
+        sourceID = self.__contents.get((md5, size)) or \
+            self.manifestModel.findContent(account, md5, size)
+        if sourceID is None or \
+           self.__staleContents.get((md5, size)) == sourceID:
+            return None
+
+        copiedFile = self.__copy(sourceID, folderID, fileName)
+        if copiedFile is not None and copiedFile.get("md5Checksum") == md5:
+            return copiedFile
+
+        self.__staleContents[(md5, size)] = sourceID
+        self.__contents.pop((md5, size), None)
+        if copiedFile is not None:
+            self.executor.logger.warning(
+                f"{fileName}: the copied file {sourceID} has changed since " +
+                "it was uploaded, the file is uploaded instead."
+            )
+            self.executor.execute(
+                "files.delete",
+                self.executor.driveService.files().delete(
+                    fileId=copiedFile["id"]
+                )
+            )
+        return None
+
+    def indexContent(self, entry: ManifestEntry | None,
+                     fileStat: os.stat_result, uploadedFile: dict) -> None:
+        """
+        Adds the content of the uploaded or copied file to the content index
+        and caches its MD5; the replaced content of the file is stale.
+        Args:
+            entry (ManifestEntry, None): is the replaced entry of the file or
+            None for a new file.
+            fileStat (os.stat_result): is the stat of the file.
+            uploadedFile (dict): is the id and the md5Checksum of the file in
+            Google Drive.
+        """
+        md5 = uploadedFile.get("md5Checksum")
+        if md5 is None:
+            return
+        self.hashService.putMD5(fileStat, md5)
+        if entry is not None and entry.md5 is not None and \
+           (entry.md5, entry.size) != (md5, fileStat.st_size):
+            self.__staleContents[(entry.md5, entry.size)] = entry.fileID
+        if fileStat.st_size >= DEDUPLICATION_THRESHOLD:
+            self.__contents[(md5, fileStat.st_size)] = uploadedFile["id"]
+            if self.__contentSizes is not None:
+                self.__contentSizes.add(fileStat.st_size)
+            if self.__staleContents.get((md5, fileStat.st_size)) == \
+               uploadedFile["id"]:
+                del self.__staleContents[(md5, fileStat.st_size)]
+
+    def saveContents(self, account: str) -> None:
+        """Saves the changes of the content index of the account."""
+        if self.manifestModel is None:
+            return
+        self.manifestModel.deleteContents(account, self.__staleContents)
+        self.manifestModel.putContents(account, self.__contents)
+
+    def __copy(self, sourceID: str, folderID: str,
+               fileName: str) -> dict | None:
+        """
+        Copies the Google Drive file into the folder.
+        Raises:
+            HttpError: raises if the file cannot be copied, except if it is
+            not found.
+        Returns:
+            dict | None: the id and the md5Checksum of the copy or None if
+            the file is not found.
+        """
+        copiedID = self.executor.reserveFileID()
+        try:
+            with self.executor.profiler.span("upload"):
+                return self.executor.create(
+                    "files.copy",
+                    self.executor.driveService.files().copy(
+                        fileId=sourceID,
+                        body={"id": copiedID, "name": fileName,
+                              "parents": [folderID]},
+                        fields="id, md5Checksum"
+                    ),
+                    copiedID,
+                    "id, md5Checksum"
+                )
+        except HttpError as exception:
+            if exception.resp.status != 404:
+                raise
+        return None
@@ -0,0 +1,198 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the DriveRequestExecutor class."""
+
+import time
+from model.RuleRun import RuleRun
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from googleapiclient.http import MediaUpload
+from googleapiclient.errors import HttpError
+from logger.logger import logger
+from metrics.metrics import API_CALLS, API_REQUEST_DURATION, API_RETRIES
+from const.const import GENERATED_FILE_IDS
+
+
+class DriveRequestExecutor:
+    """
+    The class of DriveRequestExecutor - executes the Google Drive API
+    requests of BackupEngine and of its services, retrying the transient
+    errors by the retry policy and recording the metrics of every call.
+
+    The created and copied files get an ID reserved by files.generateIds
+    beforehand, so a retried request whose first attempt was applied (the
+    response was lost) fails with 409 instead of creating a duplicate, and
+    the file is fetched.
+
+    The engine sets the run, whose API calls and retries are counted, and
+    the logger bound to its rule for the duration of a run.
+    """
+
+    def __init__(self, driveService, retryPolicy: RetryPolicy,
+                 profiler: Profiler):
+        """
+        Initializes the executor.
+        Args:
+            driveService (Service): is the auth drive service.
+            retryPolicy (RetryPolicy): is the policy of retrying the failed
+            API requests.
+            profiler (Profiler): times the "upload" span of the uploads.
+        """
+        self.driveService = driveService
+        self.retryPolicy = retryPolicy
+        self.profiler = profiler
+        self.run: RuleRun | None = None
+        self.logger = logger
+        # The IDs reserved by files.generateIds for the created files.
+        self.__fileIDs: list[str] = []
+
+    def execute(self, method: str, request,
+                isResumable: bool = False) -> dict:
+        """
+        Executes the API request, retrying the transient errors. A
+        resumable upload is sent chunk by chunk, and every chunk is retried
+        on its own.
+        Args:
+            method (str): is the name of the API method, e.g. "files.get".
+            request (HttpRequest): is the executed request.
+            isResumable (bool): whether the request is a resumable upload.
+        """
+        if not isResumable:
+            return self.executeWithRetries(method, request.execute)
+        response = None
+        while response is None:
+            _, response = self.executeWithRetries(method, request.next_chunk)
+        return response
+
+    def executeWithRetries(self, method: str, send):
+        """
+        Calls send until it succeeds or fails with an error which is not
+        retried by the retry policy.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self.__send(method, send)
+            except self.retryPolicy.RETRIED_ERRORS as exception:
+                if not self.retryPolicy.isRetryable(exception, attempt):
+                    raise
+                self.countRetries(method)
+                self.logger.warning(
+                    f"{method} failed, retry {attempt + 1}: {exception}"
+                )
+                self.retryPolicy.wait(exception, attempt)
+                attempt += 1
+
+    def countRetries(self, method: str, numberOfRetries: int = 1) -> None:
+        """Counts the retried requests of the method."""
+        API_RETRIES.inc(numberOfRetries, method=method)
+        if self.run is not None:
+            self.run.retries += numberOfRetries
+
+    def create(self, method: str, request, fileID: str, fields: str,
+               isResumable: bool = False) -> dict:
+        """
+        Executes files.create or files.copy of the file with the reserved
+        ID. If the ID is taken (409), an attempt whose response was lost has
+        created the file, and the file is fetched instead.
+        Args:
+            method (str): is the name of the API method.
+            request (HttpRequest): is the executed request.
+            fileID (str): is the reserved ID of the file in the request.
+            fields (str): are the fields of the response.
+            isResumable (bool): whether the request is a resumable upload.
+        Returns:
+            dict: the fields of the created file.
+        """
+        try:
+            return self.execute(method, request, isResumable)
+        except HttpError as exception:
+            if exception.resp.status != 409:
+                raise
+        self.logger.info(f"{method} of {fileID} has already been applied.")
+        return self.execute("files.get", self.driveService.files().get(
+            fileId=fileID,
+            fields=fields
+        ))
+
+    def reserveFileID(self) -> str:
+        """
+        Returns an ID for a created file, reserving GENERATED_FILE_IDS IDs
+        by files.generateIds when they run out.
+        Raises:
+            HttpError: raises if the IDs cannot be generated.
+        """
+        if not self.__fileIDs:
+            self.__fileIDs = self.execute(
+                "files.generateIds",
+                self.driveService.files().generateIds(
+                    count=GENERATED_FILE_IDS,
+                    space="drive",
+                    fields="ids"
+                )
+            )["ids"][::-1]
+        return self.__fileIDs.pop()
+
+    def sendFile(self, media: MediaUpload, fileID: str | None,
+                 folderID: str, fileName: str, isResumable: bool) -> dict:
+        """
+        Updates the file with the ID or creates it if there is no file.
+        Returns:
+            dict: the id and the md5Checksum of the file in Google Drive.
+        """
+        if fileID is not None:
+            try:
+                with self.profiler.span("upload"):
+                    return self.execute(
+                        "files.update",
+                        self.driveService.files().update(
+                            fileId=fileID,
+                            media_body=media,
+                            fields="id, md5Checksum"
+                        ),
+                        isResumable
+                    )
+            except HttpError as exception:
+                if exception.resp.status != 404:
+                    raise
+
+        createdID = self.reserveFileID()
+        metadata = {"id": createdID, "name": fileName, "parents": [folderID]}
+        with self.profiler.span("upload"):
+            return self.create("files.create", self.driveService.files(
+            ).create(
+                body=metadata,
+                media_body=media,
+                fields="id, md5Checksum"
+            ), createdID, "id, md5Checksum", isResumable)
+
+    def __send(self, method: str, send):
+        """
+        Sends one API request, counting it by method and status and
+        recording its latency.
+        """
+        if self.run is not None:
+            self.run.apiCalls += 1
+        status = "error"
+        startTime = time.perf_counter()
+        try:
+            response = send()
+            status = "200"
+            return response
+        except HttpError as exception:
+            status = str(exception.resp.status)
+            raise
+        finally:
+            API_REQUEST_DURATION.observe(time.perf_counter() - startTime,
+                                         method=method)
+            API_CALLS.inc(method=method, status=status)
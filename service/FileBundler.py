@@ -0,0 +1,297 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FileBundler class."""
+
+import io
+import os
+import stat
+import time
+import hashlib
+import zipfile
+from typing import Container, NamedTuple
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import PlannedFile
+from logger.logger import logger
+from const.const import BUNDLE_MAX_SIZE
+
+
+class Bundle(NamedTuple):
+    """
+    A bundle to upload: its path relative to the parent of pathFrom, its
+    manifest entry (None for a new bundle or a bundle replacing an old
+    one), the relative paths of its members and the planned files among
+    them.
+    """
+    relativePath: str
+    entry: ManifestEntry | None
+    memberPaths: list[str]
+    files: list[PlannedFile]
+
+
+class FileBundler:
+    """
+    The class of FileBundler - packs the small files of a directory into ZIP
+    bundles named BUNDLE_PREFIX + ID + ".zip" in the Google Drive folder of
+    the directory, so many small files cost one upload. The central
+    directory of the ZIP file is the index of a bundle, so every member can
+    be restored on its own with any unzip tool.
+
+    In the manifest a bundle is an entry of its own, and the entries of its
+    members keep their size, modification time and MD5 with the file ID of
+    the bundle. A bundle is packed again only when one of its members
+    changes (or, for a mirror rule, is gone); the new small files of a
+    directory are packed into new bundles of at most BUNDLE_MAX_SIZE bytes.
+    A changed bundle with gone members of a rule which is not a mirror is
+    kept for them, and its other members are packed into a new bundle.
+    """
+    BUNDLE_PREFIX = ".goodab-bundle-"
+    BUNDLE_SUFFIX = ".zip"
+    MIN_ZIP_TIME = 315532800  # 1980-01-01, the earliest time of a ZIP file
+
+    def __init__(self, threshold: int, isMirror: bool = False,
+                 maxBundleSize: int = BUNDLE_MAX_SIZE):
+        """
+        Initializes the bundler.
+        Args:
+            threshold (int): is the size of the bundled files; the smaller
+            files are bundled.
+            isMirror (bool): whether the gone members are dropped from their
+            bundles.
+            maxBundleSize (int): is the maximum size of the members of a new
+            bundle in bytes.
+        """
+        self.threshold = threshold
+        self.isMirror = isMirror
+        self.maxBundleSize = maxBundleSize
+        self.__usedPaths: set[str] = set()
+
+    @classmethod
+    def isBundlePath(cls, relativePath: str) -> bool:
+        """Returns whether the path is the path of a bundle."""
+        name = relativePath.rpartition("/")[2]
+        return name.startswith(cls.BUNDLE_PREFIX) and \
+            name.endswith(cls.BUNDLE_SUFFIX)
+
+    @classmethod
+    def getBundleFileIDs(cls, manifest: dict[str, ManifestEntry]) -> set[str]:
+        """Returns the Google Drive IDs of the bundles of the manifest."""
+        return {
+            entry.fileID for relativePath, entry in manifest.items()
+            if cls.isBundlePath(relativePath)
+        }
+
+    def planBundles(self, files: list[PlannedFile],
+                    manifest: dict[str, ManifestEntry],
+                    gonePaths: Container[str] = ()
+                    ) -> tuple[list[PlannedFile], list[Bundle],
+                               dict[str, ManifestEntry]]:
+        """
+        Splits the planned files into the files uploaded on their own and
+        the bundles to pack.
+        Args:
+            files (list[PlannedFile]): are the new and changed files.
+            manifest (dict[str, ManifestEntry]): is the manifest of the rule.
+            gonePaths (Container[str]): are the gone files; the bundles of a
+            mirror rule are packed again without them.
+        Returns:
+            tuple[list[PlannedFile], list[Bundle], dict[str, ManifestEntry]]:
+            the files uploaded on their own, the bundles and the entries of
+            the bundles without members left, by the relative path.
+        """
+        bundlePaths = {
+            entry.fileID: relativePath
+            for relativePath, entry in manifest.items()
+            if self.isBundlePath(relativePath)
+        }
+        nativeFiles, changedBundles, newFiles = self.__splitFiles(
+            files, bundlePaths
+        )
+        # A grown member is uploaded on its own, not over its bundle.
+        grownPaths = {file.relativePath for file in nativeFiles
+                      if file.entry is not None and
+                      file.entry.fileID in bundlePaths}
+        nativeFiles = [file._replace(entry=None)
+                       if file.relativePath in grownPaths else file
+                       for file in nativeFiles]
+        self.__usedPaths = set(bundlePaths.values())
+        bundles, emptyBundles = self.__planChangedBundles(
+            manifest, bundlePaths, changedBundles, grownPaths,
+            gonePaths if self.isMirror else ()
+        )
+        for directory, directoryFiles in newFiles.items():
+            bundles.extend(self.__bundleNewFiles(directory, directoryFiles))
+        return nativeFiles, bundles, emptyBundles
+
+    def __planChangedBundles(self, manifest: dict[str, ManifestEntry],
+                             bundlePaths: dict[str, str],
+                             changedBundles: dict[str, list[PlannedFile]],
+                             grownPaths: set[str], gonePaths: Container[str]
+                             ) -> tuple[list[Bundle],
+                                        dict[str, ManifestEntry]]:
+        """
+        Returns the uploaded bundles to pack again without their grown and
+        gone members and the entries of the bundles without members left.
+        A bundle with a gone member is changed too.
+        """
+        memberPaths = self.__getMemberPaths(manifest, bundlePaths)
+        for fileID, paths in memberPaths.items():
+            if any(path in gonePaths for path in paths):
+                changedBundles.setdefault(fileID, [])
+
+        bundles = []
+        emptyBundles = {}
+        for fileID, changedFiles in changedBundles.items():
+            bundlePath = bundlePaths[fileID]
+            keptPaths = [path for path in memberPaths.get(fileID, [])
+                         if path not in gonePaths and
+                         path not in grownPaths]
+            if keptPaths:
+                bundles.append(Bundle(bundlePath, manifest[bundlePath],
+                                      keptPaths, changedFiles))
+            else:
+                emptyBundles[bundlePath] = manifest[bundlePath]
+        return bundles, emptyBundles
+
+    @classmethod
+    def __getMemberPaths(cls, manifest: dict[str, ManifestEntry],
+                         bundlePaths: dict[str, str]) -> dict[str, list[str]]:
+        """Returns the paths of the members by the file ID of the bundle."""
+        memberPaths: dict[str, list[str]] = {}
+        for relativePath, entry in manifest.items():
+            if entry.fileID in bundlePaths and \
+               not cls.isBundlePath(relativePath):
+                memberPaths.setdefault(entry.fileID, []).append(relativePath)
+        return memberPaths
+
+    def __splitFiles(self, files: list[PlannedFile],
+                     bundlePaths: Container[str]
+                     ) -> tuple[list[PlannedFile],
+                                dict[str, list[PlannedFile]],
+                                dict[str, list[PlannedFile]]]:
+        """
+        Splits the planned files into the files uploaded on their own, the
+        changed small members by the file ID of their bundle and the new
+        small files by their directory. The bundle of a grown member is
+        changed too.
+        """
+        nativeFiles = []
+        changedBundles: dict[str, list[PlannedFile]] = {}
+        newFiles: dict[str, list[PlannedFile]] = {}
+        for file in files:
+            bundleID = file.entry.fileID if file.entry is not None and \
+                file.entry.fileID in bundlePaths else None
+            if bundleID is not None:
+                changedBundles.setdefault(bundleID, [])
+            if file.size >= self.threshold:
+                nativeFiles.append(file)
+            elif bundleID is not None:
+                changedBundles[bundleID].append(file)
+            else:
+                directory = file.relativePath.rpartition("/")[0]
+                newFiles.setdefault(directory, []).append(file)
+        return nativeFiles, changedBundles, newFiles
+
+    def __bundleNewFiles(self, directory: str, files: list[PlannedFile]
+                         ) -> list[Bundle]:
+        """
+        Returns the new bundles of the new small files of the directory, of
+        at most maxBundleSize bytes each.
+        """
+        bundles = []
+        chunk: list[PlannedFile] = []
+        chunkSize = 0
+        for file in files:
+            if chunk and chunkSize + file.size > self.maxBundleSize:
+                bundles.append(self.__newBundle(directory, chunk))
+                chunk, chunkSize = [], 0
+            chunk.append(file)
+            chunkSize += file.size
+        if chunk:
+            bundles.append(self.__newBundle(directory, chunk))
+        return bundles
+
+    def __newBundle(self, directory: str, files: list[PlannedFile]) -> Bundle:
+        """Returns the new bundle of the files of the directory."""
+        paths = [file.relativePath for file in files]
+        return Bundle(self.__newBundlePath(directory, paths), None, paths,
+                      files)
+
+    def pack(self, bundle: Bundle, parentPath: str
+             ) -> tuple[Bundle, bytes, dict[str, ManifestEntry]]:
+        """
+        Packs the members of the bundle which are still small files. The
+        MD5 of every member is computed while it is read. If a member of an
+        uploaded bundle of a rule which is not a mirror is gone, the bundle
+        is kept for it and the others are packed into a new bundle.
+        Args:
+            bundle (Bundle): is the packed bundle.
+            parentPath (str): is the parent of pathFrom.
+        Returns:
+            tuple[Bundle, bytes, dict[str, ManifestEntry]]: the packed
+            bundle, the ZIP file and the entries of the packed members
+            without the file ID.
+        """
+        buffer = io.BytesIO()
+        entries = {}
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for relativePath in bundle.memberPaths:
+                filePath = os.path.join(parentPath, *relativePath.split("/"))
+                try:
+                    fileStat = os.stat(filePath)
+                    if not stat.S_ISREG(fileStat.st_mode) or \
+                       fileStat.st_size >= self.threshold:
+                        continue
+                    with open(filePath, 'rb') as file:
+                        content = file.read()
+                except OSError as exception:
+                    logger.warning(f"{filePath}: {exception}")
+                    continue
+                memberInfo = zipfile.ZipInfo(
+                    relativePath.rpartition("/")[2],
+                    time.localtime(
+                        max(fileStat.st_mtime, self.MIN_ZIP_TIME)
+                    )[:6]
+                )
+                memberInfo.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(memberInfo, content)
+                entries[relativePath] = ManifestEntry(
+                    fileStat.st_size,
+                    fileStat.st_mtime_ns,
+                    "",
+                    hashlib.md5(content, usedforsecurity=False).hexdigest()
+                )
+        if not self.isMirror and bundle.entry is not None and \
+           len(entries) < len(bundle.memberPaths) and entries:
+            bundle = bundle._replace(
+                relativePath=self.__newBundlePath(
+                    bundle.relativePath.rpartition("/")[0], list(entries)
+                ),
+                entry=None
+            )
+        return bundle, buffer.getvalue(), entries
+
+    def __newBundlePath(self, directory: str, memberPaths: list[str]) -> str:
+        """
+        Returns a new unused path of a bundle of the members in the
+        directory, named after the digest of its first member.
+        """
+        digest = hashlib.blake2b(memberPaths[0].encode(), digest_size=4)
+        number = 0
+        while True:
+            bundleID = digest.hexdigest() + (f"-{number}" if number else "")
+            bundlePath = f"{directory}/{self.BUNDLE_PREFIX}{bundleID}" + \
+                self.BUNDLE_SUFFIX
+            if bundlePath not in self.__usedPaths:
+                self.__usedPaths.add(bundlePath)
+                return bundlePath
+            number += 1
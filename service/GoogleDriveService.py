@@ -12,9 +12,26 @@
 
 """Module containing the GoogleDriveService class."""
 
+from typing import Iterator
+import httplib2
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from google.auth.exceptions import GoogleAuthError
+from const.const import FOLDERS_PAGE_SIZE
+
 
 class GoogleDriveService:
     """The class of Google Drive Service."""
+    FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+    # The errors of a request: the HTTP errors of the API, the network
+    # errors and the errors of refreshing the token.
+    API_ERRORS = (
+        HttpError,
+        OSError,
+        httplib2.HttpLib2Error,
+        GoogleAuthError,
+    )
+
     @staticmethod
     def listFolders(service, parentID="root") -> list[dict]:
         """
@@ -25,10 +42,122 @@ class GoogleDriveService:
         Returns:
             list[dict]: the directory hierarchy in Google Drive.
         """
+        return [
+            folder
+            for page in GoogleDriveService.listFolderPages(service, parentID)
+            for folder in page
+        ]
+
+    @staticmethod
+    def listFolderPages(service, parentID="root",
+                        pageSize=FOLDERS_PAGE_SIZE) -> Iterator[list[dict]]:
+        """
+        Yields the subfolders of the parent folder page by page, following
+        nextPageToken until the last page.
+        Args:
+            service (Service): is the drive service.
+            parentID (str): is the parent ID.
+            pageSize (int): is the maximum number of folders in a page.
+        Returns:
+            Iterator[list[dict]]: the pages of folders with "id" and "name".
+        """
         query = f"'{parentID}' in parents and mimeType = " + \
-            "'application/vnd.google-apps.folder' and trashed = false"
-        result = service.files().list(
-            q=query,
-            fields="files(id, name)"
-        ).execute()
-        return result.get("files", [])
+            f"'{GoogleDriveService.FOLDER_MIME_TYPE}' and trashed = false"
+        pageToken = None
+        while True:
+            result = service.files().list(
+                q=query,
+                fields="nextPageToken, files(id, name)",
+                orderBy="name",
+                pageSize=pageSize,
+                pageToken=pageToken
+            ).execute()
+            yield result.get("files", [])
+            pageToken = result.get("nextPageToken")
+            if not pageToken:
+                return
+
+    @staticmethod
+    def listAllFolderPages(service,
+                           pageSize=FOLDERS_PAGE_SIZE) -> Iterator[list[dict]]:
+        """
+        Yields all folders of the drive page by page with one paged query.
+        Args:
+            service (Service): is the drive service.
+            pageSize (int): is the maximum number of folders in a page.
+        Returns:
+            Iterator[list[dict]]: the pages of folders with "id", "name" and
+            "parents".
+        """
+        query = f"mimeType = '{GoogleDriveService.FOLDER_MIME_TYPE}' " + \
+            "and trashed = false"
+        pageToken = None
+        while True:
+            result = service.files().list(
+                q=query,
+                spaces="drive",
+                fields="nextPageToken, files(id, name, parents)",
+                pageSize=pageSize,
+                pageToken=pageToken
+            ).execute()
+            yield result.get("files", [])
+            pageToken = result.get("nextPageToken")
+            if not pageToken:
+                return
+
+    @staticmethod
+    def getRootFolderID(service) -> str:
+        """Returns the real ID of the "root" folder (My Drive)."""
+        return service.files().get(fileId="root", fields="id").execute()["id"]
+
+    @staticmethod
+    def getStartPageToken(service) -> str:
+        """Returns the page token of the changes made from now on."""
+        return service.changes().getStartPageToken().execute()[
+            "startPageToken"
+        ]
+
+    @staticmethod
+    def listChangePages(service, pageToken: str,
+                        pageSize=FOLDERS_PAGE_SIZE
+                        ) -> Iterator[tuple[list[dict], str | None]]:
+        """
+        Yields the changes made since the page token page by page.
+        Args:
+            service (Service): is the drive service.
+            pageToken (str): is the page token of the first change.
+            pageSize (int): is the maximum number of changes in a page.
+        Returns:
+            Iterator[tuple[list[dict], str | None]]: the pages of changes
+            with "fileId", "removed" and "file", and the new start page token
+            on the last page (None on the other pages).
+        """
+        while True:
+            result = service.changes().list(
+                pageToken=pageToken,
+                spaces="drive",
+                includeRemoved=True,
+                fields="nextPageToken, newStartPageToken, changes(fileId, " +
+                "removed, file(id, name, mimeType, parents, trashed))",
+                pageSize=pageSize
+            ).execute()
+            yield result.get("changes", []), result.get("newStartPageToken")
+            pageToken = result.get("nextPageToken")
+            if not pageToken:
+                return
+
+    @staticmethod
+    def createThreadService(service):
+        """
+        Returns a new drive service with the credentials of the service for
+        use in another thread, since the HTTP object of a service is not
+        thread-safe. A service without credentials is returned as it is.
+        Args:
+            service (Service): is the drive service.
+        """
+        credentials = getattr(getattr(service, "_http", None),
+                              "credentials", None)
+        if credentials is None:
+            return service
+        return build("drive", "v3", credentials=credentials,
+                     cache_discovery=False)
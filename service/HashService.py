@@ -0,0 +1,204 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the HashService class."""
+
+import os
+import mmap
+import hashlib
+import concurrent.futures
+from typing import Callable
+from model.HashCacheRepository import HashCacheRepository
+from const.const import (
+    HASH_BUFFER_SIZE,
+    HASH_MMAP_THRESHOLD,
+    QUICK_HASH_BLOCK_SIZE,
+    QUICK_HASH_BLOCKS,
+)
+
+
+class HashService:
+    """
+    The class of HashService - hashes the local files in a thread pool;
+    hashlib releases the GIL while it hashes, so the files are hashed in
+    parallel with each other and with the uploads.
+
+    There are two tiers of hashes:
+        quickHash: BLAKE2b of the size and QUICK_HASH_BLOCKS blocks sampled
+        evenly over the file. It reads at most about 1 MiB, so it is cheap
+        even for huge files; a different quick hash proves a change, an
+        equal one does not prove equality.
+        md5: MD5 of the whole file, the checksum Google Drive keeps in
+        md5Checksum. Files above HASH_MMAP_THRESHOLD are read through mmap,
+        smaller files through a reused HASH_BUFFER_SIZE buffer.
+
+    The hashes are cached in the hash cache by the inode, the size and the
+    modification time of the file.
+    """
+    MD5 = "md5"
+    QUICK_HASH = "blake2bSampled"
+
+    def __init__(self, hashCacheModel: HashCacheRepository | None = None,
+                 maxWorkers: int | None = None):
+        """
+        Initializes the hash service.
+        Args:
+            hashCacheModel (HashCacheRepository, None): is the cache of the
+            hashes or None to not cache them.
+            maxWorkers (int, None): is the number of the hashing threads or
+            None for the number of the CPUs.
+        """
+        self.hashCacheModel = hashCacheModel
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=maxWorkers or os.cpu_count() or 1,
+            thread_name_prefix="HashService"
+        )
+
+    @staticmethod
+    def isQuickHashUseful(fileSize: int) -> bool:
+        """Returns whether the quick hash reads less than the whole file."""
+        return fileSize > QUICK_HASH_BLOCK_SIZE * QUICK_HASH_BLOCKS
+
+    def md5(self, filePath: str,
+            fileStat: os.stat_result | None = None) -> str:
+        """
+        Returns the hex MD5 of the whole file.
+        Args:
+            filePath (str): is the path to the file.
+            fileStat (os.stat_result, None): is the stat of the file or None
+            to stat it.
+        Raises:
+            OSError: raises if the file cannot be read.
+        """
+        return self.__cachedHash(filePath, fileStat, self.MD5,
+                                 self.__computeMD5)
+
+    def putMD5(self, fileStat: os.stat_result, md5: str) -> None:
+        """
+        Caches the MD5 of the file known without reading it, e.g. the
+        md5Checksum of the uploaded file.
+        """
+        if self.hashCacheModel is not None:
+            self.hashCacheModel.putHash(fileStat, self.MD5, md5)
+
+    def quickHash(self, filePath: str,
+                  fileStat: os.stat_result | None = None) -> str:
+        """
+        Returns the hex BLAKE2b of the size and the sampled blocks of the
+        file.
+        Args:
+            filePath (str): is the path to the file.
+            fileStat (os.stat_result, None): is the stat of the file or None
+            to stat it.
+        Raises:
+            OSError: raises if the file cannot be read.
+        """
+        return self.__cachedHash(filePath, fileStat, self.QUICK_HASH,
+                                 self.__computeQuickHash)
+
+    def submitMD5(self, filePath: str, fileStat: os.stat_result | None = None
+                  ) -> concurrent.futures.Future:
+        """Hashes the file by md5 in the thread pool."""
+        return self.__executor.submit(self.md5, filePath, fileStat)
+
+    def submitQuickHash(self, filePath: str,
+                        fileStat: os.stat_result | None = None
+                        ) -> concurrent.futures.Future:
+        """Hashes the file by quickHash in the thread pool."""
+        return self.__executor.submit(self.quickHash, filePath, fileStat)
+
+    def isUnchanged(self, filePath: str, fileStat: os.stat_result,
+                    md5: str, quickHash: str | None = None) -> bool:
+        """
+        Checks whether the content of the file is the uploaded content.
+        The quick hash is compared first, so a changed large file is
+        usually detected without reading it whole.
+        Args:
+            filePath (str): is the path to the file.
+            fileStat (os.stat_result): is the stat of the file.
+            md5 (str): is the md5Checksum of the uploaded file.
+            quickHash (str, None): is the quick hash of the uploaded file or
+            None if it is not known.
+        Raises:
+            OSError: raises if the file cannot be read.
+        """
+        if quickHash is not None and \
+           self.quickHash(filePath, fileStat) != quickHash:
+            return False
+        return self.md5(filePath, fileStat) == md5
+
+    def submitIsUnchanged(self, filePath: str, fileStat: os.stat_result,
+                          md5: str, quickHash: str | None = None
+                          ) -> concurrent.futures.Future:
+        """Runs isUnchanged in the thread pool."""
+        return self.__executor.submit(self.isUnchanged, filePath, fileStat,
+                                      md5, quickHash)
+
+    def close(self) -> None:
+        """Waits for the submitted hashes and stops the threads."""
+        self.__executor.shutdown()
+
+    def __cachedHash(self, filePath: str, fileStat: os.stat_result | None,
+                     algorithm: str,
+                     computeHash: Callable[[str, int], str]) -> str:
+        """Returns the cached hash or computes and caches it."""
+        if fileStat is None:
+            fileStat = os.stat(filePath)
+        if self.hashCacheModel is not None:
+            cachedDigest = self.hashCacheModel.getHash(fileStat, algorithm)
+            if cachedDigest is not None:
+                return cachedDigest
+        digest = computeHash(filePath, fileStat.st_size)
+        if self.hashCacheModel is not None:
+            self.hashCacheModel.putHash(fileStat, algorithm, digest)
+        return digest
+
+    @staticmethod
+    def __computeMD5(filePath: str, fileSize: int) -> str:
+        md5 = hashlib.md5(usedforsecurity=False)
+        with open(filePath, 'rb') as file:
+            if fileSize > HASH_MMAP_THRESHOLD:
+                try:
+                    fileMap = mmap.mmap(file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    fileMap = None
+                if fileMap is not None:
+                    with fileMap, memoryview(fileMap) as view:
+                        for offset in range(0, len(view), HASH_BUFFER_SIZE):
+                            md5.update(view[offset:offset + HASH_BUFFER_SIZE])
+                    return md5.hexdigest()
+
+            buffer = bytearray(HASH_BUFFER_SIZE)
+            with memoryview(buffer) as view:
+                while True:
+                    numberOfBytes = file.readinto(buffer)
+                    if not numberOfBytes:
+                        break
+                    md5.update(view[:numberOfBytes])
+        return md5.hexdigest()
+
+    @staticmethod
+    def __computeQuickHash(filePath: str, fileSize: int) -> str:
+        quickHash = hashlib.blake2b(digest_size=16)
+        quickHash.update(fileSize.to_bytes(8, "little"))
+        with open(filePath, 'rb') as file:
+            if not HashService.isQuickHashUseful(fileSize):
+                quickHash.update(file.read())
+                return quickHash.hexdigest()
+            # The first and the last block and the blocks evenly between.
+            step = (fileSize - QUICK_HASH_BLOCK_SIZE) // \
+                (QUICK_HASH_BLOCKS - 1)
+            for block in range(QUICK_HASH_BLOCKS):
+                file.seek(block * step)
+                quickHash.update(file.read(QUICK_HASH_BLOCK_SIZE))
+        return quickHash.hexdigest()
@@ -0,0 +1,233 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the MirrorService class."""
+
+from model.Rule import Rule
+from model.ManifestRepository import ManifestRepository, ManifestEntry
+from model.UploadPlan import UploadPlan
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.FileBundler import FileBundler
+from googleapiclient.errors import HttpError
+from metrics.metrics import API_CALLS, TRASHED_FILES
+from exception.exceptions import MirrorDeletionRefusedException
+from const.const import TRASH_BATCH_SIZE
+
+
+class MirrorService:
+    """
+    The class of MirrorService - keeps the Google Drive folder of a mirror
+    rule the size of pathFrom. After a full scan, the files and folders of
+    the manifest which are gone from pathFrom are moved to the trash in
+    batches of TRASH_BATCH_SIZE requests (a folder takes its contents with
+    it). Only the entries uploaded by the rule are trashed, and nothing is
+    trashed if more than maxDeletedPercent percent of its files are gone,
+    e.g. when pathFrom is an unmounted drive.
+    """
+
+    def __init__(self, executor: DriveRequestExecutor,
+                 manifestModel: ManifestRepository | None = None):
+        """
+        Initializes the mirror service.
+        Args:
+            executor (DriveRequestExecutor): executes the trash requests.
+            manifestModel (ManifestRepository, None): is the manifest the
+            trashed entries are deleted from or None.
+        """
+        self.executor = executor
+        self.manifestModel = manifestModel
+
+    @staticmethod
+    def isInFolders(relativePath: str, folders: set[str]) -> bool:
+        """Returns whether the path is in any of the folders."""
+        directory = relativePath.rpartition("/")[0]
+        while directory:
+            if directory in folders:
+                return True
+            directory = directory.rpartition("/")[0]
+        return False
+
+    def mirror(self, rule: Rule, labels: dict[str, str], plan: UploadPlan,
+               manifest: dict[str, ManifestEntry]) -> None:
+        """
+        Moves the missing entries of the plan to the trash and deletes them
+        from the manifest. The entries in a missing folder created by the
+        rule are trashed with the folder. An adopted folder may hold files
+        of others: its entries are trashed one by one and the folder is
+        kept.
+        Args:
+            rule (Rule): is the mirror rule.
+            labels (dict[str, str]): are the metric labels of the run.
+            plan (UploadPlan): is the plan of a full scan of the rule.
+            manifest (dict[str, ManifestEntry]): is the manifest of the rule.
+        Raises:
+            MirrorDeletionRefusedException: raises if more than
+            maxDeletedPercent percent of the uploaded files are missing.
+            HttpError: raises if any entry has not been trashed.
+        """
+        self.__checkDeletedPercent(rule, plan, manifest)
+        adoptedFolders = {
+            relativePath for relativePath, entry in plan.missingEntries.items()
+            if entry.isFolder and not entry.isOwned
+        }
+        # The gone members of the bundles have been packed out of them.
+        bundleFileIDs = FileBundler.getBundleFileIDs(manifest)
+        memberPaths = {
+            relativePath for relativePath, entry in plan.missingEntries.items()
+            if entry.fileID in bundleFileIDs and
+            not FileBundler.isBundlePath(relativePath)
+        }
+        trashedEntries = self.__getTrashedEntries(plan, memberPaths,
+                                                  adoptedFolders)
+        trashedPaths: set[str] = set()
+        try:
+            self.__trash(trashedEntries, trashedPaths)
+        finally:
+            trashedFolders = {
+                relativePath for relativePath in trashedPaths
+                if trashedEntries[relativePath].isFolder
+            }
+            failedPaths = set(trashedEntries) - trashedPaths
+            deletedPaths = [
+                relativePath for relativePath in plan.missingEntries
+                if relativePath in trashedPaths or
+                relativePath in memberPaths or
+                self.isInFolders(relativePath, trashedFolders) or
+                relativePath in adoptedFolders and not any(
+                    self.isInFolders(failedPath, {relativePath})
+                    for failedPath in failedPaths
+                )
+            ]
+            if self.manifestModel is not None:
+                self.manifestModel.deleteEntries(rule.ruleID, deletedPaths)
+            TRASHED_FILES.inc(len(trashedPaths), **labels)
+            self.executor.logger.info(
+                f"{len(trashedPaths)} of {len(trashedEntries)} files and " +
+                "folders gone from pathFrom moved to the trash."
+            )
+
+    @staticmethod
+    def __checkDeletedPercent(rule: Rule, plan: UploadPlan,
+                              manifest: dict[str, ManifestEntry]) -> None:
+        """
+        Raises MirrorDeletionRefusedException if more than maxDeletedPercent
+        percent of the uploaded files (not folders or bundles) are missing.
+        """
+        def isFile(relativePath: str, entry: ManifestEntry) -> bool:
+            return not entry.isFolder and \
+                not FileBundler.isBundlePath(relativePath)
+
+        missingFiles = sum(
+            isFile(relativePath, entry)
+            for relativePath, entry in plan.missingEntries.items()
+        )
+        uploadedFiles = sum(
+            isFile(relativePath, entry)
+            for relativePath, entry in manifest.items()
+        )
+        if missingFiles * Rule.MAX_PERCENT > \
+           rule.maxDeletedPercent * uploadedFiles:
+            raise MirrorDeletionRefusedException(
+                missingFiles, uploadedFiles, rule.maxDeletedPercent
+            )
+
+    def __getTrashedEntries(self, plan: UploadPlan, memberPaths: set[str],
+                            adoptedFolders: set[str]
+                            ) -> dict[str, ManifestEntry]:
+        """
+        Returns the missing entries trashed one by one: not the members of
+        the bundles, the adopted folders or the entries in the trashed
+        folders.
+        """
+        missingFolders = {
+            relativePath for relativePath, entry in plan.missingEntries.items()
+            if entry.isFolder and entry.isOwned
+        }
+        return {
+            relativePath: entry
+            for relativePath, entry in plan.missingEntries.items()
+            if relativePath not in memberPaths and
+            relativePath not in adoptedFolders and
+            not self.isInFolders(relativePath, missingFolders)
+        }
+
+    def __trash(self, entries: dict[str, ManifestEntry],
+                trashedPaths: set[str]) -> None:
+        """
+        Moves the entries to the trash of Google Drive in batch requests
+        and adds their paths to trashedPaths. The entries which are not
+        found have already been deleted. The entries which failed with a
+        transient error are retried together in new batches.
+        Raises:
+            HttpError: raises if any entry has not been trashed.
+        """
+        retryPolicy = self.executor.retryPolicy
+        pendingPaths = list(entries)
+        attempt = 0
+        while pendingPaths:
+            errors: dict[str, Exception] = {}
+            for start in range(0, len(pendingPaths), TRASH_BATCH_SIZE):
+                self.__trashBatch(
+                    entries, pendingPaths[start:start + TRASH_BATCH_SIZE],
+                    trashedPaths, errors
+                )
+            if not errors:
+                return
+            exception = next(iter(errors.values()))
+            if not all(retryPolicy.isRetryable(error, attempt)
+                       for error in errors.values()):
+                for relativePath, error in errors.items():
+                    self.executor.logger.bind(file=relativePath).error(
+                        str(error)
+                    )
+                raise exception
+            self.executor.countRetries("files.update", len(errors))
+            self.executor.logger.warning(
+                f"{len(errors)} trash requests failed, retry " +
+                f"{attempt + 1}: {exception}"
+            )
+            retryPolicy.wait(exception, attempt)
+            pendingPaths = list(errors)
+            attempt += 1
+
+    def __trashBatch(self, entries: dict[str, ManifestEntry],
+                     relativePaths: list[str], trashedPaths: set[str],
+                     errors: dict[str, Exception]) -> None:
+        """
+        Sends the trash requests of the paths in one batch request and
+        records the trashed paths and the errors of the others.
+        """
+        def onResponse(requestID: str, _response, exception) -> None:
+            relativePath = relativePaths[int(requestID)]
+            status = "200"
+            if isinstance(exception, HttpError):
+                status = str(exception.resp.status)
+            elif exception is not None:
+                status = "error"
+            API_CALLS.inc(method="files.update", status=status)
+            if exception is None or status == "404":
+                trashedPaths.add(relativePath)
+            else:
+                errors[relativePath] = exception
+
+        driveService = self.executor.driveService
+        batch = driveService.new_batch_http_request(callback=onResponse)
+        for index, relativePath in enumerate(relativePaths):
+            batch.add(
+                driveService.files().update(
+                    fileId=entries[relativePath].fileID,
+                    body={"trashed": True},
+                    fields="id"
+                ),
+                request_id=str(index)
+            )
+        self.executor.executeWithRetries("batch", batch.execute)
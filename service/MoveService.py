@@ -0,0 +1,199 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the MoveService class."""
+
+import concurrent.futures
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import UploadPlan, PlannedFile
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.HashService import HashService
+from service.FileBundler import FileBundler
+from googleapiclient.errors import HttpError
+from metrics.metrics import MOVED_FILES
+
+
+class MoveService:
+    """
+    The class of MoveService - finds the files which have been moved or
+    renamed in pathFrom and moves their Google Drive files instead of
+    uploading them again.
+
+    After a full scan, a new file with the inode (or the modification time),
+    the size and the MD5 of a gone file of the manifest has been moved or
+    renamed: its Google Drive file is moved by one files.update of its
+    parents and name.
+    """
+
+    def __init__(self, executor: DriveRequestExecutor,
+                 hashService: HashService):
+        """
+        Initializes the move service.
+        Args:
+            executor (DriveRequestExecutor): executes the moves.
+            hashService (HashService): hashes the new files.
+        """
+        self.executor = executor
+        self.hashService = hashService
+
+    def findMovedFiles(self, plan: UploadPlan,
+                       manifest: dict[str, ManifestEntry]) -> None:
+        """
+        Moves the new files of the plan with the inode (or the modification
+        time), the size and the MD5 of a missing file to movedFiles. The
+        new files are hashed in the thread pool of the hash service; a
+        renamed file keeps its inode, so its hash is usually cached.
+        Args:
+            plan (UploadPlan): is the plan of a full scan.
+            manifest (dict[str, ManifestEntry]): is the manifest of the rule.
+        """
+        pathsByInode, pathsByTime = self.__indexMissingFiles(plan, manifest)
+        if not pathsByTime:
+            return
+
+        comparedFiles: list[tuple[str, PlannedFile,
+                                  concurrent.futures.Future]] = []
+        try:
+            for file in plan.files:
+                if file.entry is not None:
+                    continue
+                movedPath = pathsByInode.get(
+                    (file.size, file.fileStat.st_ino)
+                ) or pathsByTime.get((file.size, file.fileStat.st_mtime_ns))
+                if movedPath is None:
+                    continue
+                entry = plan.missingEntries[movedPath]
+                if entry.md5 is None:
+                    continue
+                comparedFiles.append((
+                    movedPath,
+                    file,
+                    self.hashService.submitIsUnchanged(
+                        file.filePath, file.fileStat, entry.md5,
+                        entry.quickHash
+                    )
+                ))
+            for movedPath, file, isUnchanged in comparedFiles:
+                if movedPath in plan.missingEntries and \
+                   self.__isUnchanged(isUnchanged, file.filePath):
+                    plan.movedFiles.append((movedPath, file._replace(
+                        entry=plan.missingEntries.pop(movedPath)
+                    )))
+        finally:
+            for _, _, isUnchanged in comparedFiles:
+                isUnchanged.cancel()
+        if plan.movedFiles:
+            movedFiles = {file.relativePath for _, file in plan.movedFiles}
+            plan.files = [file for file in plan.files
+                          if file.relativePath not in movedFiles]
+
+    @staticmethod
+    def __indexMissingFiles(plan: UploadPlan,
+                            manifest: dict[str, ManifestEntry]
+                            ) -> tuple[dict[tuple[int, int], str],
+                                       dict[tuple[int, int], str]]:
+        """
+        Returns the missing files of the plan with an MD5, which are not
+        bundled, by their size and inode and by their size and modification
+        time.
+        """
+        bundleFileIDs = FileBundler.getBundleFileIDs(manifest)
+        pathsByInode: dict[tuple[int, int], str] = {}
+        pathsByTime: dict[tuple[int, int], str] = {}
+        for relativePath, entry in plan.missingEntries.items():
+            if entry.isFolder or entry.md5 is None or \
+               entry.fileID in bundleFileIDs:
+                continue
+            if entry.inode is not None:
+                pathsByInode.setdefault((entry.size, entry.inode),
+                                        relativePath)
+            pathsByTime.setdefault((entry.size, entry.mtimeNs), relativePath)
+        return pathsByInode, pathsByTime
+
+    def moveFile(self, labels: dict[str, str],
+                 manifest: dict[str, ManifestEntry],
+                 uploadedEntries: dict[str, ManifestEntry],
+                 movedPath: str, file: PlannedFile, folderID: str) -> bool:
+        """
+        Moves and renames the Google Drive file of the gone path to the
+        path of the moved file by one files.update.
+        Args:
+            labels (dict[str, str]): are the metric labels of the run.
+            manifest (dict[str, ManifestEntry]): is the manifest of the rule.
+            uploadedEntries (dict[str, ManifestEntry]): are the entries
+            added in this run; the moved file is added to them.
+            movedPath (str): is the gone path of the file.
+            file (PlannedFile): is the moved file with the entry of the gone
+            path.
+            folderID (str): is the ID of the Google Drive folder of the moved
+            file.
+        Raises:
+            HttpError: raises if the file cannot be moved, except if it is
+            not found.
+        Returns:
+            bool: False if the Google Drive file is not found.
+        """
+        entry = file.entry
+        if entry is None:
+            return False
+        movedDirectory, movedName = movedPath.rpartition("/")[::2]
+        fileName = file.relativePath.rpartition("/")[2]
+        folderEntry = manifest.get(movedDirectory)
+        movedFolderID = folderEntry.fileID \
+            if folderEntry is not None and folderEntry.isFolder else None
+        try:
+            if movedFolderID is None:
+                movedFolderID = self.executor.execute(
+                    "files.get",
+                    self.executor.driveService.files().get(
+                        fileId=entry.fileID, fields="parents"
+                    )
+                ).get("parents", [None])[0]
+            parents = {}
+            if movedFolderID != folderID:
+                parents = {"addParents": folderID,
+                           "removeParents": movedFolderID}
+            self.executor.execute(
+                "files.update",
+                self.executor.driveService.files().update(
+                    fileId=entry.fileID,
+                    body={"name": fileName} if fileName != movedName else {},
+                    fields="id",
+                    **parents
+                )
+            )
+        except HttpError as exception:
+            if exception.resp.status != 404:
+                raise
+            return False
+
+        self.executor.logger.bind(file=file.relativePath).debug(
+            f"Moved from {movedPath}."
+        )
+        MOVED_FILES.inc(**labels)
+        uploadedEntries[file.relativePath] = entry._replace(
+            mtimeNs=file.fileStat.st_mtime_ns, inode=file.fileStat.st_ino
+        )
+        return True
+
+    def __isUnchanged(self, future: concurrent.futures.Future,
+                      filePath: str) -> bool:
+        """
+        Waits for the comparison of the file; returns False if the file
+        cannot be read.
+        """
+        with self.executor.profiler.span("hash"):
+            try:
+                return future.result()
+            except OSError as exception:
+                self.executor.logger.warning(f"{filePath}: {exception}")
+                return False
@@ -0,0 +1,110 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ParallelDriveClient class."""
+
+import threading
+from service.GoogleDriveService import GoogleDriveService
+from service.RetryPolicy import RetryPolicy
+from logger.logger import logger
+
+
+class ParallelDriveClient:
+    """
+    The class of ParallelDriveClient - sends the API requests of many
+    threads, each thread with its own drive service, and retries the failed
+    requests by the retry policy.
+    """
+    PAGE_SIZE = 1000
+
+    def __init__(self, driveService, retryPolicy: RetryPolicy | None = None):
+        """
+        Initializes the client.
+        Args:
+            driveService (Service): is the auth drive service.
+            retryPolicy (RetryPolicy, None): is the policy of retrying the
+            failed API requests or None for the default policy.
+        """
+        self.driveService = driveService
+        self.retryPolicy = retryPolicy or RetryPolicy()
+        self.listCalls = 0
+        self.__threadLocal = threading.local()
+        self.__lock = threading.Lock()
+
+    def getService(self):
+        """Returns the drive service of the current thread."""
+        service = getattr(self.__threadLocal, "service", None)
+        if service is None:
+            service = GoogleDriveService.createThreadService(
+                self.driveService
+            )
+            self.__threadLocal.service = service
+        return service
+
+    def execute(self, send):
+        """
+        Calls send until it succeeds or fails with an error which is not
+        retried by the retry policy.
+        Args:
+            send (Callable): sends the request and returns its result.
+        Raises:
+            HttpError: raises if the request fails.
+        Returns:
+            Any: the result of send.
+        """
+        attempt = 0
+        while True:
+            try:
+                return send()
+            except self.retryPolicy.RETRIED_ERRORS as exception:
+                if not self.retryPolicy.isRetryable(exception, attempt):
+                    raise
+                logger.warning(f"Retry {attempt + 1}: {exception}")
+                self.retryPolicy.wait(exception, attempt)
+                attempt += 1
+
+    def listChildren(self, folderID: str, fields: str,
+                     name: str | None = None) -> list[dict]:
+        """
+        Lists the files and folders of the Google Drive folder page by page
+        and counts the list calls.
+        Args:
+            folderID (str): is the ID of the listed folder.
+            fields (str): are the listed fields of files.list.
+            name (str, None): is the name of the listed children or None for
+            all children.
+        Raises:
+            HttpError: raises if the folder cannot be listed.
+        Returns:
+            list[dict]: the listed files and folders.
+        """
+        query = f"'{folderID}' in parents and trashed = false"
+        if name is not None:
+            escapedName = name.replace("\\", "\\\\").replace("'", "\\'")
+            query += f" and name = '{escapedName}'"
+        service = self.getService()
+        children = []
+        pageToken = None
+        while True:
+            response = self.execute(service.files().list(
+                q=query,
+                spaces="drive",
+                fields=fields,
+                pageSize=self.PAGE_SIZE,
+                pageToken=pageToken
+            ).execute)
+            with self.__lock:
+                self.listCalls += 1
+            children.extend(response.get("files", []))
+            pageToken = response.get("nextPageToken")
+            if not pageToken:
+                return children
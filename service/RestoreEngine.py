@@ -0,0 +1,475 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing the RestoreEngine class."""
+
+import os
+import time
+import zlib
+import shutil
+import zipfile
+import functools
+import concurrent.futures
+from typing import NamedTuple
+from googleapiclient.errors import HttpError
+from model.RestoreReport import RestoreReport
+from model.ManifestRepository import ManifestRepository
+from service.GoogleDriveService import GoogleDriveService
+from service.RetryPolicy import RetryPolicy
+from service.ParallelDriveClient import ParallelDriveClient
+from service.HashService import HashService
+from service.FileBundler import FileBundler
+from logger.logger import logger
+from exception.exceptions import ChecksumMismatchException
+from const.const import (
+    RESTORE_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    RESTORE_PART_SUFFIX,
+    RESTORE_BUNDLE_DIRECTORY,
+    HASH_BUFFER_SIZE,
+)
+
+
+class RemoteFile(NamedTuple):
+    """
+    A file of the restored Google Drive folder: its path relative to the
+    restored directory with "/" separators, its ID, its size, its
+    md5Checksum and its modification time (RFC 3339).
+    """
+    relativePath: str
+    fileID: str
+    size: int
+    md5: str
+    modifiedTime: str
+
+
+class BundleMember(NamedTuple):
+    """
+    A member of a restored bundle: the bundle, the path to the downloaded
+    bundle and the member in it, both None if the bundle has not been
+    downloaded because its members are already restored.
+    """
+    bundle: RemoteFile
+    bundlePath: str | None
+    memberInfo: zipfile.ZipInfo | None
+
+
+class RestoreEngine:
+    """
+    The class of RestoreEngine - downloads a Google Drive folder with its
+    subfolders back to a local directory.
+
+    The folder is listed first, then the files are downloaded in parallel
+    by maxWorkers threads, each with its own drive service. A file is
+    downloaded in Range requests of chunkSize bytes into a part file named
+    after its md5Checksum next to it, so a restore interrupted by a crash
+    continues with the Range after the downloaded bytes. The
+    downloaded file is verified against the md5Checksum and renamed to its
+    name. A local file which already matches the md5Checksum is skipped.
+
+    The bundles of FileBundler are downloaded like the files into
+    RESTORE_BUNDLE_DIRECTORY of the restored directory, named after their
+    IDs, and their members are extracted next to them; the CRC of the ZIP
+    file verifies every member. The directory is deleted after a restore
+    without errors, so a failed restore continues the downloaded bundles.
+    With the manifest, a bundle whose members already match the hashes of
+    their entries is not downloaded. If a file is in more than one bundle
+    or also uploaded on its own, the most recently modified one is
+    restored.
+
+    The Google Docs files have no content to download and are ignored.
+    """
+    RESTORE_ERRORS = (
+        HttpError,
+        OSError,
+        ChecksumMismatchException,
+        zipfile.BadZipFile,
+        *RetryPolicy.CONNECTION_ERRORS,
+    )
+    LISTED_FIELDS = "nextPageToken, files(id, name, mimeType, size, " + \
+        "md5Checksum, modifiedTime)"
+
+    def __init__(self, driveService,
+                 hashService: HashService | None = None,
+                 retryPolicy: RetryPolicy | None = None,
+                 maxWorkers: int = RESTORE_WORKERS,
+                 chunkSize: int = DOWNLOAD_CHUNK_SIZE,
+                 manifestModel: ManifestRepository | None = None):
+        """
+        Initializes the restore engine.
+        Args:
+            driveService (Service): is the auth drive service.
+            hashService (HashService, None): hashes the local files or None
+            for a hash service without a cache.
+            retryPolicy (RetryPolicy, None): is the policy of retrying the
+            failed API requests or None for the default policy.
+            maxWorkers (int): is the number of the parallel downloads.
+            chunkSize (int): is the size of a Range request in bytes.
+            manifestModel (ManifestRepository, None): is the manifest of the
+            uploaded files or None to download every bundle.
+        """
+        self.driveService = driveService
+        self.hashService = hashService or HashService()
+        self.maxWorkers = maxWorkers
+        self.chunkSize = chunkSize
+        self.manifestModel = manifestModel
+        self.driveClient = ParallelDriveClient(driveService, retryPolicy)
+
+    def restore(self, folderID: str, pathTo: str) -> RestoreReport:
+        """
+        Restores the Google Drive folder to the directory. The errors of a
+        file do not stop the restore of the others; they are in the errors
+        of the report.
+        Args:
+            folderID (str): is the ID of the restored Google Drive folder.
+            pathTo (str): is the directory the files are restored to; it is
+            created if it does not exist.
+        Raises:
+            HttpError: raises if the folder cannot be listed.
+        Returns:
+            RestoreReport: the finished restore.
+        """
+        report = RestoreReport(folderID, pathTo, time.time())
+        try:
+            files, bundles = self.listFiles(folderID, report)
+            os.makedirs(pathTo, exist_ok=True)
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.maxWorkers,
+                thread_name_prefix="RestoreEngine"
+            ) as executor:
+                members = self.__downloadBundles(executor, bundles, pathTo,
+                                                 report)
+                futures = self.__extractMembers(executor, files, members,
+                                                pathTo, report)
+                futures.extend(
+                    executor.submit(self.__restoreFile, file, pathTo, report)
+                    for file in files.values()
+                )
+                concurrent.futures.wait(futures)
+            if not report.errors:
+                shutil.rmtree(os.path.join(pathTo, RESTORE_BUNDLE_DIRECTORY),
+                              ignore_errors=True)
+        finally:
+            report.endTime = time.time()
+            logger.bind(
+                bytes=report.bytesDownloaded,
+                duration=round(report.duration, 3)
+            ).info(
+                f"Restore of {folderID} {report.outcome}: " +
+                f"{report.filesRestored} files restored, " +
+                f"{report.filesSkipped} skipped, {len(report.errors)} failed."
+            )
+        return report
+
+    def listFiles(self, folderID: str, report: RestoreReport
+                  ) -> tuple[dict[str, RemoteFile], list[RemoteFile]]:
+        """
+        Lists the files of the folder and its subfolders page by page.
+        Args:
+            folderID (str): is the ID of the listed Google Drive folder.
+            report (RestoreReport): counts the listed and ignored files.
+        Raises:
+            HttpError: raises if a folder cannot be listed.
+        Returns:
+            tuple[dict[str, RemoteFile], list[RemoteFile]]: the files by
+            the relative path, the most recently modified file of a name,
+            and the bundles.
+        """
+        files: dict[str, RemoteFile] = {}
+        bundles = []
+        folders = [(folderID, "")]
+        while folders:
+            parentID, relativeDirectory = folders.pop()
+            for item in self.driveClient.listChildren(
+                    parentID, self.LISTED_FIELDS
+            ):
+                name = item["name"]
+                relativePath = self.__joinPath(relativeDirectory, name)
+                if not self.__isSafeName(name):
+                    logger.warning(f"{relativePath}: the name is not a " +
+                                   "local file name, the file is ignored.")
+                    report.filesIgnored += 1
+                    continue
+                if item["mimeType"] == GoogleDriveService.FOLDER_MIME_TYPE:
+                    folders.append((item["id"], relativePath))
+                    continue
+                if "md5Checksum" not in item:
+                    logger.warning(f"{relativePath}: the file has no " +
+                                   "content to download, it is ignored.")
+                    report.filesIgnored += 1
+                    continue
+                file = RemoteFile(relativePath, item["id"],
+                                  int(item.get("size", 0)),
+                                  item["md5Checksum"],
+                                  item.get("modifiedTime", ""))
+                report.filesListed += 1
+                if FileBundler.isBundlePath(relativePath):
+                    bundles.append(file)
+                elif relativePath not in files or \
+                        files[relativePath].modifiedTime < file.modifiedTime:
+                    files[relativePath] = file
+        return files, bundles
+
+    @staticmethod
+    def __isSafeName(name: str) -> bool:
+        """Returns whether the name stays in its directory."""
+        return name not in ("", ".", "..") and "/" not in name and \
+            "\\" not in name and "\0" not in name
+
+    def __downloadBundles(self, executor: concurrent.futures.Executor,
+                          bundles: list[RemoteFile], pathTo: str,
+                          report: RestoreReport) -> dict[str, BundleMember]:
+        """
+        Downloads the bundles in parallel.
+        Returns:
+            dict[str, BundleMember]: the members by their relative path,
+            from the most recently modified bundle.
+        """
+        bundleMembers = executor.map(
+            functools.partial(self.__downloadBundle, pathTo, report), bundles
+        )
+        members: dict[str, BundleMember] = {}
+        for _, membersOfBundle in sorted(
+            zip(bundles, bundleMembers),
+            key=lambda item: item[0].modifiedTime
+        ):
+            members.update(membersOfBundle)
+        return members
+
+    def __downloadBundle(self, pathTo: str, report: RestoreReport,
+                         bundle: RemoteFile) -> dict[str, BundleMember]:
+        """
+        Downloads the bundle into RESTORE_BUNDLE_DIRECTORY unless its
+        members are already restored or it has already been downloaded.
+        Returns:
+            dict[str, BundleMember]: the members of the bundle by their
+            relative path, none if the bundle cannot be downloaded.
+        """
+        relativeDirectory = bundle.relativePath.rpartition("/")[0]
+        restoredPaths = self.__getRestoredMembers(bundle, pathTo)
+        if restoredPaths:
+            return {relativePath: BundleMember(bundle, None, None)
+                    for relativePath in restoredPaths}
+        bundlePath = os.path.join(pathTo, RESTORE_BUNDLE_DIRECTORY,
+                                  f"{bundle.fileID}.zip")
+        try:
+            if not self.__isRestored(bundlePath, bundle.size, bundle.md5):
+                os.makedirs(os.path.dirname(bundlePath), exist_ok=True)
+                report.addDownloaded(self.__download(bundle, bundlePath))
+            with zipfile.ZipFile(bundlePath) as archive:
+                memberInfos = archive.infolist()
+        except self.RESTORE_ERRORS as exception:
+            logger.bind(file=bundle.relativePath).error(str(exception))
+            report.addError(bundle.relativePath, exception)
+            return {}
+        return {
+            self.__joinPath(relativeDirectory, memberInfo.filename):
+                BundleMember(bundle, bundlePath, memberInfo)
+            for memberInfo in memberInfos
+            if not memberInfo.is_dir() and
+            self.__isSafeName(memberInfo.filename)
+        }
+
+    def __getRestoredMembers(self, bundle: RemoteFile,
+                             pathTo: str) -> list[str]:
+        """
+        Returns the relative paths of the members of the bundle in the
+        manifest if every local file matches the hashes of its entry, or an
+        empty list if any does not or the bundle is not in the manifest.
+        """
+        if self.manifestModel is None:
+            return []
+        relativeDirectory = bundle.relativePath.rpartition("/")[0]
+        restoredPaths = []
+        isBundleKnown = False
+        for path, entry in \
+                self.manifestModel.getFileEntries(bundle.fileID).items():
+            if FileBundler.isBundlePath(path):
+                isBundleKnown = entry.md5 == bundle.md5
+                continue
+            relativePath = self.__joinPath(relativeDirectory,
+                                           path.rpartition("/")[2])
+            if entry.md5 is None or not self.__isRestored(
+                os.path.join(pathTo, *relativePath.split("/")), entry.size,
+                entry.md5
+            ):
+                return []
+            restoredPaths.append(relativePath)
+        return restoredPaths if isBundleKnown else []
+
+    def __extractMembers(self, executor: concurrent.futures.Executor,
+                         files: dict[str, RemoteFile],
+                         members: dict[str, BundleMember], pathTo: str,
+                         report: RestoreReport
+                         ) -> list[concurrent.futures.Future]:
+        """
+        Extracts the members in parallel; the files of the members of a
+        more recently modified bundle are dropped from the files.
+        Returns:
+            list[concurrent.futures.Future]: the extractions.
+        """
+        futures = []
+        for relativePath, member in members.items():
+            file = files.get(relativePath)
+            if file is not None and \
+               file.modifiedTime >= member.bundle.modifiedTime:
+                continue
+            files.pop(relativePath, None)
+            if member.bundlePath is None or member.memberInfo is None:
+                report.addSkipped()
+                continue
+            futures.append(executor.submit(
+                self.__extractMember, member.bundle, member.bundlePath,
+                member.memberInfo, relativePath, pathTo, report
+            ))
+        return futures
+
+    @staticmethod
+    def __joinPath(relativeDirectory: str, name: str) -> str:
+        """Returns the relative path of the name in the directory."""
+        return f"{relativeDirectory}/{name}" if relativeDirectory else name
+
+    def __restoreFile(self, file: RemoteFile, pathTo: str,
+                      report: RestoreReport) -> None:
+        """Downloads the file unless the local file already matches it."""
+        filePath = os.path.join(pathTo, *file.relativePath.split("/"))
+        try:
+            if self.__isRestored(filePath, file.size, file.md5):
+                report.addSkipped()
+                return
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            report.addRestored(self.__download(file, filePath))
+        except self.RESTORE_ERRORS as exception:
+            logger.bind(file=file.relativePath).error(str(exception))
+            report.addError(file.relativePath, exception)
+
+    def __isRestored(self, filePath: str, size: int, md5: str) -> bool:
+        """Returns whether the local file has the size and the MD5."""
+        try:
+            fileStat = os.stat(filePath)
+            return fileStat.st_size == size and \
+                self.hashService.md5(filePath, fileStat) == md5
+        except OSError:
+            return False
+
+    def __download(self, file: RemoteFile, filePath: str) -> int:
+        """
+        Downloads the file through its part file, continuing the part file
+        of an interrupted download, and renames it to the file path.
+        Raises:
+            HttpError: raises if the file cannot be downloaded.
+            ChecksumMismatchException: raises if the downloaded file does
+            not match the md5Checksum; the part file is deleted.
+        Returns:
+            int: the number of the downloaded bytes.
+        """
+        partPath = f"{filePath}.{file.md5}{RESTORE_PART_SUFFIX}"
+        try:
+            offset = os.path.getsize(partPath)
+        except FileNotFoundError:
+            offset = 0
+        if offset > file.size:
+            os.remove(partPath)
+            offset = 0
+        with open(partPath, 'ab') as part:
+            request = self.driveClient.getService().files().get_media(
+                fileId=file.fileID
+            )
+            position = offset
+            while position < file.size:
+                nextPosition = self.driveClient.execute(
+                    lambda: self.__downloadChunk(request, part, position,
+                                                 file.size)
+                )
+                if nextPosition == position:
+                    break  # The md5Checksum fails the truncated file.
+                position = nextPosition
+
+        md5 = self.hashService.md5(partPath)
+        if md5 != file.md5:
+            os.remove(partPath)
+            raise ChecksumMismatchException(file.relativePath, file.md5, md5)
+        os.replace(partPath, filePath)
+        return file.size - offset
+
+    def __downloadChunk(self, request, part, offset: int,
+                        size: int) -> int:
+        """
+        Downloads the next chunk of the media request by its Range and
+        appends it to the part file.
+        Args:
+            request (HttpRequest): is the request of files.get_media.
+            part (BinaryIO): is the part file opened for appending.
+            offset (int): is the number of the bytes of the part file.
+            size (int): is the size of the file.
+        Raises:
+            HttpError: raises if the chunk cannot be downloaded.
+        Returns:
+            int: the number of the bytes of the part file after the chunk.
+        """
+        headers = dict(request.headers)
+        headers["range"] = \
+            f"bytes={offset}-{min(offset + self.chunkSize, size) - 1}"
+        response, content = request.http.request(request.uri, method="GET",
+                                                 headers=headers)
+        if response.status == 200:
+            # The Range was ignored and the whole file was sent.
+            part.truncate(0)
+            offset = 0
+        elif response.status != 206:
+            raise HttpError(response, content, uri=request.uri)
+        part.write(content)
+        part.flush()
+        return offset + len(content)
+
+    def __extractMember(self, bundle: RemoteFile, bundlePath: str,
+                        memberInfo: zipfile.ZipInfo, relativePath: str,
+                        pathTo: str, report: RestoreReport) -> None:
+        """
+        Extracts the member of the downloaded bundle unless the local file
+        already matches it.
+        """
+        filePath = os.path.join(pathTo, *relativePath.split("/"))
+        partPath = f"{filePath}{RESTORE_PART_SUFFIX}"
+        try:
+            if self.__isExtracted(filePath, memberInfo):
+                report.addSkipped()
+                return
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            with zipfile.ZipFile(bundlePath) as archive, \
+                    archive.open(memberInfo) as member, \
+                    open(partPath, 'wb') as part:
+                shutil.copyfileobj(member, part, HASH_BUFFER_SIZE)
+            os.replace(partPath, filePath)
+            report.addRestored(0)
+        except self.RESTORE_ERRORS as exception:
+            logger.bind(file=relativePath).error(
+                f"{bundle.relativePath}: {exception}"
+            )
+            report.addError(relativePath, exception)
+            if os.path.exists(partPath):
+                os.remove(partPath)
+
+    @staticmethod
+    def __isExtracted(filePath: str, memberInfo: zipfile.ZipInfo) -> bool:
+        """Returns whether the local file matches the member by its CRC."""
+        try:
+            if os.path.getsize(filePath) != memberInfo.file_size:
+                return False
+            crc = 0
+            with open(filePath, 'rb') as file:
+                while chunk := file.read(HASH_BUFFER_SIZE):
+                    crc = zlib.crc32(chunk, crc)
+            return crc == memberInfo.CRC
+        except OSError:
+            return False
@@ -0,0 +1,126 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RetryPolicy class."""
+
+import time
+import random
+import httplib2
+from googleapiclient.errors import HttpError
+from const.const import (
+    MAX_API_RETRIES,
+    API_RETRY_INITIAL_DELAY,
+    API_RETRY_MAX_DELAY,
+)
+
+
+class RetryPolicy:
+    """
+    The class of RetryPolicy - decides which Google Drive API errors are
+    transient and how long to wait before the next attempt.
+
+    Rate limits (429 and 403 with a rate limit reason), server errors (5xx)
+    and dropped connections are retried with an exponential backoff with
+    full jitter; Retry-After of the response is honoured. An expired token
+    (401) is retried once, because the authorized transport refreshes the
+    token on the next request.
+    """
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+    RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+    UNAUTHORIZED_STATUS = 401
+    CONNECTION_ERRORS = (
+        ConnectionError,
+        TimeoutError,
+        httplib2.ServerNotFoundError,
+    )
+    # The errors which may be retried, see isRetryable.
+    RETRIED_ERRORS = (HttpError, *CONNECTION_ERRORS)
+
+    def __init__(self, maxRetries: int = MAX_API_RETRIES,
+                 initialDelay: float = API_RETRY_INITIAL_DELAY,
+                 maxDelay: float = API_RETRY_MAX_DELAY,
+                 sleep=time.sleep,
+                 randomGenerator: random.Random | None = None):
+        """
+        Initializes the retry policy.
+        Args:
+            maxRetries (int): is the number of retries of a request.
+            initialDelay (float): is the maximum delay before the first
+            retry in seconds; it doubles with every retry.
+            maxDelay (float): is the maximum delay in seconds.
+            sleep (Callable[[float], None]): waits for the delay.
+            randomGenerator (random.Random, None): is the source of the
+            jitter.
+        """
+        self.maxRetries = maxRetries
+        self.initialDelay = initialDelay
+        self.maxDelay = maxDelay
+        self.sleep = sleep
+        # The jitter only spreads the retries, it is not a security use.
+        self.randomGenerator = randomGenerator or random.Random()  # nosec B311
+
+    def isRetryable(self, exception: Exception, attempt: int) -> bool:
+        """
+        Checks whether the failed attempt should be retried.
+        Args:
+            exception (Exception): is the error of the attempt.
+            attempt (int): is the number of the failed attempt from 0.
+        """
+        if attempt >= self.maxRetries:
+            return False
+        if isinstance(exception, self.CONNECTION_ERRORS):
+            return True
+        if not isinstance(exception, HttpError):
+            return False
+
+        status = exception.resp.status
+        if status in self.RETRYABLE_STATUSES:
+            return True
+        if status == 403:
+            return not self.RATE_LIMIT_REASONS.isdisjoint(
+                self.getReasons(exception)
+            )
+        return status == self.UNAUTHORIZED_STATUS and attempt == 0
+
+    def getDelay(self, exception: Exception, attempt: int) -> float:
+        """
+        Returns the delay before retrying the failed attempt in seconds.
+        Args:
+            exception (Exception): is the error of the attempt.
+            attempt (int): is the number of the failed attempt from 0.
+        """
+        if isinstance(exception, HttpError):
+            retryAfter = exception.resp.get("retry-after")
+            if retryAfter is not None and retryAfter.isdigit():
+                return min(float(retryAfter), self.maxDelay)
+            if exception.resp.status == self.UNAUTHORIZED_STATUS:
+                return 0.0
+        return self.randomGenerator.uniform(
+            0, min(self.maxDelay, self.initialDelay * 2 ** attempt)
+        )
+
+    def wait(self, exception: Exception, attempt: int) -> None:
+        """Waits before retrying the failed attempt."""
+        delay = self.getDelay(exception, attempt)
+        if delay > 0:
+            self.sleep(delay)
+
+    @staticmethod
+    def getReasons(exception: HttpError) -> set[str]:
+        """Returns the reasons of the errors of the HTTP error."""
+        details = getattr(exception, "error_details", None)
+        if not isinstance(details, list):
+            return set()
+        return {
+            str(detail["reason"]) for detail in details
+            if isinstance(detail, dict) and "reason" in detail
+        }
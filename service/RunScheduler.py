@@ -0,0 +1,139 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RunScheduler class."""
+
+import time
+import collections
+from typing import Callable
+from model.Rule import Rule
+from metrics.metrics import QUEUE_DEPTH
+from const.const import SCHEDULER_AGING_INTERVAL
+
+
+class RunScheduler:
+    """
+    The class of RunScheduler - the queue of the pending runs of the rules.
+    A rule is queued once: a scheduled run absorbs the changed paths of the
+    rule, and the changed paths of the runs triggered by changes are merged.
+
+    pop takes the pending run with the lowest key:
+    1. the priority rank of the rule, raised by one class for every
+       agingInterval seconds of waiting, so no run starves;
+    2. the virtual finish time of the run - its estimated seconds added to
+       the seconds served to its account or to its folder, whichever is
+       more. For the rules of one account and folder it is the shortest job
+       first; the accounts and the folders share the worker by the work;
+    3. the time the run was queued.
+    The served seconds are forgotten when the queue is drained.
+    """
+    def __init__(self,
+                 estimateSeconds: Callable[[Rule, set[str] | None], float],
+                 agingInterval: float = SCHEDULER_AGING_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes the empty queue.
+        Args:
+            estimateSeconds (Callable[[Rule, set[str] | None], float]):
+            returns the estimated seconds of the run of the rule with the
+            changed paths.
+            agingInterval (float): is the waiting in seconds which raises
+            the priority of a run by one class.
+            clock (Callable[[], float]): returns the current time in
+            seconds.
+        """
+        self.estimateSeconds = estimateSeconds
+        self.agingInterval = agingInterval
+        self.clock = clock
+        # The changed paths (None for all files), the queue time and the
+        # estimated seconds of the pending runs by the rule.
+        self.__pendingRuns: dict[Rule, list] = {}
+        self.__servedSeconds: collections.defaultdict[
+            tuple[str, str], float
+        ] = collections.defaultdict(float)
+        self.__chargedSeconds: dict[Rule, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.__pendingRuns)
+
+    def getPendingRules(self) -> list[Rule]:
+        """Returns the rules of the pending runs."""
+        return list(self.__pendingRuns)
+
+    def push(self, rule: Rule, changedPaths: set[str] | None = None) -> None:
+        """
+        Queues the run of the rule or merges it into the pending run.
+        Args:
+            rule (Rule): is the rule to run.
+            changedPaths (set[str], None): are the changed paths to back up
+            or None to scan all files.
+        """
+        pendingRun = self.__pendingRuns.get(rule)
+        if pendingRun is None:
+            self.__pendingRuns[rule] = [
+                None if changedPaths is None else set(changedPaths),
+                self.clock(),
+                self.estimateSeconds(rule, changedPaths)
+            ]
+        elif pendingRun[0] is not None:
+            if changedPaths is None:
+                pendingRun[0] = None
+            else:
+                pendingRun[0] |= changedPaths
+            pendingRun[2] = self.estimateSeconds(rule, pendingRun[0])
+        QUEUE_DEPTH.set(len(self.__pendingRuns))
+
+    def pop(self) -> tuple[Rule, set[str] | None] | None:
+        """
+        Takes the next run from the queue and charges its estimated seconds
+        to its account and its folder.
+        Returns:
+            tuple[Rule, set[str] | None] | None: the rule and the changed
+            paths of the run or None if the queue is empty.
+        """
+        if not self.__pendingRuns:
+            return None
+        now = self.clock()
+        rule = min(self.__pendingRuns,
+                   key=lambda pendingRule: self.__key(pendingRule, now))
+        changedPaths, _, estimatedSeconds = self.__pendingRuns.pop(rule)
+        self.__charge(rule, estimatedSeconds)
+        self.__chargedSeconds[rule] = estimatedSeconds
+        QUEUE_DEPTH.set(len(self.__pendingRuns))
+        return rule, changedPaths
+
+    def complete(self, rule: Rule, seconds: float) -> None:
+        """
+        Replaces the charged estimate of the finished run with its duration.
+        Args:
+            rule (Rule): is the run rule.
+            seconds (float): is the duration of the run.
+        """
+        estimatedSeconds = self.__chargedSeconds.pop(rule, 0.0)
+        if self.__pendingRuns:
+            self.__charge(rule, seconds - estimatedSeconds)
+        elif not self.__chargedSeconds:
+            self.__servedSeconds.clear()
+
+    def __key(self, rule: Rule, now: float) -> tuple[int, float, float]:
+        _, queueTime, estimatedSeconds = self.__pendingRuns[rule]
+        agedClasses = int((now - queueTime) / self.agingInterval)
+        servedSeconds = max(
+            self.__servedSeconds.get(("account", rule.account), 0.0),
+            self.__servedSeconds.get(("folder", rule.folderID), 0.0)
+        )
+        return (max(rule.priorityRank - agedClasses, 0),
+                servedSeconds + estimatedSeconds, queueTime)
+
+    def __charge(self, rule: Rule, seconds: float) -> None:
+        self.__servedSeconds["account", rule.account] += seconds
+        self.__servedSeconds["folder", rule.folderID] += seconds
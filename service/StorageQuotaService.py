@@ -0,0 +1,124 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the StorageQuotaService class."""
+
+import time
+from model.Rule import Rule
+from model.UploadPlan import UploadPlan
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.RetryPolicy import RetryPolicy
+from googleapiclient.errors import HttpError
+from const.const import STORAGE_QUOTA_TTL
+
+
+class StorageQuotaService:
+    """
+    The class of StorageQuotaService - checks the planned runs against the
+    free storage of the accounts from about.get, cached for
+    STORAGE_QUOTA_TTL seconds and lowered by every upload. The files which
+    do not fit are deferred, the most recently modified files are kept.
+    """
+    STORAGE_QUOTA_EXCEEDED_REASON = "storageQuotaExceeded"
+
+    def __init__(self, executor: DriveRequestExecutor):
+        """
+        Initializes the storage quota service.
+        Args:
+            executor (DriveRequestExecutor): executes about.get.
+        """
+        self.executor = executor
+        # The expiry time and the free bytes (None if unlimited) of the
+        # storage quota by the account.
+        self.__storageQuotas: dict[str, list] = {}
+
+    @classmethod
+    def isQuotaExceeded(cls, exception: Exception) -> bool:
+        """
+        Returns whether the error is Google Drive refusing a file because
+        the storage quota is exceeded.
+        """
+        return isinstance(exception, HttpError) and \
+            cls.STORAGE_QUOTA_EXCEEDED_REASON in \
+            RetryPolicy.getReasons(exception)
+
+    def checkPlan(self, rule: Rule, plan: UploadPlan,
+                  reservedBytes: int = 0) -> None:
+        """
+        Defers the planned files which do not fit the free storage of the
+        account of the rule, less the bytes reserved for the runs of a
+        higher priority. The updated files need only the growth of their
+        size.
+        Args:
+            rule (Rule): is the planned rule.
+            plan (UploadPlan): is the plan of the rule.
+            reservedBytes (int): are the bytes of the free storage kept for
+            the queued runs of the rules of a higher priority.
+        """
+        plannedBytes = plan.plannedQuotaBytes
+        if plannedBytes <= 0:
+            return
+        freeBytes = self.getFreeBytes(rule.account)
+        if freeBytes is None:
+            return
+        freeBytes = max(freeBytes - reservedBytes, 0)
+        if plannedBytes <= freeBytes:
+            return
+        plan.trim(freeBytes)
+        self.executor.logger.warning(
+            f"{plannedBytes} more bytes are planned, {freeBytes} bytes are " +
+            f"free in Google Drive: {len(plan.deferredFiles)} files are " +
+            "deferred."
+        )
+
+    def getFreeBytes(self, account: str) -> int | None:
+        """
+        Returns the free bytes of the storage quota of the account, cached
+        for STORAGE_QUOTA_TTL seconds, or None if the storage is unlimited
+        or the quota cannot be read.
+        """
+        cachedQuota = self.__storageQuotas.get(account)
+        if cachedQuota is not None and cachedQuota[0] > time.monotonic():
+            return cachedQuota[1]
+        try:
+            response = self.executor.execute(
+                "about.get",
+                self.executor.driveService.about().get(fields="storageQuota")
+            )
+        except (HttpError, *RetryPolicy.CONNECTION_ERRORS) as exception:
+            self.executor.logger.warning(
+                f"The storage quota cannot be read: {exception}"
+            )
+            return None
+        quota = response.get("storageQuota", {})
+        freeBytes = None
+        if quota.get("limit") is not None:
+            freeBytes = max(
+                int(quota["limit"]) - int(quota.get("usage", 0)), 0
+            )
+        self.__storageQuotas[account] = [
+            time.monotonic() + STORAGE_QUOTA_TTL, freeBytes
+        ]
+        return freeBytes
+
+    def useFreeBytes(self, account: str, numberOfBytes: int) -> None:
+        """Subtracts the uploaded bytes from the cached free bytes."""
+        cachedQuota = self.__storageQuotas.get(account)
+        if cachedQuota is not None and cachedQuota[1] is not None:
+            cachedQuota[1] = max(cachedQuota[1] - numberOfBytes, 0)
+
+    def forgetFreeBytes(self, account: str) -> None:
+        """
+        Drops the cached free bytes of the account, e.g. after Google Drive
+        has refused a file, so the next run reads the quota again.
+        """
+        self.__storageQuotas.pop(account, None)
@@ -0,0 +1,377 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for BackupEngine class."""
+
+import datetime
+import gc
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from googleapiclient.errors import HttpError
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.ManifestRepository import ManifestRepository
+from service.BackupEngine import BackupEngine
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+from benchmark.FaultProfile import FaultProfile
+from metrics.metrics import API_CALLS, UPLOADED_BYTES
+
+
+def sampleValue(metric, **labels):
+    """Returns the value of the sample of the metric with the labels."""
+    for sampleLabels, value in metric.samples():
+        if sampleLabels == labels:
+            return value
+    return 0
+
+
+class TestBackupEngine(unittest.TestCase):
+    """Unit tests for BackupEngine class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filePath = os.path.join(self.directory.name, "file.txt")
+        with open(self.filePath, 'w') as file:
+            file.write("content")
+        self.driveService = Mock()
+        self.driveService.files().create().execute.return_value = {
+            "id": "created"
+        }
+        self.driveService.files().update().execute.return_value = {
+            "id": "created"
+        }
+        self.driveService.files().list().execute.return_value = {"files": []}
+        self.driveService.files().generateIds().execute.return_value = {
+            "ids": ["reserved"]
+        }
+        self.driveService.about().get().execute.return_value = {
+            "storageQuota": {"usage": "0"}
+        }
+        self.engine = BackupEngine(self.driveService)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def createTree(self) -> str:
+        """Creates the directory tree/a.txt, tree/sub/b.txt."""
+        treePath = os.path.join(self.directory.name, "tree")
+        os.makedirs(os.path.join(treePath, "sub"))
+        for relativePath in ("a.txt", os.path.join("sub", "b.txt")):
+            with open(os.path.join(treePath, relativePath), 'w') as file:
+                file.write(relativePath)
+        return treePath
+
+    def testIsRuleDue(self):
+        """Test the time, the weekday and the day of month are checked."""
+        monday = datetime.datetime(2024, 1, 1, 10, 0)
+        self.assertTrue(BackupEngine.isRuleDue(
+            Rule("/a", "1", "acc", "10:00", weekday="Monday"), monday
+        ))
+        self.assertFalse(BackupEngine.isRuleDue(
+            Rule("/a", "1", "acc", "10:00", weekday="Tuesday"), monday
+        ))
+        self.assertFalse(BackupEngine.isRuleDue(
+            Rule("/a", "1", "acc", "10:00", dayOfMonth=2), monday
+        ))
+        self.assertFalse(BackupEngine.isRuleDue(
+            Rule("/a", "1", "acc", "10:01"), monday
+        ))
+
+    def testRunRuleRecordsMetrics(self):
+        """Test an upload counts the bytes and the API calls."""
+        rule = Rule(self.filePath, "folder", "acc", "10:00")
+        calls = sampleValue(API_CALLS, method="files.create", status="200")
+
+        run = self.engine.runRule(rule)
+
+        self.assertEqual(
+            sampleValue(UPLOADED_BYTES, rule=rule.ruleID, account="acc"), 7
+        )
+        self.assertEqual(
+            sampleValue(API_CALLS, method="files.create", status="200"),
+            calls + 1
+        )
+        self.assertEqual(run.outcome, RuleRun.SUCCESS)
+        self.assertEqual((run.filesUploaded, run.bytesUploaded), (1, 7))
+
+    def testRunRuleMissingFolder(self):
+        """Test a missing folder fails the run."""
+        self.driveService.files().get().execute.side_effect = HttpError(
+            Mock(status=404), b"Not found"
+        )
+
+        run = self.engine.runRule(Rule(self.filePath, "folder", "acc",
+                                       "10:00"))
+
+        self.assertEqual(run.outcome, RuleRun.FAILURE)
+        self.assertEqual(run.errorClass, "FolderIDDoesNotExistException")
+        self.assertEqual(run.filesUploaded, 0)
+
+    def testScanDirectory(self):
+        """Test the files of a directory are relative to its parent."""
+        treePath = self.createTree()
+
+        relativePaths = [path for path, *_ in BackupEngine.scan(treePath)]
+
+        self.assertEqual(relativePaths, ["tree/a.txt", "tree/sub/b.txt"])
+
+    def testScanPrunesExcludedDirectories(self):
+        """Test an excluded directory is not listed."""
+        treePath = self.createTree()
+        excludedPaths = set()
+        with patch("os.scandir", wraps=os.scandir) as scandir:
+            files = list(BackupEngine.scan(
+                treePath, Rule(treePath, "id", "acc", "10:00",
+                               filters="sub/").fileFilter, excludedPaths
+            ))
+        self.assertEqual([file[0] for file in files], ["tree/a.txt"])
+        self.assertEqual(excludedPaths, {"tree/sub"})
+        self.assertEqual(scandir.call_count, 1)
+
+    def testRunRuleUploadsOnlyChangedFiles(self):
+        """Test the second run uploads only the changed file."""
+        treePath = self.createTree()
+        manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+        self.addCleanup(manifest.close)
+        engine = BackupEngine(self.driveService, manifest)
+        rule = Rule(treePath, "folder", "acc", "10:00")
+
+        firstRun = engine.runRule(rule)
+        filePath = os.path.join(treePath, "a.txt")
+        with open(filePath, 'w') as file:
+            file.write("changed")
+        os.utime(filePath, ns=(0, 0))
+        secondRun = engine.runRule(rule)
+
+        self.assertEqual((firstRun.filesScanned, firstRun.filesUploaded),
+                         (2, 2))
+        self.assertEqual((secondRun.filesChanged, secondRun.filesUploaded),
+                         (1, 1))
+        self.assertEqual(
+            set(manifest.getEntries(rule.ruleID)),
+            {"tree", "tree/sub", "tree/a.txt", "tree/sub/b.txt"}
+        )
+
+    def testRunRuleSkipsTouchedUnchangedFiles(self):
+        """Test a touched file is uploaded only if its content changed."""
+        treePath = self.createTree()
+        manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+        self.addCleanup(manifest.close)
+        driveService = FakeDriveService()
+        folderID = driveService.addFolder("Backup")
+        engine = BackupEngine(driveService, manifest)
+        rule = Rule(treePath, folderID, "acc", "10:00")
+        engine.runRule(rule)
+
+        touchedPath = os.path.join(treePath, "a.txt")
+        os.utime(touchedPath, ns=(0, 0))
+        changedPath = os.path.join(treePath, "sub", "b.txt")
+        with open(changedPath, 'w') as file:
+            file.write("sub/B.txt")
+        os.utime(changedPath, ns=(0, 0))
+        run = engine.runRule(rule)
+
+        self.assertEqual((run.filesChanged, run.filesUploaded), (1, 1))
+        self.assertEqual(driveService.calls["files.update"], 1)
+        self.assertEqual(manifest.getEntries(rule.ruleID)["tree/a.txt"]
+                         .mtimeNs, 0)
+        self.assertEqual(engine.runRule(rule).filesChanged, 0)
+
+    def testRunRuleChangedPaths(self):
+        """Test only the existing changed files are backed up."""
+        treePath = self.createTree()
+        rule = Rule(treePath, "folder", "acc", "10:00", trigger="onChange")
+
+        run = self.engine.runRule(rule, {"tree/sub/b.txt", "tree/gone.txt",
+                                         "tree/sub"})
+
+        self.assertEqual((run.filesScanned, run.filesUploaded), (1, 1))
+
+    def testPlanRule(self):
+        """Test a plan lists the new files without uploading them."""
+        treePath = self.createTree()
+        driveService = FakeDriveService()
+        engine = BackupEngine(driveService)
+
+        plan = engine.planRule(Rule(treePath, "folder", "acc", "10:00"))
+
+        self.assertEqual([file.relativePath for file in plan.files],
+                         ["tree/a.txt", "tree/sub/b.txt"])
+        self.assertEqual((plan.filesScanned, plan.plannedBytes), (2, 14))
+        self.assertEqual(driveService.numberOfCalls, 0)
+
+    def testPlanRuleLooksUpRemoteFiles(self):
+        """Test a dry run finds the existing files without creating any."""
+        treePath = self.createTree()
+        driveService = FakeDriveService(storageLimit=1000)
+        folderID = driveService.addFolder("Backup")
+        treeID = driveService.addFolder("tree", folderID)
+        driveService.createFile({"name": "a.txt", "parents": [treeID]},
+                                b"old", "id")
+        engine = BackupEngine(driveService)
+        calls = driveService.numberOfCalls
+
+        plan = engine.planRule(Rule(treePath, folderID, "acc", "10:00"),
+                               isRemoteChecked=True).toDict(2.0)
+
+        self.assertEqual(plan["update"], [{"path": "tree/a.txt", "size": 5}])
+        self.assertEqual(plan["create"],
+                         [{"path": "tree/sub/b.txt", "size": 9}])
+        self.assertEqual((plan["plannedBytes"], plan["estimatedSeconds"]),
+                         (14, 2.0))
+        self.assertEqual(driveService.calls["files.create"], 0)
+        self.assertEqual(driveService.numberOfCalls - calls, 3)
+
+    def testPlanRuleListsMissingFiles(self):
+        """Test the files gone since the last run are planned to delete."""
+        treePath = self.createTree()
+        manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+        self.addCleanup(manifest.close)
+        driveService = FakeDriveService()
+        engine = BackupEngine(driveService, manifest)
+        rule = Rule(treePath, driveService.addFolder("Backup"), "acc",
+                    "10:00")
+        engine.runRule(rule)
+        os.remove(os.path.join(treePath, "sub", "b.txt"))
+
+        plan = engine.planRule(rule).toDict()
+
+        self.assertEqual(plan["delete"], ["tree/sub", "tree/sub/b.txt"])
+        self.assertEqual((plan["skip"], plan["create"]), (1, []))
+        self.assertEqual(engine.planRule(rule, {"tree/a.txt"}).toDict()[
+            "delete"
+        ], [])
+
+    def testRunRuleDefersFilesBeyondStorageQuota(self):
+        """Test the newest files which fit the free storage are uploaded."""
+        treePath = self.createTree()
+        os.utime(os.path.join(treePath, "a.txt"), ns=(0, 0))
+        driveService = FakeDriveService(storageLimit=10)
+        folderID = driveService.addFolder("Backup")
+        engine = BackupEngine(driveService)
+        progress = []
+
+        run = engine.runRule(
+            Rule(treePath, folderID, "acc", "10:00"),
+            onProgress=lambda run, plan: progress.append(
+                (run.bytesUploaded, plan.plannedBytes)
+            )
+        )
+
+        self.assertEqual(run.errorClass, "StorageQuotaExceededException")
+        self.assertEqual((run.error.deferredFiles, run.error.deferredBytes),
+                         (1, 5))
+        self.assertEqual((run.filesChanged, run.filesUploaded), (2, 1))
+        self.assertEqual(progress, [(0, 9), (9, 9)])
+        # The folders tree and tree/sub and the file tree/sub/b.txt.
+        self.assertEqual(driveService.calls["files.create"], 3)
+
+    def testRunRuleUpdatesFileNearStorageQuota(self):
+        """Test an updated file needs only the growth of its size."""
+        treePath = self.createTree()
+        manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+        self.addCleanup(manifest.close)
+        driveService = FakeDriveService(storageLimit=100)
+        engine = BackupEngine(driveService, manifest)
+        rule = Rule(treePath, driveService.addFolder("Backup"), "acc",
+                    "10:00")
+        engine.runRule(rule)
+        driveService.storageLimit = driveService.storageUsage + 2
+        with open(os.path.join(treePath, "a.txt"), 'w') as file:
+            file.write("a.txt+")
+
+        run = BackupEngine(driveService, manifest).runRule(rule)
+
+        self.assertIsNone(run.errorClass)
+        self.assertEqual(run.filesUploaded, 1)
+        self.assertEqual(driveService.storageLimit - driveService.storageUsage,
+                         1)
+
+    def testRunRuleDefersFilesOnStorageQuotaError(self):
+        """Test a refused upload defers the rest and rereads the quota."""
+        treePath = self.createTree()
+        driveService = FakeDriveService(storageLimit=100)
+        folderID = driveService.addFolder("Backup")
+        engine = BackupEngine(driveService)
+        rule = Rule(treePath, folderID, "acc", "10:00")
+        engine.runRule(rule, {"tree/a.txt"})
+        driveService.storageLimit = driveService.storageUsage
+
+        run = engine.runRule(rule)
+
+        self.assertEqual(run.errorClass, "StorageQuotaExceededException")
+        # tree/a.txt is replaced by the same size, tree/sub/b.txt is new.
+        self.assertEqual(run.filesUploaded, 1)
+        self.assertEqual(run.error.deferredFiles, 1)
+        self.assertEqual(driveService.calls["about.get"], 1)
+        engine.runRule(rule)
+        self.assertEqual(driveService.calls["about.get"], 2)
+
+    def createFakeEngine(self, faultProfile: FaultProfile):
+        """Returns the fake Drive with the folder and the engine over it."""
+        driveService = FakeDriveService(faultProfile=faultProfile)
+        folderID = driveService.addFolder("Backup")
+        engine = BackupEngine(
+            driveService,
+            retryPolicy=RetryPolicy(sleep=lambda delay: None)
+        )
+        return driveService, folderID, engine
+
+    def testRunRuleFailsAfterRetries(self):
+        """Test a lasting server error is not reported as a missing folder."""
+        _, folderID, engine = self.createFakeEngine(FaultProfile(
+            {FaultProfile.SERVER_ERROR: 1.0}, methods={"files.get"}
+        ))
+
+        run = engine.runRule(Rule(self.filePath, folderID, "acc", "10:00"))
+
+        self.assertEqual(run.errorClass, "HttpError")
+        self.assertEqual(run.retries, engine.retryPolicy.maxRetries)
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc")
+    def testUploadClosesFile(self):
+        """Test the uploaded file is closed without the garbage collector."""
+        driveService = FakeDriveService()
+        profiler = Profiler(True, isCProfileEnabled=False,
+                            outputDirectory=self.directory.name)
+        engine = BackupEngine(driveService, profiler=profiler)
+        rule = Rule(self.filePath, driveService.addFolder("Backup"), "acc",
+                    "10:00")
+        fileDescriptors = len(os.listdir("/proc/self/fd"))
+
+        gc.disable()
+        try:
+            with profiler.profileRun(rule.ruleID):
+                run = engine.runRule(rule)
+            openFileDescriptors = len(os.listdir("/proc/self/fd"))
+        finally:
+            gc.enable()
+
+        self.assertEqual(run.filesUploaded, 1)
+        self.assertEqual(openFileDescriptors, fileDescriptors)
+
+
+if __name__ == "__main__":
+    unittest.main()
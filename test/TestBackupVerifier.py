@@ -0,0 +1,115 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing unit tests for BackupVerifier class."""
+
+import os
+import tempfile
+import unittest
+
+from model.Rule import Rule
+from model.ManifestRepository import ManifestRepository
+from service.BackupEngine import BackupEngine
+from service.BackupVerifier import BackupVerifier
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestBackupVerifier(unittest.TestCase):
+    """Unit tests for BackupVerifier class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        treePath = os.path.join(self.directory.name, "tree")
+        os.makedirs(os.path.join(treePath, "sub"))
+        for relativePath in ("a.txt", "c.txt", os.path.join("sub", "b.txt")):
+            with open(os.path.join(treePath, relativePath), 'w') as file:
+                file.write(relativePath)
+        self.manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+        self.driveService = FakeDriveService()
+        self.engine = BackupEngine(self.driveService, self.manifest)
+        self.rule = Rule(treePath, self.driveService.addFolder("Backup"),
+                         "acc", "10:00")
+        self.engine.runRule(self.rule)
+        self.verifier = BackupVerifier(self.driveService, self.manifest)
+
+    def tearDown(self):
+        self.manifest.close()
+        self.directory.cleanup()
+
+    def testVerifyRuleListsOnly(self):
+        report = self.verifier.verifyRule(self.rule)
+
+        self.assertEqual(report.outcome, "success")
+        self.assertEqual(report.filesChecked, 3)
+        # The root tree in the rule folder, tree and tree/sub.
+        self.assertEqual(report.listCalls, 3)
+        self.assertEqual(set(self.driveService.calls) - {"files.get"},
+                         {"files.generateIds", "files.create", "files.list",
+                          "about.get"})
+
+    def testVerifyRuleReportsAndRequeuesBadFiles(self):
+        entries = self.manifest.getEntries(self.rule.ruleID)
+        self.driveService.deleteFile(entries["tree/a.txt"].fileID)
+        self.driveService.updateFile(entries["tree/c.txt"].fileID, {},
+                                     b"corrupted", None)
+        self.driveService.createFile(
+            {"name": "extra.txt", "parents": [entries["tree/sub"].fileID]},
+            b"extra", None
+        )
+
+        report = self.verifier.verifyRule(self.rule, isRequeued=True)
+
+        self.assertEqual(report.outcome, "failure")
+        self.assertEqual(report.missing, ["tree/a.txt"])
+        self.assertEqual(list(report.mismatched), ["tree/c.txt"])
+        self.assertEqual(report.extra, ["tree/sub/extra.txt"])
+        self.assertEqual(report.requeued, 2)
+        run = self.engine.runRule(self.rule)
+        self.assertEqual(run.filesUploaded, 2)
+        self.assertEqual(self.verifier.verifyRule(self.rule).outcome,
+                         "success")
+
+    def testVerifyRuleListsOnlyItsRootInSharedFolder(self):
+        """Test the files of two rules sharing a folder are not extra."""
+        filePath = os.path.join(self.directory.name, "d.txt")
+        with open(filePath, 'w') as file:
+            file.write("d.txt")
+        fileRule = Rule(filePath, self.rule.folderID, "acc", "10:00")
+        self.engine.runRule(fileRule)
+
+        report = self.verifier.verifyRule(self.rule)
+        fileReport = self.verifier.verifyRule(fileRule)
+
+        self.assertEqual((report.outcome, report.filesChecked, report.extra),
+                         ("success", 3, []))
+        self.assertEqual((fileReport.outcome, fileReport.filesChecked,
+                          fileReport.extra, fileReport.listCalls),
+                         ("success", 1, [], 1))
+
+    def testVerifyRuleRehashesLocalFiles(self):
+        """Test a local change not uploaded yet is a mismatch."""
+        filePath = os.path.join(self.rule.pathFrom, "a.txt")
+        with open(filePath, 'w') as file:
+            file.write("A.txt")
+
+        self.assertEqual(self.verifier.verifyRule(self.rule).outcome,
+                         "success")
+        report = self.verifier.verifyRule(self.rule, isRehashed=True)
+
+        self.assertEqual(list(report.mismatched), ["tree/a.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
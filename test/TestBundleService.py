@@ -0,0 +1,119 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for BundleService class."""
+
+import os
+import tempfile
+import unittest
+
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import UploadPlan, PlannedFile
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.StorageQuotaService import StorageQuotaService
+from service.BundleService import BundleService
+from service.FileBundler import Bundle
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestBundleService(unittest.TestCase):
+    """Unit tests for BundleService class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.treePath = os.path.join(self.directory.name, "tree")
+        os.makedirs(self.treePath)
+        self.driveService = FakeDriveService()
+        self.folderID = self.driveService.addFolder("tree")
+        executor = DriveRequestExecutor(self.driveService, RetryPolicy(),
+                                        Profiler())
+        self.bundleService = BundleService(executor,
+                                           StorageQuotaService(executor))
+        self.rule = Rule(self.treePath, "folder", "acc", "10:00",
+                         mode="bundle:1K")
+        self.run = RuleRun(self.rule.ruleID, 0.0)
+        self.uploadedEntries: dict[str, ManifestEntry] = {}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def planFiles(self, manifest: dict[str, ManifestEntry],
+                  **contents: bytes) -> list[PlannedFile | Bundle]:
+        """Writes the files of the tree and plans their uploads."""
+        plan = UploadPlan(self.rule.ruleID)
+        for name, content in contents.items():
+            filePath = os.path.join(self.treePath, name)
+            with open(filePath, 'wb') as file:
+                file.write(content)
+            relativePath = f"tree/{name}"
+            plan.files.append(PlannedFile(relativePath, filePath,
+                                          os.stat(filePath),
+                                          manifest.get(relativePath)))
+        return self.bundleService.planUploads(self.rule, plan, manifest)
+
+    def backupBundle(self, bundle: Bundle) -> Exception | None:
+        """Uploads the bundle into the folder of the tree."""
+        return self.bundleService.backupBundle(
+            self.rule, self.run, {"rule": self.rule.ruleID, "account": "acc"},
+            self.uploadedEntries, bundle, lambda _directory: self.folderID
+        )
+
+    def testPlanUploadsBundlesSmallFilesLast(self):
+        """Test the large files are uploaded on their own before bundles."""
+        uploads = self.planFiles({}, a=b"a", big=b"x" * 2048, b=b"b")
+
+        bundle = uploads[1]
+        self.assertEqual(uploads[0].relativePath, "tree/big")
+        self.assertIsInstance(bundle, Bundle)
+        self.assertEqual([file.relativePath for file in bundle.files],
+                         ["tree/a", "tree/b"])
+
+    def testPlanUploadsWithoutBundleMode(self):
+        """Test the files of a rule which does not bundle are kept."""
+        self.rule = Rule(self.treePath, "folder", "acc", "10:00")
+
+        uploads = self.planFiles({}, a=b"a")
+
+        self.assertEqual([upload.relativePath for upload in uploads],
+                         ["tree/a"])
+
+    def testBackupBundleUpdatesUploadedBundleInPlace(self):
+        """Test a bundle packed again is updated, not created again."""
+        bundle = self.planFiles({}, a=b"a", b=b"b")[0]
+
+        self.assertIsNone(self.backupBundle(bundle))
+        self.assertEqual(self.run.filesUploaded, 2)
+        self.assertEqual(self.driveService.calls["files.create"], 1)
+        manifest = dict(self.uploadedEntries)
+        self.assertEqual(manifest["tree/a"].fileID,
+                         manifest[bundle.relativePath].fileID)
+
+        self.assertIsNone(self.backupBundle(
+            self.planFiles(manifest, a=b"changed")[0]
+        ))
+        self.assertEqual(self.driveService.calls["files.create"], 1)
+        self.assertEqual(self.driveService.calls["files.update"], 1)
+        self.assertEqual(self.run.filesUploaded, 3)
+
+    def testBackupBundleNeedsPlan(self):
+        """Test a bundle which has not been planned is refused."""
+        with self.assertRaises(ValueError):
+            self.backupBundle(Bundle("tree/.goodab-bundle-1.zip", None,
+                                     ["tree/a"], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for ChangeWatcher class."""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from model.Rule import Rule
+from service.ChangeWatcher import ChangeWatcher
+
+
+class TestChangeWatcher(unittest.TestCase):
+    """Unit tests for ChangeWatcher class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.treePath = os.path.join(self.directory.name, "tree")
+        os.makedirs(os.path.join(self.treePath, "sub"))
+        self.now = 0.0
+        self.watcher = ChangeWatcher(maxDelay=60, fallbackScanInterval=100,
+                                     clock=lambda: self.now)
+        self.rule = Rule(self.treePath, "folder", "acc", "10:00",
+                         trigger="onChange:5")
+
+    def tearDown(self):
+        self.watcher.close()
+        self.directory.cleanup()
+
+    def writeFile(self, *names: str) -> None:
+        with open(os.path.join(self.treePath, *names), 'w') as file:
+            file.write("content")
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "requires inotify")
+    def testCoalescesUntilQuiet(self):
+        """Test the changes are returned once after the quiet period."""
+        self.assertTrue(self.watcher.watch(self.rule))
+        self.writeFile("a.txt")
+        self.writeFile("sub", "b.txt")
+        self.watcher.poll(1)
+        self.now = 4
+        self.writeFile("a.txt")
+        self.watcher.poll(1)
+
+        self.now = 8
+        self.assertEqual(self.watcher.takeChanges(), [])
+        self.now = 9
+        self.assertEqual(self.watcher.takeChanges(),
+                         [(self.rule, {"tree/a.txt", "tree/sub/b.txt"})])
+        self.assertEqual(self.watcher.takeChanges(), [])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "requires inotify")
+    def testMovedInDirectory(self):
+        """Test a moved in directory is watched with all its files."""
+        self.watcher.watch(self.rule)
+        outsidePath = os.path.join(self.directory.name, "outside")
+        os.makedirs(outsidePath)
+        with open(os.path.join(outsidePath, "c.txt"), 'w') as file:
+            file.write("content")
+        shutil.move(outsidePath, os.path.join(self.treePath, "moved"))
+        self.watcher.poll(1)
+        self.writeFile("moved", "d.txt")
+        self.watcher.poll(1)
+
+        self.now = 5
+        self.assertEqual(
+            self.watcher.takeChanges(),
+            [(self.rule, {"tree/moved/c.txt", "tree/moved/d.txt"})]
+        )
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "requires inotify")
+    def testUnwatch(self):
+        """Test the removed rules are not watched."""
+        self.watcher.setRules([self.rule])
+        self.watcher.setRules([])
+        self.writeFile("a.txt")
+        self.watcher.poll(0.1)
+        self.now = 100
+        self.assertEqual(self.watcher.takeChanges(), [])
+
+    def testFallbackScan(self):
+        """Test a rule which cannot be watched is scanned periodically."""
+        rule = Rule(os.path.join(self.treePath, "missing", "file"),
+                    "folder", "acc", "10:00", trigger="onChange")
+        self.assertFalse(self.watcher.watch(rule))
+        self.assertEqual(self.watcher.takeChanges(), [])
+        self.now = 100
+        self.assertEqual(self.watcher.takeChanges(), [(rule, None)])
+        self.now = 150
+        self.assertEqual(self.watcher.takeChanges(), [])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "requires inotify")
+    def testWatchRetry(self):
+        """Test a rule which cannot be watched is watched again later."""
+        path = os.path.join(self.treePath, "missing", "watched")
+        rule = Rule(path, "folder", "acc", "10:00", trigger="onChange:5")
+        self.assertFalse(self.watcher.watch(rule))
+        self.now = 60
+        self.assertEqual(self.watcher.takeChanges(), [])
+        os.makedirs(os.path.join(path, "sub"))
+        self.now = 170
+        self.assertEqual(self.watcher.takeChanges(), [(rule, None)])
+
+        self.now = 180
+        self.assertEqual(self.watcher.takeChanges(), [])
+        self.now = 185
+        self.assertEqual(self.watcher.takeChanges(), [(rule, None)])
+        with open(os.path.join(path, "sub", "a.txt"), 'w') as file:
+            file.write("content")
+        self.watcher.poll(1)
+        self.now = 300
+        self.assertEqual(self.watcher.takeChanges(),
+                         [(rule, {"watched/sub/a.txt"})])
+
+
+if __name__ == "__main__":
+    unittest.main()
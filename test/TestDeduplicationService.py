@@ -0,0 +1,129 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for DeduplicationService class."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.ManifestRepository import ManifestRepository, ManifestEntry
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.DeduplicationService import DeduplicationService
+from service.HashService import HashService
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+
+
+@patch("service.DeduplicationService.DEDUPLICATION_THRESHOLD", 1)
+class TestDeduplicationService(unittest.TestCase):
+    """Unit tests for DeduplicationService class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filePath = os.path.join(self.directory.name, "a.txt")
+        with open(self.filePath, 'w') as file:
+            file.write("content")
+        self.fileStat = os.stat(self.filePath)
+        self.manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+        self.driveService = FakeDriveService()
+        self.folderID = self.driveService.addFolder("Backup")
+        self.hashService = HashService()
+        self.deduplicationService = DeduplicationService(
+            DriveRequestExecutor(self.driveService, RetryPolicy(),
+                                 Profiler()),
+            self.hashService, self.manifest
+        )
+        self.sourceID = self.driveService.createFile(
+            {"name": "a.txt", "parents": [self.folderID]}, b"content", "id"
+        )["id"]
+
+    def tearDown(self):
+        self.hashService.close()
+        self.manifest.close()
+        self.directory.cleanup()
+
+    def indexSource(self) -> None:
+        """Indexes and saves the content of the uploaded source file."""
+        self.deduplicationService.indexContent(None, self.fileStat, {
+            "id": self.sourceID,
+            "md5Checksum": self.hashService.md5(self.filePath)
+        })
+        self.deduplicationService.saveContents("acc")
+        self.deduplicationService.reset()
+
+    def copyContent(self) -> dict | None:
+        """Copies the content of the local file into the folder."""
+        return self.deduplicationService.copyContent(
+            "acc", self.filePath, self.fileStat, self.folderID, "b.txt"
+        )
+
+    def testCopyContentCopiesIndexedContent(self):
+        """Test a content uploaded by another rule is copied."""
+        self.indexSource()
+
+        copiedFile = self.copyContent()
+
+        self.assertIsNotNone(copiedFile)
+        self.assertEqual(
+            self.driveService.getFile(copiedFile["id"], "name, parents"),
+            {"name": "b.txt", "parents": [self.folderID]}
+        )
+        self.assertEqual(self.driveService.calls["files.copy"], 1)
+
+    def testCopyContentWithoutIndexedContent(self):
+        """Test a content which is not indexed is not hashed nor copied."""
+        self.assertIsNone(self.copyContent())
+        self.assertEqual(self.driveService.calls["files.copy"], 0)
+
+    def testCopyContentDeletesCopyOfChangedSource(self):
+        """Test the copy of a changed source is deleted and not reused."""
+        self.indexSource()
+        self.driveService.updateFile(self.sourceID, {}, b"other", None)
+
+        self.assertIsNone(self.copyContent())
+        self.assertIsNone(self.copyContent())
+        self.assertEqual(self.driveService.calls["files.copy"], 1)
+        self.assertEqual(self.driveService.calls["files.delete"], 1)
+        self.deduplicationService.saveContents("acc")
+        self.assertIsNone(self.manifest.findContent(
+            "acc", self.hashService.md5(self.filePath), self.fileStat.st_size
+        ))
+
+    def testIndexContentReplacesUpdatedContent(self):
+        """Test the replaced content of an updated file is stale."""
+        self.indexSource()
+        oldMD5 = self.hashService.md5(self.filePath)
+        with open(self.filePath, 'w') as file:
+            file.write("changed")
+        fileStat = os.stat(self.filePath)
+        md5 = self.hashService.md5(self.filePath)
+
+        self.deduplicationService.indexContent(
+            ManifestEntry(fileStat.st_size, 0, self.sourceID, oldMD5),
+            fileStat, {"id": self.sourceID, "md5Checksum": md5}
+        )
+        self.deduplicationService.saveContents("acc")
+
+        self.assertIsNone(self.manifest.findContent("acc", oldMD5,
+                                                    fileStat.st_size))
+        self.assertEqual(self.manifest.findContent("acc", md5,
+                                                   fileStat.st_size),
+                         self.sourceID)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for DriveRequestExecutor class."""
+
+import io
+import unittest
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+from model.RuleRun import RuleRun
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+from benchmark.FaultProfile import FaultProfile
+
+
+class TestDriveRequestExecutor(unittest.TestCase):
+    """Unit tests for DriveRequestExecutor class."""
+
+    def setUp(self):
+        self.driveService = FakeDriveService()
+        self.folderID = self.driveService.addFolder("Backup")
+        self.executor = DriveRequestExecutor(
+            self.driveService, RetryPolicy(sleep=lambda delay: None),
+            Profiler()
+        )
+        self.executor.run = RuleRun("rule", 0.0)
+
+    def getFolder(self) -> dict:
+        """Executes files.get of the folder."""
+        return self.executor.execute(
+            "files.get",
+            self.driveService.files().get(fileId=self.folderID, fields="id")
+        )
+
+    def testExecuteRetriesServerErrors(self):
+        """Test a server error is retried and counted in the run."""
+        self.driveService.faultProfile = FaultProfile(
+            script={1: FaultProfile.SERVER_ERROR}, methods={"files.get"}
+        )
+
+        self.assertEqual(self.getFolder(), {"id": self.folderID})
+        self.assertEqual((self.executor.run.retries,
+                          self.executor.run.apiCalls), (1, 2))
+        self.assertEqual(self.driveService.calls["files.get"], 2)
+
+    def testExecuteRaisesAfterRetries(self):
+        """Test a lasting server error raises after the last retry."""
+        self.driveService.faultProfile = FaultProfile(
+            {FaultProfile.SERVER_ERROR: 1.0}, methods={"files.get"}
+        )
+
+        with self.assertRaises(HttpError):
+            self.getFolder()
+        self.assertEqual(self.executor.run.retries,
+                         self.executor.retryPolicy.maxRetries)
+
+    def testResumableUploadResendsOnlyDroppedChunk(self):
+        """Test a dropped connection resends only the current chunk."""
+        self.driveService.faultProfile = FaultProfile(
+            script={2: FaultProfile.CONNECTION_DROP},
+            methods={"upload.chunk"}
+        )
+        media = MediaIoBaseUpload(io.BytesIO(b"x" * 600 * 1024),
+                                  mimetype="application/octet-stream",
+                                  chunksize=256 * 1024, resumable=True)
+
+        self.executor.sendFile(media, None, self.folderID, "file.bin", True)
+
+        self.assertEqual(self.driveService.calls["upload.chunk"], 4)
+        self.assertEqual(self.driveService.wastedBytes, 128 * 1024)
+        self.assertEqual(self.driveService.uploadedBytes, (600 + 128) * 1024)
+
+    def testCreateFetchesFileOfLostResponse(self):
+        """Test a create applied before its lost response is not repeated."""
+        self.driveService.faultProfile = FaultProfile(
+            script={1: FaultProfile.RESPONSE_LOST}, methods={"files.create"}
+        )
+        fileID = self.executor.reserveFileID()
+
+        createdFile = self.executor.create(
+            "files.create",
+            self.driveService.files().create(
+                body={"id": fileID, "name": "a.txt",
+                      "parents": [self.folderID]},
+                fields="id"
+            ),
+            fileID,
+            "id"
+        )
+
+        self.assertEqual(createdFile, {"id": fileID})
+        self.assertEqual(self.executor.run.retries, 1)
+        self.assertEqual((self.driveService.calls["files.create"],
+                          self.driveService.calls["files.get"]), (2, 1))
+        folder = self.driveService.listFiles(
+            f"'{self.folderID}' in parents", "files(id)", 100, None, None
+        )
+        self.assertEqual(folder["files"], [{"id": fileID}])
+
+    def testReserveFileIDGeneratesIDsOnce(self):
+        """Test the reserved IDs are generated by one request."""
+        fileIDs = {self.executor.reserveFileID() for _ in range(3)}
+
+        self.assertEqual(len(fileIDs), 3)
+        self.assertEqual(self.driveService.calls["files.generateIds"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for ErrorAggregator class."""
+
+import unittest
+
+from model.ErrorAggregator import ErrorAggregator
+
+
+class TestErrorAggregator(unittest.TestCase):
+    """Unit tests for ErrorAggregator class."""
+
+    def setUp(self):
+        self.aggregator = ErrorAggregator(window=60, notificationInterval=300,
+                                          maxGroups=3)
+
+    def testGroupsByClassAndRule(self):
+        """Test that the errors coalesce by the class and the rule."""
+        first = self.aggregator.add("HttpError", "rule", "first", 10, 0)
+        second = self.aggregator.add("HttpError", "rule", "second", 5, 30)
+        self.aggregator.add("HttpError", "other", "other", 1, 30)
+        self.aggregator.add("OSError", "rule", "other", 1, 30)
+        self.assertIs(first, second)
+        self.assertEqual(first.count, 15)
+        self.assertEqual(first.message, "second")
+        self.assertEqual((first.firstTime, first.lastTime), (0, 30))
+        self.assertEqual(len(self.aggregator.groups), 3)
+
+    def testWindow(self):
+        """Test that an error after the window opens a new group."""
+        first = self.aggregator.add("HttpError", "rule", "first", 1, 0)
+        second = self.aggregator.add("HttpError", "rule", "second", 1, 61)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.aggregator.groups, [first, second])
+
+    def testMaxGroups(self):
+        """Test that only the newest groups are kept."""
+        for number in range(5):
+            self.aggregator.add("HttpError", f"rule{number}", "", 1, number)
+        self.assertEqual(
+            [group.ruleID for group in self.aggregator.groups],
+            ["rule2", "rule3", "rule4"]
+        )
+
+    def testNotificationRateLimit(self):
+        """Test that the errors are notified once per interval."""
+        self.assertIsNone(self.aggregator.nextNotificationDelay(0))
+        self.aggregator.add("HttpError", "rule", "revoked", 5000, 0)
+        summary = self.aggregator.takeNotification(0)
+        self.assertIn("5000 errors in 1 rules", summary)
+        self.assertIn("HttpError in the rule rule (5000x)", summary)
+
+        self.aggregator.add("HttpError", "rule", "revoked", 1, 10)
+        self.aggregator.add("OSError", "other", "denied", 2, 20)
+        self.assertIsNone(self.aggregator.takeNotification(20))
+        self.assertEqual(self.aggregator.nextNotificationDelay(20), 280)
+        summary = self.aggregator.takeNotification(300)
+        self.assertIn("3 errors in 2 rules", summary)
+        self.assertIsNone(self.aggregator.nextNotificationDelay(300))
+
+    def testClear(self):
+        """Test that clear removes the groups and the notification."""
+        self.aggregator.add("HttpError", "rule", "", 1, 0)
+        self.aggregator.clear()
+        self.assertEqual(self.aggregator.groups, [])
+        self.assertIsNone(self.aggregator.takeNotification(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
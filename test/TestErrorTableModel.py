@@ -0,0 +1,69 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for ErrorTableModel class."""
+
+import unittest
+from unittest.mock import Mock
+
+from model.ErrorGroup import ErrorGroup
+from view.ErrorTableModel import ErrorTableModel
+
+
+class TestErrorTableModel(unittest.TestCase):
+    """Unit tests for ErrorTableModel class."""
+
+    def setUp(self):
+        self.model = ErrorTableModel(maxGroups=2)
+        self.groups = [
+            ErrorGroup("HttpError", f"rule{number}", "message", 1, number)
+            for number in range(3)
+        ]
+
+    def testNewestFirst(self):
+        """Test that the new groups are inserted at the top."""
+        inserted = Mock()
+        self.model.rowsInserted.connect(inserted)
+        self.model.updateGroup(self.groups[0])
+        self.model.updateGroup(self.groups[1])
+        self.assertEqual(inserted.call_count, 2)
+        self.assertIs(self.model.groupAt(0), self.groups[1])
+        index = self.model.index(0, ErrorTableModel.RULE_ID_COLUMN)
+        self.assertEqual(self.model.data(index), "rule1")
+
+    def testChangedGroupUpdatesRow(self):
+        """Test that a changed group emits dataChanged of its row only."""
+        self.model.updateGroup(self.groups[0])
+        self.model.updateGroup(self.groups[1])
+        changed = Mock()
+        self.model.dataChanged.connect(changed)
+        self.groups[0].add("again", 4, 10)
+        self.model.updateGroup(self.groups[0])
+        self.assertEqual(self.model.rowCount(), 2)
+        topLeft, bottomRight = changed.call_args[0][:2]
+        self.assertEqual((topLeft.row(), bottomRight.row()), (1, 1))
+        index = self.model.index(1, ErrorTableModel.COUNT_COLUMN)
+        self.assertEqual(self.model.data(index), "5")
+
+    def testMaxGroups(self):
+        """Test that the oldest group is removed beyond maxGroups."""
+        for group in self.groups:
+            self.model.updateGroup(group)
+        self.assertEqual(self.model.rowCount(), 2)
+        self.assertIs(self.model.groupAt(1), self.groups[1])
+
+        self.model.setGroups([])
+        self.assertEqual(self.model.rowCount(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for FakeDriveService class."""
+
+import os
+import hashlib
+import tempfile
+import unittest
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+from benchmark.FakeDriveService import FakeDriveService
+from benchmark.FaultProfile import FaultProfile
+from benchmark.DriveBenchmark import compareResults, runScenario
+from service.RetryPolicy import RetryPolicy
+
+
+class TestFakeDriveService(unittest.TestCase):
+    """Unit tests for FakeDriveService class."""
+
+    def setUp(self):
+        self.service = FakeDriveService()
+        self.folderID = self.service.addFolder("Backup")
+        self.directory = tempfile.TemporaryDirectory()
+        self.filePath = os.path.join(self.directory.name, "file.bin")
+        with open(self.filePath, 'wb') as file:
+            file.write(b"x" * 1000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testCreateListAndGet(self):
+        """Test the created files are listed by the query in pages."""
+        for name in ("b", "it's", "a"):
+            self.service.files().create(
+                body={"name": name, "parents": [self.folderID]}
+            ).execute()
+
+        query = f"'{self.folderID}' in parents and trashed = false"
+        first = self.service.files().list(
+            q=query, pageSize=2, orderBy="name",
+            fields="nextPageToken, files(id, name)"
+        ).execute()
+        second = self.service.files().list(
+            q=query, pageSize=2, pageToken=first["nextPageToken"],
+            orderBy="name"
+        ).execute()
+        found = self.service.files().list(
+            q=f"'{self.folderID}' in parents and name = 'it\\'s'"
+        ).execute()["files"]
+
+        self.assertEqual([file["name"] for file in first["files"]],
+                         ["a", "b"])
+        self.assertEqual(set(first["files"][0]), {"id", "name"})
+        self.assertEqual([file["name"] for file in second["files"]],
+                         ["it's"])
+        self.assertNotIn("nextPageToken", second)
+        self.assertEqual(
+            self.service.files().get(fileId=found[0]["id"]).execute()["name"],
+            "it's"
+        )
+        self.assertEqual(self.service.calls["files.list"], 3)
+
+    def testUploadAndMissingFile(self):
+        """Test the uploaded content and 404 of a missing file."""
+        fileID = self.service.files().create(
+            body={"name": "file.bin", "parents": [self.folderID]},
+            media_body=MediaFileUpload(self.filePath)
+        ).execute()["id"]
+
+        file = self.service.files().get(fileId=fileID, fields="*").execute()
+        self.assertEqual(file["size"], "1000")
+        self.assertEqual(file["md5Checksum"],
+                         hashlib.md5(b"x" * 1000,
+                                     usedforsecurity=False).hexdigest())
+        with self.assertRaises(HttpError) as context:
+            self.service.files().update(
+                fileId="missing", media_body=MediaFileUpload(self.filePath)
+            ).execute()
+        self.assertEqual(context.exception.resp.status, 404)
+
+    def testResumableUpload(self):
+        """Test a resumable upload is sent in chunks."""
+        media = MediaFileUpload(self.filePath, chunksize=256, resumable=True)
+        request = self.service.files().create(
+            body={"name": "file.bin", "parents": [self.folderID]},
+            media_body=media
+        )
+
+        progress = []
+        response = None
+        while response is None:
+            status, response = request.next_chunk()
+            if status is not None:
+                progress.append(status.resumable_progress)
+
+        self.assertEqual(progress, [256, 512, 768])
+        self.assertEqual(self.service.calls["upload.chunk"], 4)
+        self.assertEqual(self.service.uploadedBytes, 1000)
+
+    def testStorageQuota(self):
+        """Test the storage quota is reported and enforced."""
+        self.service.storageLimit = 1500
+        self.service.files().create(
+            body={"name": "file.bin", "parents": [self.folderID]},
+            media_body=MediaFileUpload(self.filePath)
+        ).execute()
+
+        self.assertEqual(self.service.about().get(
+            fields="storageQuota"
+        ).execute(), {"storageQuota": {"limit": "1500", "usage": "1000"}})
+        with self.assertRaises(HttpError) as context:
+            self.service.files().create(
+                body={"name": "file2.bin", "parents": [self.folderID]},
+                media_body=MediaFileUpload(self.filePath)
+            ).execute()
+        self.assertEqual(context.exception.resp.status, 403)
+        self.assertEqual(RetryPolicy.getReasons(context.exception),
+                         {"storageQuotaExceeded"})
+
+    def testBatch(self):
+        """Test the requests of a batch are sent in one call."""
+        responses = {}
+        batch = self.service.new_batch_http_request(
+            callback=lambda requestID, response, exception:
+                responses.__setitem__(requestID, (response, exception))
+        )
+        batch.add(self.service.files().get(fileId=self.folderID))
+        batch.add(self.service.files().get(fileId="missing"))
+        batch.execute()
+
+        self.assertEqual(responses["1"][0]["name"], "Backup")
+        self.assertEqual(responses["2"][1].resp.status, 404)
+        self.assertEqual(self.service.calls["batch"], 1)
+
+    def testInjectedFaults(self):
+        """Test the scripted faults fail the requests without applying them."""
+        self.service.faultProfile = FaultProfile(script={
+            1: FaultProfile.USER_RATE_LIMIT,
+            2: FaultProfile.CONNECTION_DROP,
+        })
+        request = self.service.files().create(
+            body={"name": "file.bin", "parents": [self.folderID]},
+            media_body=MediaFileUpload(self.filePath)
+        )
+
+        with self.assertRaises(HttpError) as context:
+            request.execute()
+        with self.assertRaises(ConnectionResetError):
+            request.execute()
+        request.execute()
+
+        self.assertEqual(context.exception.resp.status, 403)
+        self.assertEqual(context.exception.error_details[0]["reason"],
+                         "userRateLimitExceeded")
+        self.assertEqual(self.service.wastedBytes, 1500)
+        self.assertEqual(len(self.service.files().list(
+            q=f"'{self.folderID}' in parents"
+        ).execute()["files"]), 1)
+
+    def testBenchmarkScenario(self):
+        """Test a small scenario and its comparison with a baseline."""
+        metrics = runScenario("deepTree", scale=0.02)
+        baseline = {"scenarios": {"deepTree": dict(
+            metrics, apiCallsPerFile=metrics["apiCallsPerFile"] / 2
+        )}}
+
+        lines = compareResults(baseline, {"scenarios": {"deepTree": metrics}},
+                               threshold=0.1)
+
+        self.assertEqual(metrics["files"], 20)
+        self.assertEqual(metrics["rerunApiCalls"], 1)
+        self.assertEqual(
+            [line for line in lines if line.startswith("REGRESSION")],
+            [line for line in lines if "apiCallsPerFile" in line]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for FileBundler class."""
+
+import io
+import os
+import hashlib
+import tempfile
+import unittest
+import zipfile
+
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import PlannedFile
+from service.FileBundler import FileBundler
+
+
+class TestFileBundler(unittest.TestCase):
+    """Unit tests for FileBundler class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.treePath = os.path.join(self.directory.name, "tree")
+        os.makedirs(self.treePath)
+        self.bundler = FileBundler(10, maxBundleSize=6)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def plannedFile(self, name: str, content: bytes,
+                    entry: ManifestEntry | None = None) -> PlannedFile:
+        """Writes the file of the tree and returns it as planned."""
+        filePath = os.path.join(self.treePath, name)
+        with open(filePath, 'wb') as file:
+            file.write(content)
+        return PlannedFile(f"tree/{name}", filePath, os.stat(filePath),
+                           entry)
+
+    def testIsBundlePath(self):
+        self.assertTrue(FileBundler.isBundlePath("a/.goodab-bundle-1.zip"))
+        self.assertFalse(FileBundler.isBundlePath("a/bundle.zip"))
+
+    def testPlanNewBundles(self):
+        """Test the small new files are packed in bundles of a max size."""
+        files = [self.plannedFile(name, content) for name, content in (
+            ("a", b"aaa"), ("b", b"bbb"), ("c", b"c"), ("big", b"x" * 10)
+        )]
+
+        nativeFiles, bundles, emptyBundles = self.bundler.planBundles(
+            files, {}
+        )
+
+        self.assertEqual([file.relativePath for file in nativeFiles],
+                         ["tree/big"])
+        self.assertEqual([bundle.memberPaths for bundle in bundles],
+                         [["tree/a", "tree/b"], ["tree/c"]])
+        self.assertNotEqual(bundles[0].relativePath, bundles[1].relativePath)
+        self.assertEqual(emptyBundles, {})
+
+    def testPlanChangedBundle(self):
+        """Test only the bundle of a changed member is packed again."""
+        bundleEntry = ManifestEntry(100, 0, "bundle1")
+        manifest = {
+            "tree/.goodab-bundle-1.zip": bundleEntry,
+            "tree/.goodab-bundle-2.zip": ManifestEntry(100, 0, "bundle2"),
+            "tree/a": ManifestEntry(3, 0, "bundle1"),
+            "tree/b": ManifestEntry(3, 0, "bundle1"),
+            "tree/c": ManifestEntry(3, 0, "bundle2"),
+        }
+        changedFile = self.plannedFile("a", b"AAA", manifest["tree/a"])
+
+        _, bundles, _ = self.bundler.planBundles([changedFile], manifest)
+
+        self.assertEqual(len(bundles), 1)
+        self.assertEqual(bundles[0].entry, bundleEntry)
+        self.assertEqual(bundles[0].memberPaths, ["tree/a", "tree/b"])
+        self.assertEqual(bundles[0].files, [changedFile])
+
+    def testPack(self):
+        """Test the members are packed with their MD5 and restorable."""
+        self.plannedFile("big", b"x" * 10)
+        bundle = self.bundler.planBundles(
+            [self.plannedFile("a", b"aaa")], {}
+        )[1][0]._replace(memberPaths=["tree/a", "tree/big"])
+
+        packedBundle, content, entries = self.bundler.pack(
+            bundle, self.directory.name
+        )
+
+        self.assertEqual(packedBundle, bundle)
+        self.assertEqual(list(entries), ["tree/a"])
+        self.assertEqual(
+            entries["tree/a"].md5,
+            hashlib.md5(b"aaa", usedforsecurity=False).hexdigest()
+        )
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(archive.read("a"), b"aaa")
+
+    def testPackKeepsBundleOfGoneMember(self):
+        """Test a bundle with a gone member is replaced by a new one."""
+        manifest = {
+            "tree/.goodab-bundle-1.zip": ManifestEntry(100, 0, "bundle1"),
+            "tree/a": ManifestEntry(3, 0, "bundle1"),
+            "tree/gone": ManifestEntry(3, 0, "bundle1"),
+        }
+        changedFile = self.plannedFile("a", b"AAA", manifest["tree/a"])
+        bundle = self.bundler.planBundles([changedFile], manifest)[1][0]
+
+        packedBundle, _, entries = self.bundler.pack(bundle,
+                                                     self.directory.name)
+
+        self.assertIsNone(packedBundle.entry)
+        self.assertNotEqual(packedBundle.relativePath,
+                            "tree/.goodab-bundle-1.zip")
+        self.assertEqual(list(entries), ["tree/a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing unit tests for FileCopyWorker class."""
+
+import os
+import time
+import tempfile
+import unittest
+
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.RunHistoryRepository import RunHistoryRepository
+from worker.FileCopyWorker import FileCopyWorker
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestFileCopyWorker(unittest.TestCase):
+    """Unit tests for FileCopyWorker class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.runHistory = RunHistoryRepository(
+            os.path.join(self.directory.name, "runHistory.sqlite3")
+        )
+
+    def tearDown(self):
+        self.runHistory.close()
+        self.directory.cleanup()
+
+    def createDirectory(self, name: str, sizes: list[int]) -> str:
+        """Creates the directory with a file of every size."""
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(path)
+        for number, size in enumerate(sizes):
+            with open(os.path.join(path, f"{number}.bin"), 'wb') as file:
+                file.write(b"x" * size)
+        return path
+
+    def testRunKeepsStorageOfHigherPriority(self):
+        """Test a low priority run leaves the storage of a queued high one."""
+        driveService = FakeDriveService(storageLimit=20)
+        folderID = driveService.addFolder("Backup")
+        lowRule = Rule(self.createDirectory("low", [5, 9]), folderID, "acc",
+                       "10:00", priority="low")
+        highRule = Rule(self.createDirectory("high", [10]), folderID, "acc",
+                        "10:00", priority="high")
+        self.runHistory.addRun(RuleRun(highRule.ruleID, time.time() - 5,
+                                       time.time(), bytesUploaded=10))
+        worker = FileCopyWorker(driveService, [lowRule, highRule],
+                                runHistoryModel=self.runHistory)
+        runs = []
+        worker.ruleRunFinished.connect(lambda rule, run: runs.append(run))
+        now = 0.0
+        worker.scheduler.clock = lambda: now
+        worker.scheduler.push(lowRule)
+        now = 2 * worker.scheduler.agingInterval
+        worker.scheduler.push(highRule)
+
+        while worker.runNext():
+            pass
+
+        self.assertEqual([run.ruleID for run in runs],
+                         [lowRule.ruleID, highRule.ruleID])
+        self.assertEqual(runs[0].errorClass, "StorageQuotaExceededException")
+        self.assertEqual(runs[0].filesUploaded, 1)
+        self.assertIsNone(runs[1].error)
+        self.assertEqual(runs[1].bytesUploaded, 10)
+
+    def testEstimateScalesWithChangedFiles(self):
+        """Test a run of changed files is estimated by their bytes."""
+        rule = Rule(self.createDirectory("tree", [100, 400]), "folder", "acc",
+                    "10:00")
+        now = time.time()
+        self.runHistory.addRun(RuleRun(rule.ruleID, now - 10, now,
+                                       bytesUploaded=1000))
+        worker = FileCopyWorker(FakeDriveService(), [rule],
+                                runHistoryModel=self.runHistory)
+
+        self.assertEqual(worker.scheduler.estimateSeconds(rule, None), 10)
+        self.assertEqual(
+            worker.scheduler.estimateSeconds(rule, {"tree/1.bin"}), 4
+        )
+        self.assertEqual(
+            worker.scheduler.estimateSeconds(rule, {"tree/gone.bin"}), 0
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for FileFilter class."""
+
+import os
+import tempfile
+import unittest
+
+from model.FileFilter import FileFilter
+from exception.exceptions import FiltersAreInvalidException
+
+
+def statResult(size: int = 0, mtime: float = 0.0) -> os.stat_result:
+    """Returns the stat of a regular file of the size and the mtime."""
+    return os.stat_result((0o100644, 0, 0, 1, 0, 0, size, 0, mtime, 0))
+
+
+class TestFileFilter(unittest.TestCase):
+    """Unit tests for FileFilter class."""
+
+    def testEmpty(self):
+        self.assertTrue(FileFilter.fromString(None).isEmpty)
+        self.assertTrue(FileFilter.fromString(" ; ").isEmpty)
+        self.assertFalse(FileFilter.fromString("*.tmp").isEmpty)
+
+    def testPatterns(self):
+        """Test the .gitignore-style patterns."""
+        fileFilter = FileFilter.fromString(
+            "node_modules/; .git/objects; *.tmp; /build; docs/**/*.pdf"
+        )
+        self.assertTrue(fileFilter.isDirectoryExcluded("node_modules"))
+        self.assertTrue(fileFilter.isDirectoryExcluded("app/node_modules"))
+        self.assertTrue(fileFilter.isDirectoryExcluded(".git/objects"))
+        self.assertFalse(fileFilter.isDirectoryExcluded("app/.git/objects"))
+        self.assertTrue(fileFilter.isDirectoryExcluded("build"))
+        self.assertFalse(fileFilter.isDirectoryExcluded("app/build"))
+        file = statResult()
+        self.assertFalse(fileFilter.isFileExcluded("node_modules", file, 0))
+        self.assertTrue(fileFilter.isFileExcluded("a/b.tmp", file, 0))
+        self.assertTrue(fileFilter.isFileExcluded("docs/a/b/c.pdf", file, 0))
+        self.assertTrue(fileFilter.isFileExcluded("docs/c.pdf", file, 0))
+        self.assertFalse(fileFilter.isFileExcluded("c.pdf", file, 0))
+        self.assertTrue(fileFilter.isExcluded("app/node_modules/x.js", file,
+                                              0))
+
+    def testNegatedPattern(self):
+        """Test the last matching pattern wins."""
+        fileFilter = FileFilter.fromString("*.log; !keep.log")
+        file = statResult()
+        self.assertTrue(fileFilter.isFileExcluded("a.log", file, 0))
+        self.assertFalse(fileFilter.isFileExcluded("sub/keep.log", file, 0))
+
+    def testIncludeSizeAndAge(self):
+        """Test the include patterns and the size and age limits."""
+        fileFilter = FileFilter.fromString(
+            "include:*.py; maxSize:1K; maxAge:1"
+        )
+        now = 10 * FileFilter.SECONDS_PER_DAY
+        self.assertFalse(fileFilter.isFileExcluded(
+            "src/a.py", statResult(1024, now), now
+        ))
+        self.assertTrue(fileFilter.isFileExcluded(
+            "src/a.txt", statResult(1, now), now
+        ))
+        self.assertTrue(fileFilter.isFileExcluded(
+            "src/a.py", statResult(1025, now), now
+        ))
+        self.assertTrue(fileFilter.isFileExcluded(
+            "src/a.py", statResult(1, now - 2 * FileFilter.SECONDS_PER_DAY),
+            now
+        ))
+        self.assertFalse(fileFilter.isDirectoryExcluded("src"))
+
+    def testIgnoreFiles(self):
+        """Test the patterns of an ignore file apply under its directory."""
+        fileFilter = FileFilter.fromString("ignoreFile:.gitignore")
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, ".gitignore"), 'w') as file:
+                file.write("# comment\n*.o\n/out/\n")
+            self.assertIs(fileFilter.withIgnoreFiles(
+                os.path.join(directory, "missing"), "missing"
+            ), fileFilter)
+            subFilter = fileFilter.withIgnoreFiles(directory, "sub")
+        self.assertTrue(subFilter.isFileExcluded("sub/x/a.o", statResult(),
+                                                 0))
+        self.assertFalse(subFilter.isFileExcluded("a.o", statResult(), 0))
+        self.assertTrue(subFilter.isDirectoryExcluded("sub/out"))
+        self.assertFalse(subFilter.isDirectoryExcluded("sub/x/out"))
+
+    def testInvalidFilters(self):
+        for filters in ("maxSize:1X", "maxAge:day", "include:", "!",
+                        "ignoreFile:a/b"):
+            with self.assertRaises(FiltersAreInvalidException):
+                FileFilter.fromString(filters)
+
+
+if __name__ == "__main__":
+    unittest.main()
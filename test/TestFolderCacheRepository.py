@@ -0,0 +1,68 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for FolderCacheRepository class."""
+
+import os
+import tempfile
+import unittest
+
+from model.FolderCacheRepository import FolderCacheRepository
+
+
+class TestFolderCacheRepository(unittest.TestCase):
+    """Unit tests for FolderCacheRepository class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cacheFilePath = os.path.join(
+            self.directory.name, "cache", "folderCache.json"
+        )
+        self.repository = FolderCacheRepository(
+            self.cacheFilePath, ttl=10, maxAge=100
+        )
+        self.folders = [{"id": "1", "name": "Photos"}]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testFreshness(self):
+        """Test an entry is fresh only within the TTL."""
+        self.assertIsNone(self.repository.getFolders("root"))
+        self.repository.putFolders("root", self.folders, now=1000)
+
+        self.assertEqual(self.repository.getFolders("root"), self.folders)
+        self.assertTrue(self.repository.isFresh("root", now=1005))
+        self.assertFalse(self.repository.isFresh("root", now=1010))
+
+    def testSaveAndLoad(self):
+        """Test the cache survives a restart and old entries are dropped."""
+        self.repository.putFolders("root", self.folders, now=1000)
+        self.repository.putFolders("old", [], now=850)
+        self.repository.save(now=1000)
+
+        repository = FolderCacheRepository(self.cacheFilePath)
+        self.assertEqual(repository.getFolders("root"), self.folders)
+        self.assertIsNone(repository.getFolders("old"))
+
+    def testBrokenFileIsEmptyCache(self):
+        """Test a broken cache file is treated as an empty cache."""
+        os.makedirs(os.path.dirname(self.cacheFilePath))
+        with open(self.cacheFilePath, 'w') as cacheFile:
+            cacheFile.write("{broken")
+
+        repository = FolderCacheRepository(self.cacheFilePath)
+        self.assertIsNone(repository.getFolders("root"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for FolderIndex class."""
+
+import os
+import tempfile
+import unittest
+
+from model.FolderIndex import FolderIndex
+
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+
+class TestFolderIndex(unittest.TestCase):
+    """Unit tests for FolderIndex class."""
+
+    def setUp(self):
+        self.folderIndex = FolderIndex()
+        self.folderIndex.rebuild(
+            "ROOT",
+            [
+                {"id": "1", "name": "Photos", "parents": ["ROOT"]},
+                {"id": "2", "name": "2024", "parents": ["1"]},
+                {"id": "3", "name": "Pictures of home", "parents": ["ROOT"]},
+                {"id": "4", "name": "Shared", "parents": ["UNKNOWN"]},
+            ],
+            "token"
+        )
+
+    def testGetPath(self):
+        """Test the full path of a folder."""
+        self.assertEqual(self.folderIndex.getPath("2"), "My Drive/Photos/2024")
+        self.assertEqual(self.folderIndex.getPath("4"), "Shared")
+        self.assertEqual(self.folderIndex.getChildren("root"), ["1", "3"])
+
+    def testSearchPrefixBeforeFuzzy(self):
+        """Test the prefix matches come before the fuzzy matches."""
+        results = self.folderIndex.search("ph")
+        self.assertEqual(results[0], ("1", "My Drive/Photos"))
+
+        results = self.folderIndex.search("PCS")
+        self.assertEqual([folderID for folderID, _ in results], ["3"])
+
+        self.assertEqual(self.folderIndex.search("xyz"), [])
+
+    def testApplyChanges(self):
+        """Test folders are added, moved and removed by the changes."""
+        isChanged = self.folderIndex.applyChanges([
+            {"fileId": "1", "removed": True},
+            {"fileId": "2", "file": {"id": "2", "name": "2024",
+                                     "mimeType": FOLDER_MIME_TYPE,
+                                     "parents": ["3"]}},
+            {"fileId": "5", "file": {"id": "5", "name": "file.txt",
+                                     "mimeType": "text/plain"}},
+        ], "newToken")
+
+        self.assertTrue(isChanged)
+        self.assertEqual(self.folderIndex.search("photos"), [])
+        self.assertEqual(self.folderIndex.getPath("2"),
+                         "My Drive/Pictures of home/2024")
+        self.assertEqual(self.folderIndex.changesPageToken, "newToken")
+
+    def testJSONRoundTrip(self):
+        """Test the index survives a restart."""
+        with tempfile.TemporaryDirectory() as directory:
+            filePath = os.path.join(directory, "folderIndex.json")
+            self.folderIndex.writeJSON(filePath)
+            folderIndex = FolderIndex.readJSON(filePath)
+
+        self.assertTrue(folderIndex.isReady)
+        self.assertEqual(folderIndex.getPath("2"), "My Drive/Photos/2024")
+        self.assertFalse(FolderIndex.readJSON(filePath).isReady)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for FolderIndexWorker class."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from model.FolderIndex import FolderIndex
+from service.GoogleDriveService import GoogleDriveService
+from worker.FolderIndexWorker import FolderIndexWorker
+
+
+class TestFolderIndexWorker(unittest.TestCase):
+    """Unit tests for FolderIndexWorker class."""
+
+    def testResetIndexUsesTheNewDriveService(self):
+        """Test the index of another account is built by its service."""
+        oldService = Mock()
+        newService = Mock()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        worker = FolderIndexWorker(
+            oldService,
+            FolderIndex(),
+            os.path.join(directory.name, "folderIndex.json")
+        )
+        builtServices = []
+
+        def listAllFolderPages(service):
+            builtServices.append(service)
+            if len(builtServices) == 1:
+                worker.resetIndex(newService)
+            else:
+                worker.stop()
+            return iter([])
+
+        with patch("worker.FolderIndexWorker.FOLDER_INDEX_REFRESH_TIME", 0), \
+             patch.object(GoogleDriveService, "createThreadService",
+                          side_effect=lambda service: service), \
+             patch.object(GoogleDriveService, "getStartPageToken",
+                          return_value="token"), \
+             patch.object(GoogleDriveService, "getRootFolderID",
+                          return_value="ROOT"), \
+             patch.object(GoogleDriveService, "listAllFolderPages",
+                          side_effect=listAllFolderPages):
+            worker.run()
+
+        self.assertEqual(builtServices, [oldService, newService])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for GoogleDriveService class."""
+
+import unittest
+from unittest.mock import Mock
+
+from service.GoogleDriveService import GoogleDriveService
+
+
+class TestGoogleDriveService(unittest.TestCase):
+    """Unit tests for GoogleDriveService class."""
+
+    def testListFoldersFollowsPages(self):
+        """Test all pages are listed by nextPageToken."""
+        service = Mock()
+        service.files().list().execute.side_effect = [
+            {"files": [{"id": "1", "name": "A"}], "nextPageToken": "next"},
+            {"files": [{"id": "2", "name": "B"}]},
+        ]
+
+        pages = list(GoogleDriveService.listFolderPages(service, "root"))
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(
+            service.files().list.call_args.kwargs["pageToken"], "next"
+        )
+
+    def testListFolders(self):
+        """Test the folders of all pages are returned together."""
+        service = Mock()
+        service.files().list().execute.side_effect = [
+            {"files": [{"id": "1", "name": "A"}], "nextPageToken": "next"},
+            {"files": [{"id": "2", "name": "B"}]},
+        ]
+
+        folders = GoogleDriveService.listFolders(service, "root")
+
+        self.assertEqual([folder["id"] for folder in folders], ["1", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
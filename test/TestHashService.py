@@ -0,0 +1,136 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for HashService class."""
+
+import os
+import time
+import hashlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import service.HashService
+from service.HashService import HashService
+from model.HashCacheRepository import HashCacheRepository
+
+
+class TestHashService(unittest.TestCase):
+    """Unit tests for HashService class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.hashCache = HashCacheRepository(
+            os.path.join(self.directory.name, "hashCache.sqlite3")
+        )
+        self.hashService = HashService(self.hashCache, maxWorkers=2)
+        self.content = os.urandom(3 * 1024 * 1024 + 5)
+        self.filePath = os.path.join(self.directory.name, "file.bin")
+        with open(self.filePath, 'wb') as file:
+            file.write(self.content)
+
+    def tearDown(self):
+        self.hashService.close()
+        self.hashCache.close()
+        self.directory.cleanup()
+
+    def testMD5(self):
+        """Test the MD5 of the buffered and the mmap reads."""
+        expected = hashlib.md5(self.content, usedforsecurity=False).hexdigest()
+        self.assertEqual(HashService().md5(self.filePath), expected)
+        with patch.object(service.HashService, "HASH_MMAP_THRESHOLD", 0):
+            self.assertEqual(HashService().md5(self.filePath), expected)
+        self.assertEqual(self.hashService.submitMD5(self.filePath).result(),
+                         expected)
+
+    def testMD5OfEmptyFile(self):
+        """Test the empty file, which cannot be mapped."""
+        emptyPath = os.path.join(self.directory.name, "empty")
+        open(emptyPath, 'w').close()
+        with patch.object(service.HashService, "HASH_MMAP_THRESHOLD", -1):
+            self.assertEqual(HashService().md5(emptyPath),
+                             hashlib.md5(usedforsecurity=False).hexdigest())
+
+    def testQuickHash(self):
+        """Test the quick hash samples the blocks of a large file."""
+        quickHash = self.hashService.quickHash(self.filePath)
+        with open(self.filePath, 'r+b') as file:
+            file.seek(0)
+            file.write(b"changed")
+        self.assertNotEqual(HashService().quickHash(self.filePath),
+                            quickHash)
+
+        smallPath = os.path.join(self.directory.name, "small")
+        with open(smallPath, 'wb') as file:
+            file.write(b"small")
+        self.assertEqual(
+            HashService().quickHash(smallPath),
+            HashService().quickHash(smallPath)
+        )
+        self.assertFalse(HashService.isQuickHashUseful(5))
+
+    def testCache(self):
+        """Test the hash is cached until the file changes."""
+        fileStat = os.stat(self.filePath)
+        self.hashService.md5(self.filePath, fileStat)
+        self.hashCache.putHash(fileStat, HashService.MD5, "cached")
+        self.assertEqual(self.hashService.md5(self.filePath), "cached")
+
+        os.utime(self.filePath, ns=(0, 0))
+        self.assertEqual(self.hashService.md5(self.filePath), hashlib.md5(
+            self.content, usedforsecurity=False
+        ).hexdigest())
+
+    def testIsUnchanged(self):
+        """Test the quick hash is compared before the MD5."""
+        fileStat = os.stat(self.filePath)
+        md5 = hashlib.md5(self.content, usedforsecurity=False).hexdigest()
+        quickHash = self.hashService.quickHash(self.filePath, fileStat)
+        self.assertTrue(self.hashService.submitIsUnchanged(
+            self.filePath, fileStat, md5, quickHash
+        ).result())
+        with patch.object(self.hashService, "md5") as md5Method:
+            self.assertFalse(self.hashService.isUnchanged(
+                self.filePath, fileStat, md5, "other"
+            ))
+            md5Method.assert_not_called()
+        self.assertFalse(self.hashService.isUnchanged(
+            self.filePath, fileStat, "other"
+        ))
+
+    def testPruneUnusedHashes(self):
+        """Test the hashes not used for maxAge are pruned, used ones kept."""
+        fileStat = os.stat(self.filePath)
+        otherPath = os.path.join(self.directory.name, "other.bin")
+        with open(otherPath, 'wb') as file:
+            file.write(b"other")
+        otherStat = os.stat(otherPath)
+        now = time.time()
+        with patch("time.time", return_value=now):
+            self.hashService.md5(self.filePath, fileStat)
+            self.hashService.md5(otherPath, otherStat)
+        later = now + self.hashCache.maxAge * 2 / 3
+        with patch("time.time", return_value=later):
+            self.hashService.md5(self.filePath, fileStat)
+
+        self.assertEqual(self.hashCache.prune(later), 0)
+        self.assertEqual(
+            self.hashCache.prune(now + self.hashCache.maxAge + 1), 1
+        )
+        self.assertIsNotNone(
+            self.hashCache.getHash(fileStat, HashService.MD5)
+        )
+        self.assertIsNone(self.hashCache.getHash(otherStat, HashService.MD5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for the logger settings."""
+
+import os
+import json
+import tempfile
+import unittest
+
+from logger.logger import logger, createFormatter, addFileSink
+
+
+class TestLogger(unittest.TestCase):
+    """Unit tests for the logger settings."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.logPath = os.path.join(self.directory.name, "log", "test.log")
+        self.config = {
+            "logPath": self.logPath,
+            "rotation": "10 MB",
+            "retention": "1 day",
+            "mode": "w",
+            "level": "DEBUG",
+            "format": "{level} | {message}",
+            "enqueue": True,
+            "serialize": False,
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def writeRecord(self, config: dict) -> str:
+        """Logs a record with bound context and returns the log file."""
+        sinkID = addFileSink(config)
+        try:
+            logger.bind(ruleID="rule", bytes=5).info("Uploaded.")
+            logger.complete()
+        finally:
+            logger.remove(sinkID)
+        with open(self.logPath) as logFile:
+            return logFile.read()
+
+    def testFormatterAppendsContext(self):
+        formatRecord = createFormatter("{message}")
+        self.assertEqual(
+            formatRecord({"extra": {"ruleID": "rule", "bytes": 5,
+                                    "other": 1}}),
+            "{message} | ruleID={extra[ruleID]} bytes={extra[bytes]}\n" +
+            "{exception}"
+        )
+        self.assertEqual(formatRecord({"extra": {}}),
+                         "{message}\n{exception}")
+
+    def testTextSink(self):
+        self.assertEqual(self.writeRecord(self.config),
+                         "INFO | Uploaded. | ruleID=rule bytes=5\n")
+
+    def testJSONSink(self):
+        self.config["serialize"] = True
+        record = json.loads(self.writeRecord(self.config))["record"]
+        self.assertEqual(record["message"], "Uploaded.")
+        self.assertEqual(record["extra"], {"ruleID": "rule", "bytes": 5})
+
+
+if __name__ == "__main__":
+    unittest.main()
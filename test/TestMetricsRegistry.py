@@ -0,0 +1,93 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for MetricsRegistry class."""
+
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from metrics.MetricsRegistry import MetricsRegistry
+from metrics.MetricsServer import MetricsServer
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Unit tests for MetricsRegistry class."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.counter = self.registry.counter(
+            "test_calls_total", "Calls.", ("method",)
+        )
+        self.histogram = self.registry.histogram(
+            "test_duration_seconds", "Duration.", buckets=(0.1, 1.0)
+        )
+
+    def testRenderPrometheus(self):
+        """Test the counters and histograms in the Prometheus format."""
+        self.counter.inc(method="files.get")
+        self.counter.inc(2, method="files.get")
+        self.histogram.observe(0.05)
+        self.histogram.observe(5)
+
+        text = self.registry.renderPrometheus()
+
+        self.assertIn("# TYPE test_calls_total counter", text)
+        self.assertIn('test_calls_total{method="files.get"} 3', text)
+        self.assertIn('test_duration_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_duration_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn("test_duration_seconds_count 2", text)
+
+    def testLabelsAreChecked(self):
+        """Test wrong labels and re-registration are rejected."""
+        with self.assertRaises(ValueError):
+            self.counter.inc(rule="1")
+        with self.assertRaises(ValueError):
+            self.registry.gauge("test_calls_total", "Calls.")
+        self.assertIs(
+            self.registry.counter("test_calls_total", "Calls.", ("method",)),
+            self.counter
+        )
+
+    def testWriteSnapshot(self):
+        """Test the JSON snapshot of the metrics."""
+        self.counter.inc(method="files.list")
+        with tempfile.TemporaryDirectory() as directory:
+            filePath = os.path.join(directory, "metrics.json")
+            self.registry.writeSnapshot(filePath)
+            with open(filePath) as snapshotFile:
+                snapshot = json.load(snapshotFile)
+
+        self.assertEqual(
+            snapshot["test_calls_total"]["samples"],
+            [{"labels": {"method": "files.list"}, "value": 1}]
+        )
+
+    def testServer(self):
+        """Test the metrics are served on localhost."""
+        self.counter.inc(method="files.get")
+        server = MetricsServer(self.registry, "127.0.0.1", 0)
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            with urllib.request.urlopen(url) as response:  # nosec B310
+                text = response.read().decode()
+        finally:
+            server.stop()
+
+        self.assertIn('test_calls_total{method="files.get"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for MirrorService class."""
+
+import unittest
+from unittest.mock import ANY, Mock
+
+from model.Rule import Rule
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import UploadPlan
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.MirrorService import MirrorService
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+from exception.exceptions import MirrorDeletionRefusedException
+from const.const import MANIFEST_FOLDER_SIZE
+
+
+class TestMirrorService(unittest.TestCase):
+    """Unit tests for MirrorService class."""
+
+    def setUp(self):
+        self.driveService = FakeDriveService()
+        self.manifestModel = Mock()
+        self.mirrorService = MirrorService(
+            DriveRequestExecutor(self.driveService, RetryPolicy(),
+                                 Profiler()),
+            self.manifestModel
+        )
+        self.treeID = self.driveService.addFolder("tree")
+        self.subID = self.driveService.addFolder("sub", self.treeID)
+        self.manifest = {
+            "tree": ManifestEntry(MANIFEST_FOLDER_SIZE, 0, self.treeID,
+                                  isOwned=True),
+            "tree/a.txt": self.addFile("a.txt", self.treeID),
+            "tree/c.txt": self.addFile("c.txt", self.treeID),
+            "tree/sub": ManifestEntry(MANIFEST_FOLDER_SIZE, 0, self.subID,
+                                      isOwned=True),
+            "tree/sub/b.txt": self.addFile("b.txt", self.subID),
+        }
+
+    def addFile(self, name: str, folderID: str) -> ManifestEntry:
+        """Creates the file in the folder and returns its entry."""
+        fileID = self.driveService.createFile(
+            {"name": name, "parents": [folderID]}, name.encode(), "id"
+        )["id"]
+        return ManifestEntry(len(name), 0, fileID)
+
+    def mirror(self, mode: str, *missingPaths: str) -> None:
+        """Mirrors the rule of the mode with the missing paths."""
+        plan = UploadPlan("rule")
+        plan.missingEntries = {relativePath: self.manifest[relativePath]
+                               for relativePath in missingPaths}
+        rule = Rule("tree", "folder", "acc", "10:00", mode=mode)
+        self.mirrorService.mirror(rule, {"rule": "rule", "account": "acc"},
+                                  plan, self.manifest)
+
+    def isTrashed(self, fileID: str) -> bool:
+        """Returns whether the Google Drive file is in the trash."""
+        return self.driveService.getFile(fileID, "trashed")["trashed"]
+
+    def testIsInFolders(self):
+        """Test a path is in the folders of any of its ancestors."""
+        self.assertTrue(MirrorService.isInFolders("tree/sub/b.txt", {"tree"}))
+        self.assertFalse(MirrorService.isInFolders("tree/sub", {"tree/sub"}))
+        self.assertFalse(MirrorService.isInFolders("tree2/a.txt", {"tree"}))
+
+    def testMirrorTrashesMissingFolderWithItsFiles(self):
+        """Test a gone folder is trashed with one request in a batch."""
+        self.mirror("mirror:50", "tree/sub", "tree/sub/b.txt")
+
+        self.assertEqual(self.driveService.calls["batch"], 1)
+        self.assertEqual(self.driveService.calls["files.update"], 1)
+        self.assertTrue(self.isTrashed(self.subID))
+        self.manifestModel.deleteEntries.assert_called_once_with(
+            ANY, ["tree/sub", "tree/sub/b.txt"]
+        )
+
+    def testMirrorKeepsAdoptedFolders(self):
+        """Test the files of others in an adopted folder are not trashed."""
+        self.manifest["tree/sub"] = self.manifest["tree/sub"]._replace(
+            isOwned=False
+        )
+        keptFileID = self.driveService.createFile(
+            {"name": "keep.txt", "parents": [self.subID]}, b"keep", "id"
+        )["id"]
+
+        self.mirror("mirror:50", "tree/sub", "tree/sub/b.txt")
+
+        for fileID, isTrashed in (
+            (self.subID, False),
+            (keptFileID, False),
+            (self.manifest["tree/sub/b.txt"].fileID, True),
+        ):
+            self.assertEqual(self.isTrashed(fileID), isTrashed)
+        self.manifestModel.deleteEntries.assert_called_once_with(
+            ANY, ["tree/sub", "tree/sub/b.txt"]
+        )
+
+    def testMirrorRefusesMassDeletion(self):
+        """Test nothing is trashed if too many files are gone."""
+        with self.assertRaises(MirrorDeletionRefusedException) as context:
+            self.mirror("mirror", "tree/c.txt")
+
+        self.assertEqual(
+            (context.exception.missingFiles, context.exception.uploadedFiles),
+            (1, 3)
+        )
+        self.assertEqual(self.driveService.calls["batch"], 0)
+        self.manifestModel.deleteEntries.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
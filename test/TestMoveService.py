@@ -0,0 +1,115 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for MoveService class."""
+
+import os
+import tempfile
+import unittest
+
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import UploadPlan, PlannedFile
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.MoveService import MoveService
+from service.HashService import HashService
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestMoveService(unittest.TestCase):
+    """Unit tests for MoveService class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filePath = os.path.join(self.directory.name, "c.txt")
+        with open(self.filePath, 'w') as file:
+            file.write("content")
+        self.fileStat = os.stat(self.filePath)
+        self.driveService = FakeDriveService()
+        self.folderID = self.driveService.addFolder("tree")
+        self.subfolderID = self.driveService.addFolder("sub", self.folderID)
+        self.fileID = self.driveService.createFile(
+            {"name": "a.txt", "parents": [self.folderID]}, b"content", "id"
+        )["id"]
+        self.hashService = HashService()
+        self.moveService = MoveService(
+            DriveRequestExecutor(self.driveService, RetryPolicy(),
+                                 Profiler()),
+            self.hashService
+        )
+        self.manifest = {
+            "tree": ManifestEntry(-1, 0, self.folderID),
+            "tree/a.txt": ManifestEntry(
+                self.fileStat.st_size, 0, self.fileID,
+                self.hashService.md5(self.filePath), None,
+                self.fileStat.st_ino
+            ),
+        }
+        self.plan = UploadPlan("rule")
+        self.plan.missingEntries["tree/a.txt"] = self.manifest["tree/a.txt"]
+        self.plan.files.append(PlannedFile("tree/sub/c.txt", self.filePath,
+                                           self.fileStat, None))
+
+    def tearDown(self):
+        self.hashService.close()
+        self.directory.cleanup()
+
+    def moveFile(self) -> bool:
+        """Moves the moved file of the plan into the subfolder."""
+        movedPath, file = self.plan.movedFiles[0]
+        return self.moveService.moveFile(
+            {"rule": "rule", "account": "acc"}, self.manifest, {}, movedPath,
+            file, self.subfolderID
+        )
+
+    def testFindMovedFilesByInode(self):
+        """Test a renamed file of the same content is moved, not uploaded."""
+        self.moveService.findMovedFiles(self.plan, self.manifest)
+
+        self.assertEqual(self.plan.files, [])
+        self.assertEqual(self.plan.missingEntries, {})
+        movedPath, file = self.plan.movedFiles[0]
+        self.assertEqual((movedPath, file.relativePath, file.entry.fileID),
+                         ("tree/a.txt", "tree/sub/c.txt", self.fileID))
+
+    def testFindMovedFilesComparesContent(self):
+        """Test a new file with the inode of a gone file but another
+        content is uploaded."""
+        with open(self.filePath, 'w') as file:
+            file.write("changed")
+
+        self.moveService.findMovedFiles(self.plan, self.manifest)
+
+        self.assertEqual(self.plan.movedFiles, [])
+        self.assertEqual(len(self.plan.files), 1)
+
+    def testMoveFileUpdatesParentsAndName(self):
+        """Test the Google Drive file is moved by one files.update."""
+        self.moveService.findMovedFiles(self.plan, self.manifest)
+
+        self.assertTrue(self.moveFile())
+        self.assertEqual(self.driveService.calls["files.update"], 1)
+        self.assertEqual(self.driveService.getFile(self.fileID,
+                                                   "name, parents"),
+                         {"name": "c.txt", "parents": [self.subfolderID]})
+
+    def testMoveFileNotFound(self):
+        """Test a Google Drive file which is gone is not moved."""
+        self.moveService.findMovedFiles(self.plan, self.manifest)
+        self.driveService.deleteFile(self.fileID)
+
+        self.assertFalse(self.moveFile())
+
+
+if __name__ == "__main__":
+    unittest.main()
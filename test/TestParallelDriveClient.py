@@ -0,0 +1,64 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for ParallelDriveClient class."""
+
+import unittest
+
+from service.ParallelDriveClient import ParallelDriveClient
+from service.RetryPolicy import RetryPolicy
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestParallelDriveClient(unittest.TestCase):
+    """Unit tests for ParallelDriveClient class."""
+
+    def setUp(self):
+        self.driveService = FakeDriveService()
+        self.folderID = self.driveService.addFolder("Backup")
+        self.driveService.addFolder("tree", self.folderID)
+        self.driveService.createFile(
+            {"name": "it's.txt", "parents": [self.folderID]}, b"content", None
+        )
+        self.client = ParallelDriveClient(
+            self.driveService, RetryPolicy(sleep=lambda delay: None)
+        )
+
+    def testListChildren(self):
+        """Test every child of the folder is listed by one list call."""
+        children = self.client.listChildren(self.folderID, "files(name)")
+
+        self.assertEqual(sorted(child["name"] for child in children),
+                         ["it's.txt", "tree"])
+        self.assertEqual(self.client.listCalls, 1)
+
+    def testListChildrenByName(self):
+        """Test only the children of the escaped name are listed."""
+        children = self.client.listChildren(self.folderID, "files(name)",
+                                            "it's.txt")
+
+        self.assertEqual(children, [{"name": "it's.txt"}])
+
+    def testExecuteRetriesConnectionErrors(self):
+        """Test a request failing with a connection error is sent again."""
+        errors = [ConnectionError("reset")]
+
+        def send():
+            if errors:
+                raise errors.pop()
+            return "sent"
+
+        self.assertEqual(self.client.execute(send), "sent")
+
+
+if __name__ == "__main__":
+    unittest.main()
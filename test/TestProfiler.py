@@ -0,0 +1,92 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for Profiler class."""
+
+import os
+import json
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+
+from model.Rule import Rule
+from profiling.Profiler import Profiler, NULL_SPAN
+from service.BackupEngine import BackupEngine
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestProfiler(unittest.TestCase):
+    """Unit tests for Profiler class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.outputDirectory = os.path.join(self.directory.name, "profiles")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testDisabled(self):
+        """Test a disabled profiler does not time nor write anything."""
+        profiler = Profiler(outputDirectory=self.outputDirectory)
+        function = len
+
+        with profiler.profileRun("rule") as spans:
+            self.assertIs(profiler.span("scan"), NULL_SPAN)
+            self.assertIs(profiler.wrap("read", function), function)
+
+        self.assertEqual(spans, {})
+        self.assertFalse(os.path.exists(self.outputDirectory))
+
+    def testSlowestRunsAreKept(self):
+        """Test the profiles of the slowest runs are written and pruned."""
+        profiler = Profiler(True, isTracemallocEnabled=True, slowestRuns=1,
+                            outputDirectory=self.outputDirectory)
+        with profiler.profileRun("fast") as spans:
+            with profiler.span("scan"):
+                pass
+        with profiler.profileRun("slow"):
+            sum(range(10 ** 6))
+
+        self.assertEqual(spans["scan"][1], 1)
+        profiles = profiler.profiles
+        self.assertEqual([profile["ruleID"] for profile in profiles],
+                         ["slow"])
+        pstats.Stats(profiles[0]["cProfile"])
+        tracemalloc.Snapshot.load(profiles[0]["tracemalloc"])
+        with open(os.path.join(self.outputDirectory,
+                               Profiler.SUMMARY_FILE)) as summaryFile:
+            self.assertEqual(json.load(summaryFile), profiles)
+        self.assertEqual(len(os.listdir(self.outputDirectory)), 3)
+
+    def testEngineSpans(self):
+        """Test the engine times its spans in a profiled run."""
+        profiler = Profiler(True, isCProfileEnabled=False,
+                            outputDirectory=self.outputDirectory)
+        treePath = os.path.join(self.directory.name, "tree")
+        os.makedirs(os.path.join(treePath, "sub"))
+        with open(os.path.join(treePath, "sub", "file.txt"), 'w') as file:
+            file.write("content")
+        driveService = FakeDriveService()
+        engine = BackupEngine(driveService, profiler=profiler)
+        rule = Rule(treePath, driveService.addFolder("Backup"), "acc",
+                    "10:00")
+
+        with profiler.profileRun(rule.ruleID) as spans:
+            engine.runRule(rule)
+
+        self.assertEqual(set(spans), {"scan", "lookup", "upload", "read"})
+        self.assertEqual(spans["scan"][1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
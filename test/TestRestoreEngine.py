@@ -0,0 +1,197 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+
+"""Module containing unit tests for RestoreEngine class."""
+
+import os
+import hashlib
+import tempfile
+import unittest
+
+from model.Rule import Rule
+from model.ManifestRepository import ManifestRepository
+from service.BackupEngine import BackupEngine
+from service.RestoreEngine import RestoreEngine
+from service.FileBundler import FileBundler
+from benchmark.FakeDriveService import FakeDriveService
+from const.const import RESTORE_PART_SUFFIX, RESTORE_BUNDLE_DIRECTORY
+
+
+class TestRestoreEngine(unittest.TestCase):
+    """Unit tests for RestoreEngine class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.treePath = os.path.join(self.directory.name, "tree")
+        self.contents = {
+            "a.txt": b"a",
+            "sub/b.txt": b"b" * 10,
+            "sub/large.bin": bytes(range(256)) * 12,
+        }
+        for relativePath, content in self.contents.items():
+            filePath = os.path.join(self.treePath, *relativePath.split("/"))
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            with open(filePath, 'wb') as file:
+                file.write(content)
+        self.driveService = FakeDriveService(isContentKept=True)
+        self.folderID = self.driveService.addFolder("Backup")
+        self.pathTo = os.path.join(self.directory.name, "restored")
+        self.engine = RestoreEngine(self.driveService, chunkSize=1024)
+        self.manifest = ManifestRepository(
+            os.path.join(self.directory.name, "manifest.sqlite3")
+        )
+
+    def tearDown(self):
+        self.manifest.close()
+        self.directory.cleanup()
+
+    def backUp(self, mode: str | None = None) -> Rule:
+        rule = Rule(self.treePath, self.folderID, "acc", "10:00", mode=mode)
+        run = BackupEngine(self.driveService, self.manifest).runRule(rule)
+        self.assertIsNone(run.error)
+        return rule
+
+    def readRestored(self) -> dict[str, bytes]:
+        restored = {}
+        for directory, _, fileNames in os.walk(self.pathTo):
+            for fileName in fileNames:
+                filePath = os.path.join(directory, fileName)
+                relativePath = os.path.relpath(
+                    filePath, os.path.join(self.pathTo, "tree")
+                ).replace(os.sep, "/")
+                with open(filePath, 'rb') as file:
+                    restored[relativePath] = file.read()
+        return restored
+
+    def testRestoreDownloadsAndSkipsMatchingFiles(self):
+        self.backUp()
+
+        report = self.engine.restore(self.folderID, self.pathTo)
+
+        self.assertEqual(report.outcome, "success")
+        self.assertEqual((report.filesRestored, report.filesSkipped), (3, 0))
+        self.assertEqual(self.readRestored(), self.contents)
+        # 3072 bytes in Range requests of 1024 bytes.
+        self.assertEqual(self.driveService.calls["files.get_media"], 5)
+        report = self.engine.restore(self.folderID, self.pathTo)
+        self.assertEqual((report.filesRestored, report.filesSkipped), (0, 3))
+        self.assertEqual(self.driveService.calls["files.get_media"], 5)
+
+    def testRestoreContinuesPartFile(self):
+        """Test an interrupted download continues after its part file."""
+        self.backUp()
+        content = self.contents["sub/large.bin"]
+        partPath = os.path.join(
+            self.pathTo, "tree", "sub",
+            "large.bin." +
+            hashlib.md5(content, usedforsecurity=False).hexdigest() +
+            RESTORE_PART_SUFFIX
+        )
+        os.makedirs(os.path.dirname(partPath))
+        with open(partPath, 'wb') as file:
+            file.write(content[:2048])
+
+        report = self.engine.restore(self.folderID, self.pathTo)
+
+        self.assertEqual(report.outcome, "success")
+        self.assertEqual(report.bytesDownloaded, 1 + 10 + 1024)
+        largeRanges = [
+            byteRange for fileID, byteRange in
+            self.driveService.downloadedRanges
+            if self.driveService.getFile(fileID, "name")["name"] == "large.bin"
+        ]
+        self.assertEqual(largeRanges, [f"bytes=2048-{len(content) - 1}"])
+        self.assertEqual(self.readRestored(), self.contents)
+
+    def testRestoreReportsChecksumMismatch(self):
+        self.backUp()
+        content = self.contents["sub/large.bin"]
+        partPath = os.path.join(
+            self.pathTo, "tree", "sub",
+            "large.bin." +
+            hashlib.md5(content, usedforsecurity=False).hexdigest() +
+            RESTORE_PART_SUFFIX
+        )
+        os.makedirs(os.path.dirname(partPath))
+        with open(partPath, 'wb') as file:
+            file.write(b"x" * 2048)
+
+        report = self.engine.restore(self.folderID, self.pathTo)
+
+        self.assertIn("ChecksumMismatchException",
+                      report.errors["tree/sub/large.bin"])
+        self.assertFalse(os.path.exists(partPath))
+
+    def testRestoreExtractsBundles(self):
+        self.backUp("bundle:1K")
+
+        report = self.engine.restore(self.folderID, self.pathTo)
+
+        self.assertEqual(report.outcome, "success")
+        self.assertEqual(report.filesRestored, 3)
+        self.assertEqual(self.readRestored(), self.contents)
+        report = self.engine.restore(self.folderID, self.pathTo)
+        self.assertEqual(report.filesSkipped, 3)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.pathTo, RESTORE_BUNDLE_DIRECTORY)
+        ))
+
+    def testRestoreContinuesBundlePartFile(self):
+        """Test a bundle continues its part file in the bundle directory."""
+        rule = self.backUp("bundle:1K")
+        bundle = next(
+            entry for relativePath, entry in
+            self.manifest.getEntries(rule.ruleID).items()
+            if FileBundler.isBundlePath(relativePath)
+        )
+        partPath = os.path.join(
+            self.pathTo, RESTORE_BUNDLE_DIRECTORY,
+            f"{bundle.fileID}.zip.{bundle.md5}{RESTORE_PART_SUFFIX}"
+        )
+        os.makedirs(os.path.dirname(partPath))
+        with open(partPath, 'wb') as file:
+            file.write(self.driveService.getContent(bundle.fileID)[:10])
+
+        report = self.engine.restore(self.folderID, self.pathTo)
+
+        self.assertEqual(report.outcome, "success")
+        self.assertEqual(
+            [byteRange for fileID, byteRange in
+             self.driveService.downloadedRanges if fileID == bundle.fileID],
+            [f"bytes=10-{bundle.size - 1}"]
+        )
+        self.assertEqual(self.readRestored(), self.contents)
+
+    def testRestoreSkipsBundlesOfRestoredMembers(self):
+        """Test a bundle whose members match the manifest is not
+        downloaded."""
+        self.backUp("bundle:1K")
+        engine = RestoreEngine(self.driveService, chunkSize=1024,
+                               manifestModel=self.manifest)
+        engine.restore(self.folderID, self.pathTo)
+        downloads = self.driveService.calls["files.get_media"]
+
+        report = engine.restore(self.folderID, self.pathTo)
+
+        self.assertEqual((report.filesRestored, report.filesSkipped), (0, 3))
+        self.assertEqual(self.driveService.calls["files.get_media"],
+                         downloads)
+        with open(os.path.join(self.pathTo, "tree", "a.txt"), 'wb') as file:
+            file.write(b"changed")
+        report = engine.restore(self.folderID, self.pathTo)
+        self.assertEqual((report.filesRestored, report.filesSkipped), (1, 2))
+        self.assertEqual(self.readRestored(), self.contents)
+
+
+if __name__ == "__main__":
+    unittest.main()
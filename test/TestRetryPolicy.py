@@ -0,0 +1,76 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for RetryPolicy class."""
+
+import json
+import random
+import unittest
+
+import httplib2
+from googleapiclient.errors import HttpError
+from service.RetryPolicy import RetryPolicy
+
+
+def httpError(status: int, reason: str = "", retryAfter: str | None = None):
+    """Returns an HttpError with the status and the reason."""
+    headers: dict[str, int | str] = {"status": status}
+    if retryAfter is not None:
+        headers["retry-after"] = retryAfter
+    content = {"error": {"code": status, "message": reason,
+                         "errors": [{"reason": reason}]}}
+    return HttpError(httplib2.Response(headers), json.dumps(content).encode())
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Unit tests for RetryPolicy class."""
+
+    def setUp(self):
+        self.policy = RetryPolicy(
+            maxRetries=3, initialDelay=1, maxDelay=4,
+            randomGenerator=random.Random(0)  # nosec B311
+        )
+
+    def testIsRetryable(self):
+        """Test only the transient errors are retried."""
+        self.assertTrue(self.policy.isRetryable(httpError(429), 0))
+        self.assertTrue(self.policy.isRetryable(httpError(503), 2))
+        self.assertFalse(self.policy.isRetryable(httpError(503), 3))
+        self.assertTrue(self.policy.isRetryable(
+            httpError(403, "userRateLimitExceeded"), 0
+        ))
+        self.assertFalse(self.policy.isRetryable(
+            httpError(403, "insufficientFilePermissions"), 0
+        ))
+        self.assertFalse(self.policy.isRetryable(httpError(404), 0))
+        self.assertTrue(self.policy.isRetryable(httpError(401), 0))
+        self.assertFalse(self.policy.isRetryable(httpError(401), 1))
+        self.assertTrue(self.policy.isRetryable(ConnectionResetError(), 0))
+        self.assertFalse(self.policy.isRetryable(ValueError(), 0))
+
+    def testGetDelay(self):
+        """Test the backoff is bounded and Retry-After is honoured."""
+        for attempt in range(6):
+            delay = self.policy.getDelay(httpError(503), attempt)
+            self.assertLessEqual(delay, min(4, 2 ** attempt))
+            self.assertGreaterEqual(delay, 0)
+        self.assertEqual(
+            self.policy.getDelay(httpError(429, retryAfter="2"), 0), 2
+        )
+        self.assertEqual(
+            self.policy.getDelay(httpError(429, retryAfter="60"), 0), 4
+        )
+        self.assertEqual(self.policy.getDelay(httpError(401), 0), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,8 +25,22 @@ from exception.exceptions import (
     TimeIsBlankException,
     WeekdayIsBlankException,
     WeekdayIsInvalidException,
-    DayOfMonthOutOfRangeException
+    DayOfMonthOutOfRangeException,
+    TriggerIsInvalidException,
+    PriorityIsInvalidException,
+    ModeIsInvalidException,
 )
+from const.const import MIRROR_MAX_DELETED_PERCENT
+
+
+VALID_DATA = {
+    "pathFrom": "/path",
+    "folderID": "123",
+    "account": "acc",
+    "time": "10:00",
+    "weekday": "Monday",
+    "dayOfMonth": 10
+}
 
 
 class TestRule(unittest.TestCase):
@@ -34,14 +48,7 @@ class TestRule(unittest.TestCase):
 
     def setUp(self):
         """Set up valid default data."""
-        self.validData = {
-            "pathFrom": "/path",
-            "folderID": "123",
-            "account": "acc",
-            "time": "10:00",
-            "weekday": "Monday",
-            "dayOfMonth": 10
-        }
+        self.validData = dict(VALID_DATA)
 
     def testCreateValidRule(self):
         """Test successful rule creation."""
@@ -117,7 +124,7 @@ class TestRule(unittest.TestCase):
     def testToRow(self):
         """Test conversion to row."""
         rule = Rule(**self.validData)
-        self.assertEqual(len(rule.toRow()), 6)
+        self.assertEqual(len(rule.toRow()), 10)
 
     def testCopy(self):
         """Test copy method."""
@@ -137,6 +144,85 @@ class TestRule(unittest.TestCase):
         r2 = Rule(**self.validData)
         self.assertEqual(hash(r1), hash(r2))
 
+    def testImmutable(self):
+        """Test rule attributes cannot be changed."""
+        rule = Rule(**self.validData)
+        with self.assertRaises(AttributeError):
+            rule.time = "11:00"  # type: ignore
+
+    def testSlots(self):
+        """Test rule has no per-instance __dict__."""
+        rule = Rule(**self.validData)
+        self.assertFalse(hasattr(rule, "__dict__"))
+
+    def testFromValidated(self):
+        """Test the trusted constructor creates an equal rule."""
+        rule = Rule(**self.validData)
+        self.assertEqual(Rule.fromValidated(**self.validData), rule)
+
+
+class TestRuleOptionalAttributes(unittest.TestCase):
+    """Unit tests for the optional attributes and the ID of Rule class."""
+
+    def setUp(self):
+        """Set up valid default data."""
+        self.validData = dict(VALID_DATA)
+
+    def testTrigger(self):
+        """Test the on change trigger and its quiet period."""
+        rule = Rule(**self.validData)
+        self.assertFalse(rule.isOnChange)
+        onChangeRule = Rule(**self.validData, trigger="onChange:30")
+        self.assertTrue(onChangeRule.isOnChange)
+        self.assertEqual(onChangeRule.quietPeriod, 30)
+        self.assertNotEqual(onChangeRule, rule)
+        self.assertNotEqual(onChangeRule.ruleID, rule.ruleID)
+        for trigger in ("daily", "onChange:", "onChange:0", "onChange:x"):
+            with self.assertRaises(TriggerIsInvalidException):
+                Rule(**self.validData, trigger=trigger)
+
+    def testPriority(self):
+        """Test the priority and its rank."""
+        self.assertEqual(Rule(**self.validData).priorityRank, 1)
+        highRule = Rule(**self.validData, priority="high")
+        self.assertEqual(highRule.priorityRank, 0)
+        self.assertNotEqual(highRule, Rule(**self.validData))
+        self.assertEqual(highRule.copy(), highRule)
+        with self.assertRaises(PriorityIsInvalidException):
+            Rule(**self.validData, priority="urgent")
+
+    def testMode(self):
+        """Test the mirror mode and its deletion limit."""
+        rule = Rule(**self.validData)
+        self.assertFalse(rule.isMirror)
+        mirrorRule = Rule(**self.validData, mode="mirror:50")
+        self.assertTrue(mirrorRule.isMirror)
+        self.assertEqual(mirrorRule.maxDeletedPercent, 50)
+        self.assertEqual(Rule(**self.validData, mode="mirror")
+                         .maxDeletedPercent, MIRROR_MAX_DELETED_PERCENT)
+        self.assertEqual(mirrorRule.copy(), mirrorRule)
+        bundleRule = Rule(**self.validData, mode="mirror;bundle:1K")
+        self.assertTrue(bundleRule.isMirror)
+        self.assertEqual(bundleRule.bundleThreshold, 1024)
+        self.assertIsNone(mirrorRule.bundleThreshold)
+        for mode in ("sync", "mirror:", "mirror:0", "mirror:101",
+                     "bundle:1X", "bundle;bundle"):
+            with self.assertRaises(ModeIsInvalidException):
+                Rule(**self.validData, mode=mode)
+
+    def testRuleID(self):
+        """Test the rule ID is stable and depends on the attributes."""
+        rule = Rule(**self.validData)
+        self.assertEqual(rule.ruleID, Rule(**self.validData).ruleID)
+        self.assertNotEqual(
+            rule.ruleID, Rule(**{**self.validData, "time": "11:00"}).ruleID
+        )
+
+    def testRuleIDWithoutOptionalAttributes(self):
+        """Test the ID does not digest the unset optional attributes."""
+        rule = Rule(**self.validData)
+        self.assertEqual(rule.ruleID, "6b91bd42b5ed")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,107 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for RuleRepository class."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from model.Rule import Rule
+from model.RuleRepository import RuleRepository
+from exception.exceptions import (
+    PathToRulesFileDoesNotExistException,
+    MalformedRuleAttributesException,
+)
+
+
+class TestRuleRepository(unittest.TestCase):
+    """Unit tests for RuleRepository class."""
+
+    def setUp(self):
+        """Creates a temporary rules file."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.rulesFilePath = os.path.join(self.directory.name, "rules.csv")
+        with open(self.rulesFilePath, 'w') as file:
+            file.write("/path,123,acc,10:00,,\n")
+        self.repository = RuleRepository(self.rulesFilePath)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def writeRulesFile(self, content: str) -> None:
+        with open(self.rulesFilePath, 'w') as file:
+            file.write(content)
+
+    def testLoadRules(self):
+        """Test rules are parsed from the file."""
+        rules = self.repository.loadRules()
+        self.assertEqual(rules, [Rule("/path", "123", "acc", "10:00")])
+
+    def testLoadRulesIsCached(self):
+        """Test the file is not re-read while its stamp is unchanged."""
+        self.repository.loadRules()
+        with patch("builtins.open") as mockOpen:
+            self.repository.loadRules()
+            self.assertFalse(self.repository.refreshRules())
+            mockOpen.assert_not_called()
+
+    def testRefreshNotifiesOnlyOnChange(self):
+        """Test subscribers are notified only when the rules change."""
+        self.repository.loadRules()
+        callback = Mock()
+        self.repository.subscribe(callback)
+
+        os.utime(self.rulesFilePath, ns=(1, 1))
+        self.assertFalse(self.repository.refreshRules())
+        callback.assert_not_called()
+
+        self.writeRulesFile("/path,123,acc,10:00,,\n/other,1,acc,11:00,,\n")
+        self.assertTrue(self.repository.refreshRules())
+        callback.assert_called_once()
+        self.assertEqual(len(callback.call_args[0][0]), 2)
+
+    def testSaveRulesBumpsGenerationAndNotifies(self):
+        """Test saving rules updates the snapshot without re-parsing."""
+        self.repository.loadRules()
+        stamp = self.repository.changeStamp
+        callback = Mock()
+        self.repository.subscribe(callback)
+
+        self.repository.saveUniqueRules([Rule("/new", "1", "acc", "12:00")])
+
+        callback.assert_called_once()
+        self.assertNotEqual(self.repository.changeStamp, stamp)
+        self.assertFalse(self.repository.refreshRules())
+        self.assertEqual(len(self.repository.loadRules()), 2)
+
+    def testMalformedFileIsReportedOnce(self):
+        """Test a malformed file raises only until it changes again."""
+        self.repository.loadRules()
+        self.writeRulesFile("/path,123\n")
+
+        with self.assertRaises(MalformedRuleAttributesException):
+            self.repository.refreshRules()
+        self.assertFalse(self.repository.refreshRules())
+
+    def testMissingFileIsReportedOnce(self):
+        """Test a missing file raises only once."""
+        os.remove(self.rulesFilePath)
+
+        with self.assertRaises(PathToRulesFileDoesNotExistException):
+            self.repository.refreshRules()
+        self.assertFalse(self.repository.refreshRules())
+
+
+if __name__ == "__main__":
+    unittest.main()
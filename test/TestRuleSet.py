@@ -0,0 +1,127 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for RuleSet class."""
+
+import os
+import tempfile
+import unittest
+
+from model.Rule import Rule
+from model.RuleSet import RuleSet
+from benchmark.RuleSetBenchmark import runBenchmark
+from exception.exceptions import RulesAreInvalidException
+
+
+class TestRuleSet(unittest.TestCase):
+    """Unit tests for RuleSet class."""
+
+    def setUp(self):
+        self.rows = [
+            ["/path", "123", "acc", "10:00", "Monday", ""],
+            ["/path", "123", "acc", "12:00", "", "5"],
+            ["/path", "123", "acc", "10:00", "Monday", ""],
+        ]
+
+    def testFromRowsDeduplicates(self):
+        """Test rows are converted and duplicates dropped in order."""
+        ruleSet = RuleSet.fromRows(self.rows)
+        self.assertEqual(list(ruleSet), [
+            Rule("/path", "123", "acc", "10:00", "Monday"),
+            Rule("/path", "123", "acc", "12:00", None, 5),
+        ])
+
+    def testFromRowsWithTrigger(self):
+        """Test the optional trigger column may be missing or blank."""
+        ruleSet = RuleSet.fromRows([
+            ["/path", "123", "acc", "10:00", "", "", "onChange"],
+            ["/path", "123", "acc", "11:00", "", "", ""],
+            ["/path", "123", "acc", "12:00", "", ""],
+        ])
+        self.assertEqual([rule.trigger for rule in ruleSet],
+                         ["onChange", None, None])
+
+    def testFromRowsWithPriority(self):
+        """Test the optional priority column may be missing or blank."""
+        ruleSet = RuleSet.fromRows([
+            ["/path", "123", "acc", "10:00", "", "", "", "high"],
+            ["/path", "123", "acc", "11:00", "", "", "", ""],
+            ["/path", "123", "acc", "12:00", "", "", "onChange"],
+        ])
+        self.assertEqual([rule.priority for rule in ruleSet],
+                         ["high", None, None])
+
+    def testFromRowsReportsAllErrors(self):
+        """Test all invalid attributes are reported together."""
+        self.rows[0][4] = "Someday"
+        self.rows[1][1] = " "
+        self.rows[2][5] = "x"
+        with self.assertRaises(RulesAreInvalidException) as context:
+            RuleSet.fromRows(self.rows)
+        self.assertEqual(len(context.exception.errors), 3)
+
+    def testFromColumns(self):
+        """Test rules are created from typed columns."""
+        ruleSet = RuleSet.fromColumns({
+            "pathFrom": ["/a", "/b"],
+            "folderID": ["1", "2"],
+            "account": ["acc", "acc"],
+            "time": ["10:00", "11:00"],
+        })
+        self.assertEqual(ruleSet.toColumns()["dayOfMonth"], [None, None])
+
+    def testCSVAndJSONRoundTrip(self):
+        """Test rules survive export and import."""
+        ruleSet = RuleSet.fromRows(self.rows)
+        with tempfile.TemporaryDirectory() as directory:
+            csvPath = os.path.join(directory, "rules.csv")
+            jsonPath = os.path.join(directory, "rules.json")
+            ruleSet.writeCSV(csvPath)
+            ruleSet.writeJSON(jsonPath)
+            self.assertEqual(RuleSet.readCSV(csvPath), ruleSet)
+            self.assertEqual(RuleSet.readJSON(jsonPath), ruleSet)
+
+    def testReadCSVQuotedAndShortRows(self):
+        """Test quoted fields and rows of different lengths are read."""
+        with tempfile.TemporaryDirectory() as directory:
+            csvPath = os.path.join(directory, "rules.csv")
+            with open(csvPath, 'w', newline='') as file:
+                file.write('"/a,b",123,acc,10:00,,\r\n'
+                           '/c,123,acc,12:00,Monday,,onChange\r\n')
+            ruleSet = RuleSet.readCSV(csvPath)
+
+        self.assertEqual(list(ruleSet), [
+            Rule("/a,b", "123", "acc", "10:00"),
+            Rule("/c", "123", "acc", "12:00", "Monday", trigger="onChange"),
+        ])
+
+    def testReadCSVReportsInvalidRows(self):
+        """Test the errors of an unquoted file name their rows."""
+        with tempfile.TemporaryDirectory() as directory:
+            csvPath = os.path.join(directory, "rules.csv")
+            with open(csvPath, 'w', newline='') as file:
+                file.write("/a,123,acc,10:00,,\n/b,123,acc,10:00,Moonday,\n")
+
+            with self.assertRaises(RulesAreInvalidException) as context:
+                RuleSet.readCSV(csvPath)
+
+        self.assertEqual(len(context.exception.errors), 1)
+        self.assertIn("row 2, weekday", context.exception.errors[0])
+
+    def testBenchmark(self):
+        """Test the benchmark loads and deduplicates the generated rules."""
+        results = runBenchmark(1_000)
+        self.assertEqual(results["uniqueRules"], 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for RuleTableModel class."""
+
+import unittest
+from unittest.mock import Mock
+
+from PyQt5.QtCore import Qt
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+from view.RuleTableModel import RuleTableModel
+from view.RuleFilterProxyModel import RuleFilterProxyModel
+
+
+class TestRuleTableModel(unittest.TestCase):
+    """Unit tests for RuleTableModel class."""
+
+    def setUp(self):
+        self.rules = [
+            Rule(f"/path/{i}", "123", f"acc{i % 2}", "10:00")
+            for i in range(5)
+        ]
+        self.model = RuleTableModel()
+        self.model.setRules(self.rules)
+
+    def testData(self):
+        """Test the cells and the rule of a row."""
+        index = self.model.index(1, RuleTableModel.ACCOUNT_NAME_COLUMN)
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(self.model.data(index), "acc1")
+        self.assertEqual(
+            self.model.data(index, RuleTableModel.RuleRole), self.rules[1]
+        )
+        self.assertEqual(self.model.rowOfRule(self.rules[3]), 3)
+
+    def testSetRulesUpdatesOnlyChangedRows(self):
+        """Test a refresh removes and inserts rows without a reset."""
+        reset, removed, inserted = Mock(), Mock(), Mock()
+        self.model.modelReset.connect(reset)
+        self.model.rowsRemoved.connect(removed)
+        self.model.rowsInserted.connect(inserted)
+        newRule = Rule("/new", "1", "acc", "12:00")
+
+        self.model.setRules(self.rules[:1] + self.rules[3:] + [newRule])
+
+        reset.assert_not_called()
+        self.assertEqual(removed.call_args[0][1:], (1, 2))
+        self.assertEqual(inserted.call_args[0][1:], (3, 3))
+        self.assertEqual(self.model.ruleAt(3), newRule)
+        self.assertEqual(self.model.rowOfRule(self.rules[4]), 2)
+
+    def testSort(self):
+        """Test the rules are sorted by the column."""
+        self.model.sort(RuleTableModel.PATH_FROM_COLUMN, Qt.DescendingOrder)
+        self.assertEqual(self.model.ruleAt(0), self.rules[4])
+
+        self.model.setRules(self.rules + [Rule("/z", "1", "acc", "12:00")])
+        self.assertEqual(self.model.ruleAt(0).pathFrom, "/z")
+
+    def testRuleRuns(self):
+        """Test the last runs are shown and sorted by the duration."""
+        self.model.setRuleRuns({
+            self.rules[0].ruleID: RuleRun(self.rules[0].ruleID, 0, 30),
+        })
+        self.model.setRuleRun(
+            self.rules[2], RuleRun(self.rules[2].ruleID, 0, 4, errorClass="E")
+        )
+
+        self.model.sort(RuleTableModel.DURATION_COLUMN)
+
+        self.assertEqual(self.model.ruleAt(0), self.rules[2])
+        self.assertEqual(self.model.ruleAt(1), self.rules[0])
+        self.assertEqual(
+            self.model.data(self.model.index(0,
+                                             RuleTableModel.DURATION_COLUMN)),
+            "4.0 s"
+        )
+        self.assertTrue(self.model.data(self.model.index(
+            0, RuleTableModel.LAST_RUN_COLUMN
+        )).endswith("(E)"))
+
+    def testRuleProgress(self):
+        """Test the progress replaces the last run until the run ends."""
+        index = self.model.index(1, RuleTableModel.LAST_RUN_COLUMN)
+
+        self.model.setRuleProgress(self.rules[1], 25, 100, 65.0)
+        self.assertEqual(self.model.data(index), "Running 25%, 1:05 left")
+        self.model.setRuleProgress(self.rules[1], 0, 100, -1.0)
+        self.assertEqual(self.model.data(index), "Running 0%")
+
+        self.model.setRuleRun(self.rules[1],
+                              RuleRun(self.rules[1].ruleID, 0, 4))
+        self.assertFalse(self.model.data(index).startswith("Running"))
+
+    def testFilter(self):
+        """Test the proxy filters the rules case insensitively."""
+        proxyModel = RuleFilterProxyModel(self.model)
+
+        proxyModel.setRuleFilter("ACC1", RuleTableModel.ACCOUNT_NAME_COLUMN)
+        self.assertEqual(proxyModel.rowCount(), 2)
+
+        proxyModel.setRuleFilter("/path/3")
+        self.assertEqual(proxyModel.rowCount(), 1)
+
+        proxyModel.setRuleFilter("")
+        self.assertEqual(proxyModel.rowCount(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for RunHistoryRepository class."""
+
+import os
+import time
+import tempfile
+import unittest
+
+from model.RuleRun import RuleRun
+from model.RunHistoryRepository import RunHistoryRepository
+
+
+class TestRunHistoryRepository(unittest.TestCase):
+    """Unit tests for RunHistoryRepository class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.repository = RunHistoryRepository(
+            os.path.join(self.directory.name, "runHistory.sqlite3"),
+            maxRunsPerRule=3
+        )
+        self.now = time.time()
+
+    def tearDown(self):
+        self.repository.close()
+        self.directory.cleanup()
+
+    def addRun(self, ruleID, startTime, errorClass=None) -> RuleRun:
+        run = RuleRun(ruleID, startTime, startTime + 2, bytesUploaded=10,
+                      errorClass=errorClass)
+        self.repository.addRun(run)
+        return run
+
+    def testGetRuns(self):
+        """Test the runs are filtered by the rule and the outcome."""
+        first = self.addRun("a", self.now - 20)
+        failed = self.addRun("a", self.now - 10, "HttpError")
+        self.addRun("b", self.now - 5)
+
+        self.assertEqual(self.repository.getRuns("a"), [failed, first])
+        self.assertEqual(
+            self.repository.getRuns("a", outcome=RuleRun.FAILURE), [failed]
+        )
+        self.assertEqual(
+            self.repository.getRuns(since=self.now - 15, outcome="success"),
+            [self.repository.getRuns("b")[0]]
+        )
+
+    def testRetention(self):
+        """Test only maxRunsPerRule runs not older than maxAge are kept."""
+        self.addRun("a", self.now - self.repository.maxAge - 1)
+        runs = [self.addRun("a", self.now - seconds)
+                for seconds in (4, 3, 2, 1)]
+
+        self.assertEqual(self.repository.getRuns("a"), runs[:0:-1])
+
+    def testLastRunsAndStatistics(self):
+        """Test the last run of every rule and the rule statistics."""
+        self.addRun("a", self.now - 20)
+        last = self.addRun("a", self.now - 10, "HttpError")
+        other = self.addRun("b", self.now - 30)
+
+        self.assertEqual(self.repository.getLastRuns(),
+                         {"a": last, "b": other})
+        statistics = self.repository.getRuleStatistics("a")
+        self.assertEqual(statistics["runs"], 2)
+        self.assertEqual(statistics["failures"], 1)
+        self.assertAlmostEqual(statistics["averageDuration"], 2)
+        self.assertEqual(statistics["bytesUploaded"], 20)
+
+    def testThroughput(self):
+        """Test the throughput counts only the runs which uploaded bytes."""
+        self.addRun("a", self.now - 20)
+        self.repository.addRun(RuleRun("a", self.now - 10, self.now))
+        self.repository.addRun(RuleRun("b", self.now - 5, self.now - 4,
+                                       bytesUploaded=25))
+
+        self.assertAlmostEqual(self.repository.getThroughput("a"), 5)
+        self.assertAlmostEqual(self.repository.getThroughput(), 35 / 3)
+        self.assertEqual(self.repository.getThroughput("c"), 0)
+        self.assertAlmostEqual(self.repository.estimateThroughput("c"),
+                               35 / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for RunScheduler class."""
+
+import unittest
+
+from model.Rule import Rule
+from service.RunScheduler import RunScheduler
+
+
+class TestRunScheduler(unittest.TestCase):
+    """Unit tests for RunScheduler class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.estimates: dict[str, float] = {}
+        self.scheduler = RunScheduler(
+            lambda rule, changedPaths: self.estimates.get(rule.pathFrom, 0),
+            agingInterval=600,
+            clock=lambda: self.now
+        )
+
+    def rule(self, pathFrom: str, seconds: float, account: str = "acc",
+             priority: str | None = None) -> Rule:
+        """Returns the rule whose run is estimated to take the seconds."""
+        self.estimates[pathFrom] = seconds
+        return Rule(pathFrom, f"folder-{account}", account, "10:00",
+                    priority=priority)
+
+    def popAll(self) -> list[str]:
+        """Runs the queued rules as estimated and returns their paths."""
+        paths = []
+        while (scheduledRun := self.scheduler.pop()) is not None:
+            rule = scheduledRun[0]
+            paths.append(rule.pathFrom)
+            self.now += self.estimates[rule.pathFrom]
+            self.scheduler.complete(rule, self.estimates[rule.pathFrom])
+        return paths
+
+    def testPriorityThenShortestJobFirst(self):
+        """Test the runs are ordered by the priority, then by the size."""
+        for rule in (self.rule("/huge", 3000), self.rule("/small", 10),
+                     self.rule("/low", 1, priority="low"),
+                     self.rule("/high", 500, priority="high")):
+            self.scheduler.push(rule)
+
+        self.assertEqual(len(self.scheduler), 4)
+        self.assertEqual(self.popAll(), ["/high", "/small", "/huge", "/low"])
+
+    def testAging(self):
+        """Test a waiting low priority run is not starved."""
+        self.scheduler.push(self.rule("/low", 1, priority="low"))
+        self.now = 1200
+        self.scheduler.push(self.rule("/normal", 0))
+
+        self.assertEqual(self.popAll(), ["/low", "/normal"])
+
+    def testAccountFairness(self):
+        """Test the accounts share the worker by the work."""
+        for number in range(3):
+            self.scheduler.push(self.rule(f"/a{number}", 100, "a"))
+        self.scheduler.push(self.rule("/b", 150, "b"))
+
+        self.assertEqual(self.popAll(), ["/a0", "/b", "/a1", "/a2"])
+
+    def testMergesRunsOfRule(self):
+        """Test a rule is queued once and a scan absorbs the changes."""
+        rule = self.rule("/rule", 1)
+        self.scheduler.push(rule, {"rule/a"})
+        self.scheduler.push(rule, {"rule/b"})
+        self.assertEqual(self.scheduler.pop(), (rule, {"rule/a", "rule/b"}))
+
+        self.scheduler.push(rule, {"rule/a"})
+        self.scheduler.push(rule)
+        self.assertEqual(self.scheduler.pop(), (rule, None))
+        self.assertIsNone(self.scheduler.pop())
+
+
+if __name__ == "__main__":
+    unittest.main()
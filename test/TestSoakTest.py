@@ -0,0 +1,56 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for the soak test."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmark.SoakTest import detectGrowth, runSoak
+from metrics.metrics import metricsConfig
+
+
+class TestSoakTest(unittest.TestCase):
+    """Unit tests for the soak test."""
+
+    def testDetectGrowth(self):
+        """Test a steady growth is detected and noise is not."""
+        samples = [
+            {"objects": 50000 + 100 * number, "threads": 2 + number % 2,
+             "fileDescriptors": 10 + number}
+            for number in range(50)
+        ]
+
+        growing = detectGrowth(samples)
+
+        self.assertEqual(set(growing), {"fileDescriptors"})
+
+    def testShortSoak(self):
+        """Test a simulated half day runs the rules without leaking."""
+        # The worker writes the metrics snapshot after every check.
+        with tempfile.TemporaryDirectory() as directory, patch.dict(
+            metricsConfig,
+            snapshotPath=os.path.join(directory, "metrics.json")
+        ):
+            report = runSoak(days=0.5, numberOfRules=4, numberOfFiles=4,
+                             isGUI=True, sampleEvery=30)
+
+        self.assertEqual(report["runs"], 2)
+        self.assertEqual(report["failedRuns"], 0)
+        self.assertNotIn("fileDescriptors", report["growing"])
+        self.assertNotIn("threads", report["growing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for StorageQuotaService class."""
+
+import os
+import unittest
+
+from googleapiclient.errors import HttpError
+from model.Rule import Rule
+from model.ManifestRepository import ManifestEntry
+from model.UploadPlan import UploadPlan, PlannedFile
+from service.DriveRequestExecutor import DriveRequestExecutor
+from service.StorageQuotaService import StorageQuotaService
+from service.RetryPolicy import RetryPolicy
+from profiling.Profiler import Profiler
+from benchmark.FakeDriveService import FakeDriveService
+
+
+class TestStorageQuotaService(unittest.TestCase):
+    """Unit tests for StorageQuotaService class."""
+
+    def setUp(self):
+        self.driveService = FakeDriveService(storageLimit=100)
+        self.storageQuotaService = StorageQuotaService(DriveRequestExecutor(
+            self.driveService, RetryPolicy(sleep=lambda delay: None),
+            Profiler()
+        ))
+        self.rule = Rule("tree", "folder", "acc", "10:00")
+        self.plan = UploadPlan(self.rule.ruleID)
+        for index, size in enumerate((40, 50)):
+            self.plan.files.append(PlannedFile(
+                f"tree/{index}", f"/tree/{index}",
+                os.stat_result((0o100644, 0, 0, 1, 0, 0, size, 0, 0, 0,
+                                0, 0, 0, 0, index, 0)),
+                None
+            ))
+
+    def getDeferredPaths(self) -> list[str]:
+        """Returns the relative paths of the deferred files of the plan."""
+        return [file.relativePath for file in self.plan.deferredFiles]
+
+    def testCheckPlanDefersFilesBeyondQuota(self):
+        """Test the newest files which fit the free storage are kept."""
+        self.driveService.storageLimit = 60
+
+        self.storageQuotaService.checkPlan(self.rule, self.plan)
+
+        self.assertEqual(self.getDeferredPaths(), ["tree/0"])
+
+    def testCheckPlanKeepsReservedStorage(self):
+        """Test the storage reserved for other runs is not planned."""
+        self.storageQuotaService.checkPlan(self.rule, self.plan, 20)
+
+        self.assertEqual(self.getDeferredPaths(), ["tree/0"])
+
+    def testCheckPlanCountsGrowthOfUpdatedFiles(self):
+        """Test an updated file needs only the growth of its size."""
+        self.driveService.storageLimit = 60
+        self.plan.files[0] = self.plan.files[0]._replace(
+            entry=ManifestEntry(30, 0, "uploaded")
+        )
+
+        self.storageQuotaService.checkPlan(self.rule, self.plan)
+
+        self.assertEqual(self.getDeferredPaths(), [])
+
+    def testFreeBytesAreCachedAndLoweredByUploads(self):
+        """Test the quota is read once and lowered by the uploaded bytes."""
+        self.assertEqual(self.storageQuotaService.getFreeBytes("acc"), 100)
+        self.storageQuotaService.useFreeBytes("acc", 30)
+
+        self.assertEqual(self.storageQuotaService.getFreeBytes("acc"), 70)
+        self.assertEqual(self.driveService.calls["about.get"], 1)
+        self.storageQuotaService.forgetFreeBytes("acc")
+        self.assertEqual(self.storageQuotaService.getFreeBytes("acc"), 100)
+        self.assertEqual(self.driveService.calls["about.get"], 2)
+
+    def testUnlimitedStorageDefersNothing(self):
+        """Test nothing is deferred without a storage limit."""
+        self.driveService.storageLimit = None
+
+        self.storageQuotaService.checkPlan(self.rule, self.plan, 1000)
+
+        self.assertIsNone(self.storageQuotaService.getFreeBytes("acc"))
+        self.assertEqual(self.getDeferredPaths(), [])
+
+    def testIsQuotaExceeded(self):
+        """Test only the storageQuotaExceeded errors exceed the quota."""
+        with self.assertRaises(HttpError) as context:
+            self.driveService.createFile({"name": "big"}, b"x" * 101, "id")
+
+        self.assertTrue(
+            StorageQuotaService.isQuotaExceeded(context.exception)
+        )
+        self.assertFalse(StorageQuotaService.isQuotaExceeded(OSError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
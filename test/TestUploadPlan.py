@@ -0,0 +1,83 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing unit tests for UploadPlan class."""
+
+import os
+import unittest
+
+from model.UploadPlan import UploadPlan, PlannedFile
+from model.ManifestRepository import ManifestEntry
+
+
+def plannedFile(name: str, size: int, mtimeNs: int) -> PlannedFile:
+    """Returns the planned new file with the size and the mtime."""
+    fileStat = os.stat_result((0o100644, 0, 0, 1, 0, 0, size, 0, 0, 0,
+                               0, 0, 0, 0, mtimeNs, 0))
+    return PlannedFile(name, f"/{name}", fileStat, None)
+
+
+class TestUploadPlan(unittest.TestCase):
+    """Unit tests for UploadPlan class."""
+
+    def setUp(self):
+        self.plan = UploadPlan("rule")
+        self.plan.files = [
+            plannedFile("old", 40, 1),
+            plannedFile("new", 50, 3),
+            plannedFile("small", 10, 2),
+        ]
+
+    def testTrimKeepsNewestFilesInScanOrder(self):
+        """Test the newest files which fit are kept in the scan order."""
+        self.plan.trim(65)
+
+        self.assertEqual([file.relativePath for file in self.plan.files],
+                         ["new", "small"])
+        self.assertEqual([file.relativePath
+                          for file in self.plan.deferredFiles], ["old"])
+        self.assertEqual((self.plan.plannedBytes, self.plan.deferredBytes),
+                         (60, 40))
+
+    def testTrimCountsGrowthOfUpdatedFiles(self):
+        """Test an updated file needs only the growth of its size."""
+        oldFile = self.plan.files[0]
+        self.plan.files[0] = oldFile._replace(
+            entry=ManifestEntry(35, 0, "id")
+        )
+        self.plan.trim(65)
+
+        self.assertEqual([file.relativePath for file in self.plan.files],
+                         ["old", "new", "small"])
+        self.assertEqual(self.plan.plannedQuotaBytes, 65)
+
+    def testToDict(self):
+        """Test the plan for JSON."""
+        self.plan.filesScanned = 5
+        self.plan.remoteFileIDs["small"] = "id"
+        self.plan.trim(60)
+
+        plan = self.plan.toDict(3.0)
+
+        self.assertEqual(plan["create"], [{"path": "new", "size": 50}])
+        self.assertEqual(plan["update"], [{"path": "small", "size": 10}])
+        self.assertEqual(plan["deferred"], [{"path": "old", "size": 40}])
+        self.assertEqual((plan["skip"], plan["estimatedSeconds"]), (2, 3.0))
+
+    def testEstimateSeconds(self):
+        """Test the time left of the planned bytes."""
+        self.assertEqual(self.plan.estimateSeconds(10.0, 50), 5.0)
+        self.assertIsNone(self.plan.estimateSeconds(0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
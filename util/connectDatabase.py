@@ -0,0 +1,31 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the connectDatabase method."""
+
+import os
+import sqlite3
+
+
+def connectDatabase(databaseFilePath: str) -> sqlite3.Connection:
+    """
+    Opens the SQLite database in write-ahead logging mode, creating its
+    directory. The connection may be shared between threads under a lock.
+    Args:
+        databaseFilePath (str): is the path to the database file.
+    """
+    directory = os.path.dirname(databaseFilePath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(databaseFilePath, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
@@ -13,7 +13,11 @@
 """Module containing the CreationRuleWindow class."""
 
 from view.GoogleDriveFolderPicker import GoogleDriveFolderPicker
+from model.FolderCacheRepository import FolderCacheRepository
+from worker.FolderListingWorker import FolderListingWorker
+from worker.FolderIndexWorker import FolderIndexWorker
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import (
     QDialog,
     QPushButton,
@@ -26,18 +30,19 @@ from PyQt5.QtWidgets import (
     QFileDialog,
     QStyle,
     QComboBox,
-    QSpinBox
+    QSpinBox,
+    QCheckBox,
 )
 
 
 class CreationRuleWindow(QDialog):
     """The class of creation rules of autobackup."""
-    def __init__(self, driveService):
+    def __init__(self, folderListingWorker: FolderListingWorker,
+                 folderIndexWorker: FolderIndexWorker,
+                 folderCacheModel: FolderCacheRepository):
         super().__init__()
         self.setWindowTitle("Create rule")
-        self.setWindowFlags(
-            self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint
-        )
+        self.setWindowFlag(Qt.WindowType.WindowContextHelpButtonHint, False)
 
         self.pathFromInput = QLineEdit()
         self.pathFromInput.setPlaceholderText("Path from")
@@ -47,7 +52,10 @@ class CreationRuleWindow(QDialog):
         self.folderIDInput.setPlaceholderText("Folder ID")
         self.folderIDInput.setReadOnly(True)
 
-        icon = self.style().standardIcon(QStyle.SP_DirOpenIcon)
+        style = self.style()
+        icon = QIcon() if style is None else style.standardIcon(
+            QStyle.StandardPixmap.SP_DirOpenIcon
+        )
 
         self.browsePathFromButton = QPushButton()
         self.browsePathFromButton.setIcon(icon)
@@ -76,6 +84,36 @@ class CreationRuleWindow(QDialog):
         self.dayOfMonthSpinBox.setMinimum(MIN_DAY_OF_MONTH)
         self.dayOfMonthSpinBox.setMaximum(MAX_DAY_OF_MONTH)
 
+        self.onChangeCheckBox = QCheckBox("Also back up on &change")
+        self.onChangeCheckBox.setToolTip(
+            "Backs up the changed files as soon as they are quiet."
+        )
+
+        self.priorityComboBox = QComboBox()
+        self.priorityComboBox.addItems(["normal", "high", "low"])
+        self.priorityComboBox.setToolTip(
+            "The rules due together run by the priority."
+        )
+
+        self.mirrorCheckBox = QCheckBox("&Mirror deletions")
+        self.mirrorCheckBox.setToolTip(
+            "Moves the backed up files deleted from the path to the trash."
+        )
+
+        self.bundleCheckBox = QCheckBox("&Bundle small files")
+        self.bundleCheckBox.setToolTip(
+            "Uploads the files smaller than 64 KB packed in ZIP bundles."
+        )
+
+        self.filtersInput = QLineEdit()
+        self.filtersInput.setPlaceholderText(
+            "Filters, e.g. node_modules/; *.tmp; maxSize:1G"
+        )
+        self.filtersInput.setToolTip(
+            "Excluded .gitignore-style patterns and include:PATTERN, " +
+            "ignoreFile:NAME, maxSize:SIZE and maxAge:DAYS, separated by ;"
+        )
+
         self.addButton = QPushButton("&Add", self)
         self.addButton.clicked.connect(self.addTime)
 
@@ -103,6 +141,12 @@ class CreationRuleWindow(QDialog):
         layout.addWidget(self.weekdayComboBox)
         layout.addWidget(QLabel("Day of month:"))
         layout.addWidget(self.dayOfMonthSpinBox)
+        layout.addWidget(self.onChangeCheckBox)
+        layout.addWidget(QLabel("Priority:"))
+        layout.addWidget(self.priorityComboBox)
+        layout.addWidget(self.mirrorCheckBox)
+        layout.addWidget(self.bundleCheckBox)
+        layout.addWidget(self.filtersInput)
         layout.addWidget(self.confirmButton)
 
         self.weekdayComboBox.currentTextChanged.connect(self.toggleDayOfMonth)
@@ -110,19 +154,22 @@ class CreationRuleWindow(QDialog):
         self.setLayout(layout)
         self.timeList.installEventFilter(self)
 
-        self.driveService = driveService
+        self.folderListingWorker = folderListingWorker
+        self.folderIndexWorker = folderIndexWorker
+        self.folderCacheModel = folderCacheModel
 
     def addTime(self) -> None:
         """Adds unique value of the time to list."""
         timeValue = self.timeEdit.time().toString("HH:mm")
-        timeList = [
-            self.timeList.item(i).text() for i in range(
-                self.timeList.count()
-            )
-        ]
+        timeList = self.__timeValues()
         if timeValue not in timeList:
             self.timeList.addItem(timeValue)
 
+    def __timeValues(self) -> list[str]:
+        """Returns the values of the time list."""
+        items = (self.timeList.item(i) for i in range(self.timeList.count()))
+        return [item.text() for item in items if item is not None]
+
     def eventFilter(self, source, event):
         """
         Adds response to Delete key press and time selection in the table.
@@ -146,7 +193,11 @@ class CreationRuleWindow(QDialog):
 
     def selectGoogleFolder(self):
         """Selects Google Drive folder."""
-        dialog = GoogleDriveFolderPicker(self.driveService)
+        dialog = GoogleDriveFolderPicker(
+            self.folderListingWorker,
+            self.folderIndexWorker,
+            self.folderCacheModel
+        )
         dialog.folderSelected.connect(
             lambda folderID: self.folderIDInput.setText(folderID)
         )
@@ -184,11 +235,12 @@ class CreationRuleWindow(QDialog):
             "pathFrom": self.pathFromInput.text().strip(),
             "folderID": self.folderIDInput.text().strip(),
             "account": self.accountInput.text().strip(),
-            "timeList": [
-                self.timeList.item(i).text() for i in range(
-                    self.timeList.count()
-                )
-            ],
+            "timeList": self.__timeValues(),
             "weekday": self.weekdayComboBox.currentText(),
-            "dayOfMonth": int(self.dayOfMonthSpinBox.text())
+            "dayOfMonth": int(self.dayOfMonthSpinBox.text()),
+            "isOnChange": self.onChangeCheckBox.isChecked(),
+            "priority": self.priorityComboBox.currentText(),
+            "isMirror": self.mirrorCheckBox.isChecked(),
+            "isBundle": self.bundleCheckBox.isChecked(),
+            "filters": self.filtersInput.text().strip()
         }
@@ -0,0 +1,69 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ErrorPanel class."""
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QDialog,
+    QPushButton,
+    QVBoxLayout,
+    QHBoxLayout,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+)
+from view.ErrorTableModel import ErrorTableModel
+
+
+class ErrorPanel(QDialog):
+    """
+    The class of the non-modal panel of the errors of the rule runs,
+    grouped by the error class and the rule.
+    """
+    def __init__(self, errorTableModel: ErrorTableModel, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Errors")
+        self.setWindowFlag(Qt.WindowType.WindowContextHelpButtonHint, False)
+        self.setModal(False)
+
+        self.table = QTableView()
+        self.table.setModel(errorTableModel)
+        header = self.table.horizontalHeader()
+        if header is not None:
+            header.setSectionResizeMode(
+                QHeaderView.ResizeMode.ResizeToContents
+            )
+            header.setStretchLastSection(True)
+        verticalHeader = self.table.verticalHeader()
+        if verticalHeader is not None:
+            verticalHeader.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setWordWrap(False)
+
+        self.clearButton = QPushButton("&Clear")
+        self.closeButton = QPushButton("C&lose")
+        self.closeButton.clicked.connect(self.hide)
+
+        buttonsLayout = QHBoxLayout()
+        buttonsLayout.addStretch()
+        buttonsLayout.addWidget(self.clearButton)
+        buttonsLayout.addWidget(self.closeButton)
+
+        mainLayout = QVBoxLayout(self)
+        mainLayout.addWidget(self.table)
+        mainLayout.addLayout(buttonsLayout)
+
+        PANEL_WIDTH = 800
+        PANEL_HEIGHT = 400
+        self.resize(PANEL_WIDTH, PANEL_HEIGHT)
@@ -0,0 +1,127 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the ErrorTableModel class."""
+
+import datetime
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from model.ErrorGroup import ErrorGroup
+from const.const import MAX_ERROR_GROUPS
+
+
+class ErrorTableModel(QAbstractTableModel):
+    """
+    The class of ErrorTableModel - the table model over the groups of the
+    errors, the newest first. The view asks only for the visible cells, and
+    a changed group updates only its row.
+    """
+    LAST_TIME_COLUMN = 0
+    FIRST_TIME_COLUMN = 1
+    RULE_ID_COLUMN = 2
+    ERROR_CLASS_COLUMN = 3
+    COUNT_COLUMN = 4
+    MESSAGE_COLUMN = 5
+
+    HEADERS = ["Last error", "First error", "Rule", "Error", "Count",
+               "Message"]
+
+    def __init__(self, parent=None, maxGroups: int = MAX_ERROR_GROUPS):
+        """Initializes the empty error table model."""
+        super().__init__(parent)
+        self.maxGroups = maxGroups
+        self.__groups: list[ErrorGroup] = []  # the oldest first
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.__groups)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex,
+             role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        group = self.groupAt(index.row())
+        column = index.column()
+        if role == Qt.ItemDataRole.ToolTipRole and \
+           column == self.MESSAGE_COLUMN:
+            return group.message
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.__displayText(group, column)
+
+    def __displayText(self, group: ErrorGroup, column: int) -> str | None:
+        """Returns the text of the group in the column."""
+        if column == self.LAST_TIME_COLUMN:
+            return self.__timeText(group.lastTime)
+        if column == self.FIRST_TIME_COLUMN:
+            return self.__timeText(group.firstTime)
+        return {
+            self.RULE_ID_COLUMN: group.ruleID,
+            self.ERROR_CLASS_COLUMN: group.errorClass,
+            self.COUNT_COLUMN: str(group.count),
+            self.MESSAGE_COLUMN: group.message,
+        }.get(column)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and \
+           orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def groupAt(self, row: int) -> ErrorGroup:
+        """Returns the group in the row."""
+        return self.__groups[len(self.__groups) - 1 - row]
+
+    def setGroups(self, groups: list[ErrorGroup]) -> None:
+        """
+        Replaces the groups in the table.
+        Args:
+            groups (list[ErrorGroup]): are the groups, the oldest first.
+        """
+        self.beginResetModel()
+        self.__groups = list(groups[-self.maxGroups:]) \
+            if self.maxGroups else []
+        self.endResetModel()
+
+    def updateGroup(self, group: ErrorGroup) -> None:
+        """
+        Shows the new or changed group; a new group is inserted at the top
+        and the oldest group beyond maxGroups is removed.
+        Args:
+            group (ErrorGroup): is the new or changed group.
+        """
+        for index in range(len(self.__groups) - 1, -1, -1):
+            if self.__groups[index] is group:
+                row = len(self.__groups) - 1 - index
+                self.dataChanged.emit(
+                    self.index(row, 0),
+                    self.index(row, self.columnCount() - 1)
+                )
+                return
+
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.__groups.append(group)
+        self.endInsertRows()
+        if len(self.__groups) > self.maxGroups:
+            lastRow = len(self.__groups) - 1
+            self.beginRemoveRows(QModelIndex(), lastRow, lastRow)
+            del self.__groups[0]
+            self.endRemoveRows()
+
+    @staticmethod
+    def __timeText(time: float) -> str:
+        return datetime.datetime.fromtimestamp(time).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
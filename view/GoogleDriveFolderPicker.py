@@ -12,14 +12,20 @@
 
 """Module containing the GoogleDriveFolderPicker class."""
 
-from service.GoogleDriveService import GoogleDriveService
+from model.FolderCacheRepository import FolderCacheRepository
+from worker.FolderListingWorker import FolderListingWorker
+from worker.FolderIndexWorker import FolderIndexWorker
+from logger.logger import logger
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import (
     QDialog,
     QVBoxLayout,
     QPushButton,
     QTreeWidget,
-    QTreeWidgetItem
+    QTreeWidgetItem,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem
 )
 
 
@@ -27,22 +33,57 @@ class GoogleDriveFolderPicker(QDialog):
     """
     The class of GoogleDriveFolderPicker - manager for selecting from the
     directory hierarchy in Google Drive.
+
+    Subfolders are listed by FolderListingWorker and streamed into the tree
+    page by page. Cached subfolders are shown at once and revalidated in the
+    background when they are older than the TTL, and the subfolders of an
+    expanded folder are prefetched so the next expand is instant.
+
+    The search box searches the whole drive in the FolderIndex kept by
+    FolderIndexWorker and shows the full paths of the found folders.
     """
     folderSelected = pyqtSignal(str)
 
-    def __init__(self, driveService):
+    FOLDER_ID_ROLE = Qt.UserRole  # type: ignore
+    STATE_ROLE = Qt.UserRole + 1  # type: ignore
+
+    NOT_LOADED = 0
+    LOADING = 1
+    LOADED = 2
+
+    MAX_PREFETCHED_FOLDERS = 20
+
+    def __init__(self, folderListingWorker: FolderListingWorker,
+                 folderIndexWorker: FolderIndexWorker,
+                 folderCacheModel: FolderCacheRepository):
         """
         Initializes the folder picker window.
         Args:
-            driveService (Service): is the auth drive service.
+            folderListingWorker (FolderListingWorker): is the worker listing
+            the folders.
+            folderIndexWorker (FolderIndexWorker): is the worker keeping the
+            index of all folders.
+            folderCacheModel (FolderCacheRepository): is the folder cache.
         """
         super().__init__()
-        self.driveService = driveService
+        self.folderListingWorker = folderListingWorker
+        self.folderIndexWorker = folderIndexWorker
+        self.folderIndex = folderIndexWorker.folderIndex
+        self.folderCacheModel = folderCacheModel
         self.setWindowTitle("Select Google Drive Folder")
-        self.setWindowFlags(
-            self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint
-        )
+        self.setWindowFlag(Qt.WindowType.WindowContextHelpButtonHint, False)
         self.selectedFolderID = None
+        self.__itemsByFolderID: dict[str, QTreeWidgetItem] = {}
+
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText("Search folders")
+        self.searchInput.setClearButtonEnabled(True)
+        self.searchInput.textChanged.connect(self.searchFolders)
+
+        self.searchResults = QListWidget()
+        self.searchResults.setUniformItemSizes(True)
+        self.searchResults.itemDoubleClicked.connect(self.confirm)
+        self.searchResults.hide()
 
         self.tree = QTreeWidget()
         self.tree.setHeaderHidden(True)
@@ -52,49 +93,229 @@ class GoogleDriveFolderPicker(QDialog):
         self.confirmButton.clicked.connect(self.confirm)
 
         layout = QVBoxLayout()
+        layout.addWidget(self.searchInput)
+        layout.addWidget(self.searchResults)
         layout.addWidget(self.tree)
         layout.addWidget(self.confirmButton)
         self.setLayout(layout)
 
+        self.folderListingWorker.pageLoaded.connect(self.addPage)
+        self.folderListingWorker.listingFinished.connect(self.finishListing)
+        self.folderListingWorker.errorOccured.connect(self.handleListingError)
+        self.folderIndexWorker.indexUpdated.connect(self.searchFolders)
+        self.folderIndexWorker.refresh()
+
         self.populateRoot()
 
     def onItemClicked(self, item) -> None:
         """Saves the selected item."""
-        self.selectedFolderID = item.data(0, Qt.UserRole)  # type: ignore
+        self.selectedFolderID = item.data(0, self.FOLDER_ID_ROLE)
 
     def populateRoot(self) -> None:
-        rootItem = QTreeWidgetItem(["Root"])
-        rootItem.setData(0, Qt.UserRole, "root")  # type: ignore
-        rootItem.setChildIndicatorPolicy(
-            QTreeWidgetItem.ShowIndicator)  # type: ignore
-        rootItem.setData(0, Qt.UserRole + 1, False)  # type: ignore
+        rootItem = self.__createFolderItem({"id": "root", "name": "Root"})
         self.tree.addTopLevelItem(rootItem)
         self.tree.expandItem(rootItem)
         self.tree.setCurrentItem(rootItem)
 
     def loadSubfoldersLazy(self, item):
-        """Loads subfolders lazy."""
-        isLoaded = item.data(0, Qt.UserRole + 1)  # type: ignore
-        if isLoaded:
+        """
+        Loads subfolders lazy: the cached subfolders are shown at once,
+        otherwise they are requested from the worker.
+        """
+        if item.data(0, self.STATE_ROLE) != self.NOT_LOADED:
             return
 
-        parentID = item.data(0, Qt.UserRole)  # type: ignore
-        subfolders = GoogleDriveService.listFolders(
-            self.driveService,
-            parentID
-        )
-        for folder in subfolders:
-            child = QTreeWidgetItem([folder["name"]])
-            child.setData(0, Qt.UserRole, folder["id"])  # type: ignore
-            child.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
-            child.setData(0, Qt.UserRole + 1, False)  # type: ignore
-            item.addChild(child)
-        item.setData(0, Qt.UserRole + 1, True)  # type: ignore
+        parentID = item.data(0, self.FOLDER_ID_ROLE)
+        cachedFolders = self.folderCacheModel.getFolders(parentID)
+        if cachedFolders is None:
+            item.setData(0, self.STATE_ROLE, self.LOADING)
+            loadingItem = QTreeWidgetItem(["Loading..."])
+            loadingItem.setFlags(Qt.NoItemFlags)  # type: ignore
+            item.addChild(loadingItem)
+            self.folderListingWorker.requestListing(parentID)
+            return
+
+        self.__addChildren(item, cachedFolders)
+        item.setData(0, self.STATE_ROLE, self.LOADED)
+        if self.folderCacheModel.isFresh(parentID):
+            self.__prefetchSubfolders(cachedFolders)
+        else:
+            self.folderListingWorker.requestListing(parentID)
+
+    def addPage(self, parentID: str, folders: list[dict]) -> None:
+        """
+        Streams a page of subfolders into the folder that is being loaded.
+        Args:
+            parentID (str): is the parent ID.
+            folders (list[dict]): are the subfolders in the page.
+        """
+        item = self.__itemsByFolderID.get(parentID)
+        if item is None or item.data(0, self.STATE_ROLE) != self.LOADING:
+            return
+        self.__removeLoadingItem(item)
+        self.__addChildren(item, folders)
+
+    def finishListing(self, parentID: str, folders: list[dict]) -> None:
+        """
+        Completes the listing of the folder: a loading folder is marked as
+        loaded, and a folder shown from the cache is reconciled with the
+        fresh listing. Then the next level is prefetched.
+        Args:
+            parentID (str): is the parent ID.
+            folders (list[dict]): are all subfolders of the folder.
+        """
+        item = self.__itemsByFolderID.get(parentID)
+        if item is None:
+            return
+
+        state = item.data(0, self.STATE_ROLE)
+        if state == self.NOT_LOADED:
+            if not folders:
+                item.setChildIndicatorPolicy(
+                    QTreeWidgetItem.DontShowIndicator  # type: ignore
+                )
+            return
+
+        if state == self.LOADING:
+            self.__removeLoadingItem(item)
+            item.setData(0, self.STATE_ROLE, self.LOADED)
+        else:
+            self.__reconcileChildren(item, folders)
+        if not folders:
+            item.setChildIndicatorPolicy(
+                QTreeWidgetItem.DontShowIndicator  # type: ignore
+            )
+        self.__prefetchSubfolders(folders)
+
+    def handleListingError(self, parentID: str, message: str) -> None:
+        """Logs the error; the folder is loaded again on the next expand."""
+        logger.error(message)
+        item = self.__itemsByFolderID.get(parentID)
+        if item is None or item.data(0, self.STATE_ROLE) != self.LOADING:
+            return
+        self.__removeLoadingItem(item)
+        item.takeChildren()
+        item.setData(0, self.STATE_ROLE, self.NOT_LOADED)
+        item.setExpanded(False)
+
+    def searchFolders(self) -> None:
+        """
+        Shows the folders found by the text of the search box instead of the
+        tree; an empty text shows the tree again.
+        """
+        query = self.searchInput.text().strip()
+        self.searchResults.setVisible(bool(query))
+        self.tree.setVisible(not query)
+        if not query:
+            return
+
+        self.searchResults.clear()
+        if not self.folderIndex.isReady:
+            indexingItem = QListWidgetItem("Indexing folders...")
+            indexingItem.setFlags(Qt.NoItemFlags)  # type: ignore
+            self.searchResults.addItem(indexingItem)
+            return
+
+        for folderID, path in self.folderIndex.search(query):
+            resultItem = QListWidgetItem(path)
+            resultItem.setData(self.FOLDER_ID_ROLE, folderID)
+            self.searchResults.addItem(resultItem)
+        if self.searchResults.count():
+            self.searchResults.setCurrentRow(0)
 
     def confirm(self) -> None:
         """Accepts the selected folder."""
+        if not self.searchResults.isHidden():
+            result = self.searchResults.currentItem()
+            if result and result.data(self.FOLDER_ID_ROLE):
+                self.folderSelected.emit(result.data(self.FOLDER_ID_ROLE))
+                self.accept()
+            return
+
         selected = self.tree.currentItem()
         if selected:
-            folderID = selected.data(0, Qt.UserRole)  # type: ignore
+            folderID = selected.data(0, self.FOLDER_ID_ROLE)
+            if folderID is None:
+                return
             self.folderSelected.emit(folderID)
             self.accept()
+
+    def done(self, result: int) -> None:
+        """Disconnects the picker from the worker when it is closed."""
+        self.folderListingWorker.pageLoaded.disconnect(self.addPage)
+        self.folderListingWorker.listingFinished.disconnect(
+            self.finishListing
+        )
+        self.folderListingWorker.errorOccured.disconnect(
+            self.handleListingError
+        )
+        self.folderIndexWorker.indexUpdated.disconnect(self.searchFolders)
+        super().done(result)
+
+    def __createFolderItem(self, folder: dict) -> QTreeWidgetItem:
+        """Creates a not loaded tree item of the folder."""
+        item = QTreeWidgetItem([folder["name"]])
+        item.setData(0, self.FOLDER_ID_ROLE, folder["id"])
+        item.setData(0, self.STATE_ROLE, self.NOT_LOADED)
+        cachedFolders = self.folderCacheModel.getFolders(folder["id"])
+        if cachedFolders == []:
+            item.setChildIndicatorPolicy(
+                QTreeWidgetItem.DontShowIndicator  # type: ignore
+            )
+        else:
+            item.setChildIndicatorPolicy(
+                QTreeWidgetItem.ShowIndicator  # type: ignore
+            )
+        self.__itemsByFolderID[folder["id"]] = item
+        return item
+
+    def __addChildren(self, item: QTreeWidgetItem,
+                      folders: list[dict]) -> None:
+        """Adds the folders as children of the item."""
+        item.addChildren([self.__createFolderItem(folder)
+                          for folder in folders])
+
+    def __removeLoadingItem(self, item: QTreeWidgetItem) -> None:
+        """Removes the "Loading..." child of the item if it has one."""
+        firstChild = item.child(0)
+        if firstChild is not None and \
+           firstChild.data(0, self.FOLDER_ID_ROLE) is None:
+            item.takeChild(0)
+
+    def __reconcileChildren(self, item: QTreeWidgetItem,
+                            folders: list[dict]) -> None:
+        """
+        Updates the children shown from the cache to the fresh listing: the
+        removed folders are dropped, the renamed folders are renamed, and
+        the new folders are added; the loaded subtrees are kept.
+        """
+        namesByID = {folder["id"]: folder["name"] for folder in folders}
+        shownIDs = set()
+        for row in reversed(range(item.childCount())):
+            child = item.child(row)
+            if child is None:
+                continue
+            folderID = child.data(0, self.FOLDER_ID_ROLE)
+            if folderID not in namesByID:
+                item.takeChild(row)
+                continue
+            shownIDs.add(folderID)
+            if child.text(0) != namesByID[folderID]:
+                child.setText(0, namesByID[folderID])
+
+        self.__addChildren(
+            item,
+            [folder for folder in folders if folder["id"] not in shownIDs]
+        )
+        item.sortChildren(0, Qt.SortOrder.AscendingOrder)
+
+    def __prefetchSubfolders(self, folders: list[dict]) -> None:
+        """Requests the listing of the next level that is not fresh."""
+        prefetchedFolders = [
+            folder for folder in folders
+            if not self.folderCacheModel.isFresh(folder["id"])
+        ]
+        for folder in prefetchedFolders[:self.MAX_PREFETCHED_FOLDERS]:
+            self.folderListingWorker.requestListing(
+                folder["id"], isPrefetch=True
+            )
@@ -12,6 +12,7 @@
 
 """Module containing the MainWindow class."""
 
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon, QCloseEvent
 from PyQt5.QtWidgets import (
     QApplication,
@@ -20,8 +21,9 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QVBoxLayout,
     QHBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QLineEdit,
+    QComboBox,
     QMenu,
     QAction,
     QDesktopWidget,
@@ -31,21 +33,25 @@ from PyQt5.QtWidgets import (
     QAbstractItemView,
 )
 from model.Rule import Rule
+from model.RuleRun import RuleRun
+from model.ErrorGroup import ErrorGroup
+from view.RuleTableModel import RuleTableModel
+from view.ErrorTableModel import ErrorTableModel
+from view.ErrorPanel import ErrorPanel
+from view.PlanPreviewDialog import PlanPreviewDialog
+from view.RuleFilterProxyModel import RuleFilterProxyModel
 from const.const import ICON_FILE
-from exception.exceptions import (
-    ListOfRulesIsEmptyException,
-    NoRuleSelectedInTableException
-)
+from exception.exceptions import NoRuleSelectedInTableException
 
 
 class MainWindow(QMainWindow):
     """The class of main window."""
-    PATH_FROM_COLUMN = 0
-    FOLDER_ID_COLUMN = 1
-    ACCOUNT_NAME_COLUMN = 2
-    TIME_COLUMN = 3
-    WEEKDAY_COLUMN = 4
-    DAY_OF_MONTH_COLUMN = 5
+    FILTER_COLUMNS = {
+        "All": RuleFilterProxyModel.ALL_COLUMNS,
+        "Path from": RuleTableModel.PATH_FROM_COLUMN,
+        "Account": RuleTableModel.ACCOUNT_NAME_COLUMN,
+        "Time": RuleTableModel.TIME_COLUMN,
+    }
 
     def __init__(self):
         """Initializes the main window."""
@@ -53,26 +59,61 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("GooD Autobackuper")
         self.setWindowIcon(QIcon(ICON_FILE))
 
-        NUMBER_OF_COLUMNS = 6
-        NUMBER_OF_ROWS = 0
-        self.table = QTableWidget(NUMBER_OF_ROWS, NUMBER_OF_COLUMNS)
-        self.table.setHorizontalHeaderLabels(
-            ["Path from", "Folder ID", "Account", "Time", "Weekday",
-             "Day of month"]
+        self.ruleTableModel = RuleTableModel(self)
+        self.proxyModel = RuleFilterProxyModel(self.ruleTableModel, self)
+        self.__ruleSelectedBeforeReset: Rule | None = None
+        self.ruleTableModel.modelAboutToBeReset.connect(
+            self.__rememberSelectedRule
         )
+        self.ruleTableModel.modelReset.connect(self.__restoreSelectedRule)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxyModel)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
+        verticalHeader = self.table.verticalHeader()
+        verticalHeader.setSectionResizeMode(QHeaderView.Fixed)
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+
+        self.filterInput = QLineEdit()
+        self.filterInput.setPlaceholderText("Filter")
+        self.filterInput.setClearButtonEnabled(True)
+        self.filterColumnComboBox = QComboBox()
+        self.filterColumnComboBox.addItems(list(self.FILTER_COLUMNS))
+
+        FILTER_DELAY = 150
+        self.filterTimer = QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(FILTER_DELAY)
+        self.filterTimer.timeout.connect(self.applyFilter)
+        self.filterInput.textChanged.connect(self.filterTimer.start)
+        self.filterColumnComboBox.currentTextChanged.connect(
+            self.applyFilter
+        )
 
         self.createRulesButton = QPushButton("&Create rules")
         self.deleteSelectedRuleButton = QPushButton("&Delete")
+        self.previewRuleButton = QPushButton("&Preview")
+        self.previewRuleButton.setToolTip(
+            "Shows what the selected rule would upload, without uploading."
+        )
+
+        filterLayout = QHBoxLayout()
+        filterLayout.addWidget(self.filterInput)
+        filterLayout.addWidget(self.filterColumnComboBox)
 
         tableLayout = QVBoxLayout()
+        tableLayout.addLayout(filterLayout)
         tableLayout.addWidget(self.table)
 
         buttonsLayout = QHBoxLayout()
         buttonsLayout.addWidget(self.deleteSelectedRuleButton)
+        buttonsLayout.addWidget(self.previewRuleButton)
         buttonsLayout.addWidget(self.createRulesButton)
 
         centralWidget = QWidget()
@@ -81,14 +122,22 @@ class MainWindow(QMainWindow):
         mainLayout.addLayout(tableLayout)
         mainLayout.addLayout(buttonsLayout)
 
+        self.errorTableModel = ErrorTableModel(self)
+        self.errorPanel = ErrorPanel(self.errorTableModel, self)
+        self.planPreviewDialog = PlanPreviewDialog(self)
+        self.showErrorsAction = QAction("&Errors", self)
+        self.showErrorsAction.triggered.connect(self.showErrorPanel)
+
         self.exitAction = QAction("Exit", self)
         trayMenu = QMenu()
+        trayMenu.addAction(self.showErrorsAction)
         trayMenu.addAction(self.exitAction)
         self.exitAction.triggered.connect(self.closeApplication)
         self.trayIcon = QSystemTrayIcon(self)
         self.trayIcon.setIcon(QIcon(ICON_FILE))
         self.trayIcon.setContextMenu(trayMenu)
         self.trayIcon.activated.connect(self.iconClicked)
+        self.trayIcon.messageClicked.connect(self.showErrorPanel)
         self.trayIcon.show()
 
         self.deleteTokenFileAction = QAction("&Delete token file", self)
@@ -100,39 +149,106 @@ class MainWindow(QMainWindow):
         menuBar = self.menuBar()
         menuBar.addMenu(deleteTokenFileMenuPoint)
         menuBar.addMenu(updateTableMenuPoint)
+        viewMenuPoint = QMenu("View", self)
+        viewMenuPoint.addAction(self.showErrorsAction)
+        menuBar.addMenu(viewMenuPoint)
 
         self.__resizeWindowInHalfOfScreen()
         self.__centerWindow()
 
-    def addRulesToTable(self, listOfRules: list[Rule]) -> None:
+    def setRulesToTable(self, listOfRules: list[Rule]) -> None:
         """
-        Adds rules to the table.
+        Shows the rules in the table; only the removed and the new rules
+        are updated.
         Args:
             listOfRules (list[Rule]): is the list of rules.
-        Raises:
-            ListOfRulesIsEmptyException: raises if the list of rules is empty.
-        """
-        if not listOfRules:
-            raise ListOfRulesIsEmptyException()
-
-        for rule in listOfRules:
-            rowPosition = self.table.rowCount()
-            self.table.insertRow(rowPosition)
-
-            self.table.setItem(rowPosition, self.PATH_FROM_COLUMN,
-                               QTableWidgetItem(rule.pathFrom))
-            self.table.setItem(rowPosition, self.FOLDER_ID_COLUMN,
-                               QTableWidgetItem(rule.folderID))
-            self.table.setItem(rowPosition, self.ACCOUNT_NAME_COLUMN,
-                               QTableWidgetItem(rule.account))
-            self.table.setItem(rowPosition, self.TIME_COLUMN,
-                               QTableWidgetItem(rule.time))
-            self.table.setItem(rowPosition, self.WEEKDAY_COLUMN,
-                               QTableWidgetItem(rule.weekday or ""))
-            dayOfMonth = str(rule.dayOfMonth) if rule.dayOfMonth is not None \
-                else ""
-            self.table.setItem(rowPosition, self.DAY_OF_MONTH_COLUMN,
-                               QTableWidgetItem(dayOfMonth))
+        """
+        self.ruleTableModel.setRules(listOfRules)
+
+    def setRuleRuns(self, runsByRuleID: dict[str, RuleRun]) -> None:
+        """
+        Shows the last runs of the rules in the table.
+        Args:
+            runsByRuleID (dict[str, RuleRun]): are the last runs by the
+            rule ID.
+        """
+        self.ruleTableModel.setRuleRuns(runsByRuleID)
+
+    def setRuleRun(self, rule: Rule, run: RuleRun) -> None:
+        """
+        Shows the finished run of the rule in the table.
+        Args:
+            rule (Rule): is the run rule.
+            run (RuleRun): is the finished run.
+        """
+        self.ruleTableModel.setRuleRun(rule, run)
+
+    def setRuleProgress(self, rule: Rule, uploadedBytes: int,
+                        plannedBytes: int, etaSeconds: float) -> None:
+        """
+        Shows the progress of the running rule in the table.
+        Args:
+            rule (Rule): is the running rule.
+            uploadedBytes (int): is the number of the uploaded bytes.
+            plannedBytes (int): is the number of the planned bytes.
+            etaSeconds (float): is the estimated time left in seconds or -1
+            if it is not known.
+        """
+        self.ruleTableModel.setRuleProgress(rule, uploadedBytes,
+                                            plannedBytes, etaSeconds)
+
+    def setErrorGroups(self, groups: list[ErrorGroup]) -> None:
+        """
+        Shows the groups of the errors in the error panel.
+        Args:
+            groups (list[ErrorGroup]): are the groups, the oldest first.
+        """
+        self.errorTableModel.setGroups(groups)
+
+    def setErrorGroup(self, group: ErrorGroup) -> None:
+        """
+        Shows the new or changed group of the errors in the error panel.
+        Args:
+            group (ErrorGroup): is the new or changed group.
+        """
+        self.errorTableModel.updateGroup(group)
+
+    def showErrorPanel(self) -> None:
+        """Shows the non-modal error panel."""
+        self.errorPanel.show()
+        self.errorPanel.raise_()
+        self.errorPanel.activateWindow()
+
+    def showPlan(self, _rule: Rule, plan: dict) -> None:
+        """
+        Shows the plan of the run of the rule in the preview dialog.
+        Args:
+            _rule (Rule): is the planned rule (the plan holds its ID).
+            plan (dict): is the plan of PlanWorker.createPlan.
+        """
+        self.planPreviewDialog.setPlan(plan)
+        self.planPreviewDialog.show()
+        self.planPreviewDialog.raise_()
+        self.planPreviewDialog.activateWindow()
+
+    def showNotification(self, message: str) -> None:
+        """
+        Shows the message in a notification of the tray icon.
+        Args:
+            message (str): is the message.
+        """
+        NOTIFICATION_TIME = 10000  # milliseconds
+        self.trayIcon.showMessage(
+            "GooD Autobackuper", message,
+            QSystemTrayIcon.MessageIcon.Warning, NOTIFICATION_TIME
+        )
+
+    def applyFilter(self) -> None:
+        """Filters the table by the text of the filter in the column."""
+        self.proxyModel.setRuleFilter(
+            self.filterInput.text(),
+            self.FILTER_COLUMNS[self.filterColumnComboBox.currentText()]
+        )
 
     def closeApplication(self) -> None:
         """Ends the program."""
@@ -150,61 +266,42 @@ class MainWindow(QMainWindow):
             self.show()
             self.activateWindow()
 
-    def getSelectedRow(self) -> int:
+    def getSelectedRule(self) -> Rule:
         """
-        Returns the selected row in the table.
+        Returns the selected rule in the table.
         Raises:
             NoRuleSelectedInTableException: raise if no row was selected to
             delete.
         Returns:
-            int: selected rule.
+            Rule: selected rule.
         """
-        NO_RULE_SELECTED = -1
-        selectedRule = self.table.currentRow()
-        if selectedRule == NO_RULE_SELECTED:
+        selectedIndex = self.table.currentIndex()
+        if not selectedIndex.isValid():
             raise NoRuleSelectedInTableException()
-        return selectedRule
+        return self.proxyModel.data(selectedIndex, RuleTableModel.RuleRole)
 
-    def getSelectedRuleFromTable(self, selectedRow: int) -> dict:
-        """
-        Returns the selected rule (data) from the table.
-        Args:
-            selectedRow (int): the selected data from the table.
-        Returns:
-            dict: the dict of the rules from table.
-        """
-        return {
-            "pathFrom": self.table.item(
-                selectedRow,
-                self.PATH_FROM_COLUMN
-            ).text(),
-            "folderID": self.table.item(
-                selectedRow,
-                self.FOLDER_ID_COLUMN
-            ).text(),
-            "account": self.table.item(
-                selectedRow,
-                self.ACCOUNT_NAME_COLUMN
-            ).text(),
-            "time": self.table.item(selectedRow, self.TIME_COLUMN).text(),
-            "weekday": self.table.item(
-                selectedRow,
-                self.WEEKDAY_COLUMN
-            ).text(),
-            "dayOfMonth": self.table.item(
-                selectedRow,
-                self.DAY_OF_MONTH_COLUMN
-            ).text()
-        }
-
-    def resetTable(self):
-        """Resets the table."""
-        RESET_TABLE = 0
-        self.table.setRowCount(RESET_TABLE)
-
-    def selectRow(self, selectedRow: int) -> None:
-        """Selects the row in the table."""
-        self.table.selectRow(selectedRow)
+    def selectRule(self, rule: Rule) -> None:
+        """Selects the row of the rule in the table."""
+        row = self.ruleTableModel.rowOfRule(rule)
+        if row is None:
+            return
+        selectedIndex = self.proxyModel.mapFromSource(
+            self.ruleTableModel.index(row, 0)
+        )
+        self.table.selectRow(selectedIndex.row())
+
+    def __rememberSelectedRule(self) -> None:
+        """Remembers the selected rule before the table model is reset."""
+        try:
+            self.__ruleSelectedBeforeReset = self.getSelectedRule()
+        except NoRuleSelectedInTableException:
+            self.__ruleSelectedBeforeReset = None
+
+    def __restoreSelectedRule(self) -> None:
+        """Selects the remembered rule again after the table model reset."""
+        if self.__ruleSelectedBeforeReset is not None:
+            self.selectRule(self.__ruleSelectedBeforeReset)
+            self.__ruleSelectedBeforeReset = None
 
     def __resizeWindowInHalfOfScreen(self) -> None:
         """Resizes the window to half the screen size."""
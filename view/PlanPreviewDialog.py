@@ -0,0 +1,114 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the PlanPreviewDialog class."""
+
+import json
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QDialog,
+    QLabel,
+    QPushButton,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPlainTextEdit,
+    QFileDialog,
+)
+from util.reportException import reportException
+
+
+class PlanPreviewDialog(QDialog):
+    """
+    The class of the non-modal preview of the plan of a rule run: the
+    summary and the files to create, to update and to delete (the first
+    MAX_LISTED_FILES of each); the whole plan can be saved as JSON.
+    """
+    MAX_LISTED_FILES = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Preview")
+        self.setWindowFlags(
+            self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint
+        )
+        self.setModal(False)
+        self.plan: dict = {}
+
+        self.summaryLabel = QLabel()
+        self.summaryLabel.setWordWrap(True)
+        self.filesText = QPlainTextEdit()
+        self.filesText.setReadOnly(True)
+        self.filesText.setLineWrapMode(QPlainTextEdit.NoWrap)
+
+        self.saveButton = QPushButton("&Save JSON")
+        self.saveButton.clicked.connect(self.savePlan)
+        self.closeButton = QPushButton("C&lose")
+        self.closeButton.clicked.connect(self.hide)
+
+        buttonsLayout = QHBoxLayout()
+        buttonsLayout.addStretch()
+        buttonsLayout.addWidget(self.saveButton)
+        buttonsLayout.addWidget(self.closeButton)
+
+        mainLayout = QVBoxLayout(self)
+        mainLayout.addWidget(self.summaryLabel)
+        mainLayout.addWidget(self.filesText)
+        mainLayout.addLayout(buttonsLayout)
+
+        DIALOG_WIDTH = 800
+        DIALOG_HEIGHT = 500
+        self.resize(DIALOG_WIDTH, DIALOG_HEIGHT)
+
+    def setPlan(self, plan: dict) -> None:
+        """
+        Shows the plan.
+        Args:
+            plan (dict): is the plan of PlanWorker.createPlan.
+        """
+        self.plan = plan
+        estimatedSeconds = plan["estimatedSeconds"]
+        estimate = "unknown" if estimatedSeconds is None \
+            else f"{estimatedSeconds:.0f} s"
+        self.summaryLabel.setText(
+            f"{plan['pathFrom']}: {plan['filesScanned']} files scanned, " +
+            f"{len(plan['create'])} to create, {len(plan['update'])} to " +
+            f"update, {plan['skip']} skipped, {len(plan['move'])} to " +
+            f"move, {len(plan['delete'])} to " +
+            f"delete, {len(plan['deferred'])} deferred (storage quota). " +
+            f"{plan['plannedBytes'] / 1024 / 1024:.1f} MB to upload, " +
+            f"estimated time: {estimate}."
+        )
+        lines: list[str] = []
+        for action in ("create", "update", "deferred"):
+            lines.extend(
+                f"{action}\t{item['path']}\t{item['size']}"
+                for item in plan[action][:self.MAX_LISTED_FILES]
+            )
+        lines.extend(f"move\t{item['from']}\t{item['path']}"
+                     for item in plan["move"][:self.MAX_LISTED_FILES])
+        lines.extend(f"delete\t{path}"
+                     for path in plan["delete"][:self.MAX_LISTED_FILES])
+        self.filesText.setPlainText("\n".join(lines))
+
+    def savePlan(self) -> None:
+        """Saves the whole plan as JSON to the chosen file."""
+        filePath, _ = QFileDialog.getSaveFileName(
+            self, "Save plan", f"plan-{self.plan.get('ruleID', '')}.json",
+            "JSON (*.json)"
+        )
+        if not filePath:
+            return
+        try:
+            with open(filePath, 'w') as file:
+                json.dump(self.plan, file, indent=2)
+        except OSError as exception:
+            reportException(exception)
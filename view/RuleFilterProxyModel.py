@@ -0,0 +1,66 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RuleFilterProxyModel class."""
+
+from PyQt5.QtCore import Qt, QSortFilterProxyModel, QModelIndex
+from view.RuleTableModel import RuleTableModel
+
+
+class RuleFilterProxyModel(QSortFilterProxyModel):
+    """
+    The class of RuleFilterProxyModel - sorts and filters the rule table.
+    Rows are matched against the lowercase texts cached by RuleTableModel
+    instead of asking the model for the data of every cell, and sorting is
+    delegated to RuleTableModel.
+    """
+    ALL_COLUMNS = -1
+
+    def __init__(self, sourceModel: RuleTableModel, parent=None):
+        """
+        Initializes the proxy model.
+        Args:
+            sourceModel (RuleTableModel): is the rule table model.
+        """
+        super().__init__(parent)
+        self.setSourceModel(sourceModel)
+        self.ruleTableModel = sourceModel
+        self.__filterText = ""
+        self.__filterColumn = self.ALL_COLUMNS
+
+    def setRuleFilter(self, text: str, column: int = ALL_COLUMNS) -> None:
+        """
+        Shows only the rules containing the text (case insensitive).
+        Args:
+            text (str): is the filter text; an empty text shows all rules.
+            column (int): is the filtered column or ALL_COLUMNS.
+        """
+        text = text.strip().lower()
+        if (text, column) == (self.__filterText, self.__filterColumn):
+            return
+        self.__filterText = text
+        self.__filterColumn = column
+        self.invalidate()
+
+    def sort(self, column: int,
+             order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        """Sorts the source model, keeping the proxy in the source order."""
+        self.ruleTableModel.sort(column, order)
+
+    def filterAcceptsRow(self, sourceRow: int,
+                         _sourceParent: QModelIndex) -> bool:
+        if not self.__filterText:
+            return True
+        texts = self.ruleTableModel.searchTexts(sourceRow)
+        if self.__filterColumn == self.ALL_COLUMNS:
+            return any(self.__filterText in text for text in texts)
+        return self.__filterText in texts[self.__filterColumn]
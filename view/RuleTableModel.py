@@ -0,0 +1,336 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the RuleTableModel class."""
+
+import datetime
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from model.Rule import Rule
+from model.RuleRun import RuleRun
+
+
+class RuleTableModel(QAbstractTableModel):
+    """
+    The class of RuleTableModel - the table model over the list of rules.
+    The view asks only for the visible cells, and setRules applies only the
+    removed and inserted rules through the model signals, so the selection
+    and the scroll position survive a refresh. The rules are sorted here by
+    cached keys instead of comparing the cells one by one in a proxy.
+
+    The last run of every rule is shown after the rule columns; the runs are
+    kept by the rule ID and are not searched by the filter. While a rule
+    runs, its progress and the estimated time left replace the last run.
+    """
+    PATH_FROM_COLUMN = 0
+    FOLDER_ID_COLUMN = 1
+    ACCOUNT_NAME_COLUMN = 2
+    TIME_COLUMN = 3
+    WEEKDAY_COLUMN = 4
+    DAY_OF_MONTH_COLUMN = 5
+    LAST_RUN_COLUMN = 6
+    DURATION_COLUMN = 7
+    THROUGHPUT_COLUMN = 8
+
+    HEADERS = ["Path from", "Folder ID", "Account", "Time", "Weekday",
+               "Day of month", "Last run", "Duration", "Throughput"]
+
+    RuleRole = Qt.UserRole  # type: ignore
+
+    # Above this number of scattered removals one reset is cheaper than
+    # many small row removals.
+    MAX_REMOVED_RANGES = 64
+
+    def __init__(self, parent=None):
+        """Initializes the empty rule table model."""
+        super().__init__(parent)
+        self.__rules: list[Rule] = []
+        self.__rowByRule: dict[Rule, int] = {}
+        self.__searchTexts: dict[Rule, tuple[str, ...]] = {}
+        self.__runsByRuleID: dict[str, RuleRun] = {}
+        self.__progressByRuleID: dict[str, tuple[int, int, float]] = {}
+        self.__sortColumn = -1
+        self.__sortOrder = Qt.SortOrder.AscendingOrder
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.__rules)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex,
+             role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        rule = self.__rules[index.row()]
+        if role == self.RuleRole:
+            return rule
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.__displayText(rule, index.column())
+
+    def __displayText(self, rule: Rule, column: int) -> str | None:
+        """Returns the text of the rule in the column."""
+        if column >= self.LAST_RUN_COLUMN:
+            return self.__lastRunText(rule, column)
+        if column == self.TIME_COLUMN:
+            return self.__timeText(rule)
+        return {
+            self.PATH_FROM_COLUMN: rule.pathFrom,
+            self.FOLDER_ID_COLUMN: rule.folderID,
+            self.ACCOUNT_NAME_COLUMN: rule.account,
+            self.WEEKDAY_COLUMN: rule.weekday or "",
+            self.DAY_OF_MONTH_COLUMN: str(rule.dayOfMonth)
+            if rule.dayOfMonth is not None else "",
+        }.get(column)
+
+    @staticmethod
+    def __timeText(rule: Rule) -> str:
+        """Returns the time of the rule with its trigger and modes."""
+        text = f"{rule.time}, on change" if rule.isOnChange else rule.time
+        if rule.priority not in (None, Rule.NORMAL_PRIORITY):
+            text = f"{text}, {rule.priority} priority"
+        if rule.isMirror:
+            text = f"{text}, mirror"
+        if rule.bundleThreshold is not None:
+            text = f"{text}, bundled"
+        return text
+
+    def __lastRunText(self, rule: Rule, column: int) -> str | None:
+        """Returns the progress or the last run of the rule."""
+        if column == self.LAST_RUN_COLUMN and \
+           rule.ruleID in self.__progressByRuleID:
+            return self.__progressText(
+                *self.__progressByRuleID[rule.ruleID]
+            )
+        run = self.__runsByRuleID.get(rule.ruleID)
+        return self.__runText(run, column) if run is not None else ""
+
+    def __runText(self, run: RuleRun, column: int) -> str | None:
+        """Returns the text of the last run in the column."""
+        if column == self.LAST_RUN_COLUMN:
+            startTime = datetime.datetime.fromtimestamp(run.startTime)
+            text = startTime.strftime("%Y-%m-%d %H:%M")
+            return text if run.errorClass is None \
+                else f"{text} ({run.errorClass})"
+        if column == self.DURATION_COLUMN:
+            return f"{run.duration:.1f} s"
+        if column == self.THROUGHPUT_COLUMN:
+            return f"{run.throughput / 1024 / 1024:.2f} MB/s"
+        return None
+
+    @staticmethod
+    def __progressText(uploadedBytes: int, plannedBytes: int,
+                       etaSeconds: float) -> str:
+        """Returns the text of the progress of the running rule."""
+        percent = 100 * uploadedBytes // plannedBytes if plannedBytes else 0
+        text = f"Running {percent}%"
+        if etaSeconds < 0:
+            return text
+        minutes, seconds = divmod(round(etaSeconds), 60)
+        return f"{text}, {minutes}:{seconds:02d} left"
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def ruleAt(self, row: int) -> Rule:
+        """Returns the rule in the row."""
+        return self.__rules[row]
+
+    def searchTexts(self, row: int) -> tuple[str, ...]:
+        """
+        Returns the lowercase texts of the rule columns of the row, cached
+        per rule for filtering.
+        """
+        rule = self.__rules[row]
+        texts = self.__searchTexts.get(rule)
+        if texts is None:
+            texts = tuple(
+                (self.__displayText(rule, column) or "").lower()
+                for column in range(self.LAST_RUN_COLUMN)
+            )
+            self.__searchTexts[rule] = texts
+        return texts
+
+    def rowOfRule(self, rule: Rule) -> int | None:
+        """Returns the row of the rule or None if the rule is not shown."""
+        return self.__rowByRule.get(rule)
+
+    def setRuleRuns(self, runsByRuleID: dict[str, RuleRun]) -> None:
+        """
+        Replaces the last runs of the rules.
+        Args:
+            runsByRuleID (dict[str, RuleRun]): are the last runs by the
+            rule ID.
+        """
+        self.__runsByRuleID = dict(runsByRuleID)
+        if self.__rules:
+            self.dataChanged.emit(
+                self.index(0, self.LAST_RUN_COLUMN),
+                self.index(len(self.__rules) - 1, self.columnCount() - 1)
+            )
+
+    def setRuleRun(self, rule: Rule, run: RuleRun) -> None:
+        """
+        Sets the last run of the rule.
+        Args:
+            rule (Rule): is the run rule.
+            run (RuleRun): is the finished run.
+        """
+        self.__runsByRuleID[rule.ruleID] = run
+        self.__progressByRuleID.pop(rule.ruleID, None)
+        self.ruleChanged(rule)
+
+    def setRuleProgress(self, rule: Rule, uploadedBytes: int,
+                        plannedBytes: int, etaSeconds: float) -> None:
+        """
+        Sets the progress of the running rule until its run is set.
+        Args:
+            rule (Rule): is the running rule.
+            uploadedBytes (int): is the number of the uploaded bytes.
+            plannedBytes (int): is the number of the planned bytes.
+            etaSeconds (float): is the estimated time left in seconds or -1
+            if it is not known.
+        """
+        self.__progressByRuleID[rule.ruleID] = (
+            uploadedBytes, plannedBytes, etaSeconds
+        )
+        self.ruleChanged(rule)
+
+    def setRules(self, listOfRules: list[Rule]) -> None:
+        """
+        Replaces the rules in the table: the rules that are gone are removed
+        and the new rules are appended, the other rows are left untouched.
+        Args:
+            listOfRules (list[Rule]): is the new list of rules.
+        """
+        newRules = dict.fromkeys(listOfRules)
+
+        removedRows = [
+            row for row, rule in enumerate(self.__rules)
+            if rule not in newRules
+        ]
+        removedRanges = self.__groupRows(removedRows)
+        if len(removedRanges) > self.MAX_REMOVED_RANGES:
+            self.beginResetModel()
+            self.__rules = list(newRules)
+            self.__rowByRule = {
+                rule: row for row, rule in enumerate(self.__rules)
+            }
+            self.__searchTexts = {}
+            self.endResetModel()
+            self.sort(self.__sortColumn, self.__sortOrder)
+            return
+
+        for first, last in reversed(removedRanges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.__rules[first:last + 1]
+            self.endRemoveRows()
+        if removedRows:
+            self.__rowByRule = {
+                rule: row for row, rule in enumerate(self.__rules)
+            }
+            self.__searchTexts = {
+                rule: texts for rule, texts in self.__searchTexts.items()
+                if rule in self.__rowByRule
+            }
+
+        insertedRules = [
+            rule for rule in newRules if rule not in self.__rowByRule
+        ]
+        if insertedRules:
+            first = len(self.__rules)
+            self.beginInsertRows(
+                QModelIndex(), first, first + len(insertedRules) - 1
+            )
+            self.__rules.extend(insertedRules)
+            for row, rule in enumerate(insertedRules, start=first):
+                self.__rowByRule[rule] = row
+            self.endInsertRows()
+            self.sort(self.__sortColumn, self.__sortOrder)
+
+    def sort(self, column: int,
+             order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        """
+        Sorts the rules by the column; the column -1 keeps the current order.
+        Args:
+            column (int): is the sorted column.
+            order (Qt.SortOrder): is the sort order.
+        """
+        self.__sortColumn = column
+        self.__sortOrder = order
+        if column < 0 or not self.__rules:
+            return
+
+        if column == self.DAY_OF_MONTH_COLUMN:
+            def sortKey(rule):
+                return (rule.dayOfMonth is None, rule.dayOfMonth or 0)
+        elif column >= self.LAST_RUN_COLUMN:
+            attribute = {
+                self.LAST_RUN_COLUMN: "startTime",
+                self.DURATION_COLUMN: "duration",
+                self.THROUGHPUT_COLUMN: "throughput",
+            }[column]
+
+            def sortKey(rule):
+                run = self.__runsByRuleID.get(rule.ruleID)
+                if run is None:
+                    return (True, 0.0)
+                return (False, getattr(run, attribute))
+        else:
+            def sortKey(rule):
+                return self.searchTexts(self.__rowByRule[rule])[column]
+
+        self.layoutAboutToBeChanged.emit()
+        oldRules = self.__rules
+        self.__rules = sorted(
+            oldRules,
+            key=sortKey,
+            reverse=order == Qt.SortOrder.DescendingOrder
+        )
+        self.__rowByRule = {
+            rule: row for row, rule in enumerate(self.__rules)
+        }
+        for index in self.persistentIndexList():
+            row = self.__rowByRule[oldRules[index.row()]]
+            self.changePersistentIndex(index, self.index(row, index.column()))
+        self.layoutChanged.emit()
+
+    def ruleChanged(self, rule: Rule) -> None:
+        """
+        Notifies the views that the displayed data of the rule has changed.
+        Args:
+            rule (Rule): is the changed rule.
+        """
+        row = self.__rowByRule.get(rule)
+        if row is None:
+            return
+        self.dataChanged.emit(
+            self.index(row, 0),
+            self.index(row, self.columnCount() - 1)
+        )
+
+    @staticmethod
+    def __groupRows(rows: list[int]) -> list[tuple[int, int]]:
+        """Groups the sorted rows into contiguous (first, last) ranges."""
+        ranges: list[tuple[int, int]] = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1] = (ranges[-1][0], row)
+            else:
+                ranges.append((row, row))
+        return ranges
@@ -12,31 +12,61 @@
 
 """Module containing the FileCopyWorker class."""
 
-import os
 import time
+import sqlite3
 import datetime
 from PyQt5.QtCore import QThread, pyqtSignal
 from model.Rule import Rule
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.errors import HttpError
+from model.RuleRun import RuleRun
+from model.UploadPlan import UploadPlan
+from model.ManifestRepository import ManifestRepository
+from model.RunHistoryRepository import RunHistoryRepository
+from model.HashCacheRepository import HashCacheRepository
+from service.BackupEngine import BackupEngine
+from service.HashService import HashService
+from service.ChangeWatcher import ChangeWatcher
+from service.RunScheduler import RunScheduler
+from logger.logger import logger
+from metrics.metrics import writeMetricsSnapshot
+from const.const import (
+    WATCH_POLL_TIME,
+    PROGRESS_REPORT_INTERVAL,
+    MAX_MISSED_MINUTES,
+)
+from profiling.profiling import profiler
 from exception.exceptions import (
-    FileNotUploadedException,
-    FolderIDDoesNotExistException,
     ListOfRulesIsNoneException,
     DriveServiceInNoneException,
+    FileNotUploadedException,
+    StorageQuotaExceededException,
 )
 
 
 class FileCopyWorker(QThread):
     """The class of Google Drive worker."""
     updateSignal = pyqtSignal()
-    errorOccured = pyqtSignal(str)
+    # The class of the error, the rule ID, the message and the number of
+    # the errors of a failed run.
+    errorOccured = pyqtSignal(str, str, str, int)
+    ruleRunFinished = pyqtSignal(object, object)
+    # The running rule, the uploaded and the planned bytes and the
+    # estimated seconds left (-1 if not known).
+    ruleProgress = pyqtSignal(object, object, object, float)
 
-    def __init__(self, driveService, listOfRules: list[Rule]):
+    def __init__(self, driveService, listOfRules: list[Rule],
+                 manifestModel: ManifestRepository | None = None,
+                 runHistoryModel: RunHistoryRepository | None = None,
+                 hashCacheModel: HashCacheRepository | None = None):
         """
         Initializes the file copy worker.
         Args:
             listOfRules (list[Rule]): list of rules.
+            manifestModel (ManifestRepository, None): is the manifest of
+            the uploaded files.
+            runHistoryModel (RunHistoryRepository, None): is the store of
+            the finished runs.
+            hashCacheModel (HashCacheRepository, None): is the cache of the
+            hashes of the local files.
         Raises:
             ListOfRulesIsNoneException: raise if the list of rules is None.
             DriveServiceInNoneException: raises if the drive service is None.
@@ -49,114 +79,234 @@ class FileCopyWorker(QThread):
 
         self.driveService = driveService
         self.listOfRules = listOfRules
+        self.runHistoryModel = runHistoryModel
+        self.engine = BackupEngine(driveService, manifestModel,
+                                   profiler=profiler,
+                                   hashService=HashService(hashCacheModel))
+        self.changeWatcher = ChangeWatcher()
+        self.scheduler = RunScheduler(self.__estimateSeconds)
 
-    def run(self) -> None:
-        """Checks the time, the date to start copying."""
-        while True:
-            for rule in self.listOfRules:
-                now = datetime.datetime.now()
-                currentWeekday = now.strftime("%A")
-                currentDayOfMonth = now.day
-                currentTimeStr = now.strftime("%H:%M")
-
-                shouldCheck = True
-
-                if rule.weekday and rule.weekday.strip():
-                    if rule.weekday.lower() != currentWeekday.lower():
-                        shouldCheck = False
-
-                if rule.dayOfMonth:
-                    if rule.dayOfMonth != currentDayOfMonth:
-                        shouldCheck = False
-
-                if shouldCheck and currentTimeStr == rule.time:
-                    try:
-                        if not self.__isFolderIDExists(rule.folderID):
-                            raise FolderIDDoesNotExistException(rule.folderID)
-                    except (
-                        FolderIDDoesNotExistException,
-                        HttpError
-                    ) as exception:
-                        self.errorOccured.emit(str(exception))
-                        continue
-                    try:
-                        self.__uploadToGoogleDrive(
-                            rule.pathFrom,
-                            rule.folderID
-                        )
-                    except FileNotUploadedException as exception:
-                        self.errorOccured.emit(str(exception))
-                        continue
-            self.updateSignal.emit()
-            WORKER_CHECK_TIME = 60
-            time.sleep(WORKER_CHECK_TIME)
-
-    def __uploadToGoogleDrive(self, filePath: str, folderID: str) -> None:
-        """
-        Uploads files from a list of file paths to a Google Drive folder by its
-        ID.
+    def setRules(self, listOfRules: list[Rule]) -> None:
+        """
+        Replaces the list of rules checked by the worker.
         Args:
-            source: is a file path.
-            folderID: is the ID of the destination folder.
+            listOfRules (list[Rule]): list of rules.
         Raises:
-            FileNotUploadedException: raise if the file has not been uploaded
-            to Google Drive.
+            ListOfRulesIsNoneException: raise if the list of rules is None.
         """
-        if os.path.isfile(filePath):
-            try:
-                self.__uploadFile(filePath, folderID)
-            except Exception as exception:
-                raise FileNotUploadedException() from exception
+        if listOfRules is None:
+            raise ListOfRulesIsNoneException()
+        self.listOfRules = list(listOfRules)
+
+    def run(self) -> None:
+        """
+        Queues the rules due in every minute (also in the minutes missed
+        during a long run) and the changes of the "onChange" rules as soon
+        as they are quiet, and runs the queued rules one by one.
+        """
+        lastMinute = None
+        while True:
+            minute = datetime.datetime.now().replace(second=0,
+                                                     microsecond=0)
+            if minute != lastMinute:
+                self.scheduleDueRules(minute, lastMinute)
+                lastMinute = minute
+                self.__reportCycle()
+            self.scheduleChanges()
+            isRuleRun = self.runNext()
+            self.changeWatcher.poll(0 if isRuleRun else WATCH_POLL_TIME)
 
-    def __uploadFile(self, filePath: str, folderID: str) -> None:
+    def runCycle(self, now: datetime.datetime) -> None:
         """
-        Uploads a single file to the given Google Drive folder by its ID.
+        Runs the rules due at the time once. The soak test calls it with a
+        simulated time.
         Args:
-            filePath: is a file path.
-            folderID: is the destination folder ID.
-        """
-        fileName = os.path.basename(filePath)
-
-        query = f"'{folderID}' in parents and name = '{fileName}' and " + \
-            "trashed = false"
-        response = self.driveService.files().list(
-            q=query,
-            spaces="drive",
-            fields="files(id)"
-        ).execute()
-        files = response.get("files", [])
-
-        media = MediaFileUpload(filePath, mimetype="application/octet-stream")
-
-        if files:
-            fileId = files[0]["id"]
-            self.driveService.files().update(
-                fileId=fileId,
-                media_body=media
-            ).execute()
-        else:
-            metadata = {"name": fileName, "parents": [folderID]}
-            self.driveService.files().create(
-                body=metadata,
-                media_body=media,
-                fields="id"
-            ).execute()
-
-    def __isFolderIDExists(self, folderID: str) -> bool:
-        """
-        Checks whether a folder with a given ID exists.
+            now (datetime.datetime): is the checked time.
+        """
+        self.scheduleDueRules(now)
+        while self.runNext():
+            pass
+        self.__reportCycle()
+
+    def scheduleDueRules(self, now: datetime.datetime,
+                         lastMinute: datetime.datetime | None = None
+                         ) -> None:
+        """
+        Queues the rules due at the time and in the minutes after the last
+        checked minute, at most MAX_MISSED_MINUTES back.
         Args:
-            folderID: is the Google Drive folder ID.
-        Raises:
-            HttpError: raise if the folder ID doesn't exist.
+            now (datetime.datetime): is the checked time.
+            lastMinute (datetime.datetime, None): is the last checked
+            minute or None to check only the time.
         """
-        try:
-            self.driveService.files().get(
-                fileId=folderID,
-                fields="id, name, mimeType"
-            ).execute()
+        minutes = [now]
+        if lastMinute is not None:
+            missedMinutes = int((now - lastMinute).total_seconds() // 60) - 1
+            minutes[:0] = [
+                now - datetime.timedelta(minutes=number)
+                for number in range(min(missedMinutes, MAX_MISSED_MINUTES),
+                                    0, -1)
+            ]
+        for minute in minutes:
+            for rule in self.listOfRules:
+                if BackupEngine.isRuleDue(rule, minute):
+                    self.scheduler.push(rule)
+
+    def scheduleChanges(self) -> None:
+        """
+        Watches the "onChange" rules and queues the changed files of the
+        rules whose changes are quiet.
+        """
+        self.changeWatcher.setRules(
+            [rule for rule in self.listOfRules if rule.isOnChange]
+        )
+        for rule, changedPaths in self.changeWatcher.takeChanges():
+            self.scheduler.push(rule, changedPaths)
+
+    def runNext(self) -> bool:
+        """
+        Runs the next queued rule; the rules which have been deleted since
+        they were queued are dropped.
+        Returns:
+            bool: False if the queue is empty.
+        """
+        scheduledRun = self.scheduler.pop()
+        if scheduledRun is None:
+            return False
+        rule, changedPaths = scheduledRun
+        if rule not in self.listOfRules:
+            self.scheduler.complete(rule, 0.0)
             return True
-        except HttpError as exception:
-            if exception.resp.status == 404:
-                return False
-            raise FolderIDDoesNotExistException(folderID) from exception
+        startTime = time.monotonic()
+        try:
+            self.__runRule(rule, changedPaths)
+        finally:
+            self.scheduler.complete(rule, time.monotonic() - startTime)
+        return True
+
+    def __reportCycle(self) -> None:
+        """Writes the metrics snapshot and notifies about the update."""
+        try:
+            writeMetricsSnapshot()
+        except OSError as exception:
+            logger.error(exception)
+        self.updateSignal.emit()
+
+    def __runRule(self, rule: Rule,
+                  changedPaths: set[str] | None = None) -> None:
+        """Runs the rule and reports its progress and the finished run."""
+        historicalThroughput = self.__getHistoricalThroughput(rule.ruleID)
+        lastReportTime = None
+
+        def reportProgress(run: RuleRun, plan: UploadPlan) -> None:
+            nonlocal lastReportTime
+            now = time.monotonic()
+            if lastReportTime is not None and \
+               now - lastReportTime < PROGRESS_REPORT_INTERVAL:
+                return
+            lastReportTime = now
+            elapsedTime = time.time() - run.startTime
+            throughput = run.bytesUploaded / elapsedTime \
+                if run.bytesUploaded and elapsedTime > 0 \
+                else historicalThroughput
+            etaSeconds = plan.estimateSeconds(throughput, run.bytesUploaded)
+            self.ruleProgress.emit(
+                rule, run.bytesUploaded, plan.plannedBytes,
+                etaSeconds if etaSeconds is not None else -1.0
+            )
+
+        with profiler.profileRun(rule.ruleID):
+            run = self.engine.runRule(rule, changedPaths, reportProgress,
+                                      self.__getReservedBytes(rule))
+        self.__addRun(run)
+        self.ruleRunFinished.emit(rule, run)
+        if run.error is not None:
+            self.__emitError(rule, run)
+
+    def __emitError(self, rule: Rule, run: RuleRun) -> None:
+        """
+        Emits the error of the failed run once; a run which failed to upload
+        files counts every failed file.
+        """
+        message = str(run.error)
+        cause = run.error.__cause__ if run.error is not None else None
+        if cause is not None:
+            message = f"{message} {type(cause).__name__}: {cause}"
+        count = 1
+        if isinstance(run.error, (FileNotUploadedException,
+                                  StorageQuotaExceededException)):
+            count = max(run.filesChanged - run.filesUploaded, 1)
+        self.errorOccured.emit(run.errorClass, rule.ruleID, message, count)
+
+    def __estimateSeconds(self, rule: Rule,
+                          changedPaths: set[str] | None) -> float:
+        """
+        Returns the estimated duration of the run: the bytes of the changed
+        files at the recent throughput of the rule, or the average duration
+        of the stored runs of the rule, or 0 if it is not known, so the new
+        rules run first.
+        """
+        if self.runHistoryModel is None:
+            return 0.0
+        if changedPaths is not None:
+            throughput = self.__getHistoricalThroughput(rule.ruleID)
+            if throughput > 0:
+                changedBytes = sum(
+                    fileStat.st_size for _, _, fileStat in
+                    BackupEngine.scanPaths(rule.pathFrom, changedPaths)
+                )
+                return changedBytes / throughput
+        try:
+            return self.runHistoryModel.getRuleStatistics(
+                rule.ruleID
+            )["averageDuration"]
+        except sqlite3.Error as exception:
+            logger.error(exception)
+            return 0.0
+
+    def __getReservedBytes(self, rule: Rule) -> int:
+        """
+        Returns the bytes the queued runs of the rules of the account with
+        a higher priority than the rule are expected to upload (the average
+        of their stored runs), so the rule does not take their storage.
+        """
+        if self.runHistoryModel is None:
+            return 0
+        reservedBytes = 0
+        for pendingRule in self.scheduler.getPendingRules():
+            if pendingRule.account != rule.account or \
+               pendingRule.priorityRank >= rule.priorityRank:
+                continue
+            try:
+                statistics = self.runHistoryModel.getRuleStatistics(
+                    pendingRule.ruleID
+                )
+            except sqlite3.Error as exception:
+                logger.error(exception)
+                continue
+            if statistics["runs"]:
+                reservedBytes += int(statistics["bytesUploaded"] /
+                                     statistics["runs"])
+        return reservedBytes
+
+    def __getHistoricalThroughput(self, ruleID: str) -> float:
+        """
+        Returns the recent uploaded bytes per second of the rule or 0 if it
+        is not known.
+        """
+        if self.runHistoryModel is None:
+            return 0.0
+        try:
+            return self.runHistoryModel.estimateThroughput(ruleID)
+        except sqlite3.Error as exception:
+            logger.error(exception)
+            return 0.0
+
+    def __addRun(self, run) -> None:
+        """Stores the finished run in the run history."""
+        if self.runHistoryModel is None:
+            return
+        try:
+            self.runHistoryModel.addRun(run)
+        except sqlite3.Error as exception:
+            logger.error(exception)
@@ -0,0 +1,133 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FolderIndexWorker class."""
+
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from googleapiclient.errors import HttpError
+from model.FolderIndex import FolderIndex
+from service.GoogleDriveService import GoogleDriveService
+from const.const import FOLDER_INDEX_FILE_PATH, FOLDER_INDEX_REFRESH_TIME
+from exception.exceptions import DriveServiceInNoneException
+
+
+class FolderIndexWorker(QThread):
+    """
+    The class of the folder index worker - builds the index of all folders
+    of the drive with one paged query and then keeps it current with the
+    changes of the drive every FOLDER_INDEX_REFRESH_TIME seconds. The index
+    is saved to FOLDER_INDEX_FILE after every update.
+    """
+    indexUpdated = pyqtSignal()
+    errorOccured = pyqtSignal(str)
+
+    def __init__(self, driveService, folderIndex: FolderIndex,
+                 indexFilePath: str = FOLDER_INDEX_FILE_PATH):
+        """
+        Initializes the folder index worker.
+        Args:
+            driveService (Service): is the auth drive service.
+            folderIndex (FolderIndex): is the updated index.
+            indexFilePath (str): is the path to the index file.
+        Raises:
+            DriveServiceInNoneException: raises if the drive service is None.
+        """
+        super().__init__()
+        if driveService is None:
+            raise DriveServiceInNoneException()
+
+        self.driveService = driveService
+        self.folderIndex = folderIndex
+        self.indexFilePath = indexFilePath
+        self.__wakeEvent = threading.Event()
+        self.__isStopped = False
+        self.__isResetRequested = False
+
+    def refresh(self) -> None:
+        """Updates the index now instead of waiting for the next check."""
+        self.__wakeEvent.set()
+
+    def resetIndex(self, driveService=None) -> None:
+        """
+        Drops the index and builds it again, e.g. for another account.
+        Args:
+            driveService (Service, None): is the auth drive service of the
+            account or None to keep the drive service.
+        """
+        if driveService is not None:
+            self.driveService = driveService
+        self.__isResetRequested = True
+        self.__wakeEvent.set()
+
+    def stop(self) -> None:
+        """Stops the worker after the current update."""
+        self.__isStopped = True
+        self.__wakeEvent.set()
+
+    def run(self) -> None:
+        """Builds or updates the index until the worker is stopped."""
+        service = GoogleDriveService.createThreadService(self.driveService)
+        while not self.__isStopped:
+            if self.__isResetRequested:
+                self.__isResetRequested = False
+                self.folderIndex.clear()
+                service = GoogleDriveService.createThreadService(
+                    self.driveService
+                )
+            try:
+                if self.__updateIndex(service):
+                    self.folderIndex.writeJSON(self.indexFilePath)
+                    self.indexUpdated.emit()
+            except GoogleDriveService.API_ERRORS as exception:
+                self.errorOccured.emit(str(exception))
+            self.__wakeEvent.wait(FOLDER_INDEX_REFRESH_TIME)
+            self.__wakeEvent.clear()
+
+    def __updateIndex(self, service) -> bool:
+        """
+        Builds the index or applies the changes since the last update; an
+        expired changes token makes the index to be built again.
+        Returns:
+            bool: True if the index has changed.
+        """
+        changesPageToken = self.folderIndex.changesPageToken
+        if changesPageToken is None:
+            self.__buildIndex(service)
+            return True
+
+        isChanged = False
+        try:
+            for changes, newStartPageToken in \
+                    GoogleDriveService.listChangePages(
+                        service, changesPageToken
+                    ):
+                isChanged |= self.folderIndex.applyChanges(
+                    changes, newStartPageToken
+                )
+        except HttpError as exception:
+            if exception.resp.status not in (404, 410):
+                raise
+            self.__buildIndex(service)
+            return True
+        return isChanged
+
+    def __buildIndex(self, service) -> None:
+        """Lists all folders of the drive and replaces the index."""
+        changesPageToken = GoogleDriveService.getStartPageToken(service)
+        rootFolderID = GoogleDriveService.getRootFolderID(service)
+        folders = [
+            folder
+            for page in GoogleDriveService.listAllFolderPages(service)
+            for folder in page
+        ]
+        self.folderIndex.rebuild(rootFolderID, folders, changesPageToken)
@@ -0,0 +1,105 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the FolderListingWorker class."""
+
+import queue
+import itertools
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from service.GoogleDriveService import GoogleDriveService
+from exception.exceptions import DriveServiceInNoneException
+
+
+class FolderListingWorker(QThread):
+    """
+    The class of the folder listing worker - lists the subfolders of Google
+    Drive folders in the background and streams them page by page.
+
+    Requests are served by priority: folders expanded by the user come
+    before speculative prefetches, and a folder already waiting in the
+    queue is not requested twice.
+    """
+    pageLoaded = pyqtSignal(str, list)
+    listingFinished = pyqtSignal(str, list)
+    errorOccured = pyqtSignal(str, str)
+
+    USER_PRIORITY = 0
+    PREFETCH_PRIORITY = 1
+    STOP_PRIORITY = -1
+
+    def __init__(self, driveService):
+        """
+        Initializes the folder listing worker.
+        Args:
+            driveService (Service): is the auth drive service.
+        Raises:
+            DriveServiceInNoneException: raises if the drive service is None.
+        """
+        super().__init__()
+        if driveService is None:
+            raise DriveServiceInNoneException()
+
+        self.driveService = driveService
+        self.__requests: queue.PriorityQueue = queue.PriorityQueue()
+        self.__sequence = itertools.count()
+        self.__lock = threading.Lock()
+        self.__pendingPriorities: dict[str, int] = {}
+        self.__isStopped = False
+
+    def requestListing(self, parentID: str, isPrefetch: bool = False) -> None:
+        """
+        Queues the listing of the subfolders of the parent folder.
+        Args:
+            parentID (str): is the parent ID.
+            isPrefetch (bool): whether the listing is speculative.
+        """
+        priority = self.PREFETCH_PRIORITY if isPrefetch else \
+            self.USER_PRIORITY
+        with self.__lock:
+            pendingPriority = self.__pendingPriorities.get(parentID)
+            if pendingPriority is not None and pendingPriority <= priority:
+                return
+            self.__pendingPriorities[parentID] = priority
+        self.__requests.put((priority, next(self.__sequence), parentID))
+
+    def stop(self) -> None:
+        """Stops the worker after the current page."""
+        self.__isStopped = True
+        self.__requests.put((self.STOP_PRIORITY, next(self.__sequence), None))
+
+    def run(self) -> None:
+        """Lists the requested folders until the worker is stopped."""
+        service = GoogleDriveService.createThreadService(self.driveService)
+        while not self.__isStopped:
+            priority, _, parentID = self.__requests.get()
+            if parentID is None:
+                return
+            with self.__lock:
+                if self.__pendingPriorities.get(parentID) != priority:
+                    continue
+                del self.__pendingPriorities[parentID]
+            self.__listFolder(service, parentID)
+
+    def __listFolder(self, service, parentID: str) -> None:
+        """Lists the subfolders of the parent folder and emits the pages."""
+        folders: list[dict] = []
+        try:
+            for page in GoogleDriveService.listFolderPages(service, parentID):
+                if self.__isStopped:
+                    return
+                folders.extend(page)
+                self.pageLoaded.emit(parentID, page)
+        except GoogleDriveService.API_ERRORS as exception:
+            self.errorOccured.emit(parentID, str(exception))
+            return
+        self.listingFinished.emit(parentID, folders)
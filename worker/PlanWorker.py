@@ -0,0 +1,135 @@
+# This file is part of GooD Autobackuper.
+#
+# GooD Autobackuper program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""Module containing the PlanWorker class."""
+
+import queue
+import sqlite3
+from PyQt5.QtCore import QThread, pyqtSignal
+from model.Rule import Rule
+from model.ManifestRepository import ManifestRepository
+from model.RunHistoryRepository import RunHistoryRepository
+from model.HashCacheRepository import HashCacheRepository
+from service.BackupEngine import BackupEngine
+from service.HashService import HashService
+from service.GoogleDriveService import GoogleDriveService
+from logger.logger import logger
+from exception.exceptions import DriveServiceInNoneException
+
+
+class PlanWorker(QThread):
+    """
+    The class of the plan worker - plans the runs of the requested rules in
+    the background (a dry run: nothing is uploaded) and emits the plans
+    with the estimated duration.
+    """
+    # The rule and the plan of UploadPlan.toDict with its "pathFrom".
+    planFinished = pyqtSignal(object, dict)
+    errorOccured = pyqtSignal(str, str)
+    # The errors failing the plan of a rule.
+    PLAN_ERRORS = (
+        *BackupEngine.BACKUP_ERRORS,
+        *GoogleDriveService.API_ERRORS,
+        sqlite3.Error,
+    )
+
+    def __init__(self, driveService,
+                 manifestModel: ManifestRepository | None = None,
+                 runHistoryModel: RunHistoryRepository | None = None,
+                 hashCacheModel: HashCacheRepository | None = None):
+        """
+        Initializes the plan worker.
+        Args:
+            driveService (Service): is the auth drive service.
+            manifestModel (ManifestRepository, None): is the manifest of
+            the uploaded files.
+            runHistoryModel (RunHistoryRepository, None): is the store of
+            the finished runs, which gives the throughput.
+            hashCacheModel (HashCacheRepository, None): is the cache of the
+            hashes of the local files.
+        Raises:
+            DriveServiceInNoneException: raises if the drive service is None.
+        """
+        super().__init__()
+        if driveService is None:
+            raise DriveServiceInNoneException()
+
+        self.driveService = driveService
+        self.manifestModel = manifestModel
+        self.runHistoryModel = runHistoryModel
+        self.hashCacheModel = hashCacheModel
+        self.__requests: queue.Queue[Rule | None] = queue.Queue()
+
+    def requestPlan(self, rule: Rule) -> None:
+        """
+        Queues the planning of the rule and starts the worker if needed.
+        Args:
+            rule (Rule): is the planned rule.
+        """
+        self.__requests.put(rule)
+        if not self.isRunning():
+            self.start()
+
+    def stop(self) -> None:
+        """Stops the worker after the current plan."""
+        self.__requests.put(None)
+
+    def run(self) -> None:
+        """Plans the requested rules until the worker is stopped."""
+        engine = self.createEngine(
+            GoogleDriveService.createThreadService(self.driveService)
+        )
+        try:
+            while (rule := self.__requests.get()) is not None:
+                try:
+                    self.planFinished.emit(rule, self.createPlan(engine,
+                                                                 rule))
+                except self.PLAN_ERRORS as exception:
+                    logger.error(exception)
+                    self.errorOccured.emit(rule.ruleID, str(exception))
+        finally:
+            engine.hashService.close()
+
+    def createEngine(self, driveService=None) -> BackupEngine:
+        """
+        Returns the engine planning the rules.
+        Args:
+            driveService (Service, None): is the drive service of the
+            calling thread or None for the service of the worker.
+        """
+        return BackupEngine(driveService or self.driveService,
+                            self.manifestModel,
+                            hashService=HashService(self.hashCacheModel))
+
+    def createPlan(self, engine: BackupEngine, rule: Rule) -> dict:
+        """
+        Plans the full run of the rule, looking the new files up in Google
+        Drive, and estimates its duration by the recent throughput.
+        Args:
+            engine (BackupEngine): is the engine of createEngine.
+            rule (Rule): is the planned rule.
+        Raises:
+            HttpError: raises if the Google Drive folders cannot be listed.
+        Returns:
+            dict: the plan of UploadPlan.toDict with its "pathFrom".
+        """
+        plan = engine.planRule(rule, isRemoteChecked=True)
+        throughput = 0.0
+        if self.runHistoryModel is not None:
+            try:
+                throughput = self.runHistoryModel.estimateThroughput(
+                    rule.ruleID
+                )
+            except sqlite3.Error as exception:
+                logger.error(exception)
+        return {"pathFrom": rule.pathFrom,
+                **plan.toDict(plan.estimateSeconds(throughput))}